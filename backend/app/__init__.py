@@ -3,7 +3,17 @@ from app.extensions import db, jwt, bcrypt, cors, migrate, socketio
 from app.routes.auth import auth_bp
 from app.routes.events import events_bp
 from app.routes.swaps import swaps_bp
+from app.routes.ops import ops_bp
+from app.routes.availability import availability_bp
+from app.routes.batch import batch_bp
+from app.routes.orgs import orgs_bp
+from app.routes.marketplace import marketplace_bp
+from app.routes.analytics import analytics_bp
 from app.config import config
+from app.commands import register_commands
+from app.services import entity_cache, outbox, realtime, revocation, tenancy
+from app.utils import decorators, profiling, sqlite, tracing
+from app import background
 
 def create_app(config_name='development'):
     app = Flask(__name__)
@@ -11,22 +21,45 @@ def create_app(config_name='development'):
     
     # Initialize extensions
     db.init_app(app)
+    sqlite.init_app(app)
     jwt.init_app(app)
+    decorators.init_app(app)
     bcrypt.init_app(app)
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
     migrate.init_app(app, db)
-    socketio.init_app(app)
+    socketio.init_app(app, client_manager=realtime.make_manager(app.config))
     
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(events_bp)
     app.register_blueprint(swaps_bp)
+    app.register_blueprint(ops_bp)
+    app.register_blueprint(availability_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(orgs_bp)
+    app.register_blueprint(marketplace_bp)
+    app.register_blueprint(analytics_bp)
+
+    # CLI maintenance jobs and per-process services
+    register_commands(app)
+    outbox.init_app(app)
+    revocation.init_app(app)
+    entity_cache.init_app(app)
+    tenancy.init_app(app)
+
+    # Background jobs normally run in `flask worker` (app/background.py)
+    if app.config['BACKGROUND_TASKS'] and not app.config.get('TESTING'):
+        background.start(app)
 
     # Root endpoint for health check / debug
     @app.route('/')
     def index():
         return {'message': 'SlotSwapper API is running!'}
 
+    # Last, so every route handler gets wrapped
+    tracing.init_app(app)
+    profiling.init_app(app)
+
     return app
 
 from app.extensions import db
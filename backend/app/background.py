@@ -0,0 +1,26 @@
+"""
+Background jobs: the outbox worker pool and the periodic maintenance tasks.
+
+They run in the ``flask worker`` process, or inside the app process when
+BACKGROUND_TASKS is set. ``create_app`` alone never starts them, so
+migrations, other CLI commands and test apps stay single-threaded.
+"""
+
+from app.services import analytics, expiry, marketplace, outbox, revocation
+
+
+def start(app, outbox_pool=True):
+    """
+    Start every job whose interval (or thread count) is configured.
+
+    Args:
+        outbox_pool (bool): Also start the in-process outbox pool; the worker
+            command runs its own
+
+    Returns:
+        list: Started tasks, each with a ``stop()`` method
+    """
+    services = [expiry, marketplace, analytics, revocation]
+    if outbox_pool:
+        services.insert(0, outbox)
+    return [task for task in (service.start_background(app) for service in services) if task is not None]
@@ -0,0 +1,154 @@
+"""
+Flask CLI commands for background maintenance jobs.
+"""
+
+import signal
+from datetime import datetime
+import click
+from app import background
+from app.extensions import db
+from app.models import Organization
+from app.services import analytics, archival, changes, expiry, marketplace, outbox, swap_counters, tenancy, transitions
+from app.utils import profiling
+
+
+def register_commands(app):
+    """Attach maintenance commands to the ``flask`` CLI."""
+
+    @app.cli.command('reconcile-swap-counters')
+    def reconcile_swap_counters():
+        """Rebuild per-user swap counters from swap_requests."""
+        fixed = sum(count for _, count in tenancy.each_partition(swap_counters.reconcile))
+        click.echo(f'Reconciled swap counters: {fixed} row(s) corrected')
+
+    @app.cli.command('rebuild-marketplace')
+    def rebuild_marketplace():
+        """Recompute the marketplace read model from events and users."""
+        total = sum(count for _, count in tenancy.each_partition(marketplace.rebuild))
+        click.echo(f'Rebuilt marketplace: {total} slot(s) listed')
+
+    @app.cli.command('archive')
+    @click.option('--batch-size', type=int, default=None, help='Rows per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after N batches per table.')
+    @click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+    def archive(batch_size, max_batches, pause):
+        """Move past events and resolved swaps into the archive tables."""
+        runs = tenancy.each_partition(archival.run, batch_size=batch_size, max_batches=max_batches, pause=pause)
+        for partition, moved in runs:
+            for table, count in moved.items():
+                click.echo(f'Archived {count} row(s) from {_qualified(partition, table)}')
+
+    @app.cli.command('prune-tombstones')
+    @click.option('--batch-size', type=int, default=1000, help='Tombstones deleted per transaction.')
+    def prune_tombstones(batch_size):
+        """Delete event tombstones older than EVENT_TOMBSTONE_RETENTION."""
+        cutoff = datetime.utcnow() - app.config['EVENT_TOMBSTONE_RETENTION']
+
+        def prune():
+            total = 0
+            while True:
+                count = changes.prune_tombstones(cutoff, batch_size)
+                if not count:
+                    return total
+                total += count
+
+        total = sum(count for _, count in tenancy.each_partition(prune))
+        click.echo(f'Pruned {total} event tombstone(s)')
+
+    @app.cli.command('compact-transitions')
+    @click.option('--batch-size', type=int, default=5000, help='Log rows compacted per transaction.')
+    def compact_transitions(batch_size):
+        """Fold swap transitions older than SWAP_TRANSITION_RETENTION into daily counts."""
+        cutoff = datetime.utcnow() - app.config['SWAP_TRANSITION_RETENTION']
+
+        def compact():
+            total = 0
+            while True:
+                count = transitions.compact(cutoff, batch_size)
+                if not count:
+                    return total
+                total += count
+
+        total = sum(count for _, count in tenancy.each_partition(compact))
+        click.echo(f'Compacted {total} swap transition(s)')
+
+    @app.cli.command('roll-up-analytics')
+    @click.option('--batch-size', type=int, default=None, help='Log rows per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after N batches per partition.')
+    def roll_up_analytics(batch_size, max_batches):
+        """Add new swap transitions to the daily analytics rollups."""
+        runs = tenancy.each_partition(analytics.roll_up, batch_size=batch_size, max_batches=max_batches)
+        click.echo(f'Rolled up {sum(count for _, count in runs)} swap transition(s)')
+
+    @app.cli.command('profile-token')
+    @click.option('--ttl', type=int, default=600, help='Seconds the token stays valid.')
+    def profile_token(ttl):
+        """Mint a token for the X-Profile header (or _profile query parameter)."""
+        if not app.config['PROFILER_SECRET']:
+            raise click.ClickException('PROFILER_SECRET is not set')
+        click.echo(profiling.make_token(app.config['PROFILER_SECRET'], ttl))
+
+    @app.cli.command('metrics-token')
+    @click.option('--ttl', type=int, default=30 * 24 * 3600, help='Seconds the token stays valid.')
+    def metrics_token(ttl):
+        """Mint a token for the X-Metrics-Token header of GET /api/ops/metrics."""
+        if not app.config['METRICS_SECRET']:
+            raise click.ClickException('METRICS_SECRET is not set')
+        click.echo(profiling.make_token(app.config['METRICS_SECRET'], ttl))
+
+    @app.cli.command('expire-swaps')
+    @click.option('--batch-size', type=int, default=None, help='Swaps expired per transaction.')
+    @click.option('--max-batches', type=int, default=None, help='Stop after N batches.')
+    def expire_swaps(batch_size, max_batches):
+        """Expire PENDING swaps past their TTL or slot start time."""
+        runs = tenancy.each_partition(expiry.sweep, batch_size=batch_size, max_batches=max_batches)
+        expired = sum(count for _, count in runs)
+        click.echo(f'Expired {expired} swap request(s)')
+
+    @app.cli.command('create-org')
+    @click.argument('name')
+    @click.option('--slug', default=None, help='URL-safe identifier (default derived from NAME).')
+    def create_org(name, slug):
+        """Create an organization."""
+        org = Organization(name=name, slug=slug or Organization.slugify(name))
+        db.session.add(org)
+        db.session.commit()
+        click.echo(f'Created organization {org.slug} ({org.id})')
+
+    @app.cli.command('route-tenant')
+    @click.argument('slug')
+    @click.argument('schema')
+    def route_tenant(slug, schema):
+        """Move an organization's events and swaps into their own PostgreSQL schema."""
+        org = Organization.query.filter_by(slug=slug).first()
+        if org is None:
+            raise click.ClickException(f'No organization {slug}')
+        click.echo(f'Waiting {app.config["TENANT_SCHEMA_CACHE_TTL"]}s for cached routes to expire')
+        try:
+            tenancy.route_to_schema(org, schema)
+        except (RuntimeError, ValueError) as e:
+            raise click.ClickException(str(e))
+        click.echo(f'Routed {slug} to schema {schema}')
+
+    @app.cli.command('worker')
+    @click.option('--threads', type=int, default=None, help='Worker threads (default OUTBOX_WORKER_THREADS or 1).')
+    @click.option('--batch-size', type=int, default=None, help='Messages claimed per batch.')
+    def worker(threads, batch_size):
+        """Drain the outbox and run the periodic maintenance jobs until interrupted."""
+        pool = outbox.WorkerPool(app, threads=threads, batch_size=batch_size)
+        signal.signal(signal.SIGTERM, lambda *_: pool.stop())
+        tasks = background.start(app, outbox_pool=False)
+        click.echo(f'Outbox worker started with {pool.threads} thread(s) and {len(tasks)} periodic job(s)')
+        pool.start()
+        try:
+            pool.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.stop()
+            for task in tasks:
+                task.stop()
+
+
+def _qualified(partition, table):
+    return f'{partition}:{table}' if partition else table
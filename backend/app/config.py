@@ -30,8 +30,135 @@ class Config:
     # Pagination defaults
     ITEMS_PER_PAGE = 50
     
+    # Archival retention: rows older than these windows move to cold tables
+    ARCHIVE_EVENTS_AFTER = timedelta(days=int(os.environ.get('ARCHIVE_EVENTS_AFTER_DAYS', 90)))
+    ARCHIVE_SWAPS_AFTER = timedelta(days=int(os.environ.get('ARCHIVE_SWAPS_AFTER_DAYS', 30)))
+    ARCHIVE_BATCH_SIZE = 500
+    
+    # Background jobs (outbox pool, swap sweeper, marketplace prune, analytics
+    # rollup, revocation log prune) run in `flask worker`. BACKGROUND_TASKS=1
+    # also runs them inside the app process, for single-process deployments;
+    # other CLI commands never start them
+    BACKGROUND_TASKS = os.environ.get('BACKGROUND_TASKS', '0') == '1'
+    
+    # In-process outbox worker pool when BACKGROUND_TASKS is set; 0 threads
+    # leaves the outbox to `flask worker`
+    OUTBOX_WORKER_THREADS = int(os.environ.get('OUTBOX_WORKER_THREADS', 0))
+    OUTBOX_BATCH_SIZE = 100
+    OUTBOX_POLL_INTERVAL = 1.0
+    OUTBOX_LEASE_SECONDS = 60
+    OUTBOX_MAX_ATTEMPTS = 8
+    OUTBOX_BACKOFF_BASE = 2.0
+    OUTBOX_BACKOFF_MAX = 300.0
+    OUTBOX_RETENTION = timedelta(days=7)
+    
+    # Marketplace read model; started slots are pruned every interval (0 disables)
+    MARKETPLACE_PRUNE_INTERVAL = int(os.environ.get('MARKETPLACE_PRUNE_INTERVAL', 300))
+    
+    # Swap transition log rows older than this are compacted into daily counts
+    SWAP_TRANSITION_RETENTION = timedelta(days=int(os.environ.get('SWAP_TRANSITION_RETENTION_DAYS', 90)))
+    
+    # Swap analytics rollups, read from the transition log every interval (0
+    # disables the in-process job). Log rows younger than the lag wait for the
+    # next run, so transactions still committing lower ids are not skipped.
+    ANALYTICS_ROLLUP_INTERVAL = int(os.environ.get('ANALYTICS_ROLLUP_INTERVAL', 300))
+    ANALYTICS_ROLLUP_BATCH_SIZE = 5000
+    ANALYTICS_ROLLUP_LAG = timedelta(seconds=30)
+    ANALYTICS_MAX_DAYS = 366
+    
+    # Pending swap expiry; interval 0 disables the in-process sweeper
+    SWAP_REQUEST_TTL = timedelta(hours=int(os.environ.get('SWAP_REQUEST_TTL_HOURS', 72)))
+    SWAP_SWEEPER_INTERVAL = int(os.environ.get('SWAP_SWEEPER_INTERVAL', 0))
+    SWAP_SWEEPER_BATCH_SIZE = 500
+    
+    # Availability query limits
+    AVAILABILITY_MAX_USERS = 1000
+    AVAILABILITY_MAX_WINDOW = timedelta(days=62)
+    
+    # Delta sync: tombstones older than this are pruned and older cursors must resync
+    EVENT_TOMBSTONE_RETENTION = timedelta(days=30)
+    
+    # Swap candidate ranking
+    CANDIDATE_WINDOW = timedelta(days=14)
+    CANDIDATE_SCAN_LIMIT = 1000
+    CANDIDATE_PROXIMITY_HOURS = 24.0
+    CANDIDATE_MAX_K = 50
+    
+    # JWT revocation: per-process Bloom filter + exact set, synced from the
+    # revoked_tokens log every interval by a thread the first check starts in
+    # each serving process (0 syncs only once). Each sync re-reads rows
+    # revoked within the lag, in case they committed late. Expired log rows
+    # are pruned by the background jobs
+    REVOCATION_SYNC_INTERVAL = int(os.environ.get('REVOCATION_SYNC_INTERVAL', 5))
+    REVOCATION_SYNC_LAG = timedelta(seconds=60)
+    REVOCATION_PRUNE_INTERVAL = int(os.environ.get('REVOCATION_PRUNE_INTERVAL', 300))
+    REVOCATION_BLOOM_CAPACITY = 100000
+    REVOCATION_BLOOM_ERROR_RATE = 0.001
+    REVOCATION_EXACT_MAX = 50000
+    
+    # Entity detail cache; ENTITY_CACHE_URL selects a shared Redis backend,
+    # otherwise an in-process LRU of ENTITY_CACHE_SIZE entries (0 disables)
+    ENTITY_CACHE_URL = os.environ.get('ENTITY_CACHE_URL')
+    ENTITY_CACHE_SIZE = int(os.environ.get('ENTITY_CACHE_SIZE', 10000))
+    ENTITY_CACHE_TTL = 30
+    
+    # Recurring events are expanded only inside the listed window; without
+    # one, the next RECURRENCE_WINDOW. Longer windows are capped for expansion
+    RECURRENCE_WINDOW = timedelta(days=31)
+    RECURRENCE_MAX_WINDOW = timedelta(days=366)
+    
+    # Organizations: invite links expire after ORG_INVITE_TTL seconds; routed
+    # tenants' schema names are cached per process for TENANT_SCHEMA_CACHE_TTL
+    ORG_INVITE_TTL = 7 * 24 * 3600
+    TENANT_SCHEMA_CACHE_TTL = 60
+    
+    # Request batching (POST /api/batch)
+    BATCH_MAX_REQUESTS = 20
+    BATCH_MAX_WORKERS = 4
+    
+    # Tracing: a TRACE_SAMPLE_RATE share of requests record spans; those slower
+    # than TRACE_SLOW_MS are appended to TRACE_EXPORT_PATH (unset disables)
+    TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH')
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.01))
+    TRACE_SLOW_MS = int(os.environ.get('TRACE_SLOW_MS', 500))
+    TRACE_MAX_SPANS = 2000
+    TRACE_EXPORT_MAX_BYTES = 50 * 1024 * 1024
+    
+    # GET /api/ops/metrics requires a `flask metrics-token` token signed with
+    # METRICS_SECRET; unset, the endpoint returns 404
+    METRICS_SECRET = os.environ.get('METRICS_SECRET')
+    
+    # On-demand profiling; hooks are installed only when PROFILER_SECRET or a
+    # sampled endpoint is configured
+    PROFILER_SECRET = os.environ.get('PROFILER_SECRET')
+    PROFILER_SAMPLE_ENDPOINT = os.environ.get('PROFILER_SAMPLE_ENDPOINT')
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0))
+    PROFILER_FORMAT = 'folded'
+    PROFILER_INTERVAL = 0.001
+    PROFILER_DIR = os.environ.get('PROFILER_DIR', 'profiles')
+    PROFILER_MAX_FILES = 200
+    PROFILER_MAX_BYTES = 200 * 1024 * 1024
+    
+    # SQLite connection tuning, set by the 'sqlite' profile (SQLiteConfig);
+    # None leaves SQLite's default. With SQLITE_SERIALIZE_WRITES, write
+    # transactions queue for one writer per process (app/utils/sqlite.py)
+    SQLITE_JOURNAL_MODE = None
+    SQLITE_SYNCHRONOUS = None
+    SQLITE_BUSY_TIMEOUT_MS = None
+    SQLITE_MMAP_SIZE = None
+    SQLITE_CACHE_SIZE_KB = None
+    SQLITE_FOREIGN_KEYS = None
+    SQLITE_SERIALIZE_WRITES = False
+    
     # SocketIO settings
     SOCKETIO_CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173').split(',')
+    # Cross-process fan-out; SOCKETIO_MESSAGE_QUEUE is a redis:// or memory://
+    # backplane URL (unset keeps emits in-process). Emits for other processes
+    # are batched per room for up to SOCKETIO_BATCH_INTERVAL seconds (0 disables)
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_CHANNEL = 'slotswapper'
+    SOCKETIO_BATCH_INTERVAL = float(os.environ.get('SOCKETIO_BATCH_INTERVAL', 0.005))
+    SOCKETIO_BATCH_MAX = 100
 
 
 class DevelopmentConfig(Config):
@@ -45,6 +172,23 @@ class ProductionConfig(Config):
     DEBUG = False
 
 
+class SQLiteConfig(ProductionConfig):
+    """Single-node production on one SQLite file; run a single app process."""
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///slotswapper.db'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('SQLITE_POOL_SIZE', 8)),
+        'max_overflow': 8,
+        'connect_args': {'check_same_thread': False},
+    }
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+    SQLITE_FOREIGN_KEYS = True
+    SQLITE_SERIALIZE_WRITES = True
+
+
 class TestingConfig(Config):
     """Testing environment specific configuration."""
     TESTING = True
@@ -55,6 +199,7 @@ class TestingConfig(Config):
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'sqlite': SQLiteConfig,
     'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -1,7 +1,23 @@
 """Models package initialization."""
 
+from app.models.organization import Organization, TenantScoped, DEFAULT_ORG_ID
 from app.models.user import User
 from app.models.event import Event, EventStatus
-from app.models.swap_request import SwapRequest, SwapStatus
+from app.models import search  # noqa: F401  (registers full-text index DDL)
+from app.models.swap_request import SwapRequest, SwapStatus, SwapBundleSlot, RESOLVED_SWAP_STATUSES
+from app.models.swap_counter import SwapCounter
+from app.models.archive import ArchivedEvent, ArchivedSwapRequest, ArchivedSwapBundleSlot
+from app.models.outbox import OutboxMessage
+from app.models.revoked_token import RevokedToken
+from app.models.changes import ChangeCounter, EventTombstone
+from app.models.series import EventSeries, SeriesException
+from app.models.marketplace import MarketplaceSlot
+from app.models.transition import SwapTransition, SwapTransitionDaily
+from app.models.analytics import SwapDailyStats, SwapDemandHourly
 
-__all__ = ['User', 'Event', 'EventStatus', 'SwapRequest', 'SwapStatus']
+__all__ = [
+    'Organization', 'TenantScoped', 'DEFAULT_ORG_ID', 'User', 'Event', 'EventStatus', 'SwapRequest', 'SwapStatus', 'SwapBundleSlot', 'RESOLVED_SWAP_STATUSES',
+    'SwapCounter', 'ArchivedEvent', 'ArchivedSwapRequest', 'ArchivedSwapBundleSlot', 'OutboxMessage',
+    'RevokedToken', 'ChangeCounter', 'EventTombstone', 'EventSeries', 'SeriesException',
+    'MarketplaceSlot', 'SwapTransition', 'SwapTransitionDaily', 'SwapDailyStats', 'SwapDemandHourly',
+]
@@ -0,0 +1,59 @@
+"""
+Daily swap-market rollups, maintained incrementally from the transition log.
+"""
+
+from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+
+
+class SwapDailyStats(TenantScoped, db.Model):
+    """Swaps created, accepted, rejected and expired on one day.
+
+    Acceptance latency (request to acceptance) is kept as a sum and a
+    maximum over ``latency_samples`` accepted swaps whose creation time
+    was known; the mean is derived when read.
+    """
+
+    __tablename__ = 'swap_daily_stats'
+
+    org_id = db.Column(GUID(), db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    created = db.Column(db.Integer, default=0, nullable=False)
+    accepted = db.Column(db.Integer, default=0, nullable=False)
+    rejected = db.Column(db.Integer, default=0, nullable=False)
+    expired = db.Column(db.Integer, default=0, nullable=False)
+    latency_samples = db.Column(db.Integer, default=0, nullable=False)
+    latency_total_seconds = db.Column(db.BigInteger, default=0, nullable=False)
+    latency_max_seconds = db.Column(db.Integer, default=0, nullable=False)
+
+    def to_dict(self):
+        mean = self.latency_total_seconds / self.latency_samples if self.latency_samples else None
+        return {
+            'day': self.day.isoformat(),
+            'created': self.created,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'expired': self.expired,
+            'accept_latency_seconds': {
+                'mean': round(mean, 1) if mean is not None else None,
+                'max': self.latency_max_seconds if self.latency_samples else None,
+            },
+        }
+
+    def __repr__(self):
+        return f'<SwapDailyStats {self.day}>'
+
+
+class SwapDemandHourly(TenantScoped, db.Model):
+    """Swap requests made on ``day`` for slots starting in hour ``hour`` (UTC)."""
+
+    __tablename__ = 'swap_demand_hourly'
+
+    org_id = db.Column(GUID(), db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.SmallInteger, primary_key=True)
+    requests = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<SwapDemandHourly {self.day} {self.hour:02d}h>'
@@ -0,0 +1,141 @@
+"""
+Cold-storage tables for past events and resolved swaps.
+
+Rows are moved here by the archival job (see app/services/archival.py) and
+keep the ids and timestamps they had in the hot tables.
+"""
+
+from datetime import datetime
+from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+from app.models.event import EventStatus
+from app.models.swap_request import SwapStatus, REQUESTER_SIDE, REQUESTEE_SIDE
+from app.utils.tracing import traced
+
+
+class ArchivedEvent(TenantScoped, db.Model):
+    """Event whose slot has ended and is no longer referenced by a live swap."""
+
+    __tablename__ = 'events_archive'
+    __table_args__ = (
+        db.Index('ix_events_archive_org_start', 'org_id', 'start_time'),
+    )
+
+    id = db.Column(GUID(), primary_key=True)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    title = db.Column(db.String(255), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False, index=True)
+    end_time = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.Enum(EventStatus), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    owner = db.relationship('User')
+
+    @traced('serialize ArchivedEvent')
+    def to_dict(self, include_owner=False):
+        data = {
+            'id': self.id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'status': self.status.value if isinstance(self.status, EventStatus) else self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'archived': True,
+        }
+        if include_owner and self.owner:
+            data['owner'] = {
+                'id': self.owner.id,
+                'name': self.owner.name,
+                'email': self.owner.email
+            }
+        return data
+
+    def __repr__(self):
+        return f'<ArchivedEvent {self.title}>'
+
+
+class ArchivedSwapRequest(TenantScoped, db.Model):
+    """ACCEPTED or REJECTED swap past the retention window.
+
+    Slot ids carry no foreign key because the slots may themselves be
+    archived; callers resolve them with ``archival.load_slots``.
+    """
+
+    __tablename__ = 'swap_requests_archive'
+    __table_args__ = (
+        db.Index('ix_swap_requests_archive_org_created', 'org_id', 'created_at'),
+        db.Index('ix_swap_requests_archive_requestee_created', 'requestee_id', 'created_at'),
+        db.Index('ix_swap_requests_archive_requester_created', 'requester_id', 'created_at'),
+    )
+
+    id = db.Column(GUID(), primary_key=True)
+    requester_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    requestee_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    requester_slot_id = db.Column(GUID(), nullable=False)
+    requestee_slot_id = db.Column(GUID(), nullable=False)
+    status = db.Column(db.Enum(SwapStatus), nullable=False)
+    message = db.Column(db.Text, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    bundle_size = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    requester = db.relationship('User', foreign_keys=[requester_id])
+    requestee = db.relationship('User', foreign_keys=[requestee_id])
+    bundle_slots = db.relationship('ArchivedSwapBundleSlot', passive_deletes=True,
+                                   order_by='ArchivedSwapBundleSlot.position')
+
+    @traced('serialize ArchivedSwapRequest')
+    def to_dict(self, slots=None):
+        """
+        Args:
+            slots (dict): Event id to hot or archived event, used to embed
+                the slots without a query per swap
+        """
+        slots = slots or {}
+        requester_slot = slots.get(self.requester_slot_id)
+        requestee_slot = slots.get(self.requestee_slot_id)
+        return {
+            'id': self.id,
+            'requester_id': self.requester_id,
+            'requestee_id': self.requestee_id,
+            'requester_slot_id': self.requester_slot_id,
+            'requestee_slot_id': self.requestee_slot_id,
+            'message': self.message,
+            'status': self.status.value if isinstance(self.status, SwapStatus) else self.status,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'requester': self.requester.to_dict(include_email=False) if self.requester else None,
+            'requestee': self.requestee.to_dict(include_email=False) if self.requestee else None,
+            'requester_slot': requester_slot.to_dict() if requester_slot else None,
+            'requestee_slot': requestee_slot.to_dict() if requestee_slot else None,
+            'bundle': self._bundle_dict() if self.bundle_size else None,
+            'archived': True,
+        }
+
+    def _bundle_dict(self):
+        sides = {REQUESTER_SIDE: [], REQUESTEE_SIDE: []}
+        for slot in self.bundle_slots:
+            sides[slot.side].append(slot.event_id)
+        return {'requester_slot_ids': sides[REQUESTER_SIDE], 'requestee_slot_ids': sides[REQUESTEE_SIDE]}
+
+
+class ArchivedSwapBundleSlot(TenantScoped, db.Model):
+    """A slot of an archived bundle swap (see SwapBundleSlot)."""
+
+    __tablename__ = 'swap_bundle_slots_archive'
+
+    swap_id = db.Column(GUID(), db.ForeignKey('swap_requests_archive.id', ondelete='CASCADE'), primary_key=True)
+    event_id = db.Column(GUID(), primary_key=True)
+    side = db.Column(db.String(10), nullable=False)
+    position = db.Column(db.SmallInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<ArchivedSwapBundleSlot {self.swap_id} {self.side} {self.event_id}>'
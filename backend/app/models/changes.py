@@ -0,0 +1,55 @@
+"""
+Change sequencing for incremental event sync.
+"""
+
+from datetime import datetime
+from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+
+
+class ChangeCounter(db.Model):
+    """A named monotonic counter; ``events:<org_id>`` numbers an organization's event changes.
+
+    The row is updated in the same transaction as the change it numbers, so
+    its lock orders committing writers and values become visible in order.
+    """
+
+    __tablename__ = 'change_counters'
+
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<ChangeCounter {self.name}={self.value}>'
+
+
+class EventTombstone(TenantScoped, db.Model):
+    """Marks a deleted (or archived) event so syncing clients can drop it."""
+
+    __tablename__ = 'event_tombstones'
+
+    # Sequences are per organization (see app/services/changes.py).
+    org_id = db.Column(GUID(), db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    change_seq = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    event_id = db.Column(GUID(), nullable=False)
+    user_id = db.Column(GUID(), nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __init__(self, change_seq, event_id, user_id, deleted_at=None, org_id=None):
+        self.change_seq = change_seq
+        self.org_id = org_id
+        self.event_id = event_id
+        self.user_id = user_id
+        self.deleted_at = deleted_at or datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            'id': self.event_id,
+            'user_id': self.user_id,
+            'change_seq': self.change_seq,
+            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None,
+        }
+
+    def __repr__(self):
+        return f'<EventTombstone {self.event_id} @{self.change_seq}>'
@@ -2,10 +2,13 @@
 Event model for calendar slots and scheduling.
 """
 
-import uuid
 from datetime import datetime
 from enum import Enum
 from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+from app.utils.ids import new_id
+from app.utils.tracing import traced
 
 class EventStatus(str, Enum):
     """Enumeration for event status types."""
@@ -13,22 +16,31 @@ class EventStatus(str, Enum):
     SWAPPABLE = 'SWAPPABLE'
     SWAP_PENDING = 'SWAP_PENDING'
 
-class Event(db.Model):
+class Event(TenantScoped, db.Model):
     """Event model representing calendar time slots."""
     
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_user_start', 'user_id', 'start_time'),
+        db.Index('ix_events_org_status_start', 'org_id', 'status', 'start_time'),
+        db.Index('ix_events_org_start', 'org_id', 'start_time'),
+        db.Index('ix_events_org_change_seq', 'org_id', 'change_seq'),
+    )
     
     # Primary key
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     
     # Foreign key to user
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     
     # Event details
     title = db.Column(db.String(255), nullable=False)
     start_time = db.Column(db.DateTime, nullable=False, index=True)
     end_time = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.Enum(EventStatus), default=EventStatus.SWAPPABLE, nullable=False, index=True)  # <-- FIXED
+
+    # Position in the change sequence, bumped on every write (see app/services/changes.py)
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False, index=True)
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -51,6 +63,7 @@ class Event(db.Model):
         self.end_time = end_time
         self.status = status
     
+    @traced('serialize Event')
     def to_dict(self, include_owner=False):
         """
         Convert event to dictionary representation.
@@ -0,0 +1,48 @@
+"""
+Denormalized read model behind the swap marketplace.
+"""
+
+from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+
+
+class MarketplaceSlot(TenantScoped, db.Model):
+    """A SWAPPABLE event with its owner's name and email embedded.
+
+    Rows are written by app/services/marketplace.py in the same flush as
+    the event, swap or user change that affects them, so listing the
+    marketplace is a range scan of (org_id, start_time) with no join.
+    """
+
+    __tablename__ = 'marketplace_slots'
+    __table_args__ = (
+        db.Index('ix_marketplace_slots_org_start', 'org_id', 'start_time', 'event_id'),
+    )
+
+    event_id = db.Column(GUID(), db.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(GUID(), nullable=False, index=True)
+    owner_name = db.Column(db.String(255), nullable=False)
+    owner_email = db.Column(db.String(255), nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        """Same shape as ``Event.to_dict(include_owner=True)`` for a SWAPPABLE event."""
+        return {
+            'id': self.event_id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat(),
+            'status': 'SWAPPABLE',
+            'owner': {
+                'id': self.user_id,
+                'name': self.owner_name,
+                'email': self.owner_email,
+            },
+        }
+
+    def __repr__(self):
+        return f'<MarketplaceSlot {self.event_id}>'
@@ -0,0 +1,72 @@
+"""
+Organizations (tenants) and the mixin for rows they own.
+"""
+
+import re
+from datetime import datetime
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import declared_attr
+from app.extensions import db
+from app.models.types import GUID
+from app.utils.ids import new_id
+
+# Users and rows created without a tenant belong here; single-team
+# deployments never see another organization.
+DEFAULT_ORG_ID = '00000000-0000-7000-8000-000000000000'
+DEFAULT_ORG_SLUG = 'default'
+
+
+class Organization(db.Model):
+    """
+    A team sharing one namespace of users, events and swaps.
+
+    ``schema`` routes a large tenant's rows to its own PostgreSQL schema
+    (see app/services/tenancy.py); NULL keeps them in the shared tables.
+    ``routing_pending`` is set while a move to a schema is under way.
+    """
+
+    __tablename__ = 'organizations'
+
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    name = db.Column(db.String(255), nullable=False)
+    slug = db.Column(db.String(63), unique=True, nullable=False)
+    schema = db.Column(db.String(63), nullable=True)
+    routing_pending = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @staticmethod
+    def slugify(name):
+        """Lowercase ``name`` to letters, digits and single hyphens."""
+        return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')[:63] or 'org'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'slug': self.slug,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Organization {self.slug}>'
+
+
+@sa_event.listens_for(Organization.__table__, 'after_create')
+def _insert_default_org(target, connection, **kw):
+    # db.create_all() databases get the row the migration inserts.
+    connection.execute(target.insert().values(
+        id=DEFAULT_ORG_ID, name='Default', slug=DEFAULT_ORG_SLUG, created_at=datetime.utcnow()))
+
+
+class TenantScoped:
+    """
+    Mixin for rows owned by an organization.
+
+    Reads and bulk writes through the session are filtered to the current
+    organization, and new rows are stamped with it (app/services/tenancy.py).
+    Indexes on these tables lead with ``org_id``.
+    """
+
+    @declared_attr
+    def org_id(cls):
+        return db.Column(GUID(), db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
@@ -0,0 +1,57 @@
+"""
+Transactional outbox for side effects of swap and event changes.
+"""
+
+from datetime import datetime
+from app.extensions import db
+
+
+class OutboxMessage(db.Model):
+    """A side effect recorded in the same transaction as the change causing it.
+
+    Messages are drained by the worker pool in app/services/outbox.py and
+    delivered at least once.
+    """
+
+    __tablename__ = 'outbox_messages'
+    __table_args__ = (
+        # Only undelivered rows are ever scanned by the workers.
+        db.Index('ix_outbox_messages_due', 'available_at',
+                 postgresql_where=db.text('processed_at IS NULL AND failed_at IS NULL'),
+                 sqlite_where=db.text('processed_at IS NULL AND failed_at IS NULL')),
+        # Dead letters, counted by outbox.stats() on every metrics snapshot.
+        db.Index('ix_outbox_messages_dead', 'failed_at',
+                 postgresql_where=db.text('failed_at IS NOT NULL'),
+                 sqlite_where=db.text('failed_at IS NOT NULL')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    topic = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    claimed_by = db.Column(db.String(36), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = db.Column(db.DateTime, nullable=True, index=True)
+    failed_at = db.Column(db.DateTime, nullable=True)
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'topic': self.topic,
+            'payload': self.payload,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None,
+            'failed_at': self.failed_at.isoformat() if self.failed_at else None,
+        }
+
+    def __repr__(self):
+        return f'<OutboxMessage {self.id} {self.topic}>'
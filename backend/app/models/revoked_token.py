@@ -0,0 +1,34 @@
+"""
+Revocation log for JWTs.
+"""
+
+from datetime import datetime
+from app.extensions import db
+from app.models.types import GUID
+
+
+class RevokedToken(db.Model):
+    """A revoked token, kept until the token would have expired anyway.
+
+    The autoincrement id doubles as a log position: processes sync their
+    in-memory blocklist by reading rows past the last id they have seen,
+    and rows revoked recently (``revoked_at``) that committed out of order.
+    """
+
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __init__(self, jti, token_type, user_id, expires_at):
+        self.jti = jti
+        self.token_type = token_type
+        self.user_id = user_id
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti} {self.token_type}>'
@@ -0,0 +1,88 @@
+"""
+Full-text index DDL for event titles.
+
+The index lives outside the ORM mapping so the Event model stays portable:
+
+* PostgreSQL: a ``search_vector`` tsvector column on ``events`` with a GIN
+  index, maintained by a trigger.
+* SQLite: an FTS5 table ``events_fts`` maintained by triggers. Its rowids
+  come from ``events_fts_ids``, which maps each event id to an
+  ``INTEGER PRIMARY KEY``. The implicit rowid of ``events`` (whose key is
+  a BLOB UUID) is not stable: VACUUM or a table rebuild may renumber it.
+
+The statements are attached to the events table so ``db.create_all()``
+builds them too. Migrations inline their own copies.
+"""
+
+from sqlalchemy import DDL, event as sa_event
+from app.models.event import Event
+
+TEXT_SEARCH_CONFIG = 'simple'
+
+POSTGRESQL_DDL = [
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"UPDATE events SET search_vector = to_tsvector('{TEXT_SEARCH_CONFIG}', title)",
+    "CREATE INDEX IF NOT EXISTS ix_events_search_vector ON events USING GIN (search_vector)",
+    f"""
+    CREATE OR REPLACE FUNCTION events_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('{TEXT_SEARCH_CONFIG}', NEW.title);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS events_search_vector_update ON events",
+    """
+    CREATE TRIGGER events_search_vector_update BEFORE INSERT OR UPDATE OF title ON events
+    FOR EACH ROW EXECUTE FUNCTION events_search_vector_update()
+    """,
+]
+
+FTS_ID = '(SELECT id FROM events_fts_ids WHERE event_id = {}.id)'
+
+SQLITE_DDL = [
+    "CREATE TABLE IF NOT EXISTS events_fts_ids (id INTEGER PRIMARY KEY, event_id BLOB NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(title)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts_ids(event_id) VALUES (new.id);
+        INSERT INTO events_fts(rowid, title) VALUES ({FTS_ID.format('new')}, new.title);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+        DELETE FROM events_fts WHERE rowid = {FTS_ID.format('old')};
+        DELETE FROM events_fts_ids WHERE event_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF title ON events BEGIN
+        UPDATE events_fts SET title = new.title WHERE rowid = {FTS_ID.format('new')};
+    END
+    """,
+    "INSERT OR IGNORE INTO events_fts_ids(event_id) SELECT id FROM events",
+    "DELETE FROM events_fts",
+    "INSERT INTO events_fts(rowid, title) SELECT k.id, e.title FROM events_fts_ids k JOIN events e ON e.id = k.event_id",
+]
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS events_fts_insert",
+    "DROP TRIGGER IF EXISTS events_fts_delete",
+    "DROP TRIGGER IF EXISTS events_fts_update",
+    "DROP TABLE IF EXISTS events_fts",
+    "DROP TABLE IF EXISTS events_fts_ids",
+]
+
+POSTGRESQL_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS events_search_vector_update ON events",
+    "DROP FUNCTION IF EXISTS events_search_vector_update()",
+    "DROP INDEX IF EXISTS ix_events_search_vector",
+    "ALTER TABLE events DROP COLUMN IF EXISTS search_vector",
+]
+
+for statement in POSTGRESQL_DDL:
+    sa_event.listen(Event.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+for statement in SQLITE_DDL:
+    sa_event.listen(Event.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in SQLITE_DROP_DDL:
+    sa_event.listen(Event.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
@@ -0,0 +1,85 @@
+"""
+Recurring event series and their per-occurrence exceptions.
+"""
+
+from datetime import datetime
+from app.extensions import db
+from app.models.event import EventStatus
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+from app.utils.ids import new_id
+from app.utils.tracing import traced
+
+
+class EventSeries(TenantScoped, db.Model):
+    """
+    A recurring slot stored once and expanded on read.
+
+    ``rrule`` keeps the rule as submitted; ``freq``, ``interval``,
+    ``weekdays`` (bit 0 = Monday) and ``until`` are its parsed form, which is
+    what expansion reads. A COUNT rule is stored with ``until`` set to its
+    last occurrence, so every series has a simple upper bound.
+    """
+
+    __tablename__ = 'event_series'
+    __table_args__ = (
+        db.Index('ix_event_series_org_status_start', 'org_id', 'status', 'dtstart'),
+    )
+
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    title = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.Enum(EventStatus), default=EventStatus.SWAPPABLE, nullable=False)
+
+    # Start of the first occurrence and the length of every occurrence
+    dtstart = db.Column(db.DateTime, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False)
+
+    rrule = db.Column(db.String(255), nullable=False)
+    freq = db.Column(db.String(10), nullable=False)
+    interval = db.Column(db.Integer, default=1, nullable=False)
+    weekdays = db.Column(db.SmallInteger, default=0, nullable=False)
+    until = db.Column(db.DateTime, nullable=True, index=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    @traced('serialize EventSeries')
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'status': self.status.value if isinstance(self.status, EventStatus) else self.status,
+            'start_time': self.dtstart.isoformat() if self.dtstart else None,
+            'duration_minutes': self.duration_minutes,
+            'rrule': self.rrule,
+            'until': self.until.isoformat() if self.until else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<EventSeries {self.title} {self.rrule}>'
+
+
+class SeriesException(db.Model):
+    """
+    An occurrence that no longer comes from its series.
+
+    With ``event_id`` set the occurrence was materialized into that event
+    (to be edited or swapped); without it the occurrence was cancelled.
+    """
+
+    __tablename__ = 'series_exceptions'
+    __table_args__ = (
+        db.Index('ix_series_exceptions_occurrence_start', 'occurrence_start'),
+    )
+
+    series_id = db.Column(GUID(), db.ForeignKey('event_series.id', ondelete='CASCADE'), primary_key=True)
+    occurrence_start = db.Column(db.DateTime, primary_key=True)
+    event_id = db.Column(GUID(), db.ForeignKey('events.id', ondelete='SET NULL'), nullable=True)
+
+    def __repr__(self):
+        return f'<SeriesException {self.series_id} {self.occurrence_start}>'
@@ -0,0 +1,39 @@
+"""
+Materialized per-user swap counters backing the inbox badge.
+"""
+
+from datetime import datetime
+from app.extensions import db
+from app.models.types import GUID
+
+
+class SwapCounter(db.Model):
+    """Denormalized swap counts for a single user.
+
+    Rows are adjusted in the same transaction as the swap write that changes
+    them, and rebuilt from ``swap_requests`` by the reconciliation job.
+    """
+
+    __tablename__ = 'swap_counters'
+
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    pending_received = db.Column(db.Integer, default=0, nullable=False)
+    pending_sent = db.Column(db.Integer, default=0, nullable=False)
+    accepted = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __init__(self, user_id, pending_received=0, pending_sent=0, accepted=0):
+        self.user_id = user_id
+        self.pending_received = pending_received
+        self.pending_sent = pending_sent
+        self.accepted = accepted
+
+    def to_dict(self):
+        return {
+            'pending_received': self.pending_received,
+            'pending_sent': self.pending_sent,
+            'accepted': self.accepted,
+        }
+
+    def __repr__(self):
+        return f'<SwapCounter {self.user_id}>'
@@ -1,37 +1,67 @@
-import uuid
 import enum
 from datetime import datetime
 from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+from app.utils.ids import new_id
+from app.utils.tracing import traced
 
 class SwapStatus(enum.Enum):
     PENDING = 'PENDING'
     ACCEPTED = 'ACCEPTED'
     REJECTED = 'REJECTED'
+    EXPIRED = 'EXPIRED'
 
-class SwapRequest(db.Model):
+# Terminal states; swaps in these states are eligible for archival.
+RESOLVED_SWAP_STATUSES = (SwapStatus.ACCEPTED, SwapStatus.REJECTED, SwapStatus.EXPIRED)
+
+# Sides of a bundle swap, and the most slots either side may put in one.
+REQUESTER_SIDE = 'requester'
+REQUESTEE_SIDE = 'requestee'
+MAX_BUNDLE_SLOTS = 8
+
+class SwapRequest(TenantScoped, db.Model):
     __tablename__ = 'swap_requests'
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    requester_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
-    requestee_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
-    requester_slot_id = db.Column(db.String(36), db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
-    requestee_slot_id = db.Column(db.String(36), db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    __table_args__ = (
+        db.Index('ix_swap_requests_org_status_created', 'org_id', 'status', 'created_at'),
+        db.Index('ix_swap_requests_requestee_status_created', 'requestee_id', 'status', 'created_at'),
+        db.Index('ix_swap_requests_requester_status_created', 'requester_id', 'status', 'created_at'),
+        # Only PENDING rows are candidates for the expiry sweeper.
+        db.Index('ix_swap_requests_pending_expires', 'expires_at',
+                 postgresql_where=db.text("status = 'PENDING'"),
+                 sqlite_where=db.text("status = 'PENDING'")),
+    )
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    requester_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    requestee_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    requester_slot_id = db.Column(GUID(), db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    requestee_slot_id = db.Column(GUID(), db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
     status = db.Column(db.Enum(SwapStatus), default=SwapStatus.PENDING, nullable=False, index=True)
     message = db.Column(db.Text, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Slots in a bundle swap (both sides); NULL for a one-for-one swap. The
+    # slot id columns then hold the first slot of each side.
+    bundle_size = db.Column(db.Integer, nullable=True)
 
     requester = db.relationship('User', foreign_keys=[requester_id], backref='swap_requests_sent')
     requestee = db.relationship('User', foreign_keys=[requestee_id], backref='swap_requests_received')
     requester_slot = db.relationship('Event', foreign_keys=[requester_slot_id])
     requestee_slot = db.relationship('Event', foreign_keys=[requestee_slot_id])
+    bundle_slots = db.relationship('SwapBundleSlot', cascade='all, delete-orphan', passive_deletes=True,
+                                   order_by='SwapBundleSlot.position')
 
-    def __init__(self, requester_id, requestee_id, requester_slot_id, requestee_slot_id, message=None):
+    def __init__(self, requester_id, requestee_id, requester_slot_id, requestee_slot_id, message=None,
+                 expires_at=None):
         self.requester_id = requester_id
         self.requestee_id = requestee_id
         self.requester_slot_id = requester_slot_id
         self.requestee_slot_id = requestee_slot_id
         self.message = message
+        self.expires_at = expires_at
 
+    @traced('serialize SwapRequest')
     def to_dict(self):
         return {
             'id': self.id,
@@ -41,10 +71,41 @@ class SwapRequest(db.Model):
             'requestee_slot_id': self.requestee_slot_id,
             'message': self.message,
             'status': self.status.value if isinstance(self.status, SwapStatus) else self.status,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'requester': self.requester.to_dict(include_email=False) if self.requester else None,
             'requestee': self.requestee.to_dict(include_email=False) if self.requestee else None,
             'requester_slot': self.requester_slot.to_dict() if self.requester_slot else None,
             'requestee_slot': self.requestee_slot.to_dict() if self.requestee_slot else None,
+            'bundle': self._bundle_dict() if self.bundle_size else None,
         }
+
+    def _bundle_dict(self):
+        sides = {REQUESTER_SIDE: [], REQUESTEE_SIDE: []}
+        for slot in self.bundle_slots:
+            sides[slot.side].append(slot.event_id)
+        return {'requester_slot_ids': sides[REQUESTER_SIDE], 'requestee_slot_ids': sides[REQUESTEE_SIDE]}
+
+
+class SwapBundleSlot(TenantScoped, db.Model):
+    """One slot offered (requester side) or asked for (requestee side) in a bundle swap.
+
+    ``event_id`` is not a foreign key: deleting or archiving a slot must not
+    silently shrink a pending bundle. Accepting checks that all
+    ``bundle_size`` slots still exist instead.
+    """
+
+    __tablename__ = 'swap_bundle_slots'
+    __table_args__ = (
+        db.Index('ix_swap_bundle_slots_event', 'event_id'),
+    )
+
+    swap_id = db.Column(GUID(), db.ForeignKey('swap_requests.id', ondelete='CASCADE'), primary_key=True)
+    event_id = db.Column(GUID(), primary_key=True)
+    side = db.Column(db.String(10), nullable=False)
+    # Order the slots were listed in the request
+    position = db.Column(db.SmallInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<SwapBundleSlot {self.swap_id} {self.side} {self.event_id}>'
@@ -0,0 +1,82 @@
+"""
+Append-only log of swap transitions and slot ownership changes.
+"""
+
+from datetime import datetime
+from app.extensions import db
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+
+# Integer row ids on SQLite, where only INTEGER PRIMARY KEY autoincrements.
+LOG_ID = db.BigInteger().with_variant(db.Integer, 'sqlite')
+
+SWAP_CREATED = 'swap.created'
+SWAP_ACCEPTED = 'swap.accepted'
+SWAP_REJECTED = 'swap.rejected'
+SWAP_EXPIRED = 'swap.expired'
+OWNER_CHANGED = 'slot.owner_changed'
+
+TRANSITION_KINDS = (SWAP_CREATED, SWAP_ACCEPTED, SWAP_REJECTED, SWAP_EXPIRED, OWNER_CHANGED)
+
+
+class SwapTransition(TenantScoped, db.Model):
+    """One swap state change or slot ownership change. Never updated.
+
+    Swap rows: ``from_user_id``/``to_user_id`` are the requester and
+    requestee, ``slot_id``/``other_slot_id`` their slots. Ownership rows:
+    the slot moved from ``from_user_id`` to ``to_user_id`` as part of
+    ``swap_id``; ``other_slot_id`` is NULL. Ids are not foreign keys, so the
+    log outlives archived and deleted swaps and events.
+    """
+
+    __tablename__ = 'swap_transitions'
+    __table_args__ = (
+        db.Index('ix_swap_transitions_org_from_user', 'org_id', 'from_user_id', 'id'),
+        db.Index('ix_swap_transitions_org_to_user', 'org_id', 'to_user_id', 'id'),
+        db.Index('ix_swap_transitions_org_slot', 'org_id', 'slot_id', 'id'),
+        db.Index('ix_swap_transitions_org_other_slot', 'org_id', 'other_slot_id', 'id'),
+        db.Index('ix_swap_transitions_created_at', 'created_at'),
+    )
+
+    id = db.Column(LOG_ID, primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(30), nullable=False)
+    swap_id = db.Column(GUID(), nullable=False)
+    actor_id = db.Column(GUID(), nullable=True)
+    from_user_id = db.Column(GUID(), nullable=False)
+    to_user_id = db.Column(GUID(), nullable=False)
+    slot_id = db.Column(GUID(), nullable=False)
+    other_slot_id = db.Column(GUID(), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'kind': self.kind,
+            'swap_id': self.swap_id,
+            'actor_id': self.actor_id,
+            'from_user_id': self.from_user_id,
+            'to_user_id': self.to_user_id,
+            'slot_id': self.slot_id,
+            'other_slot_id': self.other_slot_id,
+            'created_at': self.created_at.isoformat(),
+        }
+
+    def __repr__(self):
+        return f'<SwapTransition {self.id} {self.kind}>'
+
+
+class SwapTransitionDaily(TenantScoped, db.Model):
+    """Per-day transition counts for log rows compacted by the rollup job."""
+
+    __tablename__ = 'swap_transition_daily'
+
+    org_id = db.Column(GUID(), db.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    kind = db.Column(db.String(30), primary_key=True)
+    count = db.Column(db.BigInteger, default=0, nullable=False)
+
+    def to_dict(self):
+        return {'day': self.day.isoformat(), 'kind': self.kind, 'count': self.count}
+
+    def __repr__(self):
+        return f'<SwapTransitionDaily {self.day} {self.kind}>'
@@ -0,0 +1,49 @@
+"""
+Custom column types shared by the models.
+"""
+
+import uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import BINARY, LargeBinary, TypeDecorator
+
+
+class GUID(TypeDecorator):
+    """
+    Compact UUID column.
+
+    Stored as native ``uuid`` on PostgreSQL and as 16 raw bytes elsewhere,
+    instead of a 36-character string. Values are exposed to the application
+    as canonical lowercase strings so routes, JWT identities and JSON
+    payloads are unaffected.
+
+    Malformed identifiers bind as NULL, which never matches a row, so a
+    lookup with a bad id behaves like a lookup for a missing one.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        if dialect.name == 'sqlite':
+            # BINARY has NUMERIC affinity in SQLite; BLOB keeps bytes untouched.
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            try:
+                value = uuid.UUID(str(value))
+            except ValueError:
+                return None
+        return value if dialect.name == 'postgresql' else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
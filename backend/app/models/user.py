@@ -2,18 +2,24 @@
 User model for authentication and user management.
 """
 
-import uuid
 from datetime import datetime
 from app.extensions import db, bcrypt
+from app.models.organization import TenantScoped
+from app.models.types import GUID
+from app.utils.ids import new_id
+from app.utils.tracing import traced
 
 
-class User(db.Model):
+class User(TenantScoped, db.Model):
     """User model representing registered users in the system."""
     
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_org_name', 'org_id', 'name'),
+    )
     
     # Primary key using UUID for better security
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     
     # User credentials and information
     name = db.Column(db.String(255), nullable=False)
@@ -40,6 +46,7 @@ class User(db.Model):
         self.email = email
         self.set_password(password)
     
+    @traced('bcrypt.hash')
     def set_password(self, password):
         """
         Hash and set the user's password.
@@ -49,6 +56,7 @@ class User(db.Model):
         """
         self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
     
+    @traced('bcrypt.check')
     def check_password(self, password):
         """
         Verify a password against the stored hash.
@@ -61,6 +69,7 @@ class User(db.Model):
         """
         return bcrypt.check_password_hash(self.password_hash, password)
     
+    @traced('serialize User')
     def to_dict(self, include_email=True):
         """
         Convert user object to dictionary representation.
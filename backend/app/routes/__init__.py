@@ -1,6 +1,12 @@
 from app.routes.auth import auth_bp
 from app.routes.events import events_bp
 from app.routes.swaps import swaps_bp
+from app.routes.ops import ops_bp
+from app.routes.availability import availability_bp
+from app.routes.batch import batch_bp
+from app.routes.orgs import orgs_bp
+from app.routes.marketplace import marketplace_bp
+from app.routes.analytics import analytics_bp
 
 
 def init_routes(app):
@@ -8,3 +14,9 @@ def init_routes(app):
     app.register_blueprint(auth_bp)
     app.register_blueprint(events_bp)
     app.register_blueprint(swaps_bp)
+    app.register_blueprint(ops_bp)
+    app.register_blueprint(availability_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(orgs_bp)
+    app.register_blueprint(marketplace_bp)
+    app.register_blueprint(analytics_bp)
@@ -0,0 +1,58 @@
+"""
+Analytics routes: swap-market rollups for the caller's organization.
+"""
+
+from datetime import date, datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.services import analytics
+
+analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+DEFAULT_DAYS = 30
+MAX_TOP_HOURS = 24
+
+
+@analytics_bp.route('/swaps', methods=['GET'])
+@jwt_required()
+def get_swap_analytics():
+    """
+    Daily swap counts, acceptance latency and the most-requested hours.
+
+    Reads the precomputed rollups only (one row per day, 24 buckets per
+    day); they trail live activity by up to ANALYTICS_ROLLUP_INTERVAL.
+
+    Query params:
+        start / end: ISO dates, inclusive (default the last 30 days)
+        top_hours: Number of start hours to rank (default 5, max 24)
+
+    Returns:
+        200: Per-day stats, totals for the range and the top start hours (UTC)
+        400: Invalid dates, or a range longer than ANALYTICS_MAX_DAYS
+    """
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else datetime.utcnow().date()
+        start = (date.fromisoformat(request.args['start']) if request.args.get('start')
+                 else end - timedelta(days=DEFAULT_DAYS - 1))
+        top_hours = max(1, min(int(request.args.get('top_hours', 5)), MAX_TOP_HOURS))
+    except ValueError:
+        return jsonify({'message': 'start and end must be ISO dates (YYYY-MM-DD); top_hours an integer'}), 400
+    if start > end:
+        return jsonify({'message': 'start must not be after end'}), 400
+    if (end - start).days + 1 > current_app.config['ANALYTICS_MAX_DAYS']:
+        return jsonify({'message': f'Range is limited to {current_app.config["ANALYTICS_MAX_DAYS"]} days'}), 400
+
+    days, hours = analytics.summary(start, end, top_hours)
+    samples = sum(day.latency_samples for day in days)
+    totals = {name: sum(getattr(day, name) for day in days) for name in ('created', 'accepted', 'rejected', 'expired')}
+    totals['accept_latency_seconds'] = {
+        'mean': round(sum(day.latency_total_seconds for day in days) / samples, 1) if samples else None,
+        'max': max((day.latency_max_seconds for day in days if day.latency_samples), default=None),
+    }
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [day.to_dict() for day in days],
+        'totals': totals,
+        'top_hours': hours,
+    }), 200
@@ -3,10 +3,15 @@ Authentication routes for user registration, login, and token management.
 """
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from app import schemas
 from app.extensions import db
-from app.models import User
+from app.models import Organization, User
+from app.services import revocation, tenancy
 from app.utils.decorators import jwt_required_with_user
+from app.utils.session import commit_keep_loaded
 
 # Create blueprint for authentication routes
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -21,44 +26,50 @@ def register():
         {
             "name": "John Doe",
             "email": "john@example.com",
-            "password": "securepassword123"
+            "password": "securepassword123",
+            "organization": "Acme",       # optional: create a new organization
+            "invite": "<invite token>"    # optional: join an existing one
         }
     
+    Without either, the user joins the default organization.
+    
     Returns:
         201: User created successfully with access and refresh tokens
-        400: Validation error or user already exists
+        400: Validation error, invalid invite or user already exists
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not data:
-            return jsonify({'message': 'No data provided'}), 400
-        
-        name = data.get('name', '').strip()
-        email = data.get('email', '').strip().lower()
-        password = data.get('password', '')
-        
-        # Basic validation
-        if not name or len(name) < 2:
-            return jsonify({'message': 'Name must be at least 2 characters long'}), 400
-        
-        if not email or '@' not in email:
-            return jsonify({'message': 'Valid email is required'}), 400
-        
-        if not password or len(password) < 6:
-            return jsonify({'message': 'Password must be at least 6 characters long'}), 400
+        data = schemas.register_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
+    
+    try:
+        email = data['email']
         
         # Check if user already exists
         existing_user = User.query.filter_by(email=email).first()
         if existing_user:
             return jsonify({'message': 'Email already registered'}), 400
         
+        org = None
+        if 'invite' in data:
+            org = tenancy.invited_org(data['invite'])
+            if org is None:
+                return jsonify({'message': 'Invalid or expired invite'}), 400
+        elif 'organization' in data:
+            slug = Organization.slugify(data['organization'])
+            if Organization.query.filter_by(slug=slug).first():
+                return jsonify({'message': 'Organization name already taken'}), 400
+            org = Organization(name=data['organization'], slug=slug)
+            db.session.add(org)
+            db.session.flush()
+        
         # Create new user
-        new_user = User(name=name, email=email, password=password)
+        new_user = User(name=data['name'], email=email, password=data['password'])
+        if org is not None:
+            new_user.org_id = org.id
         
         db.session.add(new_user)
-        db.session.commit()
+        commit_keep_loaded()
         
         # Generate tokens
         access_token = create_access_token(identity=new_user.id)
@@ -93,21 +104,15 @@ def login():
         401: Invalid credentials
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            return jsonify({'message': 'No data provided'}), 400
-        
-        email = data.get('email', '').strip().lower()
-        password = data.get('password', '')
-        
-        if not email or not password:
-            return jsonify({'message': 'Email and password are required'}), 400
-        
+        data = schemas.login_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
+    
+    try:
         # Find user by email
-        user = User.query.filter_by(email=email).first()
+        user = User.query.filter_by(email=data['email']).first()
         
-        if not user or not user.check_password(password):
+        if not user or not user.check_password(data['password']):
             return jsonify({'message': 'Invalid email or password'}), 401
         
         # Generate tokens
@@ -129,26 +134,76 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     """
-    Generate a new access token using refresh token.
+    Rotate the refresh token and generate a new access token.
     
-    Requires: Valid refresh token in Authorization header
+    Requires: Valid refresh token in Authorization header. The presented
+    refresh token is revoked, so each one can be used only once.
     
     Returns:
-        200: New access token generated
-        401: Invalid or expired refresh token
+        200: New access and refresh tokens generated
+        401: Invalid, expired or revoked refresh token
     """
     try:
         current_user_id = get_jwt_identity()
+        if not revocation.revoke(get_jwt()):
+            # A concurrent refresh already used this token.
+            return jsonify({'message': 'Refresh token has already been used'}), 401
         new_access_token = create_access_token(identity=current_user_id)
+        new_refresh_token = create_refresh_token(identity=current_user_id)
         
         return jsonify({
-            'access_token': new_access_token
+            'access_token': new_access_token,
+            'refresh_token': new_refresh_token
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'message': f'Token refresh failed: {str(e)}'}), 500
 
 
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Revoke the presented token, and optionally the paired refresh token.
+    
+    Optional JSON payload:
+        {
+            "refresh_token": "<refresh token to revoke as well>"
+        }
+    
+    Returns:
+        200: Token(s) revoked
+        400: refresh_token is invalid or belongs to another user
+        401: Invalid, expired or already revoked token
+    """
+    try:
+        data = schemas.logout_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
+    
+    try:
+        tokens = [get_jwt()]
+        
+        if 'refresh_token' in data:
+            try:
+                refresh_payload = decode_token(data['refresh_token'], allow_expired=True)
+            except (PyJWTError, JWTExtendedException):
+                return jsonify({'message': 'Invalid refresh token'}), 400
+            if refresh_payload.get('type') != 'refresh' or refresh_payload['sub'] != get_jwt_identity():
+                return jsonify({'message': 'Invalid refresh token'}), 400
+            tokens.append(refresh_payload)
+        
+        for payload in tokens:
+            revocation.revoke(payload)
+        
+        return jsonify({'message': 'Logged out'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Logout failed: {str(e)}'}), 500
+
+
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required_with_user
 def get_current_user(current_user):
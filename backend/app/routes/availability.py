@@ -0,0 +1,84 @@
+"""
+Availability routes for finding common free time across users.
+"""
+
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.services import availability
+
+availability_bp = Blueprint('availability', __name__, url_prefix='/api/availability')
+
+
+def _parse_utc(value):
+    """Parse an ISO datetime; one with an offset is converted to naive UTC like stored times."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@availability_bp.route('', methods=['POST'])
+@jwt_required()
+def get_availability():
+    """
+    Find windows when every listed user is free.
+
+    Expected JSON payload:
+        {
+            "user_ids": ["...", "..."],
+            "start": "2026-01-05T00:00:00",
+            "end": "2026-01-12T00:00:00",
+            "granularity_minutes": 30,
+            "min_duration_minutes": 60
+        }
+
+    start and end are UTC; one given with an offset or Z is converted.
+    Busy time is every stored event and every occurrence of the users'
+    recurring series overlapping the window.
+
+    Returns:
+        200: Free windows aligned to the granularity grid
+        400: Validation error
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'message': 'No data provided'}), 400
+
+    user_ids = data.get('user_ids')
+    if not isinstance(user_ids, list) or not user_ids or not all(isinstance(u, str) for u in user_ids):
+        return jsonify({'message': 'user_ids must be a non-empty list of ids'}), 400
+    max_users = current_app.config['AVAILABILITY_MAX_USERS']
+    if len(user_ids) > max_users:
+        return jsonify({'message': f'At most {max_users} users per request'}), 400
+
+    try:
+        start = _parse_utc(data.get('start', ''))
+        end = _parse_utc(data.get('end', ''))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'Invalid datetime format. Use ISO format: YYYY-MM-DDTHH:MM:SS'}), 400
+    if start >= end:
+        return jsonify({'message': 'End must be after start'}), 400
+    if end - start > current_app.config['AVAILABILITY_MAX_WINDOW']:
+        return jsonify({'message': 'Requested window is too large'}), 400
+
+    try:
+        granularity = int(data.get('granularity_minutes', 30))
+        min_duration = int(data.get('min_duration_minutes', 0))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'granularity_minutes and min_duration_minutes must be integers'}), 400
+    if granularity < 1:
+        return jsonify({'message': 'granularity_minutes must be positive'}), 400
+    if min_duration < 0:
+        return jsonify({'message': 'min_duration_minutes must not be negative'}), 400
+
+    intervals = availability.load_busy_intervals(set(user_ids), start, end)
+    windows = availability.free_windows(
+        intervals, start, end,
+        timedelta(minutes=granularity),
+        timedelta(minutes=min_duration) if min_duration else None,
+    )
+    return jsonify({
+        'free': [{'start': s.isoformat(), 'end': e.isoformat()} for s, e in windows],
+        'granularity_minutes': granularity,
+    }), 200
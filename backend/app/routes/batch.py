@@ -0,0 +1,159 @@
+"""
+Request batching: run several API calls in one HTTP round trip.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, current_app, g
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_header
+from werkzeug.test import EnvironBuilder
+from app.extensions import db
+from app.utils.decorators import BATCH_JWT
+
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+
+ALLOWED_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+
+def _environ(sub, verified):
+    builder = EnvironBuilder(
+        path=sub['path'],
+        method=sub['method'],
+        json=sub.get('body'),
+        headers={'Authorization': request.headers.get('Authorization', '')},
+        environ_base={'REMOTE_ADDR': request.remote_addr, BATCH_JWT: verified},
+    )
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _dispatch(app, environ):
+    """
+    Run one sub-request through the full Flask pipeline.
+
+    Inside the batch's app context the sub-request shares the batch's
+    session and ``g``, so the user loaded by the first sub-request is
+    reused by the rest (``g.batch_users``).
+    """
+    with app.request_context(environ):
+        response = app.full_dispatch_request()
+        body = response.get_json(silent=True)
+        _discard_uncommitted(response.status_code)
+        return {
+            'status': response.status_code,
+            'body': body if body is not None else response.get_data(as_text=True),
+        }
+
+
+def _discard_uncommitted(status):
+    """
+    Roll back what a sub-request left uncommitted in the shared session.
+
+    Handlers commit on success, so a failed sub-request (or one leaving
+    pending changes) did not: without this, objects it modified before
+    returning 4xx would be saved by the next sub-request that commits.
+    """
+    session = db.session()
+    if status < 400 and not (session.new or session.dirty or session.deleted):
+        return
+    # Expires modified objects and drops new ones; cached users reload on use.
+    session.rollback()
+
+
+def _dispatch_isolated(app, environ):
+    """Run a sub-request on a worker thread with its own app context and session."""
+    with app.app_context():
+        return _dispatch(app, environ)
+
+
+def _executor(app):
+    executor = app.extensions.get('batch_executor')
+    if executor is None:
+        executor = app.extensions['batch_executor'] = ThreadPoolExecutor(
+            max_workers=app.config['BATCH_MAX_WORKERS'], thread_name_prefix='batch')
+    return executor
+
+
+def _can_parallelize(app):
+    # SQLite sessions share one connection in tests and serialize writers
+    # anyway; sessions are never shared across threads.
+    return app.config['BATCH_MAX_WORKERS'] > 1 and db.engine.dialect.name != 'sqlite'
+
+
+def _validate(subs, max_requests):
+    if not isinstance(subs, list) or not subs:
+        return 'requests must be a non-empty list'
+    if len(subs) > max_requests:
+        return f'At most {max_requests} requests per batch'
+    for sub in subs:
+        if not isinstance(sub, dict) or not isinstance(sub.get('path'), str):
+            return 'Each request needs a path'
+        sub['method'] = str(sub.get('method', 'GET')).upper()
+        if sub['method'] not in ALLOWED_METHODS:
+            return f'Unsupported method: {sub["method"]}'
+        if not sub['path'].startswith('/api/') or sub['path'].startswith(batch_bp.url_prefix):
+            return f'Invalid path: {sub["path"]}'
+    return None
+
+
+@batch_bp.route('', methods=['POST'])
+@jwt_required()
+def run_batch():
+    """
+    Run multiple API calls with the caller's identity.
+
+    Expected JSON payload:
+        {
+            "requests": [
+                {"id": "me", "method": "GET", "path": "/api/auth/me"},
+                {"id": "events", "method": "GET", "path": "/api/events?status=SWAPPABLE"},
+                {"method": "PUT", "path": "/api/events/<id>", "body": {"title": "New"}}
+            ]
+        }
+
+    Sub-requests run in order and are independent: each commits or fails on
+    its own, and a failure does not stop the batch. Runs of consecutive GETs
+    are executed concurrently when the database allows it; writes act as
+    barriers. The token is verified once, for the batch; every sub-request
+    runs with its identity and claims (app/utils/decorators.py).
+
+    Returns:
+        200: One {id, status, body} per sub-request, in request order
+        400: Malformed batch
+        401: Missing or invalid token
+    """
+    data = request.get_json(silent=True) or {}
+    subs = data.get('requests')
+    error = _validate(subs, current_app.config['BATCH_MAX_REQUESTS'])
+    if error:
+        return jsonify({'message': error}), 400
+
+    app = current_app._get_current_object()
+    verified = (get_jwt_header(), get_jwt())
+    environs = [_environ(sub, verified) for sub in subs]
+    parallel = _can_parallelize(app)
+    results = [None] * len(subs)
+    g.batch_users = {}
+    try:
+
+        i = 0
+        while i < len(subs):
+            j = i
+            while j < len(subs) and subs[j]['method'] == 'GET':
+                j += 1
+            if parallel and j - i > 1:
+                futures = [_executor(app).submit(_dispatch_isolated, app, environs[k]) for k in range(i, j)]
+                for k, future in zip(range(i, j), futures):
+                    results[k] = future.result()
+            else:
+                j = max(j, i + 1)
+                for k in range(i, j):
+                    results[k] = _dispatch(app, environs[k])
+            i = j
+    finally:
+        g.pop('batch_users', None)
+
+    return jsonify({
+        'responses': [dict(result, id=sub.get('id', index)) for index, (sub, result) in enumerate(zip(subs, results))]
+    }), 200
@@ -2,16 +2,28 @@
 Events routes for calendar slot management.
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy import or_
+from app import schemas
 from app.extensions import db
-from app.models import User, Event, EventStatus
+from app.models import User, Event, EventSeries, EventStatus, SwapRequest
+from app.services import candidates, changes, entity_cache, outbox, recurrence, search, swap_counters
 from app.utils.decorators import jwt_required_with_user
+from app.utils.session import commit_keep_loaded
 
 # Create blueprint for events routes
 events_bp = Blueprint('events', __name__, url_prefix='/api/events')
 
+MAX_CHANGES = 1000
+
+
+def _event_payload(event):
+    """Outbox message body for an event change."""
+    return {'event_id': event.id, 'user_id': event.user_id, 'status': event.status.value}
+
+
 @events_bp.route('', methods=['POST'])
 @jwt_required_with_user
 def create_event(current_user):
@@ -19,43 +31,23 @@ def create_event(current_user):
     Create a new calendar event.
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'message': 'No data provided'}), 400
-
-        title = data.get('title', '').strip()
-        start_time_str = data.get('start_time')
-        end_time_str = data.get('end_time')
-        status = data.get('status', 'BUSY')
-
-        if not title or len(title) < 1:
-            return jsonify({'message': 'Title is required'}), 400
-        if not start_time_str or not end_time_str:
-            return jsonify({'message': 'Start and end times are required'}), 400
-
-        try:
-            start_time = datetime.fromisoformat(start_time_str)
-            end_time = datetime.fromisoformat(end_time_str)
-        except ValueError:
-            return jsonify({'message': 'Invalid datetime format. Use ISO format: YYYY-MM-DDTHH:MM:SS'}), 400
-        if start_time >= end_time:
-            return jsonify({'message': 'End time must be after start time'}), 400
-
-        try:
-            event_status = EventStatus[status]
-        except KeyError:
-            return jsonify({'message': f'Invalid status. Must be one of: {", ".join([e.value for e in EventStatus])}'}), 400
+        data = schemas.event_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
 
+    try:
         new_event = Event(
             user_id=current_user.id,
-            title=title,
-            start_time=start_time,
-            end_time=end_time,
-            status=event_status
+            title=data['title'],
+            start_time=data['start_time'],
+            end_time=data['end_time'],
+            status=data['status']
         )
 
         db.session.add(new_event)
-        db.session.commit()
+        db.session.flush()
+        outbox.enqueue('event.created', _event_payload(new_event))
+        commit_keep_loaded()
 
         return jsonify({
             'message': 'Event created successfully',
@@ -71,31 +63,210 @@ def create_event(current_user):
 def get_events(current_user):
     """
     Get all events for all users (for swap UI).
+
+    Query params:
+        status: Only events with this EventStatus
+        start / end: Only events overlapping this ISO datetime range
+        q: Full-text search on titles; results are ranked and paginated
+        limit / offset: Page of search results (only with q)
+
+    Occurrences of recurring series are expanded into the list, but only
+    inside the start/end window; without one, the next RECURRENCE_WINDOW.
+    Windows longer than RECURRENCE_MAX_WINDOW are cut short for
+    occurrences. Search (q) covers stored events only.
+
     Returns:
-        200: List of all events + current user's id
+        200: List of events + current user's id, and a cursor for /changes
+        400: Invalid filter
     """
     try:
-        events = Event.query.order_by(Event.start_time.desc()).all()
+        criteria = []
+        status = start = end = None
+        if request.args.get('status'):
+            try:
+                status = EventStatus[request.args['status'].upper()]
+            except KeyError:
+                return jsonify({'message': f'Invalid status. Must be one of: {", ".join([e.value for e in EventStatus])}'}), 400
+            criteria.append(Event.status == status)
+        try:
+            if request.args.get('start'):
+                start = datetime.fromisoformat(request.args['start'])
+                criteria.append(Event.end_time > start)
+            if request.args.get('end'):
+                end = datetime.fromisoformat(request.args['end'])
+                criteria.append(Event.start_time < end)
+        except ValueError:
+            return jsonify({'message': 'Invalid datetime format. Use ISO format: YYYY-MM-DDTHH:MM:SS'}), 400
+
+        if 'q' in request.args:
+            return _search_events(current_user, request.args['q'], criteria)
+
+        # Read the cursor first: changes racing the listing are replayed, never lost.
+        cursor = changes.current_cursor()
+        events = Event.query.filter(*criteria).order_by(Event.start_time.desc()).all()
+        events.extend(_occurrences(start, end, status))
+        events.sort(key=lambda event: event.start_time, reverse=True)
         return jsonify({
             'events': [event.to_dict() for event in events],
-            'user_id': current_user.id
+            'user_id': current_user.id,
+            'cursor': str(cursor)
         }), 200
     except Exception as e:
         return jsonify({'message': f'Failed to fetch events: {str(e)}'}), 500
 
+
+def _occurrences(start, end, status):
+    """Recurring occurrences for get_events, bounded to the recurrence window."""
+    config = current_app.config
+    low = start or datetime.utcnow()
+    high = min(end or low + config['RECURRENCE_WINDOW'], low + config['RECURRENCE_MAX_WINDOW'])
+    return recurrence.occurrences(low, high, status) if high > low else []
+
+
+def _search_events(current_user, text, criteria):
+    """Ranked, offset-paginated title search for get_events."""
+    try:
+        limit = max(1, min(int(request.args.get('limit', current_app.config['ITEMS_PER_PAGE'])), 200))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'message': 'limit and offset must be integers'}), 400
+
+    query = search.search_query(text, criteria)
+    rows = query.limit(limit + 1).offset(offset).all() if query is not None else []
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        'events': [dict(event.to_dict(), rank=round(float(rank), 6)) for event, rank in rows],
+        'user_id': current_user.id,
+        'next_offset': offset + limit if has_more else None,
+    }), 200
+
+
+@events_bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_event_changes():
+    """
+    Events created, updated, swapped or deleted since a cursor.
+
+    Query params:
+        since: Cursor from GET /api/events or a previous call (default 0)
+        limit: Maximum changes to return (default ITEMS_PER_PAGE, max 1000)
+
+    Returns:
+        200: Changed events, tombstones of deleted ones, the next cursor and
+             whether more changes are waiting
+        400: Invalid cursor or limit
+        410: Cursor predates pruned tombstones; refetch GET /api/events
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        limit = max(1, min(int(request.args.get('limit', current_app.config['ITEMS_PER_PAGE'])), MAX_CHANGES))
+    except ValueError:
+        return jsonify({'message': 'since and limit must be integers'}), 400
+    if since < 0:
+        return jsonify({'message': 'since must not be negative'}), 400
+
+    try:
+        events, tombstones, cursor, has_more = changes.since(since, limit)
+    except changes.CursorExpired:
+        return jsonify({'message': 'Cursor is too old; refetch the full event list'}), 410
+
+    return jsonify({
+        'events': [dict(event.to_dict(), change_seq=event.change_seq) for event in events],
+        'deleted': [tombstone.to_dict() for tombstone in tombstones],
+        'cursor': str(cursor),
+        'has_more': has_more
+    }), 200
+
+
+@events_bp.route('/series', methods=['POST'])
+@jwt_required_with_user
+def create_series(current_user):
+    """
+    Create a recurring slot, e.g. every weekday 09:00-10:00.
+
+    Body:
+        title, start_time, end_time: The first occurrence
+        rrule: Recurrence rule (FREQ=DAILY|WEEKLY, INTERVAL, BYDAY, UNTIL or COUNT)
+        status: BUSY or SWAPPABLE (default SWAPPABLE)
+
+    Returns:
+        201: The series
+        400: Missing fields or an unsupported rule
+    """
+    try:
+        data = schemas.series_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
+
+    try:
+        try:
+            series = recurrence.create_series(current_user.id, data['title'], data['start_time'], data['end_time'],
+                                              data['rrule'], data['status'])
+        except recurrence.InvalidRule as e:
+            return jsonify({'message': str(e)}), 400
+        commit_keep_loaded()
+
+        return jsonify({
+            'message': 'Series created successfully',
+            'series': series.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Series creation failed: {str(e)}'}), 500
+
+
+@events_bp.route('/series', methods=['GET'])
+@jwt_required_with_user
+def get_series(current_user):
+    """
+    List the current user's recurring series.
+    """
+    series = EventSeries.query.filter_by(user_id=current_user.id).order_by(EventSeries.dtstart).all()
+    return jsonify({'series': [item.to_dict() for item in series]}), 200
+
+
+@events_bp.route('/series/<series_id>', methods=['DELETE'])
+@jwt_required_with_user
+def delete_series(current_user, series_id):
+    """
+    Delete a recurring series. Occurrences already edited or swapped are
+    stored events and are kept.
+    """
+    try:
+        series = db.session.get(EventSeries, series_id)
+        if not series:
+            return jsonify({'message': 'Series not found'}), 404
+        if series.user_id != current_user.id:
+            return jsonify({'message': 'You do not have permission to delete this series'}), 403
+
+        recurrence.delete_series(series)
+        db.session.commit()
+        return jsonify({'message': 'Series deleted successfully'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Series deletion failed: {str(e)}'}), 500
+
+
 @events_bp.route('/<event_id>', methods=['GET'])
 @jwt_required_with_user
 def get_event(current_user, event_id):
     """
-    Get a specific event by ID.
+    Get a specific event by ID, including archived past events and
+    occurrences of recurring series.
     """
     try:
-        event = Event.query.get(event_id)
+        if recurrence.parse_occurrence_id(event_id):
+            occurrence = recurrence.get_event(event_id)
+            event = occurrence.to_dict(include_owner=True) if occurrence else None
+        else:
+            event = entity_cache.get_event(event_id)
         if not event:
             return jsonify({'message': 'Event not found'}), 404
-        # Optional: restrict or include owner info as needed
         return jsonify({
-            'event': event.to_dict(include_owner=True)
+            'event': event
         }), 200
 
     except Exception as e:
@@ -105,43 +276,29 @@ def get_event(current_user, event_id):
 @jwt_required_with_user
 def update_event(current_user, event_id):
     """
-    Update an event.
+    Update an event. Updating an occurrence of a recurring series detaches
+    it into a stored event, which the response returns with its new id.
     """
     try:
-        event = Event.query.get(event_id)
+        event = recurrence.get_event(event_id)
         if not event:
             return jsonify({'message': 'Event not found'}), 404
         if event.user_id != current_user.id:
             return jsonify({'message': 'You do not have permission to update this event'}), 403
 
-        data = request.get_json()
-        if not data:
-            return jsonify({'message': 'No data provided'}), 400
+        try:
+            data = schemas.event_update_payload.load(request.get_json(silent=True))
+        except schemas.ValidationError as e:
+            return jsonify(e.to_dict()), 400
+        event = recurrence.materialize(event)
 
-        if 'title' in data:
-            title = data['title'].strip()
-            if not title:
-                return jsonify({'message': 'Title cannot be empty'}), 400
-            event.title = title
-        if 'start_time' in data:
-            try:
-                event.start_time = datetime.fromisoformat(data['start_time'])
-            except ValueError:
-                return jsonify({'message': 'Invalid start_time format'}), 400
-        if 'end_time' in data:
-            try:
-                event.end_time = datetime.fromisoformat(data['end_time'])
-            except ValueError:
-                return jsonify({'message': 'Invalid end_time format'}), 400
-        if 'status' in data:
-            try:
-                event.status = EventStatus[data['status']]
-            except KeyError:
-                return jsonify({'message': f'Invalid status: {data["status"]}'}), 400
+        for field, value in data.items():
+            setattr(event, field, value)
         if event.start_time >= event.end_time:
             return jsonify({'message': 'End time must be after start time'}), 400
 
-        db.session.commit()
+        outbox.enqueue('event.updated', _event_payload(event))
+        commit_keep_loaded()
 
         return jsonify({
             'message': 'Event updated successfully',
@@ -156,15 +313,30 @@ def update_event(current_user, event_id):
 @jwt_required_with_user
 def delete_event(current_user, event_id):
     """
-    Delete an event.
+    Delete an event, or cancel one occurrence of a recurring series.
     """
     try:
-        event = Event.query.get(event_id)
+        event = recurrence.get_event(event_id)
         if not event:
             return jsonify({'message': 'Event not found'}), 404
         if event.user_id != current_user.id:
             return jsonify({'message': 'You do not have permission to delete this event'}), 403
 
+        if isinstance(event, recurrence.Occurrence):
+            recurrence.cancel(event)
+            db.session.commit()
+            return jsonify({
+                'message': 'Event deleted successfully'
+            }), 200
+
+        outbox.enqueue('event.deleted', _event_payload(event))
+        # Swaps on this slot go through the ORM, not the database cascade, so
+        # their counters are adjusted and cached copies dropped in this transaction.
+        swaps = SwapRequest.query.filter(
+            or_(SwapRequest.requester_slot_id == event.id, SwapRequest.requestee_slot_id == event.id)).all()
+        for swap in swaps:
+            swap_counters.record_deleted(swap)
+            db.session.delete(swap)
         db.session.delete(event)
         db.session.commit()
 
@@ -175,3 +347,38 @@ def delete_event(current_user, event_id):
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Event deletion failed: {str(e)}'}), 500
+
+
+@events_bp.route('/<event_id>/candidates', methods=['GET'])
+@jwt_required_with_user
+def get_swap_candidates(current_user, event_id):
+    """
+    Rank other users' SWAPPABLE slots as swap partners for one of your slots.
+
+    Query params:
+        k: Number of candidates (default 10)
+
+    Returns:
+        200: Candidates ordered by score, best first
+        403: Event belongs to another user
+        404: Event not found
+    """
+    event = Event.query.get(event_id)
+    if not event:
+        return jsonify({'message': 'Event not found'}), 404
+    if event.user_id != current_user.id:
+        return jsonify({'message': 'You do not have permission to view candidates for this event'}), 403
+
+    try:
+        k = int(request.args.get('k', 10))
+    except ValueError:
+        return jsonify({'message': 'k must be an integer'}), 400
+    k = max(1, min(k, current_app.config['CANDIDATE_MAX_K']))
+
+    ranked = candidates.rank(event, k)
+    return jsonify({
+        'candidates': [
+            {'event': candidate.to_dict(include_owner=True), 'score': round(score, 4), 'conflicts': conflicts}
+            for score, conflicts, candidate in ranked
+        ]
+    }), 200
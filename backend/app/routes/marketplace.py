@@ -0,0 +1,73 @@
+"""
+Marketplace routes: other users' upcoming SWAPPABLE slots.
+"""
+
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import EventStatus, MarketplaceSlot, User
+from app.services import recurrence
+
+marketplace_bp = Blueprint('marketplace', __name__, url_prefix='/api/swappable-slots')
+
+MAX_LIMIT = 200
+
+
+@marketplace_bp.route('', methods=['GET'])
+@jwt_required()
+def get_swappable_slots():
+    """
+    List other users' upcoming SWAPPABLE slots, soonest first.
+
+    Stored slots come from the marketplace read model: one index range scan
+    of (org_id, start_time), with the owner embedded in each row. SWAPPABLE
+    occurrences of recurring series are expanded into the list, but only
+    within the next RECURRENCE_WINDOW.
+
+    Query params:
+        limit / offset: Page of slots (default ITEMS_PER_PAGE, max 200)
+
+    Returns:
+        200: Slots with owner info, and the offset of the next page or null
+        400: Invalid limit or offset
+    """
+    try:
+        limit = max(1, min(int(request.args.get('limit', current_app.config['ITEMS_PER_PAGE'])), MAX_LIMIT))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'message': 'limit and offset must be integers'}), 400
+
+    now, user_id = datetime.utcnow(), get_jwt_identity()
+    occurrences = [
+        occurrence for occurrence in recurrence.occurrences(
+            now, now + current_app.config['RECURRENCE_WINDOW'], EventStatus.SWAPPABLE)
+        if occurrence.start_time > now and occurrence.user_id != user_id
+    ]
+    query = (
+        MarketplaceSlot.query
+        .filter(MarketplaceSlot.start_time > now, MarketplaceSlot.user_id != user_id)
+        .order_by(MarketplaceSlot.start_time, MarketplaceSlot.event_id)
+    )
+    if occurrences:
+        # The page may take rows from both sources, so merge from the start.
+        rows = query.limit(offset + limit + 1).all() + occurrences
+        rows.sort(key=lambda row: (row.start_time, row.id if _is_occurrence(row) else row.event_id))
+        rows = rows[offset:offset + limit + 1]
+        owner_ids = {row.user_id for row in rows if _is_occurrence(row)}
+        owners = {user.id: user for user in User.query.filter(User.id.in_(owner_ids))}
+    else:
+        rows, owners = query.limit(limit + 1).offset(offset).all(), {}
+    has_more = len(rows) > limit
+    return jsonify({
+        'slots': [_occurrence_dict(row, owners[row.user_id]) if _is_occurrence(row) else row.to_dict()
+                  for row in rows[:limit]],
+        'next_offset': offset + limit if has_more else None,
+    }), 200
+
+
+def _is_occurrence(row):
+    return isinstance(row, recurrence.Occurrence)
+
+
+def _occurrence_dict(occurrence, owner):
+    return dict(occurrence.to_dict(), owner={'id': owner.id, 'name': owner.name, 'email': owner.email})
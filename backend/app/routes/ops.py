@@ -0,0 +1,37 @@
+"""
+Operational endpoints: metrics for background jobs and caches.
+
+Metrics are process-wide and span every organization, so they are not
+behind user JWTs: a scraper presents a token minted with
+``flask metrics-token`` (an HMAC under METRICS_SECRET, as for the
+profiler). Without a secret the endpoint does not exist.
+"""
+
+from flask import Blueprint, current_app, jsonify, request
+from app.utils.metrics import metrics
+from app.utils.profiling import verify_token
+
+ops_bp = Blueprint('ops', __name__, url_prefix='/api/ops')
+
+
+@ops_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Snapshot of in-process counters, rates and gauges.
+
+    Counters are per process; aggregate across workers in the scraper.
+
+    Headers:
+        X-Metrics-Token: Token from ``flask metrics-token``
+
+    Returns:
+        200: Metrics snapshot
+        403: Missing, invalid or expired token
+        404: METRICS_SECRET is not set
+    """
+    secret = current_app.config['METRICS_SECRET']
+    if not secret:
+        return jsonify({'message': 'Not found'}), 404
+    if not verify_token(secret, request.headers.get('X-Metrics-Token')):
+        return jsonify({'message': 'Invalid metrics token'}), 403
+    return jsonify({'metrics': metrics.snapshot()}), 200
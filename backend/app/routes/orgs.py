@@ -0,0 +1,58 @@
+"""
+Organization routes: the caller's organization, its members and invites.
+"""
+
+from flask import Blueprint, jsonify, current_app
+from app.extensions import db
+from app.models import Organization, User
+from app.services import tenancy
+from app.utils.decorators import jwt_required_with_user
+
+orgs_bp = Blueprint('orgs', __name__, url_prefix='/api/orgs')
+
+
+@orgs_bp.route('/current', methods=['GET'])
+@jwt_required_with_user
+def get_current(current_user):
+    """
+    Get the organization of the authenticated user.
+
+    Returns:
+        200: Organization details
+    """
+    org = db.session.get(Organization, current_user.org_id)
+    return jsonify({'organization': org.to_dict()}), 200
+
+
+@orgs_bp.route('/members', methods=['GET'])
+@jwt_required_with_user
+def get_members(current_user):
+    """
+    List the users of the caller's organization.
+
+    Returns:
+        200: Members ordered by name
+    """
+    # Filtered to the caller's organization by the tenant scope
+    members = User.query.order_by(User.name).all()
+    return jsonify({
+        'members': [{'id': user.id, 'name': user.name, 'email': user.email} for user in members],
+        'count': len(members),
+    }), 200
+
+
+@orgs_bp.route('/invites', methods=['POST'])
+@jwt_required_with_user
+def create_invite(current_user):
+    """
+    Create an invite to the caller's organization.
+
+    The token is passed as ``invite`` to POST /api/auth/register.
+
+    Returns:
+        201: Invite token and its lifetime in seconds
+    """
+    return jsonify({
+        'invite': tenancy.make_invite(current_user.org_id),
+        'expires_in': current_app.config['ORG_INVITE_TTL'],
+    }), 201
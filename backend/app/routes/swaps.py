@@ -1,26 +1,55 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import or_, select
+from sqlalchemy.orm import joinedload
+from app import schemas
 from app.extensions import db
-from app.models import User, Event, SwapRequest, SwapStatus, EventStatus
+from app.models import (
+    User, SwapRequest, SwapStatus, EventStatus, RESOLVED_SWAP_STATUSES, ArchivedSwapRequest,
+)
+from app.services import archival, bundles, entity_cache, expiry, outbox, recurrence, swap_counters, transitions
 from app.utils.decorators import jwt_required_with_user
+from app.utils.pagination import keyset_merge, InvalidCursor
+from app.utils.session import commit_keep_loaded
 
 swaps_bp = Blueprint('swaps', __name__, url_prefix='/api/requests')
 
+MAX_PAGE_SIZE = 200
+
+
+def _swap_payload(swap):
+    """Outbox message body for a swap transition."""
+    return {
+        'swap_id': swap.id,
+        'requester_id': swap.requester_id,
+        'requestee_id': swap.requestee_id,
+        'requester_slot_id': swap.requester_slot_id,
+        'requestee_slot_id': swap.requestee_slot_id,
+        'status': swap.status.value,
+    }
+
+
+def _locked_swap(swap_id):
+    """Load a swap under a row lock, so its status cannot change before commit."""
+    return db.session.execute(
+        select(SwapRequest).where(SwapRequest.id == swap_id)
+        .with_for_update().execution_options(populate_existing=True)
+    ).scalar()
+
+
 @swaps_bp.route('/swap', methods=['POST'])
 @jwt_required_with_user
 def create_swap_request(current_user):
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'message': 'No data provided'}), 400
+        data = schemas.swap_request_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
 
-        requestee_id = data.get('requestee_id', '').strip()
-        my_event_id = data.get('my_event_id', '').strip()
-        requestee_event_id = data.get('requestee_event_id', '').strip()
-        message = data.get('message')
-
-        if not requestee_id or not my_event_id or not requestee_event_id:
-            return jsonify({'message': 'Required fields missing'}), 400
+    try:
+        requestee_id = data['requestee_id']
+        my_event_id = data['my_event_id']
+        requestee_event_id = data['requestee_event_id']
 
         if requestee_id == current_user.id:
             return jsonify({'message': 'Cannot swap with yourself'}), 400
@@ -29,26 +58,35 @@ def create_swap_request(current_user):
         if not requestee:
             return jsonify({'message': 'Requested user not found'}), 404
 
-        my_event = Event.query.get(my_event_id)
+        my_event = recurrence.get_event(my_event_id)
         if not my_event or my_event.user_id != current_user.id:
             return jsonify({'message': 'Your event not found or not owned'}), 404
 
-        their_event = Event.query.get(requestee_event_id)
+        their_event = recurrence.get_event(requestee_event_id)
         if not their_event or their_event.user_id != requestee_id:
             return jsonify({'message': 'Requested event not found or not owned'}), 404
 
         if my_event.status == EventStatus.BUSY or their_event.status == EventStatus.BUSY:
             return jsonify({'message': 'Both events must be in SWAPPABLE status'}), 400
 
+        # Occurrences of recurring series become stored events to be swapped.
+        my_event = recurrence.materialize(my_event)
+        their_event = recurrence.materialize(their_event)
+
         new_swap = SwapRequest(
             requester_id=current_user.id,
             requestee_id=requestee_id,
-            requester_slot_id=my_event_id,
-            requestee_slot_id=requestee_event_id,
-            message=message
+            requester_slot_id=my_event.id,
+            requestee_slot_id=their_event.id,
+            message=data.get('message'),
+            expires_at=datetime.utcnow() + current_app.config['SWAP_REQUEST_TTL']
         )
         db.session.add(new_swap)
-        db.session.commit()
+        db.session.flush()
+        swap_counters.record_created(new_swap)
+        transitions.record_swap(new_swap, actor_id=current_user.id)
+        outbox.enqueue('swap.created', _swap_payload(new_swap))
+        commit_keep_loaded()
         return jsonify({'success': True, 'message': 'Swap request created successfully', 'swap': new_swap.to_dict()}), 201
 
     except Exception as e:
@@ -56,25 +94,89 @@ def create_swap_request(current_user):
         return jsonify({'success': False, 'message': f'Swap request creation failed: {str(e)}'}), 500
 
 
+@swaps_bp.route('/bundle', methods=['POST'])
+@jwt_required_with_user
+def create_bundle_request(current_user):
+    """
+    Offer several of your slots for several of another user's, all or nothing.
+
+    Body:
+        requestee_id: The other user
+        my_event_ids: Slots you give (1 to MAX_BUNDLE_SLOTS)
+        requestee_event_ids: Slots you get in return (1 to MAX_BUNDLE_SLOTS)
+        message: Optional note
+
+    Accept and reject it like any swap request; accepting trades every slot
+    in one transaction.
+
+    Returns:
+        201: The bundle swap request
+        400: Invalid payload, duplicate slot, or a slot missing, not owned
+             by its side or BUSY
+        404: Requested user not found
+    """
+    try:
+        data = schemas.bundle_request_payload.load(request.get_json(silent=True))
+    except schemas.ValidationError as e:
+        return jsonify(e.to_dict()), 400
+
+    try:
+        if not db.session.get(User, data['requestee_id']):
+            return jsonify({'message': 'Requested user not found'}), 404
+        try:
+            swap = bundles.create(current_user.id, data['requestee_id'], data['my_event_ids'],
+                                  data['requestee_event_ids'], data.get('message'))
+        except bundles.InvalidBundle as e:
+            db.session.rollback()
+            return jsonify({'message': str(e)}), 400
+        outbox.enqueue('swap.created', _swap_payload(swap))
+        commit_keep_loaded()
+        return jsonify({'message': 'Bundle swap request created successfully', 'swap': swap.to_dict()}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Bundle swap request creation failed: {str(e)}'}), 500
+
+
 @swaps_bp.route('/<swap_id>/accept', methods=['POST'])
 @jwt_required_with_user
 def accept_swap_request(current_user, swap_id):
     try:
-        swap = SwapRequest.query.get(swap_id)
+        swap = _locked_swap(swap_id)
         if not swap:
             return jsonify({'message': 'Swap request not found'}), 404
         if swap.requestee_id != current_user.id:
             return jsonify({'message': 'You do not have permission to accept this swap'}), 403
         if swap.status != SwapStatus.PENDING:
             return jsonify({'message': f'Swap is already {swap.status.value}'}), 400
+        if expiry.is_stale(swap):
+            # Expire now rather than wait for the sweeper.
+            expiry.expire_one(swap)
+            db.session.commit()
+            return jsonify({'message': 'Swap has expired'}), 400
+
+        if swap.bundle_size:
+            try:
+                bundles.accept(swap, current_user.id)
+            except bundles.BundleConflict as e:
+                db.session.rollback()
+                return jsonify({'message': str(e)}), 409
+            outbox.enqueue('swap.accepted', _swap_payload(swap))
+            commit_keep_loaded()
+            return jsonify({'message': 'Swap accepted successfully', 'swap': swap.to_dict()}), 200
 
         # Swap event ownerships
         requester_event = swap.requester_slot
         requestee_event = swap.requestee_slot
+        transitions.record_owner_change(swap, requester_event, requestee_event.user_id, current_user.id)
+        transitions.record_owner_change(swap, requestee_event, requester_event.user_id, current_user.id)
         requester_event.user_id, requestee_event.user_id = requestee_event.user_id, requester_event.user_id
 
         swap.status = SwapStatus.ACCEPTED
-        db.session.commit()
+        swap_counters.record_resolved(swap, SwapStatus.ACCEPTED)
+        transitions.record_swap(swap, actor_id=current_user.id)
+        outbox.enqueue('swap.accepted', _swap_payload(swap))
+        commit_keep_loaded()
 
         return jsonify({'message': 'Swap accepted successfully', 'swap': swap.to_dict()}), 200
 
@@ -87,16 +189,24 @@ def accept_swap_request(current_user, swap_id):
 @jwt_required_with_user
 def reject_swap_request(current_user, swap_id):
     try:
-        swap = SwapRequest.query.get(swap_id)
+        swap = _locked_swap(swap_id)
         if not swap:
             return jsonify({'message': 'Swap request not found'}), 404
         if swap.requestee_id != current_user.id:
             return jsonify({'message': 'You do not have permission to reject this swap'}), 403
         if swap.status != SwapStatus.PENDING:
             return jsonify({'message': f'Swap is already {swap.status.value}'}), 400
+        if expiry.is_stale(swap):
+            # Expire now rather than wait for the sweeper.
+            expiry.expire_one(swap)
+            db.session.commit()
+            return jsonify({'message': 'Swap has expired'}), 400
 
         swap.status = SwapStatus.REJECTED
-        db.session.commit()
+        swap_counters.record_resolved(swap, SwapStatus.REJECTED)
+        transitions.record_swap(swap, actor_id=current_user.id)
+        outbox.enqueue('swap.rejected', _swap_payload(swap))
+        commit_keep_loaded()
 
         return jsonify({'message': 'Swap rejected successfully', 'swap': swap.to_dict()}), 200
 
@@ -112,3 +222,188 @@ def get_pending_swaps(current_user):
         status=SwapStatus.PENDING
     ).all()
     return jsonify({'pending_swaps': [s.to_dict() for s in swaps]}), 200
+
+
+@swaps_bp.route('/transitions', methods=['GET'])
+@jwt_required()
+def get_swap_transitions():
+    """
+    Swap and slot-ownership transitions, newest first.
+
+    Query params:
+        slot_id: History of one slot the current user owns or was a party
+            to (default: the current user's transitions)
+        before: Return transitions older than this id (next_before of a previous page)
+        limit: Page size (capped at MAX_PAGE_SIZE)
+
+    Returns:
+        200: Transitions and the id to pass as ``before`` for the next page
+        400: Invalid before or limit
+        403: The current user neither owns the slot nor was a party to it
+        404: Slot not found
+    """
+    try:
+        before = int(request.args['before']) if request.args.get('before') else None
+        limit = max(1, min(int(request.args.get('limit', current_app.config['ITEMS_PER_PAGE'])), MAX_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'message': 'before and limit must be integers'}), 400
+
+    user_id, slot_id = get_jwt_identity(), request.args.get('slot_id')
+    if slot_id:
+        slot = entity_cache.get_event(slot_id)
+        if (slot is None or slot['user_id'] != user_id) and not transitions.is_party(slot_id, user_id):
+            if slot is None:
+                return jsonify({'message': 'Slot not found'}), 404
+            return jsonify({'message': 'You do not have permission to view this slot'}), 403
+        rows = transitions.for_slot(slot_id, before, limit + 1)
+    else:
+        rows = transitions.for_user(user_id, before, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        'transitions': [row.to_dict() for row in rows],
+        'next_before': str(rows[-1].id) if has_more else None,
+    }), 200
+
+
+@swaps_bp.route('/<swap_id>', methods=['GET'])
+@jwt_required()
+def get_swap_request(swap_id):
+    """
+    Get one swap request, including archived ones, with both slots embedded.
+
+    Returns:
+        200: Swap details
+        403: Current user is not a participant
+        404: Swap not found
+    """
+    swap = entity_cache.get_swap(swap_id)
+    if not swap:
+        return jsonify({'message': 'Swap request not found'}), 404
+    if get_jwt_identity() not in (swap['requester_id'], swap['requestee_id']):
+        return jsonify({'message': 'You do not have permission to view this swap'}), 403
+    return jsonify({'swap': swap}), 200
+
+
+@swaps_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def get_swap_summary():
+    """
+    Get the current user's swap counters for the inbox badge.
+
+    Reads a single materialized counter row instead of loading swaps.
+    """
+    return jsonify({'summary': swap_counters.get_summary(get_jwt_identity())}), 200
+
+
+def _parse_listing_args(default_statuses):
+    """
+    Parse the shared filter and pagination query parameters.
+
+    Query params:
+        status: Comma-separated SwapStatus names
+        created_after / created_before: ISO datetimes bounding created_at
+        cursor: Opaque cursor from a previous page
+        limit: Page size (capped at MAX_PAGE_SIZE)
+
+    Raises:
+        ValueError: If any parameter is malformed
+    """
+    args = request.args
+    statuses = default_statuses
+    if args.get('status'):
+        try:
+            statuses = tuple(SwapStatus[name.strip().upper()] for name in args['status'].split(','))
+        except KeyError:
+            raise ValueError(f'Invalid status. Must be one of: {", ".join(s.value for s in SwapStatus)}')
+
+    bounds = {}
+    for name in ('created_after', 'created_before'):
+        if args.get(name):
+            try:
+                bounds[name] = datetime.fromisoformat(args[name])
+            except ValueError:
+                raise ValueError(f'Invalid {name} format. Use ISO format: YYYY-MM-DDTHH:MM:SS')
+
+    try:
+        limit = int(args.get('limit', current_app.config['ITEMS_PER_PAGE']))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    return statuses, bounds, args.get('cursor'), limit
+
+
+def _list_swaps(owner_filter, default_statuses, key):
+    """
+    Return one keyset page of swaps merged across hot and archived storage.
+
+    Args:
+        owner_filter: Callable taking a swap model and returning the
+            participant filter for the current user
+        default_statuses: Statuses listed when no status param is given
+        key (str): Response key for the list
+    """
+    try:
+        statuses, bounds, cursor, limit = _parse_listing_args(default_statuses)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    models = [SwapRequest]
+    # The archive only holds resolved swaps; skip probing it when it cannot match.
+    if not statuses or set(statuses) & set(RESOLVED_SWAP_STATUSES):
+        models.append(ArchivedSwapRequest)
+
+    sources = []
+    for model in models:
+        query = model.query.filter(owner_filter(model))
+        if statuses:
+            query = query.filter(model.status.in_(statuses))
+        if 'created_after' in bounds:
+            query = query.filter(model.created_at >= bounds['created_after'])
+        if 'created_before' in bounds:
+            query = query.filter(model.created_at < bounds['created_before'])
+
+        # Load participants and slots with the page instead of per swap in to_dict().
+        query = query.options(joinedload(model.requester), joinedload(model.requestee))
+        if model is SwapRequest:
+            query = query.options(joinedload(model.requester_slot), joinedload(model.requestee_slot))
+        sources.append((query, model))
+
+    try:
+        swaps, next_cursor = keyset_merge(sources, cursor, limit)
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+
+    slots = archival.load_slots([s for s in swaps if isinstance(s, ArchivedSwapRequest)])
+    items = [s.to_dict(slots) if isinstance(s, ArchivedSwapRequest) else s.to_dict() for s in swaps]
+    return jsonify({key: items, 'next_cursor': next_cursor}), 200
+
+
+@swaps_bp.route('/sent', methods=['GET'])
+@jwt_required()
+def get_sent_swaps():
+    """
+    List swap requests the current user has sent, newest first.
+
+    Defaults to every status; see _parse_listing_args for filters.
+    """
+    user_id = get_jwt_identity()
+    return _list_swaps(lambda model: model.requester_id == user_id, (), 'sent_swaps')
+
+
+@swaps_bp.route('/history', methods=['GET'])
+@jwt_required()
+def get_swap_history():
+    """
+    List resolved swaps the current user sent or received, newest first.
+
+    Includes archived swaps. Defaults to every resolved status; see
+    _parse_listing_args for filters.
+    """
+    user_id = get_jwt_identity()
+    return _list_swaps(
+        lambda model: or_(model.requester_id == user_id, model.requestee_id == user_id),
+        RESOLVED_SWAP_STATUSES,
+        'swaps',
+    )
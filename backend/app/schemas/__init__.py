@@ -0,0 +1,15 @@
+"""
+Request payload schemas, compiled at import into single-pass validators.
+"""
+
+from app.schemas.base import ValidationError, RequestSchema, CompiledSchema, compile_schema
+from app.schemas.auth import register_payload, login_payload, logout_payload
+from app.schemas.events import event_payload, event_update_payload, series_payload
+from app.schemas.swaps import swap_request_payload, bundle_request_payload
+
+__all__ = [
+    'ValidationError', 'RequestSchema', 'CompiledSchema', 'compile_schema',
+    'register_payload', 'login_payload', 'logout_payload',
+    'event_payload', 'event_update_payload', 'series_payload',
+    'swap_request_payload', 'bundle_request_payload',
+]
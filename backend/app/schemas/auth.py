@@ -0,0 +1,46 @@
+"""
+Authentication payloads.
+"""
+
+from marshmallow import ValidationError as FieldError, fields
+from marshmallow.validate import Length
+from app.schemas.base import RequestSchema, Trimmed, compile_schema
+
+
+def _looks_like_email(value):
+    if '@' not in value:
+        raise FieldError('Valid email is required')
+
+
+class RegisterSchema(RequestSchema):
+    name = Trimmed(required=True, validate=Length(min=2, error='Name must be at least 2 characters long'),
+                   error_messages={'required': 'Name must be at least 2 characters long'})
+    email = Trimmed(required=True, lower=True, validate=_looks_like_email,
+                    error_messages={'required': 'Valid email is required'})
+    password = fields.String(required=True,
+                             validate=Length(min=6, error='Password must be at least 6 characters long'),
+                             error_messages={'required': 'Password must be at least 6 characters long'})
+    organization = Trimmed(validate=Length(min=2, error='Organization name must be at least 2 characters long'))
+    invite = Trimmed()
+
+    invariants = (
+        (lambda values: not ('organization' in values and 'invite' in values),
+         'Provide either organization or invite, not both'),
+    )
+
+
+class LoginSchema(RequestSchema):
+    email = Trimmed(required=True, lower=True, error_messages={'required': 'Email and password are required'})
+    password = fields.String(required=True, validate=Length(min=1, error='Email and password are required'),
+                             error_messages={'required': 'Email and password are required'})
+
+
+class LogoutSchema(RequestSchema):
+    empty_message = None
+
+    refresh_token = Trimmed()
+
+
+register_payload = compile_schema(RegisterSchema)
+login_payload = compile_schema(LoginSchema)
+logout_payload = compile_schema(LogoutSchema)
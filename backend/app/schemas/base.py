@@ -0,0 +1,301 @@
+"""
+Request schemas and the compiler that turns them into fast validators.
+
+Payloads are declared as marshmallow schemas (``RequestSchema``
+subclasses), which keeps them readable and lets them run through
+``Schema().load`` unchanged. Routes don't use marshmallow's load path,
+though: ``compile_schema`` walks each schema's fields once at import and
+builds a flat tuple of ``(key, name, coerce, checks, ...)`` steps, so
+validating a request is one loop over the payload with no per-field
+dispatch, hook lookups or error-dict plumbing.
+
+Both paths accept and reject the same payloads with the same messages:
+
+- null values and, for ``Trimmed`` fields, blank strings count as missing
+- the first field error, in declaration order, is the response message
+- schema ``invariants`` run only once every field is valid
+"""
+
+from datetime import datetime
+from marshmallow import EXCLUDE, Schema, ValidationError as FieldError, fields, missing, pre_load, validates_schema
+from marshmallow.validate import Length, OneOf
+
+SCHEMA_KEY = '_schema'
+
+
+class ValidationError(ValueError):
+    """Raised by a compiled schema; ``errors`` maps field names to messages."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+    @property
+    def message(self):
+        return next(iter(self.errors.values()))[0]
+
+    def to_dict(self):
+        return {'message': self.message, 'errors': self.errors}
+
+
+class _Invalid(Exception):
+    """Cheap field error for compiled coercers; carries one message."""
+
+
+class Trimmed(fields.String):
+    """A string with surrounding whitespace removed; blank counts as missing."""
+
+    def __init__(self, *, lower=False, blank_is_missing=True, **kwargs):
+        super().__init__(**kwargs)
+        self.lower = lower
+        self.blank_is_missing = blank_is_missing
+
+    def deserialize(self, value, attr=None, data=None, **kwargs):
+        if self.blank_is_missing and isinstance(value, str) and not value.strip():
+            value = missing
+        return super().deserialize(value, attr, data, **kwargs)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        value = super()._deserialize(value, attr, data, **kwargs).strip()
+        return value.lower() if self.lower else value
+
+
+class IsoDateTime(fields.Field):
+    """A naive or aware ``datetime`` parsed with ``datetime.fromisoformat``."""
+
+    default_error_messages = {'invalid': 'Invalid datetime format. Use ISO format: YYYY-MM-DDTHH:MM:SS'}
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise self.make_error('invalid')
+
+
+class EnumName(fields.Field):
+    """An enum member given by name, optionally limited to ``choices``."""
+
+    default_error_messages = {'invalid': 'Invalid value.'}
+
+    def __init__(self, enum, *, choices=None, **kwargs):
+        super().__init__(**kwargs)
+        self.enum = enum
+        self.choices = tuple(choices or enum)
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        member = self.enum.__members__.get(value) if isinstance(value, str) else None
+        if member not in self.choices:
+            raise self.make_error('invalid', input=value)
+        return member
+
+
+class RequestSchema(Schema):
+    """
+    Base for request payloads.
+
+    Attributes:
+        empty_message: Error for a missing or non-object body, or None to
+            accept an empty body
+        invariants: ``(check, message)`` pairs over the loaded values, run
+            after the fields validate
+    """
+
+    class Meta:
+        unknown = EXCLUDE
+
+    empty_message = 'No data provided'
+    invariants = ()
+
+    @pre_load
+    def _drop_nulls(self, data, **kwargs):
+        return {key: value for key, value in data.items() if value is not None}
+
+    @validates_schema
+    def _check_invariants(self, data, **kwargs):
+        for check, message in self.invariants:
+            if not check(data):
+                raise FieldError(message)
+
+
+def ends_after_start(values):
+    """Invariant: ``end_time`` is after ``start_time`` when both are given."""
+    start, end = values.get('start_time'), values.get('end_time')
+    return start is None or end is None or start < end
+
+
+def _coerce_string(field):
+    invalid = field.error_messages['invalid']
+
+    def coerce(value):
+        if not isinstance(value, str):
+            raise _Invalid(invalid)
+        return value
+    return coerce
+
+
+def _coerce_trimmed(field):
+    invalid, lower = field.error_messages['invalid'], field.lower
+
+    def coerce(value):
+        if not isinstance(value, str):
+            raise _Invalid(invalid)
+        value = value.strip()
+        return value.lower() if lower else value
+    return coerce
+
+
+def _coerce_datetime(field):
+    invalid, parse = field.error_messages['invalid'], datetime.fromisoformat
+
+    def coerce(value):
+        try:
+            return parse(value)
+        except (TypeError, ValueError):
+            raise _Invalid(invalid)
+    return coerce
+
+
+def _coerce_enum(field):
+    members = {member.name: member for member in field.choices}
+    invalid = field.error_messages['invalid']
+
+    def coerce(value):
+        member = members.get(value) if isinstance(value, str) else None
+        if member is None:
+            raise _Invalid(invalid.format(input=value))
+        return member
+    return coerce
+
+
+def _coerce_list(field):
+    item, checks = _coercer(field.inner), tuple(_check(validator) for validator in field.inner.validators)
+    invalid = field.error_messages['invalid']
+
+    def coerce(value):
+        if not isinstance(value, list):
+            raise _Invalid(invalid)
+        items = []
+        for entry in value:
+            entry = item(entry)
+            for check in checks:
+                check(entry)
+            items.append(entry)
+        return items
+    return coerce
+
+
+# Most specific class first: Trimmed is a String.
+COERCERS = (
+    (Trimmed, _coerce_trimmed),
+    (fields.String, _coerce_string),
+    (IsoDateTime, _coerce_datetime),
+    (EnumName, _coerce_enum),
+    (fields.List, _coerce_list),
+)
+
+
+def _coercer(field):
+    for field_class, build in COERCERS:
+        if isinstance(field, field_class):
+            return build(field)
+    return lambda value: field._deserialize(value, None, None)
+
+
+def _check(validator):
+    """
+    A fast equivalent of a field validator, or the validator itself.
+
+    Length and OneOf checks are inlined; on failure they defer to the
+    validator so the message is marshmallow's.
+    """
+    if isinstance(validator, Length) and validator.equal is None:
+        low = validator.min if validator.min is not None else 0
+        high = validator.max if validator.max is not None else float('inf')
+
+        def length(value):
+            if not low <= len(value) <= high:
+                validator(value)
+        return length
+    if isinstance(validator, OneOf):
+        choices = frozenset(validator.choices)
+
+        def one_of(value):
+            if value not in choices:
+                validator(value)
+        return one_of
+    return validator
+
+
+class CompiledSchema:
+    """
+    A ``RequestSchema`` reduced to one pass over the payload.
+
+    ``load`` returns a dict of coerced values keyed by field name; optional
+    fields that are missing are left out unless they have a
+    ``load_default``. Raises ``ValidationError`` with every field error.
+    """
+
+    def __init__(self, schema_class):
+        self.schema_class = schema_class
+        self.empty_message = schema_class.empty_message
+        self.invariants = tuple(schema_class.invariants)
+        steps = []
+        for name, field in schema_class._declared_fields.items():
+            if field.dump_only:
+                continue
+            steps.append((
+                field.data_key or name,
+                name,
+                _coercer(field),
+                tuple(_check(validator) for validator in field.validators),
+                field.required,
+                field.error_messages['required'],
+                field.load_default,
+                isinstance(field, Trimmed) and field.blank_is_missing,
+            ))
+        self.steps = tuple(steps)
+
+    def load(self, data):
+        if not data or not isinstance(data, dict):
+            if self.empty_message is not None:
+                raise ValidationError({SCHEMA_KEY: [self.empty_message]})
+            data = {}
+
+        values, errors = {}, None
+        for key, name, coerce, checks, required, required_message, default, blank_is_missing in self.steps:
+            value = data.get(key)
+            if value is not None:
+                try:
+                    value = coerce(value)
+                    if blank_is_missing and not value:
+                        value = None
+                    else:
+                        for check in checks:
+                            check(value)
+                except _Invalid as e:
+                    errors = errors or {}
+                    errors[key] = [e.args[0]]
+                    continue
+                except FieldError as e:
+                    errors = errors or {}
+                    errors[key] = e.messages if isinstance(e.messages, list) else [str(e.messages)]
+                    continue
+            if value is not None:
+                values[name] = value
+            elif required:
+                errors = errors or {}
+                errors[key] = [required_message]
+            elif default is not missing:
+                values[name] = default() if callable(default) else default
+
+        if errors:
+            raise ValidationError(errors)
+        for check, message in self.invariants:
+            if not check(values):
+                raise ValidationError({SCHEMA_KEY: [message]})
+        return values
+
+
+def compile_schema(schema_class):
+    """Compile ``schema_class`` into a ``CompiledSchema``."""
+    return CompiledSchema(schema_class)
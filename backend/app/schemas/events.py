@@ -0,0 +1,45 @@
+"""
+Event and recurring series payloads.
+"""
+
+from marshmallow.validate import Length
+from app.models import EventStatus
+from app.schemas.base import RequestSchema, Trimmed, IsoDateTime, EnumName, compile_schema, ends_after_start
+
+END_AFTER_START = 'End time must be after start time'
+
+
+class EventSchema(RequestSchema):
+    title = Trimmed(required=True, error_messages={'required': 'Title is required'})
+    start_time = IsoDateTime(required=True, error_messages={'required': 'Start and end times are required'})
+    end_time = IsoDateTime(required=True, error_messages={'required': 'Start and end times are required'})
+    status = EnumName(EventStatus, load_default=EventStatus.BUSY, error_messages={
+        'invalid': f'Invalid status. Must be one of: {", ".join(status.value for status in EventStatus)}'})
+
+    invariants = ((ends_after_start, END_AFTER_START),)
+
+
+class EventUpdateSchema(RequestSchema):
+    """Partial update: only the fields present are validated and returned."""
+
+    title = Trimmed(blank_is_missing=False, validate=Length(min=1, error='Title cannot be empty'))
+    start_time = IsoDateTime(error_messages={'invalid': 'Invalid start_time format'})
+    end_time = IsoDateTime(error_messages={'invalid': 'Invalid end_time format'})
+    status = EnumName(EventStatus, error_messages={'invalid': 'Invalid status: {input}'})
+
+
+class SeriesSchema(RequestSchema):
+    title = Trimmed(required=True, error_messages={'required': 'Title is required'})
+    start_time = IsoDateTime(required=True, error_messages={'required': 'Start time, end time and rrule are required'})
+    end_time = IsoDateTime(required=True, error_messages={'required': 'Start time, end time and rrule are required'})
+    rrule = Trimmed(required=True, error_messages={'required': 'Start time, end time and rrule are required'})
+    status = EnumName(EventStatus, choices=(EventStatus.BUSY, EventStatus.SWAPPABLE),
+                      load_default=EventStatus.SWAPPABLE,
+                      error_messages={'invalid': 'Invalid status. Must be one of: BUSY, SWAPPABLE'})
+
+    invariants = ((ends_after_start, END_AFTER_START),)
+
+
+event_payload = compile_schema(EventSchema)
+event_update_payload = compile_schema(EventUpdateSchema)
+series_payload = compile_schema(SeriesSchema)
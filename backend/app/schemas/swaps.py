@@ -0,0 +1,34 @@
+"""
+Swap request payloads.
+"""
+
+from marshmallow import fields
+from marshmallow.validate import Length
+from app.models.swap_request import MAX_BUNDLE_SLOTS
+from app.schemas.base import RequestSchema, Trimmed, compile_schema
+
+BUNDLE_SIZE = f'Each side of a bundle needs 1 to {MAX_BUNDLE_SLOTS} slots'
+
+
+def _slot_ids(**kwargs):
+    return fields.List(Trimmed(blank_is_missing=False, validate=Length(min=1, error='Slot ids must not be empty')),
+                       required=True, validate=Length(min=1, max=MAX_BUNDLE_SLOTS, error=BUNDLE_SIZE),
+                       error_messages={'required': BUNDLE_SIZE, 'invalid': 'Slot ids must be a list'}, **kwargs)
+
+
+class SwapRequestSchema(RequestSchema):
+    requestee_id = Trimmed(required=True, error_messages={'required': 'Required fields missing'})
+    my_event_id = Trimmed(required=True, error_messages={'required': 'Required fields missing'})
+    requestee_event_id = Trimmed(required=True, error_messages={'required': 'Required fields missing'})
+    message = fields.String()
+
+
+class BundleRequestSchema(RequestSchema):
+    requestee_id = Trimmed(required=True, error_messages={'required': 'Required fields missing'})
+    my_event_ids = _slot_ids()
+    requestee_event_ids = _slot_ids()
+    message = fields.String()
+
+
+swap_request_payload = compile_schema(SwapRequestSchema)
+bundle_request_payload = compile_schema(BundleRequestSchema)
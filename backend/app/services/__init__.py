@@ -0,0 +1 @@
+"""Services package: domain logic shared by routes and CLI jobs."""
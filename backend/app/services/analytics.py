@@ -0,0 +1,203 @@
+"""
+Incrementally maintained swap-market rollups.
+
+``roll_up`` reads the swap transition log past a high-water mark (a
+``change_counters`` row per partition) and adds what it finds to two
+small tables:
+
+- ``swap_daily_stats``: swaps created, accepted, rejected and expired per
+  day, plus acceptance latency (sum, samples, max)
+- ``swap_demand_hourly``: requests per day by the UTC hour the requested
+  slot starts
+
+Each batch and its new mark commit together, so a crashed or concurrent
+run never counts a row twice: the mark row is locked for the batch.
+Acceptance latency joins the swap (hot or archived) by primary key and
+the requested slot likewise, so the job reads only new log rows.
+Dashboards read at most a year of daily rows and 24 hourly buckets per
+day.
+
+Log rows are skipped until ANALYTICS_ROLLUP_LAG old: ids are taken at
+insert but rows become visible at commit, so a lower id can appear after
+a higher one. ``transitions.compact`` never folds rows past the mark.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import (
+    ArchivedEvent, ArchivedSwapRequest, ChangeCounter, Event, SwapDailyStats, SwapDemandHourly,
+    SwapRequest, SwapTransition,
+)
+from app.models.transition import SWAP_CREATED, SWAP_ACCEPTED, SWAP_REJECTED, SWAP_EXPIRED
+from app.services import tenancy
+from app.utils.metrics import metrics
+from app.utils.scheduler import PeriodicTask
+
+log = SwapTransition.__table__
+daily = SwapDailyStats.__table__
+demand = SwapDemandHourly.__table__
+
+COUNT_COLUMNS = {SWAP_CREATED: 'created', SWAP_ACCEPTED: 'accepted', SWAP_REJECTED: 'rejected',
+                 SWAP_EXPIRED: 'expired'}
+MARK = 'swap_analytics'
+
+
+def _mark_name():
+    """The high-water mark of the current partition (see tenancy.each_partition)."""
+    org_id = tenancy.current_org_id()
+    return MARK if org_id is None else f'{MARK}:{org_id}'
+
+
+def rolled_up_to():
+    """Last log id rolled up in the current partition, or None if the job never ran."""
+    return db.session.execute(select(ChangeCounter.value).where(ChangeCounter.name == _mark_name())).scalar()
+
+
+def _lock_mark(name):
+    mark = db.session.execute(
+        select(ChangeCounter.value).where(ChangeCounter.name == name).with_for_update()
+    ).scalar()
+    if mark is not None:
+        return mark
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(ChangeCounter).values(name=name, value=0))
+    except IntegrityError:
+        # Another run created the mark first.
+        return _lock_mark(name)
+    return 0
+
+
+def _add(table, keys, counts, maxima=None):
+    """Add ``counts`` to (and raise ``maxima`` on) the row at ``keys``, creating it if needed."""
+    maxima = maxima or {}
+    where = [table.c[name] == value for name, value in keys.items()]
+    values = {name: table.c[name] + count for name, count in counts.items()}
+    values.update({name: case((table.c[name] < value, value), else_=table.c[name])
+                   for name, value in maxima.items()})
+    if db.session.execute(update(table).where(*where).values(**values)).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(table).values(**keys, **counts, **maxima))
+    except IntegrityError:
+        db.session.execute(update(table).where(*where).values(**values))
+
+
+def _new_rows(mark, settled_before, batch_size):
+    swaps, archived_swaps = SwapRequest.__table__, ArchivedSwapRequest.__table__
+    events, archived_events = Event.__table__, ArchivedEvent.__table__
+    return db.session.execute(
+        select(log.c.id, log.c.org_id, log.c.kind, log.c.created_at,
+               func.coalesce(swaps.c.created_at, archived_swaps.c.created_at).label('swap_created_at'),
+               func.coalesce(events.c.start_time, archived_events.c.start_time).label('slot_start'))
+        .select_from(
+            log.outerjoin(swaps, swaps.c.id == log.c.swap_id)
+            .outerjoin(archived_swaps, archived_swaps.c.id == log.c.swap_id)
+            .outerjoin(events, events.c.id == log.c.other_slot_id)
+            .outerjoin(archived_events, archived_events.c.id == log.c.other_slot_id)
+        )
+        .where(log.c.id > mark, log.c.created_at < settled_before)
+        .order_by(log.c.id)
+        .limit(batch_size)
+    ).all()
+
+
+def roll_up_batch(now=None, batch_size=None):
+    """
+    Fold the next batch of settled log rows into the rollups and advance
+    the mark, in one transaction.
+
+    Returns:
+        int: Log rows consumed (including ones that count toward nothing)
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size = batch_size or config['ANALYTICS_ROLLUP_BATCH_SIZE']
+    name = _mark_name()
+    rows = _new_rows(_lock_mark(name), now - config['ANALYTICS_ROLLUP_LAG'], batch_size)
+    if not rows:
+        db.session.commit()
+        return 0
+
+    counts = defaultdict(Counter)
+    latency_max = {}
+    hours = Counter()
+    for row in rows:
+        column = COUNT_COLUMNS.get(row.kind)
+        if column is None:
+            continue
+        key = (row.org_id, row.created_at.date())
+        counts[key][column] += 1
+        if row.kind == SWAP_ACCEPTED and row.swap_created_at is not None:
+            latency = max(int((row.created_at - row.swap_created_at).total_seconds()), 0)
+            counts[key]['latency_samples'] += 1
+            counts[key]['latency_total_seconds'] += latency
+            latency_max[key] = max(latency_max.get(key, 0), latency)
+        elif row.kind == SWAP_CREATED and row.slot_start is not None:
+            hours[key + (row.slot_start.hour,)] += 1
+
+    for (org_id, day), values in sorted(counts.items()):
+        maxima = {'latency_max_seconds': latency_max[(org_id, day)]} if (org_id, day) in latency_max else None
+        _add(daily, {'org_id': org_id, 'day': day}, dict(values), maxima)
+    for (org_id, day, hour), count in sorted(hours.items()):
+        _add(demand, {'org_id': org_id, 'day': day, 'hour': hour}, {'requests': count})
+    db.session.execute(update(ChangeCounter).where(ChangeCounter.name == name).values(value=rows[-1].id))
+    db.session.commit()
+    metrics.incr('analytics.rolled_up', len(rows))
+    return len(rows)
+
+
+def roll_up(now=None, batch_size=None, max_batches=None):
+    """
+    Consume settled log rows until caught up or ``max_batches`` ran.
+
+    Returns:
+        int: Log rows consumed
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config['ANALYTICS_ROLLUP_BATCH_SIZE']
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        consumed = roll_up_batch(now, batch_size)
+        total += consumed
+        batches += 1
+        if consumed < batch_size:
+            break
+    return total
+
+
+def summary(start, end, top_hours=5):
+    """
+    Daily stats for ``start`` <= day <= ``end`` in the active organization,
+    and the most-requested start hours over that range.
+    """
+    days = (
+        SwapDailyStats.query
+        .filter(SwapDailyStats.day >= start, SwapDailyStats.day <= end)
+        .order_by(SwapDailyStats.day)
+        .all()
+    )
+    requests = func.sum(SwapDemandHourly.requests)
+    hours = (
+        db.session.query(SwapDemandHourly.hour, requests)
+        .filter(SwapDemandHourly.day >= start, SwapDemandHourly.day <= end)
+        .group_by(SwapDemandHourly.hour)
+        .order_by(requests.desc(), SwapDemandHourly.hour)
+        .limit(top_hours)
+        .all()
+    )
+    return days, [{'hour': hour, 'requests': int(count)} for hour, count in hours]
+
+
+def start_background(app):
+    """Roll up new log rows every ANALYTICS_ROLLUP_INTERVAL seconds (0 disables)."""
+    interval = app.config['ANALYTICS_ROLLUP_INTERVAL']
+    if interval:
+        app.extensions['analytics_rollup'] = PeriodicTask(
+            app, 'analytics-rollup', interval, lambda: tenancy.each_partition(roll_up)).start()
+        return app.extensions['analytics_rollup']
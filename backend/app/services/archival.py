@@ -0,0 +1,159 @@
+"""
+Hot/cold archival of past events and resolved swaps.
+
+The mover runs in many small transactions: each batch selects a bounded set
+of ids, copies them into the archive table and deletes them from the hot
+table, then commits. Locks are therefore held for one batch at a time and
+concurrent writers are never blocked for long.
+"""
+
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, exists, insert, literal, or_, select
+from app.extensions import db
+from app.models import (
+    Event, SwapRequest, SwapBundleSlot, RESOLVED_SWAP_STATUSES, ArchivedEvent, ArchivedSwapRequest,
+    ArchivedSwapBundleSlot,
+)
+from app.services import changes, entity_cache, marketplace
+
+EVENT_COLUMNS = ('id', 'org_id', 'user_id', 'title', 'start_time', 'end_time', 'status', 'created_at', 'updated_at')
+SWAP_COLUMNS = ('id', 'org_id', 'requester_id', 'requestee_id', 'requester_slot_id', 'requestee_slot_id',
+                'status', 'message', 'expires_at', 'created_at', 'updated_at', 'bundle_size')
+BUNDLE_SLOT_COLUMNS = ('swap_id', 'event_id', 'org_id', 'side', 'position')
+
+
+def _move_batch(source, target, columns, id_query, on_delete=None):
+    """
+    Copy one batch of rows into ``target`` and delete them from ``source``.
+
+    ``id_query`` rows start with the id; ``on_delete`` receives the rows
+    before the delete, in the same transaction.
+    """
+    rows = id_query.with_for_update(skip_locked=True).all()
+    ids = [row[0] for row in rows]
+    if not ids:
+        db.session.rollback()
+        return 0
+
+    archived_at = datetime.utcnow()
+    source_columns = [getattr(source, name) for name in columns]
+    db.session.execute(
+        insert(target).from_select(
+            list(columns) + ['archived_at'],
+            select(*source_columns, literal(archived_at, db.DateTime)).where(source.id.in_(ids)),
+        )
+    )
+    if on_delete is not None:
+        on_delete(rows)
+    db.session.query(source).filter(source.id.in_(ids)).delete(synchronize_session=False)
+    entity_cache.invalidate_on_commit(entity_cache.KIND_BY_MODEL[source], ids)
+    db.session.commit()
+    return len(ids)
+
+
+def archive_swaps(cutoff, batch_size):
+    """Move one batch of swaps resolved before ``cutoff``. Returns rows moved."""
+    id_query = (
+        db.session.query(SwapRequest.id)
+        .filter(SwapRequest.status.in_(RESOLVED_SWAP_STATUSES), SwapRequest.updated_at < cutoff)
+        .order_by(SwapRequest.updated_at)
+        .limit(batch_size)
+    )
+    return _move_batch(SwapRequest, ArchivedSwapRequest, SWAP_COLUMNS, id_query, on_delete=_swaps_deleted)
+
+
+def _swaps_deleted(rows):
+    # Bundle slots move with their swap. They are deleted explicitly too:
+    # SQLite without foreign_keys would not cascade, and orphans would pin
+    # their events in hot storage forever.
+    ids = [row[0] for row in rows]
+    in_batch = SwapBundleSlot.swap_id.in_(ids)
+    db.session.execute(insert(ArchivedSwapBundleSlot).from_select(
+        BUNDLE_SLOT_COLUMNS, select(*(getattr(SwapBundleSlot, name) for name in BUNDLE_SLOT_COLUMNS)).where(in_batch)))
+    db.session.execute(delete(SwapBundleSlot).where(in_batch))
+
+
+def archive_events(cutoff, batch_size):
+    """
+    Move one batch of events that ended before ``cutoff``.
+
+    Events still referenced by a hot swap are skipped; deleting them would
+    cascade into the swap, or leave a bundle short of a slot. Syncing
+    clients see archived events as tombstones.
+    """
+    referenced = exists().where(or_(
+        SwapRequest.requester_slot_id == Event.id,
+        SwapRequest.requestee_slot_id == Event.id,
+    )) | exists().where(SwapBundleSlot.event_id == Event.id)
+    id_query = (
+        db.session.query(Event.id, Event.user_id, Event.org_id)
+        .filter(Event.end_time < cutoff, ~referenced)
+        .order_by(Event.end_time)
+        .limit(batch_size)
+    )
+    return _move_batch(Event, ArchivedEvent, EVENT_COLUMNS, id_query, on_delete=_events_deleted)
+
+
+def _events_deleted(rows):
+    changes.record_bulk_deletes(rows)
+    marketplace.remove([row[0] for row in rows])
+
+
+def run(batch_size=None, max_batches=None, pause=0.0, now=None):
+    """
+    Archive everything past the configured retention windows.
+
+    Swaps are moved first so that the events they pinned become eligible in
+    the same run.
+
+    Args:
+        batch_size (int): Rows per transaction (default ARCHIVE_BATCH_SIZE)
+        max_batches (int): Stop after this many batches per table, if set
+        pause (float): Seconds to sleep between batches to yield to traffic
+        now (datetime): Reference time, for tests
+
+    Returns:
+        dict: Rows moved per table
+    """
+    config = current_app.config
+    batch_size = batch_size or config['ARCHIVE_BATCH_SIZE']
+    now = now or datetime.utcnow()
+
+    jobs = (
+        ('swap_requests', archive_swaps, now - config['ARCHIVE_SWAPS_AFTER']),
+        ('events', archive_events, now - config['ARCHIVE_EVENTS_AFTER']),
+    )
+    moved = {}
+    for table, mover, cutoff in jobs:
+        moved[table] = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = mover(cutoff, batch_size)
+            if not count:
+                break
+            moved[table] += count
+            batches += 1
+            if pause:
+                time.sleep(pause)
+    return moved
+
+
+def get_event(event_id):
+    """Look up an event in hot storage, falling back to the archive."""
+    return db.session.get(Event, event_id) or db.session.get(ArchivedEvent, event_id)
+
+
+def load_slots(swaps):
+    """
+    Resolve the slots of archived swaps with two IN queries.
+
+    Returns:
+        dict: Event id to hot or archived event
+    """
+    ids = {swap.requester_slot_id for swap in swaps} | {swap.requestee_slot_id for swap in swaps}
+    if not ids:
+        return {}
+    slots = {event.id: event for event in ArchivedEvent.query.filter(ArchivedEvent.id.in_(ids))}
+    slots.update((event.id, event) for event in Event.query.filter(Event.id.in_(ids)))
+    return slots
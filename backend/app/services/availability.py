@@ -0,0 +1,110 @@
+"""
+Free/busy computation for groups of users.
+
+Busy intervals are projected onto a grid of ``granularity``-sized slots; a
+slot is free only if no interval overlaps it. The NumPy path builds the
+busy mask with a difference array and finds free runs with vectorized edge
+detection. Without NumPy the same result is produced by a sort-and-sweep
+over the intervals.
+"""
+
+from datetime import timedelta
+from app.extensions import db
+from app.models import Event
+from app.services import recurrence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is absent
+    np = None
+
+
+def load_busy_intervals(user_ids, start, end):
+    """
+    Fetch (start_time, end_time) pairs overlapping the window.
+
+    Stored events come from one query served by the (user_id, start_time)
+    index on events; occurrences of the users' recurring series are
+    expanded inside the window.
+    """
+    intervals = db.session.query(Event.start_time, Event.end_time).filter(
+        Event.user_id.in_(user_ids),
+        Event.start_time < end,
+        Event.end_time > start,
+    ).all()
+    intervals.extend((occurrence.start_time, occurrence.end_time)
+                     for occurrence in recurrence.occurrences(start, end, user_ids=user_ids))
+    return intervals
+
+
+def _to_offsets(intervals, start):
+    """Convert datetimes to integer seconds relative to the window start."""
+    return [
+        (int((s - start).total_seconds()), int((e - start).total_seconds()))
+        for s, e in intervals
+    ]
+
+
+def free_runs_numpy(offsets, n_slots, step):
+    """Free slot runs as ``[first, last)`` index pairs, vectorized."""
+    if not offsets:
+        return [(0, n_slots)] if n_slots else []
+    bounds = np.asarray(offsets, dtype=np.int64)
+    first = np.clip(bounds[:, 0] // step, 0, n_slots)
+    last = np.clip(-(-bounds[:, 1] // step), 0, n_slots)
+
+    diff = np.bincount(first, minlength=n_slots + 1) - np.bincount(last, minlength=n_slots + 1)
+    free = np.cumsum(diff[:n_slots]) == 0
+
+    padded = np.concatenate(([False], free, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return [(int(a), int(b)) for a, b in edges.reshape(-1, 2)]
+
+
+def free_runs_python(offsets, n_slots, step):
+    """Free slot runs as ``[first, last)`` index pairs, pure Python."""
+    runs = []
+    cursor = 0
+    for s, e in sorted(offsets):
+        first = min(max(s // step, 0), n_slots)
+        last = min(max(-(-e // step), 0), n_slots)
+        if first > cursor:
+            runs.append((cursor, first))
+        cursor = max(cursor, last)
+    if cursor < n_slots:
+        runs.append((cursor, n_slots))
+    return runs
+
+
+def free_windows(intervals, start, end, granularity, min_duration=None, use_numpy=None):
+    """
+    Compute the free windows between ``start`` and ``end``.
+
+    Args:
+        intervals: Iterable of (start_time, end_time) busy pairs
+        start (datetime): Window start, also the grid origin
+        end (datetime): Window end; a trailing partial slot is dropped
+        granularity (timedelta): Slot size
+        min_duration (timedelta): Drop free windows shorter than this
+        use_numpy (bool): Force a path; defaults to NumPy when installed
+
+    Returns:
+        list: (window_start, window_end) datetime pairs
+    """
+    step = int(granularity.total_seconds())
+    n_slots = int((end - start).total_seconds()) // step
+
+    # datetime -> offset conversion stays in Python: NumPy's datetime64
+    # parsing of Python objects is several times slower.
+    offsets = _to_offsets(intervals, start)
+
+    if use_numpy is None:
+        use_numpy = np is not None
+    runs = (free_runs_numpy if use_numpy else free_runs_python)(offsets, n_slots, step)
+
+    min_slots = -(-int(min_duration.total_seconds()) // step) if min_duration else 1
+    return [
+        (start + timedelta(seconds=a * step), start + timedelta(seconds=b * step))
+        for a, b in runs
+        if b - a >= min_slots
+    ]
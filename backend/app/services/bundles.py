@@ -0,0 +1,148 @@
+"""
+Bundle swaps: N requester slots traded for M requestee slots at once.
+
+A bundle is a ``SwapRequest`` with ``bundle_size`` set and one
+``SwapBundleSlot`` row per slot, so expiry, counters, the transition log and
+listings treat it like any other swap. Only acceptance differs: every slot
+changes hands in one transaction, or none does.
+
+Creating and accepting both load the slots with one query that locks them
+in primary-key order (``SELECT ... ORDER BY id FOR UPDATE``). Two bundles
+sharing slots therefore always lock in the same order and cannot
+deadlock. Ownership and status are then checked against those rows in
+memory. SQLite ignores FOR UPDATE; its single writer serializes these
+transactions anyway.
+"""
+
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db
+from app.models import Event, EventStatus, SwapRequest, SwapStatus, SwapBundleSlot
+from app.models.swap_request import REQUESTER_SIDE, REQUESTEE_SIDE
+from app.services import recurrence, swap_counters, transitions
+
+
+class InvalidBundle(ValueError):
+    """The requested bundle cannot be created."""
+
+
+class BundleConflict(ValueError):
+    """A pending bundle's slots changed owner or status since it was requested."""
+
+
+def _lock_events(ids):
+    """Events ``ids``, locked in id order."""
+    return db.session.execute(
+        select(Event).where(Event.id.in_(ids)).order_by(Event.id)
+        .with_for_update().execution_options(populate_existing=True)
+    ).scalars().all()
+
+
+def _stored_ids(ids, owner_id):
+    """Ids with occurrences of recurring series materialized into stored events."""
+    stored = []
+    for event_id in ids:
+        if recurrence.parse_occurrence_id(event_id) is None:
+            stored.append(event_id)
+            continue
+        occurrence = recurrence.get_event(event_id)
+        if occurrence is None or occurrence.user_id != owner_id:
+            raise InvalidBundle(f'Slot {event_id} not found or not owned')
+        stored.append(recurrence.materialize(occurrence).id)
+    return stored
+
+
+def _check(events, owners):
+    """The first slot in ``owners`` (id -> owner) that is missing, not owned or BUSY, as a message."""
+    found = {event.id: event for event in events}
+    for event_id, owner_id in owners.items():
+        event = found.get(event_id)
+        if event is None or event.user_id != owner_id:
+            return f'Slot {event_id} not found or not owned'
+        if event.status == EventStatus.BUSY:
+            return f'Slot {event_id} is not swappable'
+    return None
+
+
+def create(requester_id, requestee_id, my_event_ids, their_event_ids, message=None):
+    """
+    Create a PENDING bundle swap. Flushes, does not commit.
+
+    Raises:
+        InvalidBundle: Duplicate slots, or a slot missing, not owned by its
+            side or BUSY
+    """
+    if requestee_id == requester_id:
+        raise InvalidBundle('Cannot swap with yourself')
+    if len(set(my_event_ids) | set(their_event_ids)) != len(my_event_ids) + len(their_event_ids):
+        raise InvalidBundle('A slot may appear only once in a bundle')
+
+    my_event_ids = _stored_ids(my_event_ids, requester_id)
+    their_event_ids = _stored_ids(their_event_ids, requestee_id)
+    owners = dict.fromkeys(my_event_ids, requester_id)
+    owners.update(dict.fromkeys(their_event_ids, requestee_id))
+    problem = _check(_lock_events(list(owners)), owners)
+    if problem:
+        raise InvalidBundle(problem)
+
+    swap = SwapRequest(
+        requester_id=requester_id,
+        requestee_id=requestee_id,
+        requester_slot_id=my_event_ids[0],
+        requestee_slot_id=their_event_ids[0],
+        message=message,
+        expires_at=datetime.utcnow() + current_app.config['SWAP_REQUEST_TTL'],
+    )
+    swap.bundle_size = len(owners)
+    sides = [(REQUESTER_SIDE, event_id) for event_id in my_event_ids]
+    sides += [(REQUESTEE_SIDE, event_id) for event_id in their_event_ids]
+    swap.bundle_slots = [SwapBundleSlot(side=side, event_id=event_id, position=position)
+                         for position, (side, event_id) in enumerate(sides)]
+    db.session.add(swap)
+    db.session.flush()
+    swap_counters.record_created(swap)
+    transitions.record_swap(swap, actor_id=requester_id)
+    return swap
+
+
+def accept(swap, actor_id=None):
+    """
+    Trade every slot of a PENDING bundle. Flushes, does not commit.
+
+    The swap row is locked first, then the slots; one query locks them and
+    returns each with its side, which is checked to still belong to that
+    side's user and not be BUSY.
+
+    Raises:
+        BundleConflict: The swap is no longer PENDING, or a slot was
+            deleted, changed owner or became BUSY
+    """
+    pending = db.session.execute(
+        select(SwapRequest.id)
+        .where(SwapRequest.id == swap.id, SwapRequest.status == SwapStatus.PENDING)
+        .with_for_update()
+    ).first()
+    if pending is None:
+        raise BundleConflict('Swap is no longer pending')
+
+    rows = db.session.execute(
+        select(Event, SwapBundleSlot.side)
+        .join(SwapBundleSlot, SwapBundleSlot.event_id == Event.id)
+        .where(SwapBundleSlot.swap_id == swap.id)
+        .order_by(Event.id)
+        .with_for_update(of=Event)
+        .execution_options(populate_existing=True)
+    ).all()
+    owner_by_side = {REQUESTER_SIDE: swap.requester_id, REQUESTEE_SIDE: swap.requestee_id}
+    if len(rows) != swap.bundle_size or _check([event for event, _ in rows],
+                                                {event.id: owner_by_side[side] for event, side in rows}):
+        raise BundleConflict('Some slots in this bundle have changed since it was requested')
+
+    for event, side in rows:
+        new_owner_id = swap.requestee_id if side == REQUESTER_SIDE else swap.requester_id
+        transitions.record_owner_change(swap, event, new_owner_id, actor_id)
+        event.user_id = new_owner_id
+    swap.status = SwapStatus.ACCEPTED
+    swap_counters.record_resolved(swap, SwapStatus.ACCEPTED)
+    transitions.record_swap(swap, actor_id=actor_id)
@@ -0,0 +1,116 @@
+"""
+Ranking of swap candidates for a slot.
+
+Candidates are other users' upcoming SWAPPABLE slots starting near the
+source slot. The window query reads only the columns needed for scoring
+(served by ix_events_org_status_start, as requests are scoped to the
+user's organization); full rows are loaded for the top-k alone.
+"""
+
+import bisect
+import heapq
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.models import Event, EventStatus
+from app.services import recurrence
+
+# Score weights: proximity and duration similarity are in [0, 1].
+PROXIMITY_WEIGHT = 0.6
+DURATION_WEIGHT = 0.4
+CONFLICT_PENALTY = 1.0
+
+
+class BusyIndex:
+    """Sorted busy intervals supporting overlap checks by bisection."""
+
+    def __init__(self, intervals):
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def overlaps(self, start, end):
+        i = bisect.bisect_left(self.starts, end) - 1
+        return i >= 0 and self.ends[i] > start
+
+
+def score(source_start, source_minutes, start, end, conflicts, proximity_scale):
+    """
+    Score one candidate; higher is better.
+
+    Args:
+        proximity_scale (float): Hours of start-time distance that halve the
+            proximity component
+    """
+    hours_apart = abs((start - source_start).total_seconds()) / 3600
+    proximity = 1 / (1 + hours_apart / proximity_scale)
+    minutes = (end - start).total_seconds() / 60
+    duration = min(minutes, source_minutes) / max(minutes, source_minutes) if minutes and source_minutes else 0
+    return PROXIMITY_WEIGHT * proximity + DURATION_WEIGHT * duration - CONFLICT_PENALTY * conflicts
+
+
+def rank(source, k, now=None):
+    """
+    Return the top ``k`` candidates for ``source`` as (score, conflicts, event).
+
+    Args:
+        source (Event): Slot the requester wants to trade away
+        k (int): Number of candidates
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    window = config['CANDIDATE_WINDOW']
+    low = max(source.start_time - window, now)
+    high = source.start_time + window
+
+    # Scan outward from the source start in both directions so the scan cap
+    # drops the farthest slots, never the nearest.
+    half = config['CANDIDATE_SCAN_LIMIT'] // 2
+    base = db.session.query(Event.id, Event.start_time, Event.end_time).filter(
+        Event.status == EventStatus.SWAPPABLE,
+        Event.user_id != source.user_id,
+    )
+    rows = (
+        base.filter(Event.start_time >= max(source.start_time, low), Event.start_time <= high)
+        .order_by(Event.start_time.asc()).limit(half).all()
+        + base.filter(Event.start_time >= low, Event.start_time < source.start_time)
+        .order_by(Event.start_time.desc()).limit(half).all()
+    )
+    if not rows:
+        return []
+
+    # The source slot is given away by the swap, so it is not a conflict.
+    lo, hi = min(row.start_time for row in rows), max(row.end_time for row in rows)
+    mine = (
+        db.session.query(Event.start_time, Event.end_time)
+        .filter(
+            Event.user_id == source.user_id,
+            Event.id != source.id,
+            Event.start_time < hi,
+            Event.end_time > lo,
+        )
+        .all()
+    )
+    mine.extend((occurrence.start_time, occurrence.end_time)
+                for occurrence in recurrence.occurrences(lo, hi, user_ids=[source.user_id]))
+    busy = BusyIndex(mine)
+
+    source_minutes = source.duration_minutes
+    scale = config['CANDIDATE_PROXIMITY_HOURS']
+    scored = []
+    for row_id, start, end in rows:
+        conflicts = busy.overlaps(start, end)
+        scored.append((score(source.start_time, source_minutes, start, end, conflicts, scale), conflicts, row_id))
+    top = heapq.nlargest(k, scored, key=lambda item: item[0])
+
+    events = {
+        event.id: event
+        for event in Event.query.options(joinedload(Event.owner)).filter(Event.id.in_([t[2] for t in top]))
+    }
+    return [(s, conflicts, events[row_id]) for s, conflicts, row_id in top if row_id in events]
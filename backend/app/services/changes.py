@@ -0,0 +1,229 @@
+"""
+Monotonic change sequence for events, and the delta query built on it.
+
+Each organization has its own ``events:<org_id>`` change counter. Events
+inserted, updated or deleted in a transaction are collected as they are
+flushed; at commit, after the final flush, they take the next values of
+their organization's counter: changed rows store theirs in ``change_seq``
+and deleted rows leave an ``EventTombstone``.
+
+The counter row is the last lock a writing transaction takes and it is
+held only from that point until commit. Writers of one organization
+therefore commit in sequence order, so a reader that saw counter value V
+has seen every change <= V, while writers of different organizations never
+wait for each other. Taking it last also means a transaction holding the
+counter waits on no other row lock (its own event rows are already locked
+by the flush), so it cannot deadlock with handlers that lock rows ``FOR
+UPDATE`` (bundles.accept). A client polling with an up-to-date cursor costs
+a single primary-key read of the counter.
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from sqlalchemy import bindparam, event as sa_event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+from app.models import ChangeCounter, Event, EventTombstone, DEFAULT_ORG_ID
+from app.services import tenancy
+
+EVENTS = 'events'
+# Highest tombstone sequence pruned; older cursors must resync in full.
+TOMBSTONES_PRUNED = 'tombstones_pruned'
+
+# Key in ``session.info``: event id -> Change, for events written since the last commit.
+PENDING = 'event_changes'
+
+# ``event`` is the changed Event, or None for a deletion.
+Change = namedtuple('Change', 'event event_id user_id org_id')
+
+
+def counter_name(kind, org_id):
+    return f'{kind}:{org_id}'
+
+
+def allocate(connection, count, name):
+    """
+    Reserve ``count`` consecutive values of counter ``name``.
+
+    Runs on the given connection so it can be called while the session is
+    committing. Returns the first reserved value.
+    """
+    statement = (
+        update(ChangeCounter).where(ChangeCounter.name == name)
+        .values(value=ChangeCounter.value + count).returning(ChangeCounter.value)
+    )
+    last = connection.execute(statement).scalar()
+    if last is None:
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(ChangeCounter).values(name=name, value=count))
+            last = count
+        except IntegrityError:
+            # Another transaction created the counter first.
+            last = connection.execute(statement).scalar()
+    return last - count + 1
+
+
+def read_counters():
+    """Current org's events counter and tombstone prune horizon."""
+    org_id = tenancy.current_org_id() or DEFAULT_ORG_ID
+    names = {counter_name(EVENTS, org_id): 'head', counter_name(TOMBSTONES_PRUNED, org_id): 'pruned'}
+    rows = db.session.execute(
+        select(ChangeCounter.name, ChangeCounter.value).where(ChangeCounter.name.in_(names))
+    ).all()
+    values = {names[name]: value for name, value in rows}
+    return values.get('head', 0), values.get('pruned', 0)
+
+
+def current_cursor():
+    return read_counters()[0]
+
+
+def _pending(session):
+    return session.info.setdefault(PENDING, {})
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _collect_event_changes(session, flush_context):
+    # new/dirty/deleted still describe what was just flushed.
+    changed = [obj for obj in session.new if isinstance(obj, Event)]
+    changed += [obj for obj in session.dirty
+                if isinstance(obj, Event) and session.is_modified(obj, include_collections=False)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Event)]
+    if not changed and not deleted:
+        return
+    pending = _pending(session)
+    for obj in changed:
+        pending[obj.id] = Change(obj, obj.id, obj.user_id, obj.org_id)
+    for obj in deleted:
+        pending[obj.id] = Change(None, obj.id, obj.user_id, obj.org_id)
+
+
+@sa_event.listens_for(Session, 'before_commit')
+def _sequence_event_changes(session):
+    session.flush()
+    pending = session.info.pop(PENDING, None)
+    if not pending:
+        return
+
+    by_org = defaultdict(list)
+    for change in pending.values():
+        by_org[str(change.org_id)].append(change)
+    # Core statements on the connection, so nothing is left to flush.
+    connection = session.connection()
+    events = Event.__table__
+    now = datetime.utcnow()
+    for org_id in sorted(by_org):
+        org_changes = by_org[org_id]
+        seq = allocate(connection, len(org_changes), counter_name(EVENTS, org_id))
+        stamps, tombstones = [], []
+        for change in org_changes:
+            if change.event is None:
+                tombstones.append({'change_seq': seq, 'event_id': change.event_id, 'user_id': change.user_id,
+                                   'org_id': change.org_id, 'deleted_at': now})
+            else:
+                stamps.append({'event_key': change.event_id, 'change_seq': seq})
+                set_committed_value(change.event, 'change_seq', seq)
+            seq += 1
+        if stamps:
+            connection.execute(
+                update(events).where(events.c.id == bindparam('event_key'))
+                .values(change_seq=bindparam('change_seq')),
+                stamps,
+            )
+        if tombstones:
+            connection.execute(insert(EventTombstone.__table__), tombstones)
+
+
+@sa_event.listens_for(Session, 'after_transaction_end')
+def _forget_event_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(PENDING, None)
+
+
+def record_bulk_deletes(rows):
+    """
+    Tombstone events removed by bulk statements that bypass the ORM.
+
+    The tombstones are written when the caller's transaction commits.
+
+    Args:
+        rows: (event_id, user_id, org_id) tuples, in the caller's transaction
+    """
+    pending = _pending(db.session)
+    for event_id, user_id, org_id in rows:
+        pending[event_id] = Change(None, event_id, user_id, org_id)
+
+
+class CursorExpired(Exception):
+    """The cursor predates pruned tombstones; the client must resync in full."""
+
+
+def since(cursor, limit):
+    """
+    Event upserts and tombstones with ``cursor < change_seq``, oldest first.
+
+    Returns:
+        tuple: (events, tombstones, next_cursor, has_more)
+    """
+    head, pruned = read_counters()
+    if cursor < pruned:
+        raise CursorExpired()
+    if cursor >= head:
+        return [], [], head, False
+
+    events = (
+        Event.query.filter(Event.change_seq > cursor, Event.change_seq <= head)
+        .order_by(Event.change_seq).limit(limit + 1).all()
+    )
+    tombstones = (
+        EventTombstone.query
+        .filter(EventTombstone.change_seq > cursor, EventTombstone.change_seq <= head)
+        .order_by(EventTombstone.change_seq).limit(limit + 1).all()
+    )
+    merged = sorted(events + tombstones, key=lambda row: row.change_seq)
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    next_cursor = merged[-1].change_seq if has_more else head
+    return (
+        [row for row in merged if isinstance(row, Event)],
+        [row for row in merged if isinstance(row, EventTombstone)],
+        next_cursor,
+        has_more,
+    )
+
+
+def prune_tombstones(older_than, batch_size=1000):
+    """
+    Delete one batch of tombstones written before ``older_than`` and advance
+    each organization's prune horizon past them. Commits.
+
+    Returns:
+        int: Tombstones deleted
+    """
+    rows = db.session.execute(
+        select(EventTombstone.org_id, EventTombstone.change_seq).where(EventTombstone.deleted_at < older_than)
+        .order_by(EventTombstone.org_id, EventTombstone.change_seq).limit(batch_size)
+    ).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+    by_org = defaultdict(list)
+    for org_id, seq in rows:
+        by_org[org_id].append(seq)
+    for org_id, seqs in by_org.items():
+        EventTombstone.query.filter(
+            EventTombstone.org_id == org_id, EventTombstone.change_seq.in_(seqs)
+        ).delete(synchronize_session=False)
+        name, horizon = counter_name(TOMBSTONES_PRUNED, org_id), max(seqs)
+        result = db.session.execute(
+            update(ChangeCounter)
+            .where(ChangeCounter.name == name, ChangeCounter.value < horizon)
+            .values(value=horizon)
+        )
+        if not result.rowcount and db.session.get(ChangeCounter, name) is None:
+            db.session.add(ChangeCounter(name=name, value=horizon))
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,185 @@
+"""
+Read-through cache of event and swap detail payloads, keyed by primary key.
+
+Entries are the serialized ``to_dict`` payloads, never live ORM instances,
+so they can be shared between threads and stored in a shared backend.
+Swap entries omit their slots; ``get_swap`` fills them from the event
+cache, so an event change never has to invalidate the swaps that embed it.
+
+Invalidation is write-through and automatic for ORM writes: a session hook
+collects every Event and SwapRequest flushed as changed or deleted and
+drops their entries after the commit. Bulk statements that bypass the ORM
+(the sweeper, the archive mover) register their ids with
+``invalidate_on_commit``. Invalidations bump a per-key version kept in the
+backend itself (app/utils/cache.py), so a load that raced an invalidation
+in any process sharing the backend is not stored. Concurrent misses for
+one key within an organization share a single load.
+
+Entries are shared by every organization, so each records its ``org_id``
+and reads only return entries of the active one (app/services/tenancy.py).
+Loads are tenant-filtered, so they are never shared across organizations.
+
+Write paths keep reading rows from the database: they must validate and
+modify the current row, not a cached copy.
+"""
+
+import uuid
+from itertools import chain
+from flask import current_app, has_app_context
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session, noload
+from app.extensions import db
+from app.models import Event, SwapRequest, ArchivedEvent, ArchivedSwapRequest
+from app.services.tenancy import current_org_id
+from app.utils.cache import LRUCache, RedisCache, SingleFlight
+from app.utils.metrics import metrics
+
+KIND_BY_MODEL = {Event: 'event', SwapRequest: 'swap'}
+
+SLOT_FIELDS = (('requester_slot_id', 'requester_slot'), ('requestee_slot_id', 'requestee_slot'))
+
+
+def _load_event(event_id):
+    event = db.session.get(Event, event_id) or db.session.get(ArchivedEvent, event_id)
+    if event is None:
+        return None
+    data = event.to_dict(include_owner=True)
+    data['org_id'] = event.org_id
+    return data
+
+
+def _load_swap(swap_id):
+    swap = db.session.get(SwapRequest, swap_id, options=[
+        noload(SwapRequest.requester_slot), noload(SwapRequest.requestee_slot),
+    ]) or db.session.get(ArchivedSwapRequest, swap_id)
+    if swap is None:
+        return None
+    data = swap.to_dict()
+    data['org_id'] = swap.org_id
+    for _, field in SLOT_FIELDS:
+        data.pop(field, None)
+    return data
+
+
+LOADERS = {'event': _load_event, 'swap': _load_swap}
+
+
+def _cache_key(kind, entity_id):
+    try:
+        return f'{kind}:{uuid.UUID(str(entity_id))}'
+    except ValueError:
+        return None
+
+
+class EntityCache:
+    """A cache backend plus invalidation bookkeeping. ``backend=None`` disables caching."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._flight = SingleFlight()
+
+    def get(self, kind, entity_id):
+        """Return the cached payload for an entity, loading it on a miss; None if absent."""
+        key = _cache_key(kind, entity_id)
+        if self.backend is None or key is None:
+            return LOADERS[kind](entity_id)
+
+        org_id = current_org_id()
+        value = self.backend.get(key)
+        if value is not None:
+            metrics.incr('cache.hits')
+        else:
+            metrics.incr('cache.misses')
+            value = self._flight.do((org_id, key), lambda: self._fill(kind, entity_id, key))
+        # Another organization's entry, possibly filled by a concurrent load
+        if value is not None and org_id is not None and value['org_id'] != org_id:
+            return None
+        return value
+
+    def _fill(self, kind, entity_id, key):
+        version = self.backend.version(key)
+        value = LOADERS[kind](entity_id)
+        # An invalidation during the load means the value may predate the write.
+        if value is not None:
+            self.backend.set_if_version(key, value, version)
+        return value
+
+    def invalidate(self, kind, ids):
+        keys = [key for key in (_cache_key(kind, i) for i in ids) if key]
+        if not keys:
+            return
+        if self.backend is not None:
+            self.backend.invalidate(*keys)
+        metrics.incr('cache.invalidations', len(keys))
+
+    def stats(self):
+        hits, misses = metrics.get('cache.hits'), metrics.get('cache.misses')
+        return {
+            'backend': type(self.backend).__name__ if self.backend is not None else None,
+            'size': len(self.backend) if self.backend is not None else 0,
+            'evictions': self.backend.evictions if self.backend is not None else 0,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+def get_cache():
+    return current_app.extensions['entity_cache']
+
+
+def get_event(event_id):
+    """Cached ``Event.to_dict(include_owner=True)`` (hot or archived), or None. Read-only."""
+    return get_cache().get('event', event_id)
+
+
+def get_swap(swap_id):
+    """Cached swap payload with its slots embedded, or None."""
+    data = get_cache().get('swap', swap_id)
+    if data is None:
+        return None
+    data = dict(data)
+    for id_field, field in SLOT_FIELDS:
+        slot = get_event(data[id_field])
+        data[field] = {k: v for k, v in slot.items() if k != 'owner'} if slot else None
+    return data
+
+
+def _pending(session):
+    return session.info.setdefault('entity_cache_invalidate', set())
+
+
+def invalidate_on_commit(kind, ids):
+    """Drop entries for ``ids`` once the current transaction commits."""
+    _pending(db.session()).update((kind, entity_id) for entity_id in ids)
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    for obj in chain(session.dirty, session.deleted):
+        kind = KIND_BY_MODEL.get(type(obj))
+        if kind is not None and obj.id is not None:
+            _pending(session).add((kind, obj.id))
+
+
+@sa_event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    pending = session.info.pop('entity_cache_invalidate', None)
+    if not pending or not has_app_context() or 'entity_cache' not in current_app.extensions:
+        return
+    by_kind = {}
+    for kind, entity_id in pending:
+        by_kind.setdefault(kind, []).append(entity_id)
+    for kind, ids in by_kind.items():
+        get_cache().invalidate(kind, ids)
+
+
+def init_app(app):
+    """Create the cache: shared when ENTITY_CACHE_URL is set, otherwise an in-process LRU."""
+    config = app.config
+    if config['ENTITY_CACHE_URL']:
+        backend = RedisCache(config['ENTITY_CACHE_URL'], ttl=config['ENTITY_CACHE_TTL'])
+    elif config['ENTITY_CACHE_SIZE']:
+        backend = LRUCache(maxsize=config['ENTITY_CACHE_SIZE'], ttl=config['ENTITY_CACHE_TTL'])
+    else:
+        backend = None
+    app.extensions['entity_cache'] = EntityCache(backend)
+    metrics.gauge('cache', lambda: get_cache().stats())
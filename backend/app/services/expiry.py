@@ -0,0 +1,148 @@
+"""
+Expiry of stale PENDING swap requests.
+
+A pending swap is stale once its TTL has passed or either slot has started.
+The sweeper expires stale swaps with one set-based UPDATE per batch and
+applies the counter and outbox side effects for the whole batch at once.
+"""
+
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import aliased
+from app.extensions import db
+from app.models import Event, SwapRequest, SwapStatus
+from app.services import entity_cache, outbox, swap_counters, tenancy, transitions
+from app.utils.metrics import metrics
+from app.utils.scheduler import PeriodicTask
+
+_last_run = {}
+
+metrics.meter('sweeper.expired')
+metrics.gauge('sweeper.last_run', lambda: dict(_last_run))
+
+
+def _payload(swap_id, requester_id, requestee_id):
+    return {
+        'swap_id': swap_id,
+        'requester_id': requester_id,
+        'requestee_id': requestee_id,
+        'status': SwapStatus.EXPIRED.value,
+    }
+
+
+def is_stale(swap, now=None):
+    """Whether a PENDING swap can no longer be accepted."""
+    now = now or datetime.utcnow()
+    if swap.expires_at is not None and swap.expires_at <= now:
+        return True
+    return any(slot is not None and slot.start_time <= now
+               for slot in (swap.requester_slot, swap.requestee_slot))
+
+
+def _stale_ids(now, batch_size):
+    requester_slot = aliased(Event)
+    requestee_slot = aliased(Event)
+    query = (
+        select(SwapRequest.id, SwapRequest.org_id, SwapRequest.requester_id, SwapRequest.requestee_id,
+               SwapRequest.requester_slot_id, SwapRequest.requestee_slot_id)
+        .join(requester_slot, requester_slot.id == SwapRequest.requester_slot_id)
+        .join(requestee_slot, requestee_slot.id == SwapRequest.requestee_slot_id)
+        .where(
+            SwapRequest.status == SwapStatus.PENDING,
+            or_(
+                SwapRequest.expires_at <= now,
+                requester_slot.start_time <= now,
+                requestee_slot.start_time <= now,
+            ),
+        )
+        .limit(batch_size)
+        .with_for_update(of=SwapRequest, skip_locked=True)
+    )
+    return db.session.execute(query).all()
+
+
+def expire_batch(now=None, batch_size=None):
+    """
+    Expire one batch of stale swaps in a single transaction.
+
+    Returns:
+        int: Number of swaps expired
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config['SWAP_SWEEPER_BATCH_SIZE']
+    rows = _stale_ids(now, batch_size)
+    if not rows:
+        db.session.rollback()
+        return 0
+
+    ids = [row.id for row in rows]
+    db.session.execute(
+        update(SwapRequest)
+        .where(SwapRequest.id.in_(ids), SwapRequest.status == SwapStatus.PENDING)
+        .values(status=SwapStatus.EXPIRED, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    entity_cache.invalidate_on_commit('swap', ids)
+
+    # One counter update per affected user rather than per swap.
+    sent = Counter(row.requester_id for row in rows)
+    received = Counter(row.requestee_id for row in rows)
+    for user_id in sorted(set(sent) | set(received)):
+        swap_counters.adjust(user_id, pending_sent=-sent[user_id], pending_received=-received[user_id])
+
+    for row in rows:
+        outbox.enqueue('swap.expired', _payload(row.id, row.requester_id, row.requestee_id))
+    transitions.record_expired(rows)
+
+    db.session.commit()
+    metrics.incr('sweeper.expired', len(ids))
+    return len(ids)
+
+
+def expire_one(swap, now=None):
+    """Expire a single stale swap found on the request path. Does not commit."""
+    now = now or datetime.utcnow()
+    swap.status = SwapStatus.EXPIRED
+    swap.updated_at = now
+    swap_counters.record_resolved(swap, SwapStatus.EXPIRED)
+    transitions.record_swap(swap)
+    outbox.enqueue('swap.expired', _payload(swap.id, swap.requester_id, swap.requestee_id))
+    metrics.incr('sweeper.expired')
+
+
+def sweep(now=None, batch_size=None, max_batches=None):
+    """
+    Expire stale swaps in bounded batches until none remain.
+
+    Returns:
+        int: Total number of swaps expired
+    """
+    started = time.perf_counter()
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = expire_batch(now=now, batch_size=batch_size)
+        if not count:
+            break
+        total += count
+        batches += 1
+
+    metrics.incr('sweeper.runs')
+    _last_run.update({
+        'at': datetime.utcnow().isoformat(),
+        'expired': total,
+        'batches': batches,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+    return total
+
+
+def start_background(app):
+    """Start the in-process sweeper when SWAP_SWEEPER_INTERVAL is set."""
+    interval = app.config['SWAP_SWEEPER_INTERVAL']
+    if interval:
+        app.extensions['swap_sweeper'] = PeriodicTask(
+            app, 'swap-sweeper', interval, lambda: tenancy.each_partition(sweep)).start()
+        return app.extensions['swap_sweeper']
@@ -0,0 +1,143 @@
+"""
+Maintenance of the marketplace read model (``marketplace_slots``).
+
+The marketplace lists other users' upcoming SWAPPABLE slots with their
+owner's name. Instead of joining events to users on every read, a session
+hook keeps one denormalized row per SWAPPABLE event, rewritten in the same
+flush as any event change (create, edit, status change, ownership change
+from an accepted swap, delete) and any rename of its owner.
+
+Statements that bypass the ORM must keep the rows in step themselves: the
+archive mover calls ``remove``. Rows whose slot has started are dropped by
+``prune``, and ``rebuild`` recomputes the table from events and users.
+"""
+
+from datetime import datetime
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import Event, EventStatus, MarketplaceSlot, User
+from app.services import tenancy
+from app.utils.metrics import metrics
+from app.utils.scheduler import PeriodicTask
+
+slots = MarketplaceSlot.__table__
+users = User.__table__
+
+# Event attributes copied into (or deciding membership of) a row
+EVENT_FIELDS = ('status', 'user_id', 'title', 'start_time', 'end_time')
+OWNER_FIELDS = ('name', 'email')
+
+
+def _changed(obj, fields):
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+
+def _owners(session, connection, user_ids):
+    """(name, email) per user id, from the session when loaded, else one query."""
+    owners, missing = {}, []
+    for user_id in user_ids:
+        user = session.identity_map.get(inspect(User).identity_key_from_primary_key((user_id,)))
+        loaded = inspect(user).dict if user is not None else {}
+        if 'name' in loaded and 'email' in loaded:
+            owners[user_id] = (loaded['name'], loaded['email'])
+        else:
+            missing.append(user_id)
+    if missing:
+        rows = connection.execute(select(users.c.id, users.c.name, users.c.email).where(users.c.id.in_(missing)))
+        owners.update((row.id, (row.name, row.email)) for row in rows)
+    return owners
+
+
+def _rows(session, connection, events, now):
+    listed = [e for e in events if e.status == EventStatus.SWAPPABLE and e.start_time > now]
+    owners = _owners(session, connection, {event.user_id for event in listed})
+    return [{
+        'event_id': event.id,
+        'org_id': event.org_id,
+        'user_id': event.user_id,
+        'owner_name': owners[event.user_id][0],
+        'owner_email': owners[event.user_id][1],
+        'title': event.title,
+        'start_time': event.start_time,
+        'end_time': event.end_time,
+    } for event in listed if event.user_id in owners]
+
+
+@sa_event.listens_for(Session, 'after_flush')
+def _sync(session, flush_context):
+    changed = [obj for obj in session.new if isinstance(obj, Event)]
+    changed += [obj for obj in session.dirty if isinstance(obj, Event) and _changed(obj, EVENT_FIELDS)]
+    removed = [obj.id for obj in session.deleted if isinstance(obj, Event)]
+    renamed = [obj for obj in session.dirty if isinstance(obj, User) and _changed(obj, OWNER_FIELDS)]
+    if not (changed or removed or renamed):
+        return
+
+    connection = session.connection()
+    stale = [event.id for event in changed] + removed
+    if stale:
+        connection.execute(delete(slots).where(slots.c.event_id.in_(stale)))
+    rows = _rows(session, connection, changed, datetime.utcnow())
+    if rows:
+        connection.execute(insert(slots), rows)
+    for user in renamed:
+        connection.execute(update(slots).where(slots.c.user_id == user.id)
+                           .values(owner_name=user.name, owner_email=user.email))
+    metrics.incr('marketplace.writes', len(stale) + len(rows) + len(renamed))
+
+
+def remove(event_ids):
+    """Drop the rows of events deleted with a bulk statement. Does not commit."""
+    if event_ids:
+        db.session.execute(delete(slots).where(slots.c.event_id.in_(event_ids)))
+
+
+def prune(now=None, batch_size=1000):
+    """
+    Delete rows whose slot has started, in batches.
+
+    Returns:
+        int: Rows deleted
+    """
+    now = now or datetime.utcnow()
+    total = 0
+    while True:
+        batch = select(slots.c.event_id).where(slots.c.start_time <= now).limit(batch_size)
+        deleted = db.session.execute(delete(slots).where(slots.c.event_id.in_(batch))).rowcount
+        db.session.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def rebuild(now=None):
+    """
+    Recompute every row of the current partition from events and users.
+
+    Returns:
+        int: Rows written
+    """
+    now = now or datetime.utcnow()
+    columns = ('event_id', 'org_id', 'user_id', 'owner_name', 'owner_email', 'title', 'start_time', 'end_time')
+    events = Event.__table__
+    source = (
+        select(events.c.id, events.c.org_id, events.c.user_id, users.c.name, users.c.email,
+               events.c.title, events.c.start_time, events.c.end_time)
+        .join(users, users.c.id == events.c.user_id)
+        .where(events.c.status == EventStatus.SWAPPABLE, events.c.start_time > now)
+    )
+    db.session.execute(delete(slots))
+    written = db.session.execute(insert(slots).from_select(columns, source)).rowcount
+    db.session.commit()
+    return written
+
+
+def start_background(app):
+    """Prune started slots every MARKETPLACE_PRUNE_INTERVAL seconds (0 disables)."""
+    interval = app.config['MARKETPLACE_PRUNE_INTERVAL']
+    if interval:
+        app.extensions['marketplace_prune'] = PeriodicTask(
+            app, 'marketplace-prune', interval, lambda: tenancy.each_partition(prune)).start()
+        return app.extensions['marketplace_prune']
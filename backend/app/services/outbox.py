@@ -0,0 +1,216 @@
+"""
+Transactional outbox and the worker pool that drains it.
+
+Write paths call ``enqueue`` before their own commit, so a side effect is
+recorded if and only if the change that caused it is. Workers claim due
+messages with a short lease, run the registered handlers and mark them
+processed; a crash between the handler and the mark re-delivers the message
+once the lease expires, so handlers must be idempotent.
+"""
+
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, or_, select, update
+from app.extensions import db
+from app.models import OutboxMessage
+from app.utils.ids import new_id
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+metrics.meter('outbox.processed')
+
+
+def handler(topic):
+    """
+    Register a function to deliver messages for ``topic``.
+
+    Usage:
+        @outbox.handler('swap.accepted')
+        def notify(payload):
+            ...
+    """
+    def decorator(fn):
+        _handlers.setdefault(topic, []).append(fn)
+        return fn
+    return decorator
+
+
+def enqueue(topic, payload):
+    """
+    Record a side effect in the current transaction. Does not commit.
+
+    Args:
+        topic (str): Message topic, e.g. ``swap.accepted``
+        payload (dict): JSON-serializable message body
+    """
+    message = OutboxMessage(topic=topic, payload=payload)
+    db.session.add(message)
+    metrics.incr('outbox.enqueued')
+    return message
+
+
+def _backoff(attempts):
+    config = current_app.config
+    delay = min(config['OUTBOX_BACKOFF_BASE'] * 2 ** (attempts - 1), config['OUTBOX_BACKOFF_MAX'])
+    # Full jitter spreads retries from a burst of failures.
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def _claim(batch_size, now):
+    """Lease up to ``batch_size`` due messages to this worker and commit the claim."""
+    token = new_id()
+    due = (
+        select(OutboxMessage.id)
+        .where(
+            OutboxMessage.processed_at.is_(None),
+            OutboxMessage.failed_at.is_(None),
+            OutboxMessage.available_at <= now,
+            or_(OutboxMessage.locked_until.is_(None), OutboxMessage.locked_until < now),
+        )
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    lease = timedelta(seconds=current_app.config['OUTBOX_LEASE_SECONDS'])
+    db.session.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(due))
+        .values(claimed_by=token, locked_until=now + lease)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return OutboxMessage.query.filter_by(claimed_by=token).order_by(OutboxMessage.id).all()
+
+
+def _deliver(message):
+    for fn in _handlers.get(message.topic, ()):
+        fn(message.payload)
+
+
+def drain_batch(batch_size=None):
+    """
+    Claim and deliver one batch of due messages.
+
+    Returns:
+        int: Number of messages claimed
+    """
+    config = current_app.config
+    batch_size = batch_size or config['OUTBOX_BATCH_SIZE']
+    messages = _claim(batch_size, datetime.utcnow())
+    if not messages:
+        return 0
+
+    for message in messages:
+        try:
+            # Handler writes are isolated so one failure cannot poison the batch.
+            with db.session.begin_nested():
+                _deliver(message)
+        except Exception as e:
+            now = datetime.utcnow()
+            message.attempts += 1
+            message.last_error = str(e)[:2000]
+            if message.attempts >= config['OUTBOX_MAX_ATTEMPTS']:
+                message.failed_at = now
+                metrics.incr('outbox.dead')
+                logger.error('Outbox message %s (%s) failed permanently: %s', message.id, message.topic, e)
+            else:
+                message.available_at = now + _backoff(message.attempts)
+                metrics.incr('outbox.retried')
+        else:
+            message.processed_at = datetime.utcnow()
+            metrics.incr('outbox.processed')
+        message.claimed_by = None
+        message.locked_until = None
+
+    db.session.commit()
+    metrics.incr('outbox.batches')
+    return len(messages)
+
+
+def prune(older_than, batch_size=1000):
+    """Delete one batch of delivered messages processed before ``older_than``."""
+    ids = select(OutboxMessage.id).where(OutboxMessage.processed_at < older_than).limit(batch_size)
+    deleted = OutboxMessage.query.filter(OutboxMessage.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def stats():
+    """Backlog statistics: pending count, dead count and lag of the oldest due message."""
+    pending_filter = (OutboxMessage.processed_at.is_(None), OutboxMessage.failed_at.is_(None))
+    pending, oldest = db.session.query(
+        func.count(OutboxMessage.id), func.min(OutboxMessage.created_at)
+    ).filter(*pending_filter).one()
+    dead = OutboxMessage.query.filter(OutboxMessage.failed_at.isnot(None)).count()
+    lag = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+    return {'pending': pending, 'dead': dead, 'lag_seconds': round(lag, 3)}
+
+
+class WorkerPool:
+    """
+    Threads that drain the outbox until stopped.
+
+    Each thread runs in its own app context and session; claims are
+    row-level, so any number of pools across processes can run at once.
+    """
+
+    def __init__(self, app, threads=None, batch_size=None, poll_interval=None):
+        self.app = app
+        self.threads = threads or app.config['OUTBOX_WORKER_THREADS'] or 1
+        self.batch_size = batch_size or app.config['OUTBOX_BATCH_SIZE']
+        self.poll_interval = poll_interval or app.config['OUTBOX_POLL_INTERVAL']
+        self._stop = threading.Event()
+        self._workers = []
+
+    def start(self):
+        for i in range(self.threads):
+            worker = threading.Thread(target=self._run, name=f'outbox-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        return self
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def wait(self):
+        """Block until stop() is called from another thread or a signal handler."""
+        while not self._stop.wait(1):
+            pass
+
+    def _run(self):
+        retention = self.app.config['OUTBOX_RETENTION']
+        while not self._stop.is_set():
+            claimed = 0
+            with self.app.app_context():
+                try:
+                    claimed = drain_batch(self.batch_size)
+                    if not claimed:
+                        prune(datetime.utcnow() - retention)
+                except Exception:
+                    logger.exception('Outbox worker iteration failed')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            if not claimed:
+                self._stop.wait(self.poll_interval)
+
+
+def init_app(app):
+    """Register metrics gauges."""
+    metrics.gauge('outbox', stats)
+
+
+def start_background(app):
+    """Start an in-process worker pool when OUTBOX_WORKER_THREADS is set."""
+    if app.config['OUTBOX_WORKER_THREADS']:
+        app.extensions['outbox_pool'] = WorkerPool(app).start()
+        return app.extensions['outbox_pool']
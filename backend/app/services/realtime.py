@@ -0,0 +1,175 @@
+"""
+Real-time notifications over Socket.IO, fanned out across processes.
+
+Clients connect with an access token (``auth={'token': ...}`` or a
+``?token=`` query parameter) and join a room per user. Outbox handlers emit
+swap and event changes to the affected users' rooms; since the outbox is
+drained by whichever process claims a message, emits must reach sockets
+held by other gunicorn workers and nodes.
+
+With ``SOCKETIO_MESSAGE_QUEUE`` set, every process publishes its emits on a
+shared pub/sub backplane (``redis://`` or ``memory://``, see
+``app.utils.pubsub``) and replays the others' emits to its own sockets.
+Emits are delivered locally at once; the copies for other processes are
+buffered per room for up to ``SOCKETIO_BATCH_INTERVAL`` seconds (or
+``SOCKETIO_BATCH_MAX`` messages) and published as one backplane message,
+so a burst to a busy room costs one publish rather than one per emit.
+"""
+
+import logging
+import threading
+from functools import partial
+
+import socketio as python_socketio
+from flask import request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_socketio import ConnectionRefusedError, join_room
+from jwt.exceptions import PyJWTError
+from app.extensions import socketio
+from app.services import outbox, revocation
+from app.utils import pubsub
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SWAP_TOPICS = ('swap.created', 'swap.accepted', 'swap.rejected', 'swap.expired')
+EVENT_TOPICS = ('event.created', 'event.updated', 'event.deleted')
+
+
+def user_room(user_id):
+    return f'user:{user_id}'
+
+
+class BackplaneManager(python_socketio.PubSubManager):
+    """
+    Socket.IO client manager that shares emits through a pub/sub backplane.
+
+    Args:
+        backplane: Object with ``publish(channel, payload)`` and ``listen(channel)``
+        channel (str): Backplane channel shared by all processes
+        batch_interval (float): Seconds cross-process emits may wait to be
+            batched; 0 publishes every emit immediately
+        batch_max (int): Buffered emits that force an immediate flush
+    """
+
+    name = 'backplane'
+
+    def __init__(self, backplane, channel='socketio', batch_interval=0.0, batch_max=100,
+                 write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.backplane = backplane
+        self.batch_interval = batch_interval
+        self.batch_max = batch_max
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_count = 0
+        self._flush_scheduled = False
+
+    def _send(self, data):
+        try:
+            self.backplane.publish(self.channel, self.json.dumps(data))
+            metrics.incr('socketio.published')
+        except Exception:
+            # Local sockets already have the emit; a lost fan-out is not worth
+            # failing the request or re-running an outbox handler over.
+            metrics.incr('socketio.publish_failed')
+            logger.exception('Backplane publish failed')
+
+    def _publish(self, data):
+        if not self.batch_interval:
+            return self._send(data)
+        if data.get('method') != 'emit':
+            # Room membership and disconnects must not overtake buffered emits.
+            self.flush()
+            return self._send(data)
+
+        room = data.get('room')
+        key = (data.get('namespace'), tuple(room) if isinstance(room, list) else room)
+        with self._lock:
+            self._pending.setdefault(key, []).append(data)
+            self._pending_count += 1
+            full = self._pending_count >= self.batch_max
+            schedule = not full and not self._flush_scheduled
+            if schedule:
+                self._flush_scheduled = True
+        if full:
+            self.flush()
+        elif schedule:
+            self.server.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        self.server.sleep(self.batch_interval)
+        self.flush()
+
+    def flush(self):
+        """Publish buffered emits as one message, grouped by room in arrival order."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_count = 0
+            self._flush_scheduled = False
+        if not pending:
+            return
+        messages = [message for group in pending.values() for message in group]
+        if len(messages) == 1:
+            self._send(messages[0])
+        else:
+            self._send({'method': 'batch', 'host_id': self.host_id, 'messages': messages})
+        metrics.incr('socketio.batched_emits', len(messages))
+
+    def _listen(self):
+        for payload in self.backplane.listen(self.channel):
+            try:
+                data = self.json.loads(payload)
+            except ValueError:
+                continue
+            if not isinstance(data, dict) or data.get('method') != 'batch':
+                yield data
+            elif data.get('host_id') != self.host_id:
+                yield from data.get('messages', ())
+
+
+def make_manager(config):
+    """Client manager for ``socketio.init_app``; None keeps the in-process default."""
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        return None
+    return BackplaneManager(
+        pubsub.from_url(url),
+        channel=config['SOCKETIO_CHANNEL'],
+        batch_interval=config['SOCKETIO_BATCH_INTERVAL'],
+        batch_max=config['SOCKETIO_BATCH_MAX'],
+    )
+
+
+@socketio.on('connect')
+def on_connect(auth=None):
+    """Authenticate the socket with an access token and join the user's room."""
+    token = auth.get('token') if isinstance(auth, dict) else None
+    token = token or request.args.get('token')
+    if not token:
+        raise ConnectionRefusedError('Authentication required')
+    try:
+        payload = decode_token(token)
+    except (PyJWTError, JWTExtendedException):
+        raise ConnectionRefusedError('Invalid token')
+    if payload.get('type') != 'access' or revocation.get_blocklist().is_revoked(payload['jti']):
+        raise ConnectionRefusedError('Invalid token')
+    join_room(user_room(payload['sub']))
+    metrics.incr('socketio.connects')
+
+
+def _emit_swap(topic, payload):
+    data = dict(payload, topic=topic)
+    for user_id in {payload['requester_id'], payload['requestee_id']}:
+        socketio.emit('swap', data, to=user_room(user_id))
+
+
+def _emit_event(topic, payload):
+    socketio.emit('event', dict(payload, topic=topic), to=user_room(payload['user_id']))
+
+
+for _topic in SWAP_TOPICS:
+    outbox.handler(_topic)(partial(_emit_swap, _topic))
+for _topic in EVENT_TOPICS:
+    outbox.handler(_topic)(partial(_emit_event, _topic))
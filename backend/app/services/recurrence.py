@@ -0,0 +1,367 @@
+"""
+Recurring events: rule parsing, range-bounded expansion and materialization.
+
+A series stores one rule instead of one row per occurrence. Occurrences are
+expanded on read, only inside the window being listed, and are addressed by
+``<series id>@<YYYYmmddTHHMMSS>`` ids. Editing or swapping an occurrence
+materializes it into a real Event row; a SeriesException records that, so
+expansion stops producing the virtual copy. Deleting an occurrence that was
+never materialized records a cancellation instead.
+
+Supported RRULE subset: ``FREQ=DAILY|WEEKLY``, ``INTERVAL``, ``BYDAY`` with
+plain weekday codes, and at most one of ``UNTIL`` or ``COUNT``. Occurrences
+are the rule's matches at or after the series start.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from itertools import islice
+from sqlalchemy import or_, select
+from app.extensions import db
+from app.models import Event, EventStatus, EventSeries, SeriesException, User
+
+WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+FREQUENCIES = ('DAILY', 'WEEKLY')
+ALL_DAYS = 0b1111111
+MAX_COUNT = 1000
+MAX_INTERVAL = 366
+# Longest occurrence; bounds how far before a window an overlapping one can start.
+MAX_DURATION = timedelta(days=1)
+ID_FORMAT = '%Y%m%dT%H%M%S'
+
+# weekday bitmask -> weekday numbers in the mask, ascending
+_MASK_DAYS = [tuple(d for d in range(7) if mask >> d & 1) for mask in range(128)]
+
+Rule = namedtuple('Rule', 'freq interval weekdays until count')
+
+
+class InvalidRule(ValueError):
+    """The recurrence rule is malformed or outside the supported subset."""
+
+
+def _parse_until(value):
+    for fmt in ('%Y%m%dT%H%M%SZ', '%Y%m%dT%H%M%S'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    try:
+        # A date-only UNTIL includes every occurrence on that day.
+        return datetime.strptime(value, '%Y%m%d') + timedelta(days=1, microseconds=-1)
+    except ValueError:
+        raise InvalidRule(f'Invalid UNTIL: {value}')
+
+
+def _positive_int(key, value, maximum):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if not 1 <= number <= maximum:
+        raise InvalidRule(f'{key} must be an integer between 1 and {maximum}')
+    return number
+
+
+def parse_rrule(text, dtstart):
+    """
+    Parse the supported RRULE subset.
+
+    Args:
+        text (str): Rule such as ``FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR``, with
+            or without an ``RRULE:`` prefix
+        dtstart (datetime): Start of the series
+
+    Returns:
+        Rule
+
+    Raises:
+        InvalidRule
+    """
+    text = (text or '').strip()
+    if text.upper().startswith('RRULE:'):
+        text = text[len('RRULE:'):]
+    parts = {}
+    for part in filter(None, text.split(';')):
+        key, sep, value = part.partition('=')
+        key = key.strip().upper()
+        if not sep or key in parts:
+            raise InvalidRule(f'Invalid RRULE part: {part}')
+        parts[key] = value.strip().upper()
+
+    unsupported = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'UNTIL', 'COUNT'}
+    if unsupported:
+        raise InvalidRule(f'Unsupported RRULE parts: {", ".join(sorted(unsupported))}')
+    freq = parts.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise InvalidRule(f'FREQ must be one of: {", ".join(FREQUENCIES)}')
+    interval = _positive_int('INTERVAL', parts['INTERVAL'], MAX_INTERVAL) if 'INTERVAL' in parts else 1
+
+    if 'BYDAY' in parts:
+        weekdays = 0
+        for code in parts['BYDAY'].split(','):
+            if code not in WEEKDAY_CODES:
+                raise InvalidRule(f'Unsupported BYDAY value: {code}')
+            weekdays |= 1 << WEEKDAY_CODES.index(code)
+    else:
+        weekdays = ALL_DAYS if freq == 'DAILY' else 1 << dtstart.weekday()
+
+    if 'UNTIL' in parts and 'COUNT' in parts:
+        raise InvalidRule('UNTIL and COUNT are mutually exclusive')
+    until = _parse_until(parts['UNTIL']) if 'UNTIL' in parts else None
+    if until is not None and until < dtstart:
+        raise InvalidRule('UNTIL is before the series start')
+    count = _positive_int('COUNT', parts['COUNT'], MAX_COUNT) if 'COUNT' in parts else None
+
+    if freq == 'DAILY':
+        # Stepping by the interval only ever lands on some weekdays.
+        reachable = 0
+        for step in range(7):
+            reachable |= 1 << (dtstart.weekday() + step * interval) % 7
+        if not weekdays & reachable:
+            raise InvalidRule('Rule has no occurrences')
+    return Rule(freq, interval, weekdays, until, count)
+
+
+def _day_offsets(first_weekday, freq, interval, weekdays, lo, hi=None):
+    """Day offsets from the series start, in [lo, hi), on which the rule fires."""
+    if freq == 'DAILY':
+        k = lo + (-lo % interval)
+        while hi is None or k < hi:
+            if weekdays >> (first_weekday + k) % 7 & 1:
+                yield k
+            k += interval
+        return
+
+    # Weeks are counted from the Monday of the first week.
+    days = _MASK_DAYS[weekdays]
+    week = (first_weekday + lo) // 7
+    week += -week % interval
+    while True:
+        base = week * 7 - first_weekday
+        for day in days:
+            k = base + day
+            if hi is not None and k >= hi:
+                return
+            if k >= lo:
+                yield k
+        week += interval
+
+
+def expand(dtstart, duration, freq, interval, weekdays, until, lo, hi):
+    """
+    Starts of the occurrences that overlap [lo, hi), ascending.
+
+    Only the days inside the window are visited, so the cost depends on the
+    window, not on the age or length of the series.
+    """
+    after = lo - duration - dtstart
+    first = max(0, after.days + 1)
+    before = hi - dtstart
+    last = before.days + (1 if before % timedelta(days=1) else 0)
+    if until is not None:
+        last = min(last, (until - dtstart).days + 1)
+    if last <= first:
+        return []
+    return [dtstart + timedelta(days=k)
+            for k in _day_offsets(dtstart.weekday(), freq, interval, weekdays, first, last)]
+
+
+def last_start(dtstart, rule):
+    """Start of the final occurrence of a COUNT rule."""
+    offsets = _day_offsets(dtstart.weekday(), rule.freq, rule.interval, rule.weekdays, 0)
+    *_, k = islice(offsets, rule.count)
+    return dtstart + timedelta(days=k)
+
+
+def occurrence_id(series_id, start):
+    return f'{series_id}@{start.strftime(ID_FORMAT)}'
+
+
+def parse_occurrence_id(value):
+    """(series id, start) for an occurrence id, or None for anything else."""
+    series_id, sep, stamp = str(value).partition('@')
+    if not sep:
+        return None
+    try:
+        return series_id, datetime.strptime(stamp, ID_FORMAT)
+    except ValueError:
+        return None
+
+
+def _series_fields(series):
+    """The part of an occurrence payload shared by every occurrence of a series."""
+    return {
+        'user_id': series.user_id,
+        'title': series.title,
+        'status': series.status.value,
+        'created_at': series.created_at.isoformat(),
+        'updated_at': series.updated_at.isoformat(),
+        'series_id': series.id,
+    }
+
+
+class Occurrence:
+    """A virtual occurrence of a series; quacks like an Event for reads."""
+
+    __slots__ = ('series', 'start_time', 'end_time', '_fields')
+
+    def __init__(self, series, start_time, end_time=None, fields=None):
+        self.series = series
+        self.start_time = start_time
+        self.end_time = end_time or start_time + timedelta(minutes=series.duration_minutes)
+        self._fields = fields
+
+    @property
+    def id(self):
+        return occurrence_id(self.series.id, self.start_time)
+
+    @property
+    def user_id(self):
+        return self.series.user_id
+
+    @property
+    def title(self):
+        return self.series.title
+
+    @property
+    def status(self):
+        return self.series.status
+
+    @property
+    def duration_minutes(self):
+        return self.series.duration_minutes
+
+    def to_dict(self, include_owner=False):
+        data = dict(self._fields or _series_fields(self.series),
+                    id=self.id, start_time=self.start_time.isoformat(), end_time=self.end_time.isoformat())
+        if include_owner:
+            owner = db.session.get(User, self.series.user_id)
+            if owner:
+                data['owner'] = {'id': owner.id, 'name': owner.name, 'email': owner.email}
+        return data
+
+
+_SERIES_COLUMNS = (
+    EventSeries.id, EventSeries.user_id, EventSeries.title, EventSeries.status,
+    EventSeries.dtstart, EventSeries.duration_minutes, EventSeries.freq, EventSeries.interval,
+    EventSeries.weekdays, EventSeries.until, EventSeries.created_at, EventSeries.updated_at,
+)
+
+
+def occurrences(lo, hi, status=None, user_ids=None):
+    """
+    Virtual occurrences overlapping [lo, hi), skipping materialized and
+    cancelled ones.
+
+    Reads only the series that can reach the window, as plain rows, and the
+    exceptions inside it. ``user_ids`` limits both to those users' series.
+    """
+    query = select(*_SERIES_COLUMNS).where(
+        EventSeries.dtstart < hi,
+        or_(EventSeries.until.is_(None), EventSeries.until > lo - MAX_DURATION),
+    )
+    if status is not None:
+        query = query.where(EventSeries.status == status)
+    if user_ids is not None:
+        query = query.where(EventSeries.user_id.in_(user_ids))
+    rows = db.session.execute(query).all()
+    if not rows:
+        return []
+
+    exceptions = select(SeriesException.series_id, SeriesException.occurrence_start).where(
+        SeriesException.occurrence_start > lo - MAX_DURATION,
+        SeriesException.occurrence_start < hi,
+    )
+    if user_ids is not None:
+        exceptions = exceptions.where(SeriesException.series_id.in_([row.id for row in rows]))
+    skipped = {}
+    for series_id, start in db.session.execute(exceptions):
+        skipped.setdefault(series_id, set()).add(start)
+
+    result = []
+    for row in rows:
+        duration = timedelta(minutes=row.duration_minutes)
+        starts = expand(row.dtstart, duration, row.freq, row.interval, row.weekdays, row.until, lo, hi)
+        if not starts:
+            continue
+        fields = _series_fields(row)
+        exceptions = skipped.get(row.id, ())
+        result.extend(Occurrence(row, start, start + duration, fields)
+                      for start in starts if start not in exceptions)
+    return result
+
+
+def create_series(user_id, title, start_time, end_time, rrule, status=EventStatus.SWAPPABLE):
+    """
+    Add a series to the session. Does not commit.
+
+    Raises:
+        InvalidRule: For an unsupported rule or an occurrence longer than a day
+    """
+    start_time = start_time.replace(microsecond=0)
+    duration = end_time - start_time
+    if duration > MAX_DURATION:
+        raise InvalidRule('Recurring occurrences cannot be longer than a day')
+    rule = parse_rrule(rrule, start_time)
+    until = last_start(start_time, rule) if rule.count else rule.until
+    series = EventSeries(
+        user_id=user_id, title=title, status=status, dtstart=start_time,
+        duration_minutes=int(duration.total_seconds() // 60), rrule=rrule.strip(),
+        freq=rule.freq, interval=rule.interval, weekdays=rule.weekdays, until=until,
+    )
+    db.session.add(series)
+    return series
+
+
+def get_event(event_id):
+    """
+    Look up an event, accepting occurrence ids.
+
+    Returns:
+        Event, Occurrence or None: A materialized occurrence resolves to its
+        Event; a cancelled or non-existent one to None
+    """
+    parsed = parse_occurrence_id(event_id)
+    if parsed is None:
+        return db.session.get(Event, event_id)
+
+    series_id, start = parsed
+    exception = db.session.get(SeriesException, (series_id, start))
+    if exception is not None:
+        return db.session.get(Event, exception.event_id) if exception.event_id else None
+    series = db.session.get(EventSeries, series_id)
+    if series is None:
+        return None
+    duration = timedelta(minutes=series.duration_minutes)
+    starts = expand(series.dtstart, duration, series.freq, series.interval, series.weekdays, series.until,
+                    start, start + timedelta(seconds=1))
+    return Occurrence(series, start) if start in starts else None
+
+
+def materialize(event):
+    """
+    Turn an Occurrence into an Event row linked by a SeriesException.
+
+    Events pass through unchanged. Flushes, does not commit.
+    """
+    if not isinstance(event, Occurrence):
+        return event
+    materialized = Event(user_id=event.user_id, title=event.title, start_time=event.start_time,
+                         end_time=event.end_time, status=event.status)
+    db.session.add(materialized)
+    db.session.flush()
+    db.session.add(SeriesException(series_id=event.series.id, occurrence_start=event.start_time,
+                                   event_id=materialized.id))
+    db.session.flush()
+    return materialized
+
+
+def cancel(occurrence):
+    """Stop a virtual occurrence from being produced. Does not commit."""
+    db.session.add(SeriesException(series_id=occurrence.series.id, occurrence_start=occurrence.start_time))
+
+
+def delete_series(series):
+    """Delete a series; materialized occurrences stay as ordinary events. Does not commit."""
+    SeriesException.query.filter_by(series_id=series.id).delete(synchronize_session=False)
+    db.session.delete(series)
@@ -0,0 +1,249 @@
+"""
+JWT revocation with an in-memory blocklist.
+
+Every authenticated request asks whether its token is revoked, so the check
+must not query the database. Each process keeps a Bloom filter of revoked
+jtis plus an exact map of jti -> expiry, both fed from the ``revoked_tokens``
+log:
+
+* Bloom miss (almost every request): not revoked, no further work.
+* Bloom hit found in the exact map: revoked.
+* Bloom hit missing from the exact map (a false positive, or an entry
+  evicted to bound memory): confirmed against the database.
+
+Revocations made in this process apply immediately; those made by other
+processes apply after the next sync, i.e. within REVOCATION_SYNC_INTERVAL.
+The first check syncs inline and starts the process's sync thread, so every
+serving process keeps its blocklist current while CLI commands never start
+one. Later checks never wait for a sync.
+Log ids are taken at insert but rows become visible at commit, so a lower
+id can appear after the cursor passed it: each sync also re-reads rows
+revoked within REVOCATION_SYNC_LAG of the previous one.
+Entries are dropped once the token has expired, since an expired token is
+rejected before the blocklist is consulted.
+"""
+
+import heapq
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db, jwt
+from app.models import RevokedToken
+from app.utils.bloom import BloomFilter
+from app.utils.metrics import metrics
+from app.utils.scheduler import PeriodicTask
+
+# Tokens issued without an exp claim stay in the log indefinitely.
+NEVER_EXPIRES = datetime(9999, 12, 31)
+
+SYNC_BATCH_SIZE = 5000
+
+
+def token_expiry(jwt_payload):
+    exp = jwt_payload.get('exp')
+    return datetime.utcfromtimestamp(exp) if exp else NEVER_EXPIRES
+
+
+class Blocklist:
+    """
+    Per-process revocation state. Reads are lock-free; writers hold ``_lock``.
+
+    Syncs are serialized by ``_sync_lock`` and read the log before taking
+    ``_lock``, so a slow read does not hold up ``add()`` from a logout.
+    """
+
+    def __init__(self, capacity, error_rate, exact_max, sync_interval=0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact_max = exact_max
+        # Seconds between background syncs; 0 syncs only before the first check
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.exact = {}
+        self.cursor = 0
+        self.synced_at = None
+
+    def _add(self, jti, expires_at):
+        # Syncs re-read the lag window, so most rows are already present.
+        if jti not in self.exact:
+            self.bloom.add(jti)
+        self.exact[jti] = expires_at
+
+    def add(self, jti, expires_at):
+        """Record a revocation made by this process."""
+        with self._lock:
+            self._add(jti, expires_at)
+            self._trim()
+
+    def _trim(self, now=None):
+        """Drop expired exact entries and evict the soonest-expiring beyond exact_max."""
+        now = now or datetime.utcnow()
+        self.exact = {jti: exp for jti, exp in self.exact.items() if exp > now}
+        excess = len(self.exact) - self.exact_max
+        if excess > 0:
+            # Evicted jtis stay in the Bloom filter and fall back to the database.
+            for jti in heapq.nsmallest(excess, self.exact, key=self.exact.get):
+                del self.exact[jti]
+
+    def _start(self):
+        """Load the log before the first check and start syncing in the background."""
+        with self._sync_lock:
+            if self.synced_at is not None:
+                return
+            self._sync(datetime.utcnow())
+            if self.sync_interval:
+                app = current_app._get_current_object()
+                app.extensions['revocation_sync'] = PeriodicTask(app, 'revocation-sync', self.sync_interval,
+                                                                 self.sync).start()
+
+    def is_revoked(self, jti):
+        if self.synced_at is None:
+            self._start()
+        if jti not in self.bloom:
+            return False
+        metrics.incr('revocation.bloom_hits')
+        if jti in self.exact:
+            return True
+        metrics.incr('revocation.db_checks')
+        return db.session.query(RevokedToken.query.filter_by(jti=jti).exists()).scalar()
+
+    def _read_log(self, after_id, now, revoked_since=None):
+        """Unexpired rows past ``after_id``, plus any revoked at or after ``revoked_since``."""
+        new = RevokedToken.id > after_id
+        if revoked_since is not None:
+            new = or_(new, RevokedToken.revoked_at >= revoked_since)
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                .where(new, RevokedToken.id > last_id, RevokedToken.expires_at > now)
+                .order_by(RevokedToken.id)
+                .limit(SYNC_BATCH_SIZE)
+            ).all()
+            yield from rows
+            if len(rows) < SYNC_BATCH_SIZE:
+                return
+            last_id = rows[-1].id
+
+    def sync(self, now=None):
+        """
+        Apply log entries written since the last sync, including ones that
+        committed late with an id below the cursor.
+
+        When the Bloom filter holds more keys than it was sized for, it is
+        rebuilt from the live (unexpired) log so it does not grow stale.
+
+        Returns:
+            int: Number of log entries not already in the exact map
+        """
+        with self._sync_lock:
+            return self._sync(now or datetime.utcnow())
+
+    def _sync(self, now):
+        if len(self.bloom) > self.bloom.capacity:
+            with self._lock:
+                return self._rebuild(now)
+        revoked_since = self.synced_at - current_app.config['REVOCATION_SYNC_LAG'] if self.synced_at else None
+        # Only syncs move the cursor, so the log can be read before taking _lock.
+        rows = list(self._read_log(self.cursor, now, revoked_since))
+        with self._lock:
+            applied = 0
+            for row in rows:
+                if row.jti not in self.exact:
+                    applied += 1
+                self._add(row.jti, row.expires_at)
+                self.cursor = max(self.cursor, row.id)
+            self._trim(now)
+            self.synced_at = now
+            metrics.incr('revocation.syncs')
+            return applied
+
+    def _rebuild(self, now):
+        rows = list(self._read_log(0, now))
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        exact = {}
+        for row in rows:
+            bloom.add(row.jti)
+            exact[row.jti] = row.expires_at
+        # Swap whole structures so lock-free readers never see a partial filter.
+        self.bloom, self.exact = bloom, exact
+        self.cursor = max([row.id for row in rows] + [self.cursor])
+        self._trim(now)
+        self.synced_at = now
+        metrics.incr('revocation.rebuilds')
+        return len(rows)
+
+    def stats(self):
+        return {
+            'bloom_keys': len(self.bloom),
+            'bloom_bits': self.bloom.size,
+            'bloom_fp_rate': round(self.bloom.false_positive_rate(), 6),
+            'exact_keys': len(self.exact),
+            'cursor': self.cursor,
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None,
+        }
+
+
+def get_blocklist():
+    return current_app.extensions['revocation']
+
+
+def revoke(jwt_payload):
+    """
+    Revoke a decoded token: append it to the log and block it in this process.
+
+    Commits. Revoking an already revoked token is a no-op.
+
+    Returns:
+        bool: False if the token was already in the log, e.g. revoked by a
+        concurrent request
+    """
+    jti = jwt_payload['jti']
+    expires_at = token_expiry(jwt_payload)
+    try:
+        db.session.add(RevokedToken(jti=jti, token_type=jwt_payload.get('type', 'access'),
+                                    user_id=jwt_payload.get('sub'), expires_at=expires_at))
+        db.session.commit()
+        revoked = True
+    except IntegrityError:
+        db.session.rollback()
+        revoked = False
+    get_blocklist().add(jti, expires_at)
+    metrics.incr('revocation.revoked')
+    return revoked
+
+
+def prune(now=None, batch_size=1000):
+    """Delete one batch of log rows whose tokens have expired."""
+    now = now or datetime.utcnow()
+    ids = select(RevokedToken.id).where(RevokedToken.expires_at <= now).limit(batch_size)
+    deleted = RevokedToken.query.filter(RevokedToken.id.in_(ids)).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+@jwt.token_in_blocklist_loader
+def _check_token(jwt_header, jwt_payload):
+    return get_blocklist().is_revoked(jwt_payload['jti'])
+
+
+def init_app(app):
+    """Create this process's blocklist; tests sync it explicitly, without a thread."""
+    config = app.config
+    blocklist = Blocklist(config['REVOCATION_BLOOM_CAPACITY'], config['REVOCATION_BLOOM_ERROR_RATE'],
+                          config['REVOCATION_EXACT_MAX'],
+                          sync_interval=0 if config.get('TESTING') else config['REVOCATION_SYNC_INTERVAL'])
+    app.extensions['revocation'] = blocklist
+    metrics.gauge('revocation', lambda: get_blocklist().stats())
+
+
+def start_background(app):
+    """Prune expired log rows every REVOCATION_PRUNE_INTERVAL seconds (0 disables)."""
+    interval = app.config['REVOCATION_PRUNE_INTERVAL']
+    if interval:
+        app.extensions['revocation_prune'] = PeriodicTask(app, 'revocation-prune', interval, prune).start()
+        return app.extensions['revocation_prune']
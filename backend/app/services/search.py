@@ -0,0 +1,61 @@
+"""
+Ranked full-text search over event titles.
+
+See app/models/search.py for the index definitions per backend.
+"""
+
+import re
+from sqlalchemy import func, literal_column, table, column
+from app.extensions import db
+from app.models import Event
+from app.models.search import TEXT_SEARCH_CONFIG
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_events_fts = table('events_fts', column('rowid'))
+_events_fts_ids = table('events_fts_ids', column('id'), column('event_id'))
+
+
+def tokenize(text):
+    """Split free text into lowercase search terms; punctuation is ignored."""
+    return [token.lower() for token in _TOKEN.findall(text or '')]
+
+
+def search_query(text, criteria=()):
+    """
+    Build a query of (Event, rank) rows matching every term of ``text``.
+
+    Terms are prefix-matched, so "stand" finds "Standup". Higher rank is
+    a better match.
+
+    Args:
+        text (str): User search input
+        criteria: Extra filter expressions on Event, e.g. status or time range
+
+    Returns:
+        Query or None when ``text`` has no searchable terms
+    """
+    terms = tokenize(text)
+    if not terms:
+        return None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        vector = literal_column('events.search_vector')
+        tsquery = func.to_tsquery(TEXT_SEARCH_CONFIG, ' & '.join(f'{term}:*' for term in terms))
+        rank = func.ts_rank(vector, tsquery)
+        query = db.session.query(Event, rank.label('rank')).filter(vector.op('@@')(tsquery))
+    else:
+        # bm25() is lower-is-better; negate so both backends sort descending.
+        rank = -literal_column('bm25(events_fts)')
+        match = ' '.join(f'"{term}"*' for term in terms)
+        query = (
+            db.session.query(Event, rank.label('rank'))
+            .join(_events_fts_ids, _events_fts_ids.c.event_id == Event.id)
+            .join(_events_fts, _events_fts.c.rowid == _events_fts_ids.c.id)
+            .filter(literal_column('events_fts').op('MATCH')(match))
+        )
+
+    if criteria:
+        query = query.filter(*criteria)
+    return query.order_by(rank.desc(), Event.start_time)
@@ -0,0 +1,154 @@
+"""
+Maintenance of the materialized per-user swap counters.
+
+The adjust helpers must be called inside the same transaction as the swap
+write they describe; they never commit on their own.
+"""
+
+from collections import defaultdict
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import SwapCounter, SwapRequest, SwapStatus, ArchivedSwapRequest, Organization, User
+from app.services import tenancy
+
+COUNTER_FIELDS = ('pending_received', 'pending_sent', 'accepted')
+
+
+def adjust(user_id, **deltas):
+    """
+    Atomically add deltas to a user's counters, creating the row if needed.
+
+    Args:
+        user_id (str): Counter owner
+        **deltas: Field name to signed increment
+    """
+    values = {name: getattr(SwapCounter, name) + delta for name, delta in deltas.items() if delta}
+    if not values:
+        return
+
+    result = db.session.execute(
+        update(SwapCounter).where(SwapCounter.user_id == user_id).values(**values)
+    )
+    if result.rowcount:
+        return
+
+    initial = {name: max(deltas.get(name, 0), 0) for name in COUNTER_FIELDS}
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(SwapCounter).values(user_id=user_id, **initial))
+    except IntegrityError:
+        # Another transaction created the row first; fall back to the increment.
+        db.session.execute(
+            update(SwapCounter).where(SwapCounter.user_id == user_id).values(**values)
+        )
+
+
+def record_created(swap):
+    """Count a newly created PENDING swap for both participants."""
+    _adjust_pair(swap, requester={'pending_sent': 1}, requestee={'pending_received': 1})
+
+
+def record_resolved(swap, status):
+    """Move a PENDING swap out of the pending counters into its final state."""
+    accepted = 1 if status == SwapStatus.ACCEPTED else 0
+    _adjust_pair(
+        swap,
+        requester={'pending_sent': -1, 'accepted': accepted},
+        requestee={'pending_received': -1, 'accepted': accepted},
+    )
+
+
+def record_deleted(swap):
+    """Take a deleted swap out of the counters it was contributing to."""
+    if swap.status == SwapStatus.PENDING:
+        _adjust_pair(swap, requester={'pending_sent': -1}, requestee={'pending_received': -1})
+    elif swap.status == SwapStatus.ACCEPTED:
+        _adjust_pair(swap, requester={'accepted': -1}, requestee={'accepted': -1})
+
+
+def _adjust_pair(swap, requester, requestee):
+    # Touch rows in a stable order so concurrent swaps between the same two
+    # users cannot deadlock on the counter rows.
+    for user_id, deltas in sorted([(swap.requester_id, requester), (swap.requestee_id, requestee)]):
+        adjust(user_id, **deltas)
+
+
+def get_summary(user_id):
+    """Return the counter values for a user, zeros when no row exists yet."""
+    counter = db.session.get(SwapCounter, user_id)
+    if counter is None:
+        return {name: 0 for name in COUNTER_FIELDS}
+    return counter.to_dict()
+
+
+def compute_actual_counts():
+    """Aggregate true counter values from swap_requests, keyed by user id."""
+    actual = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    # Archived swaps are all resolved, so they only contribute to ``accepted``.
+    queries = (
+        ('pending_received', SwapRequest.requestee_id, SwapRequest.status, SwapStatus.PENDING),
+        ('pending_sent', SwapRequest.requester_id, SwapRequest.status, SwapStatus.PENDING),
+        ('accepted', SwapRequest.requester_id, SwapRequest.status, SwapStatus.ACCEPTED),
+        ('accepted', SwapRequest.requestee_id, SwapRequest.status, SwapStatus.ACCEPTED),
+        ('accepted', ArchivedSwapRequest.requester_id, ArchivedSwapRequest.status, SwapStatus.ACCEPTED),
+        ('accepted', ArchivedSwapRequest.requestee_id, ArchivedSwapRequest.status, SwapStatus.ACCEPTED),
+    )
+    for field, column, status_column, status in queries:
+        rows = db.session.query(column, func.count()).filter(status_column == status).group_by(column)
+        for user_id, count in rows:
+            actual[user_id][field] += count
+    return actual
+
+
+def _partition_users():
+    """Ids of the users whose swaps live in the current partition (see tenancy.each_partition)."""
+    org_id = tenancy.current_org_id()
+    if org_id is not None:
+        return select(User.id).where(User.org_id == org_id)
+    routed = select(Organization.id).where(Organization.schema.isnot(None))
+    return select(User.id).where(User.org_id.notin_(routed))
+
+
+def reconcile():
+    """
+    Rebuild drifted counters from the source of truth.
+
+    Counters are shared, but a routed tenant's swaps are only visible from
+    its own schema, so only the current partition's users are rebuilt.
+
+    The counter rows are locked (in user order, like ``_adjust_pair``)
+    before the swaps are counted: a swap write still in flight commits
+    after the rebuild and applies its delta on top, and one that committed
+    earlier is in the aggregates. A counter row created concurrently for a
+    user without one is left to the next run.
+
+    Returns:
+        int: Number of counter rows that were corrected or created
+    """
+    counters = (
+        SwapCounter.query.filter(SwapCounter.user_id.in_(_partition_users()))
+        .order_by(SwapCounter.user_id).with_for_update().populate_existing().all()
+    )
+    actual = compute_actual_counts()
+    fixed = 0
+
+    for counter in counters:
+        expected = actual.pop(counter.user_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        if counter.to_dict() != expected:
+            for name, value in expected.items():
+                setattr(counter, name, value)
+            fixed += 1
+    db.session.flush()
+
+    for user_id, expected in actual.items():
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(SwapCounter).values(user_id=user_id, **expected))
+            fixed += 1
+        except IntegrityError:
+            pass
+
+    db.session.commit()
+    return fixed
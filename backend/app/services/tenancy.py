@@ -0,0 +1,290 @@
+"""
+Organization (tenant) scoping, enforced centrally.
+
+Access tokens carry the user's organization in an ``org`` claim, and
+verifying a token activates that organization for the rest of the request.
+While an organization is active, a session hook adds ``org_id = <active>``
+to every ORM SELECT, UPDATE and DELETE touching a TenantScoped model,
+including primary-key lookups and joined or aliased entities, and new
+TenantScoped rows are stamped with it. Routes never filter by organization
+themselves.
+
+Without an active organization (login, registration, CLI jobs, background
+workers) nothing is filtered. ``scope(org_id)`` runs a block as one tenant.
+New rows created outside a scope take their owner's organization, or the
+default one.
+
+Large tenants can be moved to a PostgreSQL schema of their own with
+``flask route-tenant``. The schema holds the tenant's copies of
+ROUTED_TABLES. Each transaction run for that tenant sets ``search_path`` to
+the schema first, so those tables resolve there while shared tables (users,
+organizations, the outbox) fall through to ``public``. ``each_partition``
+runs maintenance jobs over the shared tables and then over every routed
+schema.
+
+Routes are cached per process for TENANT_SCHEMA_CACHE_TTL seconds, so a
+move first flags the organization and outlasts the cache. While flagged,
+the tenant's transactions read the route uncached under a share lock on
+the organization row, which the move holds exclusively until it commits:
+no transaction can write to ``public`` after its rows have moved.
+"""
+
+import re
+import time
+from uuid import UUID
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event as sa_event, inspect, select, text
+from sqlalchemy.orm import Session, with_loader_criteria
+from app.extensions import db, jwt
+from app.models import Organization, TenantScoped, User, DEFAULT_ORG_ID
+
+# Tables copied into a routed tenant's schema, parents first.
+ROUTED_TABLES = ('events', 'marketplace_slots', 'event_series', 'series_exceptions', 'swap_requests', 'event_tombstones',
+                 'events_archive', 'swap_requests_archive', 'swap_transitions', 'swap_transition_daily',
+                 'swap_bundle_slots', 'swap_daily_stats', 'swap_demand_hourly', 'swap_bundle_slots_archive')
+
+SCHEMA_NAME = re.compile(r'^[a-z_][a-z0-9_]{0,62}$')
+
+_schemas = {}
+
+
+def current_org_id():
+    """The active organization id, or None outside a tenant."""
+    return g.get('org_id') if has_app_context() else None
+
+
+def activate(org_id):
+    """Make ``org_id`` the active organization for the rest of the app context."""
+    g.org_id = org_id
+    if org_id is None:
+        return
+    session = db.session()
+    # Primary-key lookups answered from the identity map skip the filter, so
+    # rows another tenant loaded into a shared session must go.
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, TenantScoped) and inspect(obj).dict.get('org_id', org_id) != org_id:
+            session.expunge(obj)
+    if session.in_transaction():
+        _route(session.connection(), org_id)
+
+
+@contextmanager
+def scope(org_id):
+    """Run a block as ``org_id``; None runs it unfiltered."""
+    previous = g.get('org_id')
+    g.org_id = None
+    try:
+        activate(org_id)
+        yield
+    finally:
+        g.org_id = previous
+
+
+def unscoped():
+    return scope(None)
+
+
+# --- Enforcement -----------------------------------------------------------
+
+@sa_event.listens_for(Session, 'do_orm_execute')
+def _filter_to_tenant(state):
+    org_id = current_org_id()
+    if org_id is None or state.is_column_load or state.is_relationship_load:
+        return
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    state.statement = state.statement.options(with_loader_criteria(
+        TenantScoped, lambda cls: cls.org_id == org_id, include_aliases=True))
+
+
+def _owner_org(session, obj):
+    owner_id = getattr(obj, 'user_id', None) or getattr(obj, 'requester_id', None)
+    owner = session.get(User, owner_id) if owner_id else None
+    return owner.org_id if owner else None
+
+
+@sa_event.listens_for(Session, 'before_flush')
+def _stamp_new_rows(session, flush_context, instances):
+    new = [obj for obj in session.new if isinstance(obj, TenantScoped) and obj.org_id is None]
+    if not new:
+        return
+    org_id = current_org_id()
+    with session.no_autoflush:
+        for obj in new:
+            obj.org_id = org_id or _owner_org(session, obj) or DEFAULT_ORG_ID
+
+
+@jwt.additional_claims_loader
+def _org_claim(identity):
+    user = db.session.get(User, identity)
+    return {'org': user.org_id} if user else {}
+
+
+@jwt.token_verification_loader
+def _activate_token_org(jwt_header, jwt_data):
+    org_id = jwt_data.get('org')
+    if org_id is None:
+        # Tokens issued before organizations existed
+        with unscoped():
+            user = db.session.get(User, jwt_data['sub'])
+        org_id = user.org_id if user else DEFAULT_ORG_ID
+    activate(org_id)
+    return True
+
+
+# --- Invites ---------------------------------------------------------------
+
+def _invites():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='org-invite')
+
+
+def make_invite(org_id):
+    """Signed token that lets its holder register into ``org_id``."""
+    return _invites().dumps({'org': org_id})
+
+
+def invited_org(token):
+    """The Organization an invite token is for, or None if invalid or expired."""
+    try:
+        org_id = _invites().loads(token, max_age=current_app.config['ORG_INVITE_TTL'])['org']
+    except (BadSignature, KeyError, TypeError):
+        return None
+    return db.session.get(Organization, org_id)
+
+
+# --- Schema routing --------------------------------------------------------
+
+def _schema_for(connection, org_id):
+    now = time.monotonic()
+    cached = _schemas.get(org_id)
+    if cached is None or cached[1] < now:
+        row = connection.execute(
+            select(Organization.schema, Organization.routing_pending).where(Organization.id == org_id)
+        ).first()
+        if row is not None and row.routing_pending:
+            # Waits for a move in progress and returns the route it committed.
+            return connection.execute(
+                select(Organization.schema).where(Organization.id == org_id).with_for_update(read=True)
+            ).scalar()
+        schema = row.schema if row is not None else None
+        cached = _schemas[org_id] = (schema, now + current_app.config['TENANT_SCHEMA_CACHE_TTL'])
+    return cached[0]
+
+
+def _route(connection, org_id):
+    if connection.dialect.name != 'postgresql':
+        return
+    schema = _schema_for(connection, org_id)
+    if schema:
+        connection.exec_driver_sql(f'SET LOCAL search_path TO "{schema}", public')
+
+
+@sa_event.listens_for(Session, 'after_begin')
+def _route_transaction(session, transaction, connection):
+    org_id = current_org_id()
+    if org_id is not None:
+        _route(connection, org_id)
+
+
+def routed_orgs():
+    with unscoped():
+        return Organization.query.filter(Organization.schema.isnot(None)).order_by(Organization.slug).all()
+
+
+def each_partition(fn, *args, **kwargs):
+    """
+    Run a maintenance job over the shared tables, then once per routed schema.
+
+    Returns:
+        list: (organization slug or None, result) per run
+    """
+    with unscoped():
+        results = [(None, fn(*args, **kwargs))]
+    for org in routed_orgs():
+        with scope(org.id):
+            results.append((org.slug, fn(*args, **kwargs)))
+            db.session.rollback()
+    return results
+
+
+def _set_routing_pending(org_id, pending):
+    with db.engine.begin() as connection:
+        connection.execute(Organization.__table__.update()
+                           .where(Organization.id == org_id).values(routing_pending=pending))
+    _schemas.pop(org_id, None)
+
+
+def route_to_schema(org, schema, settle=None):
+    """
+    Move an organization's rows from the shared tables into ``schema``.
+
+    PostgreSQL only. Flags the organization and waits ``settle`` seconds
+    (default TENANT_SCHEMA_CACHE_TTL) until no process routes it from its
+    cache. Then, in one transaction holding the organization row (the
+    tenant's transactions wait) and the shared tables against writes,
+    creates the schema and the tenant tables in it, copies the rows and
+    deletes them from ``public``. Transactions that began before the flag
+    and run longer than ``settle`` are not covered.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        raise RuntimeError('Schema routing requires PostgreSQL')
+    if not SCHEMA_NAME.match(schema) or schema == 'public':
+        raise ValueError(f'Invalid schema name: {schema}')
+    if org.schema:
+        raise ValueError(f'{org.slug} is already routed to {org.schema}')
+
+    tables = [db.metadata.tables[name] for name in ROUTED_TABLES]
+    _set_routing_pending(org.id, True)
+    try:
+        time.sleep(current_app.config['TENANT_SCHEMA_CACHE_TTL'] + 1 if settle is None else settle)
+        _move_rows(org, schema, tables)
+    except BaseException:
+        _set_routing_pending(org.id, False)
+        raise
+    _schemas.pop(org.id, None)
+
+
+def _move_rows(org, schema, tables):
+    with db.engine.begin() as connection:
+        connection.execute(select(Organization.id).where(Organization.id == org.id).with_for_update())
+        # Readers carry on; writers of any tenant wait until the move commits,
+        # so nothing lands between the copy and the delete.
+        connection.exec_driver_sql(
+            f'LOCK TABLE {", ".join(f"public.{table.name}" for table in tables)} IN SHARE ROW EXCLUSIVE MODE')
+        connection.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        # Unqualified DDL creates the tables in the schema; foreign keys to
+        # shared tables (users) resolve to public.
+        connection.exec_driver_sql(f'SET LOCAL search_path TO "{schema}", public')
+        db.metadata.create_all(connection, tables=tables, checkfirst=False)
+
+        # Raw SQL binds the native uuid the GUID column type would send.
+        params = {'org_id': UUID(org.id)}
+        in_org = {name: 'org_id = :org_id' for name in ROUTED_TABLES}
+        in_org['series_exceptions'] = 'series_id IN (SELECT id FROM public.event_series WHERE org_id = :org_id)'
+        for table in tables:
+            columns = ', '.join(column.name for column in table.columns)
+            connection.execute(text(
+                f'INSERT INTO "{schema}".{table.name} ({columns}) '
+                f'SELECT {columns} FROM public.{table.name} WHERE {in_org[table.name]}'
+            ), params)
+        for table in reversed(tables):
+            connection.execute(text(f'DELETE FROM public.{table.name} WHERE {in_org[table.name]}'), params)
+        connection.execute(Organization.__table__.update()
+                           .where(Organization.id == org.id).values(schema=schema, routing_pending=False))
+
+
+def _clear(*_):
+    g.pop('org_id', None)
+
+
+def init_app(app):
+    """
+    Clear the active organization around every request.
+
+    Tests and batch sub-requests run several requests in one app context,
+    so ``g`` alone would carry one request's organization into the next.
+    """
+    app.before_request(_clear)
+    app.teardown_request(_clear)
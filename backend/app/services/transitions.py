@@ -0,0 +1,156 @@
+"""
+Append-only swap transition log (``swap_transitions``).
+
+Write paths record a row for every swap created, accepted, rejected or
+expired and for every slot that changes owner. Rows are buffered on the
+session and written with a single multi-row INSERT just before the
+transaction commits, so a request or sweeper batch costs one statement
+however many transitions it records, and the log commits or rolls back
+with the change it describes.
+
+``compact`` keeps the log cheap to scan: rows past
+SWAP_TRANSITION_RETENTION are folded into per-day counts
+(``swap_transition_daily``) and deleted in batches. It never deletes rows
+the analytics rollup (app/services/analytics.py) has not read yet.
+"""
+
+import heapq
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import SwapTransition, SwapTransitionDaily
+from app.models.transition import SWAP_CREATED, SWAP_ACCEPTED, SWAP_REJECTED, SWAP_EXPIRED, OWNER_CHANGED
+from app.services import analytics
+from app.utils.metrics import metrics
+
+log = SwapTransition.__table__
+daily = SwapTransitionDaily.__table__
+
+KIND_BY_STATUS = {'ACCEPTED': SWAP_ACCEPTED, 'REJECTED': SWAP_REJECTED, 'EXPIRED': SWAP_EXPIRED}
+
+
+def _pending(session):
+    return session.info.setdefault('swap_transitions', [])
+
+
+def _append(kind, org_id, swap_id, from_user_id, to_user_id, slot_id, other_slot_id=None, actor_id=None):
+    _pending(db.session()).append({
+        'kind': kind, 'org_id': org_id, 'swap_id': swap_id, 'actor_id': actor_id,
+        'from_user_id': from_user_id, 'to_user_id': to_user_id,
+        'slot_id': slot_id, 'other_slot_id': other_slot_id, 'created_at': datetime.utcnow(),
+    })
+
+
+def record_swap(swap, kind=None, actor_id=None):
+    """
+    Log a swap's transition to its current status. Does not commit.
+
+    The swap must be flushed (it needs its id and organization); ``kind``
+    defaults to the one matching ``swap.status``, or swap.created.
+    """
+    kind = kind or KIND_BY_STATUS.get(swap.status.name, SWAP_CREATED)
+    _append(kind, swap.org_id, swap.id, swap.requester_id, swap.requestee_id,
+            swap.requester_slot_id, swap.requestee_slot_id, actor_id)
+
+
+def record_owner_change(swap, event, new_owner_id, actor_id=None):
+    """Log ``event`` moving to ``new_owner_id``; call before changing ``event.user_id``."""
+    _append(OWNER_CHANGED, event.org_id, swap.id, event.user_id, new_owner_id, event.id, actor_id=actor_id)
+
+
+def record_expired(rows):
+    """Log expiries found by the sweeper: rows of (id, org_id, requester, requestee, slots)."""
+    for row in rows:
+        _append(SWAP_EXPIRED, row.org_id, row.id, row.requester_id, row.requestee_id,
+                row.requester_slot_id, row.requestee_slot_id)
+
+
+@sa_event.listens_for(Session, 'before_commit')
+def _write_pending(session):
+    rows = session.info.pop('swap_transitions', None)
+    if rows:
+        session.connection().execute(insert(log), rows)
+        metrics.incr('transitions.written', len(rows))
+
+
+@sa_event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop('swap_transitions', None)
+
+
+def _page(criteria, before, limit):
+    query = SwapTransition.query.filter(criteria)
+    if before is not None:
+        query = query.filter(SwapTransition.id < before)
+    return query.order_by(SwapTransition.id.desc()).limit(limit).all()
+
+
+def for_user(user_id, before=None, limit=50):
+    """Newest-first transitions where ``user_id`` is either party; one index scan per side."""
+    sides = (_page(SwapTransition.from_user_id == user_id, before, limit),
+             _page(SwapTransition.to_user_id == user_id, before, limit))
+    return list(heapq.merge(*sides, key=lambda row: row.id, reverse=True))[:limit]
+
+
+def for_slot(slot_id, before=None, limit=50):
+    """Newest-first transitions involving slot ``slot_id``."""
+    sides = (_page(SwapTransition.slot_id == slot_id, before, limit),
+             _page(SwapTransition.other_slot_id == slot_id, before, limit))
+    return list(heapq.merge(*sides, key=lambda row: row.id, reverse=True))[:limit]
+
+
+def is_party(slot_id, user_id):
+    """Whether ``user_id`` was either party to any transition involving slot ``slot_id``."""
+    return db.session.query(SwapTransition.query.filter(
+        or_(SwapTransition.slot_id == slot_id, SwapTransition.other_slot_id == slot_id),
+        or_(SwapTransition.from_user_id == user_id, SwapTransition.to_user_id == user_id),
+    ).exists()).scalar()
+
+
+def _add_daily(org_id, day, kind, count):
+    keys = (daily.c.org_id == org_id, daily.c.day == day, daily.c.kind == kind)
+    if db.session.execute(update(daily).where(*keys).values(count=daily.c.count + count)).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(daily).values(org_id=org_id, day=day, kind=kind, count=count))
+    except IntegrityError:
+        db.session.execute(update(daily).where(*keys).values(count=daily.c.count + count))
+
+
+def compact(older_than, batch_size=5000):
+    """
+    Fold one batch of log rows created before ``older_than`` into the daily
+    counts and delete them, in one transaction.
+
+    Once the analytics rollup has run, rows it has not read yet are kept.
+
+    Returns:
+        int: Log rows compacted
+    """
+    criteria = [log.c.created_at < older_than]
+    rolled_up = analytics.rolled_up_to()
+    if rolled_up is not None:
+        criteria.append(log.c.id <= rolled_up)
+    rows = db.session.execute(
+        select(log.c.id, log.c.org_id, log.c.kind, log.c.created_at)
+        .where(*criteria)
+        .order_by(log.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.session.rollback()
+        return 0
+
+    counts = Counter((row.org_id, row.created_at.date(), row.kind) for row in rows)
+    for (org_id, day, kind), count in sorted(counts.items()):
+        _add_daily(org_id, day, kind, count)
+    db.session.execute(delete(log).where(log.c.id.in_([row.id for row in rows])))
+    db.session.commit()
+    metrics.incr('transitions.compacted', len(rows))
+    return len(rows)
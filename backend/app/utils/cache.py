@@ -0,0 +1,196 @@
+"""
+Key-value cache backends and single-flight loading.
+
+Values must be JSON-serializable so the in-process and shared backends are
+interchangeable.
+
+Both backends also keep an invalidation version per key, next to the
+entries: ``invalidate`` bumps it, and ``set_if_version`` stores a value only
+if the version has not moved since the loader read it with ``version``. A
+load that raced an invalidation anywhere sharing the backend is therefore
+dropped rather than cached until its TTL runs out.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # optional: only needed for a shared cache
+    redis = None
+
+# Invalidation versions kept by the in-process backend; older ones are forgotten.
+MAX_TRACKED_VERSIONS = 10000
+
+# Lifetime of a shared version counter; must outlast any single load.
+VERSION_TTL = 3600
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a size bound and per-entry TTL."""
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._versions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _put(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value):
+        with self._lock:
+            self._put(key, value)
+
+    def version(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def set_if_version(self, key, value, version):
+        """Store ``value`` unless ``key`` was invalidated since ``version`` was read."""
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return False
+            self._put(key, value)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def invalidate(self, *keys):
+        """Delete ``keys`` and bump their versions."""
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._versions.move_to_end(key)
+            while len(self._versions) > MAX_TRACKED_VERSIONS:
+                self._versions.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """Shared backend on a Redis-protocol server; entries expire after ``ttl``."""
+
+    def __init__(self, url, ttl=60, prefix='slotswapper:'):
+        if redis is None:
+            raise RuntimeError('The redis package is required for a shared cache backend')
+        self.ttl = ttl
+        self.prefix = prefix
+        self.version_prefix = f'{prefix}version:'
+        self.evictions = 0
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self.prefix + key for key in keys))
+
+    def version(self, key):
+        return int(self._client.get(self.version_prefix + key) or 0)
+
+    def set_if_version(self, key, value, version):
+        """Store ``value`` unless ``key`` was invalidated since ``version`` was read."""
+        version_key = self.version_prefix + key
+        with self._client.pipeline() as pipe:
+            try:
+                # An invalidation between WATCH and EXEC aborts the SET.
+                pipe.watch(version_key)
+                if int(pipe.get(version_key) or 0) != version:
+                    return False
+                pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+                pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    def invalidate(self, *keys):
+        """Delete ``keys`` and bump their versions, in one transaction."""
+        if not keys:
+            return
+        pipe = self._client.pipeline()
+        for key in keys:
+            pipe.incr(self.version_prefix + key)
+            pipe.expire(self.version_prefix + key, VERSION_TTL)
+        pipe.delete(*(self.prefix + key for key in keys))
+        pipe.execute()
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            if not key.decode().startswith(self.version_prefix):
+                self._client.delete(key)
+
+    def __len__(self):
+        return sum(1 for key in self._client.scan_iter(self.prefix + '*')
+                   if not key.decode().startswith(self.version_prefix))
+
+
+class SingleFlight:
+    """
+    Collapse concurrent loads of the same key into one call.
+
+    The first caller runs the loader; callers arriving while it runs wait
+    for its result instead of loading again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
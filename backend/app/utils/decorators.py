@@ -3,9 +3,45 @@ Custom decorators for route protection and validation.
 """
 
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask import g, jsonify, request
+from flask_jwt_extended import view_decorators, verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended.internal_utils import custom_verification_for_token
 from app.models import User
+from app.utils import tracing
+
+# Environ key under which a /api/batch sub-request carries the (header,
+# claims) of the access token its batch already verified.
+BATCH_JWT = 'batch.jwt'
+
+
+def _reuse_batch_jwt(verify):
+    """
+    Wrap ``verify_jwt_in_request`` so batch sub-requests skip the decode and
+    blocklist check the batch did once.
+
+    Only the token verification callbacks run again, as they activate the
+    caller's organization in the sub-request's context. Routes needing a
+    refresh or fresh token verify as usual.
+    """
+    @wraps(verify)
+    def wrapper(optional=False, fresh=False, refresh=False, locations=None, verify_type=True,
+                skip_revocation_check=False):
+        verified = request.environ.get(BATCH_JWT)
+        if verified is None or fresh or (refresh and verify_type):
+            return verify(optional=optional, fresh=fresh, refresh=refresh, locations=locations,
+                          verify_type=verify_type, skip_revocation_check=skip_revocation_check)
+        jwt_header, jwt_data = verified
+        custom_verification_for_token(jwt_header, jwt_data)
+        g._jwt_extended_jwt_user = None
+        g._jwt_extended_jwt_header = jwt_header
+        g._jwt_extended_jwt = jwt_data
+        g._jwt_extended_jwt_location = 'headers'
+        return jwt_header, jwt_data
+    wrapper._reuses_batch_jwt = True
+    return wrapper
+
+
+verify_jwt = _reuse_batch_jwt(verify_jwt_in_request)
 
 
 def jwt_required_with_user(fn):
@@ -21,13 +57,20 @@ def jwt_required_with_user(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         # Verify the JWT token is present and valid
-        verify_jwt_in_request()
+        with tracing.span('jwt.verify'):
+            verify_jwt()
         
         # Get the user identity from the token
         current_user_id = get_jwt_identity()
         
-        # Fetch the user from database
-        current_user = User.query.get(current_user_id)
+        # Fetch the user from database, once per batch (see app/routes/batch.py)
+        batch_users = g.get('batch_users')
+        if batch_users is not None and current_user_id in batch_users:
+            current_user = batch_users[current_user_id]
+        else:
+            current_user = User.query.get(current_user_id)
+            if batch_users is not None:
+                batch_users[current_user_id] = current_user
         
         if not current_user:
             return jsonify({'message': 'User not found'}), 404
@@ -36,3 +79,9 @@ def jwt_required_with_user(fn):
         return fn(current_user=current_user, *args, **kwargs)
     
     return wrapper
+
+
+def init_app(app):
+    """Route flask_jwt_extended's ``jwt_required`` through the batch shortcut too."""
+    if not getattr(view_decorators.verify_jwt_in_request, '_reuses_batch_jwt', False):
+        view_decorators.verify_jwt_in_request = _reuse_batch_jwt(view_decorators.verify_jwt_in_request)
@@ -0,0 +1,94 @@
+"""
+Minimal in-process metrics registry.
+
+Counters and rate meters are updated from request handlers and background
+threads; gauges are callables evaluated when a snapshot is taken. Exposed
+through ``GET /api/ops/metrics`` to holders of a metrics token.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second buckets."""
+
+    def __init__(self, window=60):
+        self.window = window
+        self._buckets = deque()
+
+    def mark(self, count=1, now=None):
+        second = int(now if now is not None else time.time())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([second, count])
+        self._trim(second)
+
+    def rate(self, now=None):
+        second = int(now if now is not None else time.time())
+        self._trim(second)
+        return sum(count for _, count in self._buckets) / self.window
+
+    def _trim(self, second):
+        while self._buckets and self._buckets[0][0] <= second - self.window:
+            self._buckets.popleft()
+
+
+class Metrics:
+    """Thread-safe registry of counters, rate meters and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._meters = {}
+        self._gauges = {}
+
+    def incr(self, name, value=1):
+        """Add ``value`` to counter ``name`` and to its rate meter, if any."""
+        with self._lock:
+            self._counters[name] += value
+            meter = self._meters.get(name)
+            if meter is not None:
+                meter.mark(value)
+
+    def meter(self, name, window=60):
+        """Track a per-second rate for counter ``name``."""
+        with self._lock:
+            self._meters.setdefault(name, RateMeter(window))
+
+    def gauge(self, name, fn):
+        """Register a callable evaluated on every snapshot."""
+        self._gauges[name] = fn
+
+    def get(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        """
+        Return current metric values.
+
+        Gauges run in the caller's context (e.g. inside an app context when
+        they query the database); a failing gauge reports None.
+        """
+        with self._lock:
+            data = dict(self._counters)
+            for name, meter in self._meters.items():
+                data[f'{name}.per_second'] = round(meter.rate(), 3)
+        for name, fn in self._gauges.items():
+            try:
+                data[name] = fn()
+            except Exception:
+                data[name] = None
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            for name, meter in self._meters.items():
+                self._meters[name] = RateMeter(meter.window)
+
+
+metrics = Metrics()
@@ -0,0 +1,90 @@
+"""
+Keyset (seek) pagination helpers.
+
+Cursors encode the ``(created_at, id)`` of the last row returned so the next
+page continues with an index range scan instead of an OFFSET.
+"""
+
+import base64
+import heapq
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(created_at, row_id):
+    raw = f'{created_at.isoformat()}|{row_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, row_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def keyset_filter(query, model, cursor):
+    """Restrict ``query`` to rows strictly after ``cursor`` in descending order."""
+    if not cursor:
+        return query
+    created_at, row_id = decode_cursor(cursor)
+    return query.filter(or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < row_id),
+    ))
+
+
+def keyset_rows(query, model, cursor=None, limit=50):
+    """Fetch up to ``limit + 1`` rows after ``cursor``, newest first."""
+    query = keyset_filter(query, model, cursor)
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+
+def finish_page(rows, limit):
+    """Trim an over-fetched, ordered row list to a page and its next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+def keyset_page(query, model, cursor=None, limit=50):
+    """
+    Fetch one page ordered by ``(created_at, id)`` descending.
+
+    Args:
+        query: Filtered query over ``model``
+        model: Mapped class with ``created_at`` and ``id`` columns
+        cursor (str): Cursor returned by the previous page, if any
+        limit (int): Maximum number of rows to return
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+    """
+    return finish_page(keyset_rows(query, model, cursor, limit), limit)
+
+
+def keyset_merge(sources, cursor=None, limit=50):
+    """
+    Fetch one page across several tables sharing the same cursor space.
+
+    Each source is probed with its own index range scan and the results are
+    merged, so the cost stays proportional to the page size.
+
+    Args:
+        sources: Iterable of (query, model) pairs
+        cursor (str): Cursor returned by the previous page, if any
+        limit (int): Maximum number of rows to return
+
+    Returns:
+        tuple: (rows, next_cursor)
+    """
+    runs = [keyset_rows(query, model, cursor, limit) for query, model in sources]
+    merged = heapq.merge(*runs, key=lambda row: (row.created_at, row.id), reverse=True)
+    return finish_page(list(merged)[:limit + 1], limit)
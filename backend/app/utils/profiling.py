@@ -0,0 +1,186 @@
+"""
+On-demand profiling of live requests.
+
+A request is profiled when it carries a valid signed token, either in the
+``X-Profile`` header or the ``_profile`` query parameter, or when it hits
+PROFILER_SAMPLE_ENDPOINT and wins a PROFILER_SAMPLE_RATE draw. Tokens are
+minted with ``flask profile-token`` and are HMACs of an expiry time under
+PROFILER_SECRET, so only holders of the secret can trigger profiling.
+
+Two output formats:
+
+* ``folded`` (default): a wall-clock stack sampler reads the request
+  thread's frame every PROFILER_INTERVAL seconds and writes collapsed
+  stacks (``a;b;c count``), the input of flamegraph.pl and speedscope.
+* ``pstats``: a cProfile run saved with ``marshal``, for ``pstats``/snakeviz.
+  Only one cProfile can be active per process, so concurrent ``pstats``
+  requests are skipped.
+
+Files go to PROFILER_DIR, and the oldest are deleted beyond
+PROFILER_MAX_FILES or PROFILER_MAX_BYTES. With neither a secret nor a
+sampled endpoint configured, no hooks are installed at all.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('folded', 'pstats')
+
+
+def make_token(secret, ttl):
+    """Token allowing profiling for ``ttl`` seconds."""
+    expires = str(int(time.time() + ttl))
+    signature = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f'{expires}.{signature}'
+
+
+def verify_token(secret, token, now=None):
+    expires, _, signature = (token or '').partition('.')
+    if not expires.isdigit() or not signature:
+        return False
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature) and int(expires) > (now or time.time())
+
+
+class StackSampler:
+    """Collect collapsed stacks of one thread on a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+class PstatsProfiler:
+    """cProfile for the current thread."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path):
+        self.profile.dump_stats(path)
+
+
+def prune(directory, max_files, max_bytes):
+    """Delete the oldest profiles until the directory is within both bounds."""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    while entries and (len(entries) > max_files or total > max_bytes):
+        _, size, path = entries.pop(0)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def _requested_format(config):
+    fmt = request.headers.get('X-Profile-Format') or request.args.get('_profile_format')
+    return fmt if fmt in FORMATS else config['PROFILER_FORMAT']
+
+
+def _should_profile(config):
+    secret = config['PROFILER_SECRET']
+    if secret:
+        token = request.headers.get('X-Profile') or request.args.get('_profile')
+        if token and verify_token(secret, token):
+            return True
+    return (request.endpoint is not None
+            and request.endpoint == config['PROFILER_SAMPLE_ENDPOINT']
+            and random.random() < config['PROFILER_SAMPLE_RATE'])
+
+
+def init_app(app):
+    """Install the profiling hooks, only when profiling can be triggered."""
+    config = app.config
+    if not config['PROFILER_SECRET'] and not (config['PROFILER_SAMPLE_ENDPOINT'] and config['PROFILER_SAMPLE_RATE']):
+        return
+
+    directory = config['PROFILER_DIR']
+    os.makedirs(directory, exist_ok=True)
+
+    @app.before_request
+    def _start_profile():
+        if not _should_profile(config):
+            return
+        fmt = _requested_format(config)
+        if fmt == 'pstats':
+            try:
+                profiler = PstatsProfiler().start()
+            except ValueError:
+                logger.warning('Skipping pstats profile of %s: another profiler is active', request.path)
+                return
+        else:
+            profiler = StackSampler(threading.get_ident(), config['PROFILER_INTERVAL']).start()
+        name = f'{time.strftime("%Y%m%dT%H%M%S")}-{request.endpoint or "unknown"}-{os.urandom(4).hex()}.{fmt}'
+        request.environ['profiling'] = (profiler, name)
+
+    @app.after_request
+    def _tag_profile(response):
+        started = request.environ.get('profiling')
+        if started is not None:
+            response.headers['X-Profile-File'] = started[1]
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        started = request.environ.pop('profiling', None)
+        if started is None:
+            return
+        profiler, name = started
+        profiler.stop()
+        try:
+            profiler.write(os.path.join(directory, name))
+            prune(directory, config['PROFILER_MAX_FILES'], config['PROFILER_MAX_BYTES'])
+        except OSError:
+            logger.exception('Failed to write profile %s', name)
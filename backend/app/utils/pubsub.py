@@ -0,0 +1,260 @@
+"""
+Pub/sub backplanes for fanning messages out across processes and nodes.
+
+A backplane has two operations: ``publish(channel, payload)`` and
+``listen(channel)``, a blocking generator of payloads (bytes). Backends:
+
+* ``redis://host:port/db`` - any server speaking the Redis protocol (RESP),
+  via a small built-in client, so no redis package is needed.
+* ``memory://name`` - an in-process hub for tests; backplanes created with
+  the same name share it.
+
+``StandInServer`` implements the RESP pub/sub subset (PUBLISH, SUBSCRIBE,
+PING, SELECT, AUTH), so the Redis backend can be exercised in tests,
+benchmarks and local development without a Redis install.
+"""
+
+import logging
+import queue
+import socket
+import socketserver
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+# --- RESP encoding ---------------------------------------------------------
+
+def encode_command(*args):
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+class RespError(Exception):
+    """An error reply from the server."""
+
+
+def read_reply(stream):
+    """Read one RESP value from a buffered binary stream."""
+    line = stream.readline()
+    if not line:
+        raise ConnectionError('Connection closed')
+    kind, rest = line[:1], line[1:-2]
+    if kind == b'+':
+        return rest
+    if kind == b'-':
+        raise RespError(rest.decode())
+    if kind == b':':
+        return int(rest)
+    if kind == b'$':
+        length = int(rest)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if kind == b'*':
+        length = int(rest)
+        return None if length < 0 else [read_reply(stream) for _ in range(length)]
+    raise RespError(f'Unexpected reply: {line!r}')
+
+
+# --- Backends --------------------------------------------------------------
+
+class RespBackplane:
+    """Publish and subscribe over the Redis protocol."""
+
+    def __init__(self, url, reconnect_delay=1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = sock.makefile('rb')
+        if self.password:
+            sock.sendall(encode_command('AUTH', self.password))
+            read_reply(stream)
+        if self.db:
+            sock.sendall(encode_command('SELECT', self.db))
+            read_reply(stream)
+        return sock, stream
+
+    def publish(self, channel, payload):
+        """Publish ``payload``; retries once on a fresh connection. Returns subscriber count."""
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._conn is None:
+                        self._conn = self._connect()
+                    sock, stream = self._conn
+                    sock.sendall(encode_command('PUBLISH', channel, payload))
+                    return read_reply(stream)
+                except (OSError, ConnectionError):
+                    self.close()
+                    if attempt == 2:
+                        raise
+
+    def listen(self, channel):
+        """Yield payloads published on ``channel``, reconnecting on failure."""
+        while True:
+            try:
+                sock, stream = self._connect()
+            except OSError:
+                logger.warning('Backplane %s:%s unreachable; retrying', self.host, self.port)
+                time.sleep(self.reconnect_delay)
+                continue
+            try:
+                sock.sendall(encode_command('SUBSCRIBE', channel))
+                while True:
+                    reply = read_reply(stream)
+                    if isinstance(reply, list) and reply and reply[0] == b'message':
+                        yield reply[2]
+            except (OSError, ConnectionError):
+                logger.warning('Backplane subscription to %s lost; reconnecting', channel)
+                time.sleep(self.reconnect_delay)
+            finally:
+                sock.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn[0].close()
+            self._conn = None
+
+
+class MemoryBackplane:
+    """In-process hub; every backplane created with the same name shares subscribers."""
+
+    _hubs = {}
+    _hubs_lock = threading.Lock()
+
+    def __init__(self, name='default'):
+        with self._hubs_lock:
+            self._subscribers = self._hubs.setdefault(name, {})
+        self._lock = threading.Lock()
+
+    def publish(self, channel, payload):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        subscribers = list(self._subscribers.get(channel, ()))
+        for q in subscribers:
+            q.put(payload)
+        return len(subscribers)
+
+    def subscribers(self, channel):
+        return len(self._subscribers.get(channel, ()))
+
+    def listen(self, channel):
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(q)
+        try:
+            while True:
+                yield q.get()
+        finally:
+            with self._lock:
+                self._subscribers[channel].remove(q)
+
+
+def from_url(url):
+    if url.startswith('memory://'):
+        return MemoryBackplane(url[len('memory://'):] or 'default')
+    if url.startswith(('redis://', 'resp://')):
+        return RespBackplane(url)
+    raise ValueError(f'Unsupported backplane URL: {url}')
+
+
+# --- Local stand-in server -------------------------------------------------
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server
+        subscribed = []
+        write_lock = threading.Lock()
+
+        def send(data):
+            with write_lock:
+                self.wfile.write(data)
+                self.wfile.flush()
+
+        try:
+            while True:
+                command = read_reply(self.rfile)
+                if not isinstance(command, list) or not command:
+                    send(b'-ERR protocol error\r\n')
+                    continue
+                name = command[0].upper()
+                if name == b'PUBLISH':
+                    channel, payload = command[1], command[2]
+                    with server.lock:
+                        targets = list(server.channels.get(channel, ()))
+                    message = b'*3\r\n$7\r\nmessage\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n' % (
+                        len(channel), channel, len(payload), payload)
+                    delivered = 0
+                    for target in targets:
+                        try:
+                            target(message)
+                            delivered += 1
+                        except OSError:
+                            pass
+                    send(b':%d\r\n' % delivered)
+                elif name == b'SUBSCRIBE':
+                    for channel in command[1:]:
+                        with server.lock:
+                            server.channels.setdefault(channel, []).append(send)
+                        subscribed.append(channel)
+                        send(b'*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:%d\r\n' % (
+                            len(channel), channel, len(subscribed)))
+                elif name == b'PING':
+                    send(b'+PONG\r\n')
+                elif name in (b'SELECT', b'AUTH'):
+                    send(b'+OK\r\n')
+                else:
+                    send(b'-ERR unknown command\r\n')
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with server.lock:
+                for channel in subscribed:
+                    server.channels[channel].remove(send)
+
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    """Minimal Redis-protocol pub/sub server for tests, benchmarks and local runs."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _StandInHandler)
+        self.channels = {}
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f'redis://{host}:{port}/0'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='resp-stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
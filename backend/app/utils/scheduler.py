@@ -0,0 +1,47 @@
+"""
+In-process periodic job runner.
+"""
+
+import logging
+import threading
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run ``fn`` every ``interval`` seconds on a daemon thread inside an app context.
+
+    Safe to run in several processes at once as long as ``fn`` itself is
+    (e.g. it claims rows with SKIP LOCKED or uses idempotent updates).
+    """
+
+    def __init__(self, app, name, interval, fn):
+        self.app = app
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.fn()
+                except Exception:
+                    logger.exception('Periodic task %s failed', self.name)
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
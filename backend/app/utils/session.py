@@ -0,0 +1,33 @@
+"""
+Commit helpers for write handlers.
+
+The session expires every loaded object on commit, so a handler that
+serializes what it just wrote pays a SELECT per object and per
+relationship to read back values it already holds. Write handlers commit
+with ``commit_keep_loaded`` instead and build the response from memory.
+
+Expire-on-commit stays the session default. Archival, expiry and the
+counters change mapped rows with Core statements, so objects left
+unexpired could go stale.
+"""
+
+from app.extensions import db
+
+
+def commit_keep_loaded():
+    """
+    Commit without expiring loaded objects.
+
+    Safe when the flushed state is the committed state. It is here: every
+    column of the written models is filled client-side (ids, timestamps,
+    change_seq) and none has a server default, so there is nothing for the
+    database to hand back. The request session is removed at teardown, so
+    nothing outlives the request.
+    """
+    session = db.session()
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
@@ -0,0 +1,117 @@
+"""
+SQLite tuning for single-node deployments (the 'sqlite' config profile).
+
+Each new connection gets the configured PRAGMAs: WAL journaling, so
+readers and the writer never block each other; synchronous=NORMAL, which
+syncs at checkpoints rather than every commit (a power loss can lose the
+last commits but never corrupts the file); a busy timeout; a memory-mapped
+read window; and a page cache sized in KiB.
+
+SQLite allows one writer at a time. Left alone, concurrent writers poll
+for the lock inside ``busy_timeout``, and a transaction that read before
+writing fails at once with "database is locked" if another writer
+committed in between. With SQLITE_SERIALIZE_WRITES, transactions that may
+write (requests other than GET/HEAD/OPTIONS, and everything outside a
+request: workers, sweepers, CLI jobs) queue on one process-wide lock and
+open with BEGIN IMMEDIATE, so they run one at a time. Read-only requests
+open a deferred transaction and read their WAL snapshot concurrently. A
+write inside a read-only transaction (a batch mixing GETs and POSTs)
+takes the lock when it gets there, as SQLite would without it. The lock
+is released when the connection returns to the pool, which the session
+does on commit, rollback and teardown.
+
+The lock orders writers within one process; between processes only
+``busy_timeout`` applies, so the profile expects a single app process.
+"""
+
+import threading
+from flask import has_request_context, request
+from sqlalchemy import event as sa_event
+from app.extensions import db
+from app.utils.metrics import metrics
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Key in the pooled connection's ``info`` while it holds the writer lock.
+HOLDS_WRITER = 'sqlite_writer'
+
+
+def pragmas(config):
+    """``(name, value)`` pairs to set on every new connection."""
+    settings = [
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT_MS']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+        # A negative cache_size is in KiB rather than pages.
+        ('cache_size', -config['SQLITE_CACHE_SIZE_KB'] if config['SQLITE_CACHE_SIZE_KB'] else None),
+        ('foreign_keys', config['SQLITE_FOREIGN_KEYS']),
+    ]
+    return [(name, {True: 'ON', False: 'OFF'}.get(value, value))
+            for name, value in settings if value is not None]
+
+
+def _may_write():
+    return not has_request_context() or request.method not in READ_METHODS
+
+
+class WriterLock:
+    """Serializes the write transactions of one engine within the process."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    def _acquire(self, info):
+        if info.get(HOLDS_WRITER):
+            return
+        # On timeout carry on unlocked; SQLite's busy_timeout has the last word.
+        if self._lock.acquire(timeout=self.timeout):
+            info[HOLDS_WRITER] = True
+        else:
+            metrics.incr('sqlite.writer_lock_timeouts')
+
+    def begin(self, connection):
+        if _may_write():
+            self._acquire(connection.info)
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        else:
+            connection.exec_driver_sql('BEGIN')
+
+    def before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany):
+        if not connection.info.get(HOLDS_WRITER) and statement.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+            metrics.incr('sqlite.write_in_read_transaction')
+            self._acquire(connection.info)
+
+    def checkin(self, dbapi_connection, connection_record):
+        if connection_record.info.pop(HOLDS_WRITER, False):
+            self._lock.release()
+
+
+def init_app(app):
+    """Tune connections when the app runs on an SQLite file (no-op otherwise)."""
+    config = app.config
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return
+    settings = pragmas(config)
+    serialize = config['SQLITE_SERIALIZE_WRITES']
+
+    @sa_event.listens_for(engine, 'connect')
+    def _configure(dbapi_connection, connection_record):
+        if serialize:
+            # WriterLock.begin issues BEGIN itself; stop the driver from doing it.
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in settings:
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    if serialize:
+        writer = WriterLock((config['SQLITE_BUSY_TIMEOUT_MS'] or 5000) / 1000)
+        sa_event.listen(engine, 'begin', writer.begin)
+        sa_event.listen(engine, 'before_cursor_execute', writer.before_cursor_execute)
+        sa_event.listen(engine, 'checkin', writer.checkin)
+        app.extensions['sqlite_writer'] = writer
@@ -0,0 +1,326 @@
+"""
+Lightweight request tracing with slow-trace export.
+
+A sampled request records a tree of spans: the request itself, its route
+handler, SQL statements, model serialization, password hashing and JWT
+verification. When the request finishes slower than TRACE_SLOW_MS the
+trace is appended to TRACE_EXPORT_PATH as one OTLP/JSON ``resourceSpans``
+document per line, which OpenTelemetry collectors and viewers can ingest.
+
+Unsampled requests never allocate a span: ``span()`` checks a context
+variable and returns a shared no-op context manager. Every response
+carries an ``X-Request-ID`` (the client's, or the trace id), and a W3C
+``traceparent`` header is honoured for the trace id and sampling decision.
+"""
+
+import functools
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+
+SERVICE_NAME = 'slotswapper'
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_NOOP = nullcontext()
+_current = ContextVar('trace', default=None)
+
+
+def _new_id(nbytes):
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ('name', 'span_id', 'parent_id', 'kind', 'start', 'end', 'attributes', 'error')
+
+    def __init__(self, name, parent_id, kind, attributes):
+        self.name = name
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = attributes
+        self.error = None
+
+    @property
+    def duration_ms(self):
+        return ((self.end or time.time_ns()) - self.start) / 1e6
+
+
+class Trace:
+    """The spans of one sampled request; used from a single thread."""
+
+    def __init__(self, trace_id, max_spans, parent_id=None):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._stack = [parent_id]
+
+    def start(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        span = Span(name, self._stack[-1], kind, attributes or {})
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+        self._stack.append(span.span_id)
+        return span
+
+    def finish(self, span, error=None):
+        span.end = time.time_ns()
+        if error is not None:
+            span.error = f'{type(error).__name__}: {error}'
+        if self._stack[-1] == span.span_id:
+            self._stack.pop()
+
+
+class _SpanContext:
+    __slots__ = ('trace', 'name', 'kind', 'attributes', 'span')
+
+    def __init__(self, trace, name, kind, attributes):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.span = self.trace.start(self.name, self.kind, self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.finish(self.span, exc)
+        return False
+
+
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """Context manager timing a block as a child of the current span; no-op when unsampled."""
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _SpanContext(trace, name, kind, attributes)
+
+
+def traced(name):
+    """Decorator form of ``span``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _SpanContext(trace, name, SPAN_KIND_INTERNAL, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace():
+    return _current.get()
+
+
+# --- Export ----------------------------------------------------------------
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+def to_otlp(trace, resource_attributes=None):
+    """Encode a trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in trace.spans:
+        encoded = {
+            'traceId': trace.trace_id,
+            'spanId': s.span_id,
+            'name': s.name,
+            'kind': s.kind,
+            'startTimeUnixNano': str(s.start),
+            'endTimeUnixNano': str(s.end or s.start),
+            'attributes': [_attribute(k, v) for k, v in s.attributes.items()],
+            'status': {'code': STATUS_ERROR, 'message': s.error} if s.error else {'code': STATUS_UNSET},
+        }
+        if s.parent_id:
+            encoded['parentSpanId'] = s.parent_id
+        spans.append(encoded)
+    resource = {'service.name': SERVICE_NAME, **(resource_attributes or {})}
+    return {'resourceSpans': [{
+        'resource': {'attributes': [_attribute(k, v) for k, v in resource.items()]},
+        'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+    }]}
+
+
+class FileSink:
+    """Append-only JSON-lines file, rotated to ``<path>.1`` past ``max_bytes``."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, document):
+        line = json.dumps(document, separators=(',', ':')) + '\n'
+        with self._lock:
+            try:
+                if os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    os.replace(self.path, self.path + '.1')
+            except FileNotFoundError:
+                pass
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+# --- Flask and SQLAlchemy wiring -------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current.get()
+    if trace is None or context is None:
+        return
+    context._trace_span = trace.start('db.query', SPAN_KIND_CLIENT, {
+        'db.system': conn.dialect.name,
+        'db.statement': statement[:500],
+    })
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span_ = getattr(context, '_trace_span', None)
+    if span_ is not None:
+        _current.get().finish(span_)
+        context._trace_span = None
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    span_ = getattr(context, '_trace_span', None)
+    trace = _current.get()
+    if span_ is not None and trace is not None:
+        trace.finish(span_, exception_context.original_exception)
+        context._trace_span = None
+
+
+def _wrap_jwt_verification():
+    """Time JWT verification for routes using flask_jwt_extended's ``jwt_required``."""
+    from flask_jwt_extended import view_decorators
+    verify = view_decorators.verify_jwt_in_request
+    if getattr(verify, '_traced', False):
+        return
+    wrapped = traced('jwt.verify')(verify)
+    wrapped._traced = True
+    view_decorators.verify_jwt_in_request = wrapped
+
+
+def _wrap_views(app):
+    for endpoint, view in list(app.view_functions.items()):
+        if endpoint != 'static':
+            app.view_functions[endpoint] = traced(f'handler {endpoint}')(view)
+
+
+def _parse_traceparent():
+    match = TRACEPARENT.match(request.headers.get('traceparent', ''))
+    if not match:
+        return None, None, None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def init_app(app):
+    """
+    Propagate request ids and, when TRACE_EXPORT_PATH is set, sample traces.
+
+    Must run after all blueprints are registered so handlers are wrapped.
+    """
+    config = app.config
+    sample_rate = config['TRACE_SAMPLE_RATE']
+    tracing_enabled = bool(config['TRACE_EXPORT_PATH']) and sample_rate > 0
+    if tracing_enabled:
+        sink = FileSink(config['TRACE_EXPORT_PATH'], config['TRACE_EXPORT_MAX_BYTES'])
+        app.extensions['trace_sink'] = sink
+        slow_ns = config['TRACE_SLOW_MS'] * 1_000_000
+        max_spans = config['TRACE_MAX_SPANS']
+        if not getattr(Engine, '_tracing_listeners', False):
+            sa_event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            sa_event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            sa_event.listen(Engine, 'handle_error', _handle_error)
+            Engine._tracing_listeners = True
+        _wrap_jwt_verification()
+        _wrap_views(app)
+
+    @app.before_request
+    def _start_trace():
+        trace_id, parent_id, sampled = _parse_traceparent()
+        trace_id = trace_id or _new_id(16)
+        request_id = request.headers.get('X-Request-ID', '')[:128] or trace_id
+        g.request_id = request_id
+        request.environ['tracing.request_id'] = request_id
+        if not tracing_enabled:
+            return
+
+        name = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        attributes = {'http.method': request.method, 'http.target': request.path, 'request.id': request_id}
+        trace = _current.get()
+        if trace is not None:
+            # A sub-request (e.g. inside /api/batch) nests under the active trace.
+            request.environ['tracing.span'] = (trace.start(name, SPAN_KIND_INTERNAL, attributes), None)
+            return
+        if sampled is None:
+            sampled = random.random() < sample_rate
+        if not sampled:
+            return
+        trace = Trace(trace_id, max_spans, parent_id)
+        token = _current.set(trace)
+        request.environ['tracing.span'] = (trace.start(name, SPAN_KIND_SERVER, attributes), token)
+
+    @app.after_request
+    def _tag_response(response):
+        request_id = request.environ.get('tracing.request_id')
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        started = request.environ.get('tracing.span')
+        if started is not None:
+            started[0].attributes['http.status_code'] = response.status_code
+            if response.status_code >= 500:
+                started[0].error = f'HTTP {response.status_code}'
+        return response
+
+    if not tracing_enabled:
+        return
+
+    @app.teardown_request
+    def _finish_trace(exc):
+        started = request.environ.pop('tracing.span', None)
+        if started is None:
+            return
+        root, token = started
+        trace = _current.get()
+        trace.finish(root, exc)
+        if token is None:
+            return
+        _current.reset(token)
+        if trace.dropped:
+            root.attributes['trace.dropped_spans'] = trace.dropped
+        if root.end - root.start >= slow_ns:
+            sink.write(to_otlp(trace))
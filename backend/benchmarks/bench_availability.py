@@ -0,0 +1,92 @@
+"""
+Benchmark free/busy computation for 1k users over one month.
+
+Measures the indexed range query against a SQLite database and the interval
+sweep with and without NumPy.
+
+Usage:
+    python -m benchmarks.bench_availability --users 1000 --days 30
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.extensions import db
+from app.models import User, Event, EventStatus, DEFAULT_ORG_ID
+from app.services import availability
+
+
+def seed(users, days, per_day, rng):
+    start = datetime(2026, 3, 1)
+    # Bypass bcrypt: the benchmark only needs user rows for the foreign keys.
+    user_rows = [{'id': f'00000000-0000-7000-8000-{i:012d}', 'name': f'u{i}', 'email': f'u{i}@bench',
+                  'password_hash': 'x', 'org_id': DEFAULT_ORG_ID, 'created_at': start, 'updated_at': start} for i in range(users)]
+    db.session.execute(User.__table__.insert(), user_rows)
+    events = []
+    for row in user_rows:
+        for day in range(days):
+            for _ in range(per_day):
+                s = start + timedelta(days=day, minutes=rng.randrange(8 * 60, 18 * 60, 15))
+                events.append({
+                    'id': f'{rng.getrandbits(128):032x}', 'user_id': row['id'], 'title': 'busy',
+                    'start_time': s, 'end_time': s + timedelta(minutes=rng.choice([15, 30, 60])),
+                    'status': EventStatus.BUSY.name, 'org_id': DEFAULT_ORG_ID, 'created_at': start, 'updated_at': start,
+                })
+    db.session.execute(Event.__table__.insert(), events)
+    db.session.commit()
+    return [row['id'] for row in user_rows], start, start + timedelta(days=days), len(events)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--per-day', type=int, default=3)
+    parser.add_argument('--granularity', type=int, default=15, help='Minutes.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user_ids, start, end, total = seed(args.users, args.days, args.per_day, random.Random(1))
+        print(f'{args.users} users x {args.days} days, {total:,} events, {args.granularity}-minute grid')
+
+        query_time, intervals = timed(lambda: availability.load_busy_intervals(user_ids, start, end), args.repeat)
+        print(f'{"range query":<16} {query_time * 1000:>9.1f} ms')
+
+        granularity = timedelta(minutes=args.granularity)
+        paths = [('python sweep', False)] + ([('numpy sweep', True)] if availability.np is not None else [])
+        for label, use_numpy in paths:
+            elapsed, windows = timed(
+                lambda: availability.free_windows(intervals, start, end, granularity, use_numpy=use_numpy),
+                args.repeat,
+            )
+            print(f'{label:<16} {elapsed * 1000:>9.1f} ms  ({len(windows)} free windows)')
+
+        # The sweep alone, excluding the shared datetime -> offset conversion.
+        offsets = availability._to_offsets(intervals, start)
+        step = args.granularity * 60
+        n_slots = int((end - start).total_seconds()) // step
+        sweeps = [('python runs', availability.free_runs_python)]
+        if availability.np is not None:
+            sweeps.append(('numpy runs', availability.free_runs_numpy))
+        for label, fn in sweeps:
+            elapsed, _ = timed(lambda: fn(offsets, n_slots, step), args.repeat)
+            print(f'{label:<16} {elapsed * 1000:>9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
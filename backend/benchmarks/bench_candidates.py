@@ -0,0 +1,89 @@
+"""
+Benchmark swap-candidate ranking latency.
+
+Seeds a file-backed SQLite database with N events spread over a year across
+many users, then times ``candidates.rank`` for random source slots.
+
+Usage:
+    python -m benchmarks.bench_candidates --events 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.config import config, TestingConfig
+from app.extensions import db
+from app.models import User, Event, EventStatus, DEFAULT_ORG_ID
+from app.services import candidates
+from app.utils.ids import new_id
+
+
+def seed(n_events, n_users, rng, now):
+    user_ids = [new_id() for _ in range(n_users)]
+    db.session.execute(User.__table__.insert(), [
+        {'id': uid, 'name': 'u', 'email': f'{uid}@bench', 'password_hash': 'x', 'org_id': DEFAULT_ORG_ID,
+         'created_at': now, 'updated_at': now}
+        for uid in user_ids
+    ])
+    statuses = [EventStatus.SWAPPABLE.name, EventStatus.BUSY.name]
+    batch = []
+    for i in range(n_events):
+        start = now + timedelta(minutes=rng.randrange(0, 365 * 24 * 60, 15))
+        batch.append({
+            'id': new_id(), 'user_id': rng.choice(user_ids), 'title': 'slot',
+            'start_time': start, 'end_time': start + timedelta(minutes=rng.choice([15, 30, 60, 90])),
+            'status': rng.choice(statuses), 'org_id': DEFAULT_ORG_ID, 'created_at': now, 'updated_at': now,
+        })
+        if len(batch) == 50_000:
+            db.session.execute(Event.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Event.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    config['bench'] = type('BenchConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    app = create_app('bench')
+    try:
+        with app.app_context():
+            db.create_all()
+            rng = random.Random(3)
+            now = datetime.utcnow()
+            started = time.perf_counter()
+            seed(args.events, args.users, rng, now)
+            print(f'seeded {args.events:,} events in {time.perf_counter() - started:.1f}s')
+
+            sources = Event.query.filter(Event.status == EventStatus.SWAPPABLE).limit(args.queries).all()
+            timings = []
+            for source in sources:
+                started = time.perf_counter()
+                candidates.rank(source, args.k, now=now)
+                timings.append((time.perf_counter() - started) * 1000)
+                db.session.expunge_all()
+
+            timings.sort()
+            print(f'rank k={args.k}: median {statistics.median(timings):.1f} ms, '
+                  f'p95 {timings[int(len(timings) * 0.95) - 1]:.1f} ms')
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark marketplace reads: events joined to owners vs the read model.
+
+Seeds a file-backed SQLite database with N events (half SWAPPABLE) across
+many users and fills ``marketplace_slots`` with ``marketplace.rebuild``.
+Then times pages from the front of the marketplace both ways:
+
+- events: the SWAPPABLE upcoming events query with
+  ``to_dict(include_owner=True)``, which lazily loads each owner
+- read model: the ``marketplace_slots`` range scan the endpoint runs
+
+It also reports what the read model costs writers: ORM inserts of SWAPPABLE
+events with the sync hook in place.
+
+Usage:
+    python -m benchmarks.bench_marketplace --events 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.config import config, TestingConfig
+from app.extensions import db
+from app.models import User, Event, EventStatus, MarketplaceSlot, DEFAULT_ORG_ID
+from app.services import marketplace, tenancy
+from app.utils.ids import new_id
+
+
+def seed(n_events, n_users, rng, now):
+    user_ids = [new_id() for _ in range(n_users)]
+    db.session.execute(User.__table__.insert(), [
+        {'id': uid, 'name': f'user {uid[-6:]}', 'email': f'{uid}@bench', 'password_hash': 'x',
+         'org_id': DEFAULT_ORG_ID, 'created_at': now, 'updated_at': now}
+        for uid in user_ids
+    ])
+    statuses = [EventStatus.SWAPPABLE.name, EventStatus.BUSY.name]
+    batch = []
+    for _ in range(n_events):
+        start = now + timedelta(minutes=rng.randrange(-30 * 24 * 60, 365 * 24 * 60, 15))
+        batch.append({
+            'id': new_id(), 'user_id': rng.choice(user_ids), 'title': 'slot',
+            'start_time': start, 'end_time': start + timedelta(minutes=rng.choice([30, 60])),
+            'status': rng.choice(statuses), 'org_id': DEFAULT_ORG_ID, 'created_at': now, 'updated_at': now,
+        })
+        if len(batch) == 50_000:
+            db.session.execute(Event.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Event.__table__.insert(), batch)
+    db.session.commit()
+    listed = marketplace.rebuild(now)
+    db.session.execute(db.text('ANALYZE'))
+    return user_ids, listed
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        db.session.expunge_all()
+    timings.sort()
+    return statistics.median(timings), timings[max(int(len(timings) * 0.95) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--users', type=int, default=5_000)
+    parser.add_argument('--page', type=int, default=50)
+    parser.add_argument('--pages', type=int, default=20, help='Pages read, from the first 20 pages.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--writes', type=int, default=2_000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    config['bench'] = type('BenchConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    app = create_app('bench')
+    try:
+        with app.app_context():
+            db.create_all()
+            rng = random.Random(11)
+            now = datetime.utcnow()
+            user_ids, listed = seed(args.events, args.users, rng, now)
+            print(f'{args.events:,} events, {listed:,} listed in the read model')
+            viewer = user_ids[0]
+            offsets = [rng.randrange(20) * args.page for _ in range(args.pages)]
+
+            def via_events():
+                for offset in offsets:
+                    rows = (Event.query
+                            .filter(Event.status == EventStatus.SWAPPABLE, Event.start_time > now,
+                                    Event.user_id != viewer)
+                            .order_by(Event.start_time, Event.id).limit(args.page).offset(offset).all())
+                    [row.to_dict(include_owner=True) for row in rows]
+
+            def via_read_model():
+                for offset in offsets:
+                    rows = (MarketplaceSlot.query
+                            .filter(MarketplaceSlot.start_time > now, MarketplaceSlot.user_id != viewer)
+                            .order_by(MarketplaceSlot.start_time, MarketplaceSlot.event_id)
+                            .limit(args.page).offset(offset).all())
+                    [row.to_dict() for row in rows]
+
+            for name, fn in (('events + owners', via_events), ('read model', via_read_model)):
+                # Requests run scoped to the caller's organization.
+                with tenancy.scope(DEFAULT_ORG_ID):
+                    median, p95 = timed(fn, args.runs)
+                print(f'{name:16s} {args.pages} pages of {args.page}: '
+                      f'median {median:7.1f} ms, p95 {p95:7.1f} ms ({median / args.pages:.2f} ms/page)')
+
+            started = time.perf_counter()
+            for i in range(args.writes):
+                start = now + timedelta(days=1, minutes=15 * i)
+                db.session.add(Event(user_id=rng.choice(user_ids), title='new', start_time=start,
+                                     end_time=start + timedelta(hours=1)))
+                if i % 100 == 99:
+                    db.session.commit()
+            db.session.commit()
+            elapsed = time.perf_counter() - started
+            print(f'writes: {args.writes:,} SWAPPABLE events in {elapsed:.2f}s '
+                  f'({elapsed / args.writes * 1000:.3f} ms each, read model kept in sync)')
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark lazy expansion of recurring series into a listing window.
+
+Seeds a file-backed SQLite database with N series (weekday, daily and
+every-other-week rules, some already ended) plus materialized-occurrence
+exceptions, then times ``recurrence.occurrences`` for a one-month window and
+the ``to_dict`` serialization of its result. For comparison, the same
+window's occurrences are then stored as Event rows (what users had to create
+before series existed) and read back with the ORM.
+
+Usage:
+    python -m benchmarks.bench_recurrence --series 10000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.config import config, TestingConfig
+from app.extensions import db
+from app.models import User, Event, EventSeries, EventStatus, SeriesException, DEFAULT_ORG_ID
+from app.services import recurrence
+from app.utils.ids import new_id
+
+RULES = ['FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR', 'FREQ=DAILY', 'FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH',
+         'FREQ=WEEKLY;BYDAY=MO;COUNT=10']
+
+
+def seed(n_series, n_users, rng, now):
+    user_ids = [new_id() for _ in range(n_users)]
+    db.session.execute(User.__table__.insert(), [
+        {'id': uid, 'name': 'u', 'email': f'{uid}@bench', 'password_hash': 'x', 'org_id': DEFAULT_ORG_ID,
+         'created_at': now, 'updated_at': now}
+        for uid in user_ids
+    ])
+    rows, exceptions = [], []
+    for _ in range(n_series):
+        start = (now - timedelta(days=rng.randrange(0, 365))).replace(
+            hour=rng.randrange(7, 18), minute=0, second=0, microsecond=0)
+        text = rng.choice(RULES)
+        rule = recurrence.parse_rrule(text, start)
+        series_id = new_id()
+        rows.append({
+            'id': series_id, 'user_id': rng.choice(user_ids), 'title': 'slot',
+            'status': rng.choice([EventStatus.SWAPPABLE.name, EventStatus.BUSY.name]),
+            'dtstart': start, 'duration_minutes': rng.choice([30, 60]), 'rrule': text,
+            'freq': rule.freq, 'interval': rule.interval, 'weekdays': rule.weekdays,
+            'until': recurrence.last_start(start, rule) if rule.count else None,
+            'org_id': DEFAULT_ORG_ID, 'created_at': now, 'updated_at': now,
+        })
+        for occurrence in recurrence.expand(start, timedelta(hours=1), rule.freq, rule.interval, rule.weekdays,
+                                            rows[-1]['until'], now, now + timedelta(days=31))[:2]:
+            exceptions.append({'series_id': series_id, 'occurrence_start': occurrence, 'event_id': None})
+    db.session.execute(EventSeries.__table__.insert(), rows)
+    db.session.execute(SeriesException.__table__.insert(), exceptions)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return len(exceptions)
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        db.session.expunge_all()
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    config['bench'] = type('BenchConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    app = create_app('bench')
+    try:
+        with app.app_context():
+            db.create_all()
+            now = datetime.utcnow()
+            exceptions = seed(args.series, args.users, random.Random(5), now)
+            low, high = now, now + timedelta(days=args.days)
+            print(f'{args.series:,} series, {exceptions:,} exceptions, {args.days}-day window')
+
+            found, expand_ms = timed(lambda: recurrence.occurrences(low, high), args.runs)
+            print(f'expand:            {len(found):8,d} occurrences, median {expand_ms:7.1f} ms')
+            swappable, filtered_ms = timed(
+                lambda: recurrence.occurrences(low, high, EventStatus.SWAPPABLE), args.runs)
+            print(f'expand SWAPPABLE:  {len(swappable):8,d} occurrences, median {filtered_ms:7.1f} ms')
+            _, serialize_ms = timed(lambda: [o.to_dict() for o in found], args.runs)
+            print(f'to_dict:           {len(found):8,d} occurrences, median {serialize_ms:7.1f} ms')
+
+            db.session.execute(Event.__table__.insert(), [
+                {'id': new_id(), 'user_id': o.user_id, 'title': o.title, 'start_time': o.start_time,
+                 'end_time': o.end_time, 'status': o.status.name, 'change_seq': 0, 'org_id': DEFAULT_ORG_ID,
+                 'created_at': now, 'updated_at': now}
+                for o in found
+            ])
+            db.session.commit()
+            stored, stored_ms = timed(lambda: Event.query.filter(
+                Event.end_time > low, Event.start_time < high).all(), args.runs)
+            print(f'stored rows:       {len(stored):8,d} events,      median {stored_ms:7.1f} ms')
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark Socket.IO fan-out across worker processes through the backplane.
+
+Starts a RESP stand-in server, then ``--workers`` processes that each hold
+``--clients`` simulated sockets spread over ``--rooms`` user rooms (the
+sockets record packets instead of writing to a transport). A separate
+publisher node emits ``--emits`` messages to random rooms as fast as it can;
+each worker reports when every packet addressed to its sockets has arrived.
+
+Runs once without batching and once per ``--batch-interval`` value, and
+prints publish count, end-to-end throughput and emit-to-delivery latency.
+
+Usage:
+    python -m benchmarks.bench_socketio_fanout --workers 4 --clients 2000
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+from collections import Counter
+
+import socketio as python_socketio
+
+from app.services.realtime import BackplaneManager
+from app.utils import pubsub
+
+CHANNEL = 'bench'
+
+
+def _rooms_for(args, seed):
+    rng = random.Random(seed)
+    return [f'user:{rng.randrange(args.rooms)}' for _ in range(args.emits)]
+
+
+def _node(url, batch_interval):
+    manager = BackplaneManager(pubsub.from_url(url), channel=CHANNEL, batch_interval=batch_interval)
+    server = python_socketio.Server(client_manager=manager, async_mode='threading')
+    return manager, server
+
+
+def worker(index, url, args, ready, results):
+    manager, server = _node(url, 0)
+    rng = random.Random(index)
+    members = Counter()
+    for i in range(args.clients):
+        room = f'user:{rng.randrange(args.rooms)}'
+        members[room] += 1
+        sid = manager.connect(f'w{index}-{i}', '/')
+        manager.enter_room(sid, '/', room)
+    expected = sum(members[room] for room in _rooms_for(args, 'emits'))
+
+    delivered = 0
+    latencies = []
+    done = multiprocessing.Event()
+
+    def send(eio_sid, pkt):
+        nonlocal delivered
+        delivered += 1
+        if delivered == expected:
+            done.set()
+
+    handle_emit = manager._handle_emit
+
+    def timed_handle_emit(message):
+        latencies.append(time.time() - message['data'][0])
+        handle_emit(message)
+
+    server._send_eio_packet = send
+    manager._handle_emit = timed_handle_emit
+    manager.initialize()
+    ready.put(index)
+    done.wait(args.timeout)
+    results.put({'worker': index, 'expected': expected, 'delivered': delivered,
+                 'finished_at': time.time(), 'latencies': latencies})
+
+
+def run(args, stand_in, batch_interval):
+    ctx = multiprocessing.get_context('fork')
+    ready, results = ctx.Queue(), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(i, stand_in.url, args, ready, results), daemon=True)
+             for i in range(args.workers)]
+    for proc in procs:
+        proc.start()
+    for _ in procs:
+        ready.get(timeout=60)
+    while len(stand_in.channels.get(CHANNEL.encode(), ())) < args.workers:
+        time.sleep(0.01)
+
+    manager, server = _node(stand_in.url, batch_interval)
+    published = Counter()
+    publish = manager.backplane.publish
+    manager.backplane.publish = lambda channel, payload: published.update(['n']) or publish(channel, payload)
+
+    started = time.time()
+    for room in _rooms_for(args, 'emits'):
+        server.emit('swap', time.time(), to=room)
+    manager.flush()
+    reports = [results.get(timeout=args.timeout + 5) for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    elapsed = max(r['finished_at'] for r in reports) - started
+    delivered = sum(r['delivered'] for r in reports)
+    latencies = sorted(lat * 1000 for r in reports for lat in r['latencies'])
+    complete = all(r['delivered'] == r['expected'] for r in reports)
+    label = f'batch {batch_interval * 1000:g} ms' if batch_interval else 'no batching'
+    print(f'{label:>14}: {published["n"]:6d} publishes, {delivered:8,d} packets in {elapsed:6.2f}s '
+          f'({delivered / elapsed:9,.0f}/s), latency p50 {statistics.median(latencies):6.1f} ms '
+          f'p99 {latencies[int(len(latencies) * 0.99) - 1]:6.1f} ms{"" if complete else "  INCOMPLETE"}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=2000, help='sockets per worker')
+    parser.add_argument('--rooms', type=int, default=500)
+    parser.add_argument('--emits', type=int, default=20000)
+    parser.add_argument('--batch-interval', type=float, action='append',
+                        help='seconds; repeatable (default 0.005)')
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    stand_in = pubsub.StandInServer().start()
+    print(f'{args.workers} workers x {args.clients} sockets, {args.rooms} rooms, {args.emits:,} emits')
+    try:
+        for batch_interval in [0] + (args.batch_interval or [0.005]):
+            run(args, stand_in, batch_interval)
+    finally:
+        stand_in.stop()
+
+
+if __name__ == '__main__':
+    main()
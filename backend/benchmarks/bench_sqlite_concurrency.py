@@ -0,0 +1,177 @@
+"""
+Benchmark concurrent readers and writers on one SQLite file, per profile.
+
+Each profile gets a fresh database file seeded with users and events. For
+``--seconds`` it runs:
+
+- writer threads: background-job style (no request) transactions that
+  read a counter, insert an event and write the counter back incremented,
+  the check-then-act shape of handlers that validate a row before changing
+  it
+- reader threads: GET-request style reads of one user's upcoming events
+
+Profiles:
+
+- default: SQLite's defaults (rollback journal, synchronous=FULL, 5 s
+  driver timeout), transactions begun by the driver
+- pragmas: the 'sqlite' profile's PRAGMAs without the serialized writer
+- sqlite: the full 'sqlite' profile (app/utils/sqlite.py)
+
+Reported per profile: committed writes and reads per second, p50/p95
+latency, operations that failed (mostly "database is locked") and lost
+counter updates: the driver only opens a transaction at the first write,
+so without the serialized writer the counter read is not isolated.
+
+Usage:
+    python -m benchmarks.bench_sqlite_concurrency --writers 4 --readers 8
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, update
+
+from app import create_app
+from app.config import config, SQLiteConfig
+from app.extensions import db
+from app.models import ChangeCounter, User, Event, DEFAULT_ORG_ID
+from app.services import tenancy
+from app.utils.ids import new_id
+
+DEFAULTS = {name: None for name in ('SQLITE_JOURNAL_MODE', 'SQLITE_SYNCHRONOUS', 'SQLITE_BUSY_TIMEOUT_MS',
+                                    'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE_KB', 'SQLITE_FOREIGN_KEYS')}
+COUNTER = 'bench_writes'
+PROFILES = {
+    'default': dict(DEFAULTS, SQLITE_SERIALIZE_WRITES=False),
+    'pragmas': {'SQLITE_SERIALIZE_WRITES': False},
+    'sqlite': {},
+}
+
+
+def seed(n_users, n_events, rng, now):
+    user_ids = [new_id() for _ in range(n_users)]
+    db.session.execute(User.__table__.insert(), [
+        {'id': uid, 'name': f'user {uid[-6:]}', 'email': f'{uid}@bench', 'password_hash': 'x',
+         'org_id': DEFAULT_ORG_ID, 'created_at': now, 'updated_at': now}
+        for uid in user_ids
+    ])
+    rows = []
+    for _ in range(n_events):
+        start = now + timedelta(minutes=rng.randrange(0, 60 * 24 * 60, 15))
+        rows.append({'id': new_id(), 'user_id': rng.choice(user_ids), 'title': 'slot', 'start_time': start,
+                     'end_time': start + timedelta(minutes=30), 'status': 'BUSY', 'org_id': DEFAULT_ORG_ID,
+                     'created_at': now, 'updated_at': now})
+    db.session.execute(Event.__table__.insert(), rows)
+    db.session.add(ChangeCounter(name=COUNTER, value=0))
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    return user_ids
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {'write': [], 'read': []}
+        self.errors = {'write': 0, 'read': 0}
+
+    def record(self, kind, latencies, errors):
+        with self.lock:
+            self.latencies[kind].extend(latencies)
+            self.errors[kind] += errors
+
+
+def worker(app, kind, user_ids, seed_value, deadline, results, now):
+    rng = random.Random(seed_value)
+    latencies, errors = [], 0
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            user_id = rng.choice(user_ids)
+            started = time.perf_counter()
+            try:
+                if kind == 'write':
+                    count = db.session.execute(
+                        select(ChangeCounter.value).where(ChangeCounter.name == COUNTER)).scalar()
+                    start = now + timedelta(days=rng.randrange(1, 60), minutes=15 * rng.randrange(96))
+                    db.session.add(Event(user_id=user_id, title='new', start_time=start,
+                                         end_time=start + timedelta(minutes=30)))
+                    db.session.execute(update(ChangeCounter).where(ChangeCounter.name == COUNTER)
+                                       .values(value=count + 1))
+                    db.session.commit()
+                else:
+                    with app.test_request_context('/', method='GET'), tenancy.scope(DEFAULT_ORG_ID):
+                        (Event.query.filter(Event.user_id == user_id, Event.start_time > now)
+                         .order_by(Event.start_time).limit(50).all())
+                        db.session.rollback()
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                db.session.rollback()
+                errors += 1
+            db.session.expunge_all()
+        db.session.remove()
+    results.record(kind, latencies, errors)
+
+
+def run(name, args):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    config['bench'] = type('BenchConfig', (SQLiteConfig,), dict(
+        PROFILES[name], TESTING=True, SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}'))
+    app = create_app('bench')
+    try:
+        with app.app_context():
+            db.create_all()
+            now = datetime.utcnow()
+            user_ids = seed(args.users, args.events, random.Random(5), now)
+            db.session.remove()
+
+        results = Results()
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=worker, args=(app, kind, user_ids, i, deadline, results, now))
+                   for i, kind in enumerate(['write'] * args.writers + ['read'] * args.readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for kind in ('write', 'read'):
+            timings = sorted(results.latencies[kind])
+            if not timings:
+                print(f'{name:8s} {kind}s: none committed, {results.errors[kind]} failed')
+                continue
+            p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+            print(f'{name:8s} {kind}s: {len(timings) / args.seconds:8.0f}/s, '
+                  f'p50 {statistics.median(timings):6.2f} ms, p95 {p95:7.2f} ms, {results.errors[kind]} failed')
+        with app.app_context():
+            written = db.session.execute(select(func.count()).where(Event.title == 'new')).scalar()
+            lost = written - db.session.get(ChangeCounter, COUNTER).value
+            print(f'{name:8s} {written:,} events written, {lost:,} counter updates lost')
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--events', type=int, default=50_000)
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=['default', 'pragmas', 'sqlite'])
+    args = parser.parse_args()
+
+    print(f'{args.writers} writer and {args.readers} reader threads for {args.seconds:g}s per profile')
+    for name in args.profiles:
+        run(name, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Add marketplace_slots read model
+
+Revision ID: 1d8f4a6c9e52
+Revises: 7c2e5d81b4f3
+Create Date: 2026-10-20 09:42:18.730514
+
+New table only, filled from the upcoming SWAPPABLE events and their owners;
+`flask rebuild-marketplace` recomputes it at any time.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '1d8f4a6c9e52'
+down_revision = '7c2e5d81b4f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('marketplace_slots',
+    sa.Column('event_id', GUID(), nullable=False),
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('user_id', GUID(), nullable=False),
+    sa.Column('owner_name', sa.String(length=255), nullable=False),
+    sa.Column('owner_email', sa.String(length=255), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index('ix_marketplace_slots_org_start', 'marketplace_slots',
+                    ['org_id', 'start_time', 'event_id'], unique=False)
+    op.create_index('ix_marketplace_slots_user_id', 'marketplace_slots', ['user_id'], unique=False)
+
+    op.execute(
+        "INSERT INTO marketplace_slots "
+        "(event_id, org_id, user_id, owner_name, owner_email, title, start_time, end_time) "
+        "SELECT events.id, events.org_id, events.user_id, users.name, users.email, "
+        "events.title, events.start_time, events.end_time "
+        "FROM events JOIN users ON users.id = events.user_id "
+        "WHERE events.status = 'SWAPPABLE' AND events.start_time > CURRENT_TIMESTAMP"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_marketplace_slots_user_id', table_name='marketplace_slots')
+    op.drop_index('ix_marketplace_slots_org_start', table_name='marketplace_slots')
+    op.drop_table('marketplace_slots')
@@ -0,0 +1,26 @@
+"""Index revoked_tokens.revoked_at for the sync overlap window
+
+Revision ID: 1f4c8b2d7e90
+Revises: 6e1c9a3d5b28
+Create Date: 2026-10-20 09:12:40.318265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f4c8b2d7e90'
+down_revision = '6e1c9a3d5b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_revoked_tokens_revoked_at'), ['revoked_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revoked_tokens_revoked_at'))
@@ -0,0 +1,48 @@
+"""Archive bundle swaps with their slots
+
+Revision ID: 2d9b5e7a4c16
+Revises: 8e3a6c1f5d47
+Create Date: 2026-10-20 11:26:54.907318
+
+swap_requests_archive gains expires_at and bundle_size, and bundle slots
+get an archive table. Slots orphaned by earlier archival runs (SQLite
+without foreign_keys does not cascade) are deleted; the bundles they
+belonged to were already archived as one-for-one swaps.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '2d9b5e7a4c16'
+down_revision = '8e3a6c1f5d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('swap_requests_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('bundle_size', sa.Integer(), nullable=True))
+
+    op.create_table('swap_bundle_slots_archive',
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('swap_id', GUID(), nullable=False),
+    sa.Column('event_id', GUID(), nullable=False),
+    sa.Column('side', sa.String(length=10), nullable=False),
+    sa.Column('position', sa.SmallInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['swap_id'], ['swap_requests_archive.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('swap_id', 'event_id')
+    )
+
+    op.execute('DELETE FROM swap_bundle_slots WHERE swap_id NOT IN (SELECT id FROM swap_requests)')
+
+
+def downgrade():
+    op.drop_table('swap_bundle_slots_archive')
+    with op.batch_alter_table('swap_requests_archive', schema=None) as batch_op:
+        batch_op.drop_column('bundle_size')
+        batch_op.drop_column('expires_at')
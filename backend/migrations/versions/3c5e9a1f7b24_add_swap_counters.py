@@ -0,0 +1,44 @@
+"""Add swap_counters table
+
+Revision ID: 3c5e9a1f7b24
+Revises: 00fe333beef0
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e9a1f7b24'
+down_revision = '00fe333beef0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('swap_counters',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('pending_received', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('pending_sent', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('accepted', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill from existing swaps; later drift is fixed by
+    # `flask reconcile-swap-counters`.
+    op.execute("""
+        INSERT INTO swap_counters (user_id, pending_received, pending_sent, accepted)
+        SELECT u.id,
+               (SELECT COUNT(*) FROM swap_requests s WHERE s.requestee_id = u.id AND s.status = 'PENDING'),
+               (SELECT COUNT(*) FROM swap_requests s WHERE s.requester_id = u.id AND s.status = 'PENDING'),
+               (SELECT COUNT(*) FROM swap_requests s
+                 WHERE (s.requester_id = u.id OR s.requestee_id = u.id) AND s.status = 'ACCEPTED')
+        FROM users u
+    """)
+
+
+def downgrade():
+    op.drop_table('swap_counters')
@@ -0,0 +1,28 @@
+"""Index outbox dead letters for the metrics snapshot
+
+Revision ID: 3e7b1d9c4a05
+Revises: 5c1e7a9d3f62
+Create Date: 2026-10-20 16:18:05.274413
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7b1d9c4a05'
+down_revision = '5c1e7a9d3f62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('outbox_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_outbox_messages_dead', ['failed_at'], unique=False,
+                              postgresql_where=sa.text('failed_at IS NOT NULL'),
+                              sqlite_where=sa.text('failed_at IS NOT NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_messages_dead')
@@ -0,0 +1,26 @@
+"""Add (status, start_time) index on events
+
+Revision ID: 4b0f7e3a9c61
+Revises: c48e1a6f2d95
+Create Date: 2026-10-19 18:15:29.663420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b0f7e3a9c61'
+down_revision = 'c48e1a6f2d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.create_index('ix_events_status_start', ['status', 'start_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_status_start')
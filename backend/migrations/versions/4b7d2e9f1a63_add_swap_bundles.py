@@ -0,0 +1,44 @@
+"""Add bundle swaps
+
+Revision ID: 4b7d2e9f1a63
+Revises: 9a3e6b0d2f71
+Create Date: 2026-10-21 09:42:17.604311
+
+swap_requests.bundle_size is a nullable column with no default, so adding
+it only changes the catalog on PostgreSQL. Existing swaps stay
+one-for-one.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7d2e9f1a63'
+down_revision = '9a3e6b0d2f71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('swap_requests', sa.Column('bundle_size', sa.Integer(), nullable=True))
+
+    op.create_table('swap_bundle_slots',
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('swap_id', GUID(), nullable=False),
+    sa.Column('event_id', GUID(), nullable=False),
+    sa.Column('side', sa.String(length=10), nullable=False),
+    sa.Column('position', sa.SmallInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['swap_id'], ['swap_requests.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('swap_id', 'event_id')
+    )
+    op.create_index('ix_swap_bundle_slots_event', 'swap_bundle_slots', ['event_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_swap_bundle_slots_event', table_name='swap_bundle_slots')
+    op.drop_table('swap_bundle_slots')
+    with op.batch_alter_table('swap_requests') as batch_op:
+        batch_op.drop_column('bundle_size')
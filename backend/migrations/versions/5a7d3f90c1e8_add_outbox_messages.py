@@ -0,0 +1,42 @@
+"""Add outbox_messages table
+
+Revision ID: 5a7d3f90c1e8
+Revises: e2a94d7c5b13
+Create Date: 2026-10-19 15:02:33.410926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7d3f90c1e8'
+down_revision = 'e2a94d7c5b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_messages',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('topic', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('claimed_by', sa.String(length=36), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.Column('failed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outbox_messages', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_outbox_messages_processed_at'), ['processed_at'], unique=False)
+        batch_op.create_index('ix_outbox_messages_due', ['available_at'], unique=False,
+                              postgresql_where=sa.text('processed_at IS NULL AND failed_at IS NULL'),
+                              sqlite_where=sa.text('processed_at IS NULL AND failed_at IS NULL'))
+
+
+def downgrade():
+    op.drop_table('outbox_messages')
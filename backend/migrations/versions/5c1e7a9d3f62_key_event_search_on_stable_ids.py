@@ -0,0 +1,90 @@
+"""Key the SQLite event search index on stable ids
+
+Revision ID: 5c1e7a9d3f62
+Revises: 5f8a2c7e1b94
+Create Date: 2026-10-20 15:40:12.603381
+
+The external-content FTS5 table was keyed on the implicit rowid of events,
+whose primary key is a BLOB UUID. VACUUM or a table rebuild may renumber
+that rowid and silently desync the index. events_fts becomes a regular
+FTS5 table whose rowids come from events_fts_ids, which maps each event id
+to an INTEGER PRIMARY KEY, and it is rebuilt from events. PostgreSQL is
+unaffected.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9d3f62'
+down_revision = '5f8a2c7e1b94'
+branch_labels = None
+depends_on = None
+
+FTS_ID = '(SELECT id FROM events_fts_ids WHERE event_id = {}.id)'
+
+DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS events_fts_insert",
+    "DROP TRIGGER IF EXISTS events_fts_delete",
+    "DROP TRIGGER IF EXISTS events_fts_update",
+]
+
+SQLITE_DDL = [
+    "CREATE TABLE events_fts_ids (id INTEGER PRIMARY KEY, event_id BLOB NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE events_fts USING fts5(title)",
+    f"""
+    CREATE TRIGGER events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts_ids(event_id) VALUES (new.id);
+        INSERT INTO events_fts(rowid, title) VALUES ({FTS_ID.format('new')}, new.title);
+    END
+    """,
+    f"""
+    CREATE TRIGGER events_fts_delete AFTER DELETE ON events BEGIN
+        DELETE FROM events_fts WHERE rowid = {FTS_ID.format('old')};
+        DELETE FROM events_fts_ids WHERE event_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER events_fts_update AFTER UPDATE OF title ON events BEGIN
+        UPDATE events_fts SET title = new.title WHERE rowid = {FTS_ID.format('new')};
+    END
+    """,
+    "INSERT INTO events_fts_ids(event_id) SELECT id FROM events",
+    "INSERT INTO events_fts(rowid, title) SELECT k.id, e.title FROM events_fts_ids k JOIN events e ON e.id = k.event_id",
+]
+
+PREVIOUS_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE events_fts USING fts5(title, content='events', content_rowid='rowid')",
+    """
+    CREATE TRIGGER events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER events_fts_delete AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER events_fts_update AFTER UPDATE OF title ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+        INSERT INTO events_fts(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    "INSERT INTO events_fts(events_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_TRIGGERS + ["DROP TABLE IF EXISTS events_fts"] + SQLITE_DDL:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_TRIGGERS + ["DROP TABLE IF EXISTS events_fts", "DROP TABLE IF EXISTS events_fts_ids"]:
+        op.execute(statement)
+    for statement in PREVIOUS_SQLITE_DDL:
+        op.execute(statement)
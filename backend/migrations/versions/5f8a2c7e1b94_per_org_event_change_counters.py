@@ -0,0 +1,82 @@
+"""Number event changes per organization
+
+Revision ID: 5f8a2c7e1b94
+Revises: 2d9b5e7a4c16
+Create Date: 2026-10-20 14:02:31.118204
+
+The global ``events`` and ``event_tombstones_pruned`` counters become one
+``events:<org_id>`` and ``tombstones_pruned:<org_id>`` pair per
+organization, each starting from the global value so cursors already
+handed out stay valid. change_counters.name is widened to fit the org id,
+and tombstones are keyed on (org_id, change_seq), which replaces the
+ix_event_tombstones_org_seq index.
+
+Downgrading cannot merge the per-org sequences back into one: it drops
+the tombstones and moves the prune horizon to the head, so every client
+resyncs in full.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '5f8a2c7e1b94'
+down_revision = '2d9b5e7a4c16'
+branch_labels = None
+depends_on = None
+
+counters = sa.table('change_counters', sa.column('name', sa.String), sa.column('value', sa.BigInteger))
+# Read through GUID so ids come back canonical, as changes.counter_name formats them.
+organizations = sa.table('organizations', sa.column('id', GUID()))
+
+
+def _value(bind, name):
+    return bind.execute(sa.select(counters.c.value).where(counters.c.name == name)).scalar() or 0
+
+
+def upgrade():
+    bind = op.get_bind()
+    with op.batch_alter_table('change_counters', schema=None) as batch_op:
+        batch_op.alter_column('name', existing_type=sa.String(length=50), type_=sa.String(length=100),
+                              existing_nullable=False)
+
+    head, pruned = _value(bind, 'events'), _value(bind, 'event_tombstones_pruned')
+    org_ids = bind.execute(sa.select(organizations.c.id)).scalars().all()
+    if org_ids:
+        op.bulk_insert(counters, [row for org_id in org_ids for row in (
+            {'name': f'events:{org_id}', 'value': head},
+            {'name': f'tombstones_pruned:{org_id}', 'value': pruned},
+        )])
+    op.execute(counters.delete().where(counters.c.name.in_(('events', 'event_tombstones_pruned'))))
+
+    with op.batch_alter_table('event_tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_tombstones_org_seq')
+        if bind.dialect.name == 'postgresql':
+            batch_op.drop_constraint('event_tombstones_pkey', type_='primary')
+        batch_op.create_primary_key('event_tombstones_pkey', ['org_id', 'change_seq'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    head = bind.execute(
+        sa.select(sa.func.max(counters.c.value)).where(counters.c.name.like('events:%'))
+    ).scalar() or 0
+    op.execute('DELETE FROM event_tombstones')
+    op.execute(counters.delete().where(
+        counters.c.name.like('events:%') | counters.c.name.like('tombstones_pruned:%')))
+    op.bulk_insert(counters, [
+        {'name': 'events', 'value': head},
+        {'name': 'event_tombstones_pruned', 'value': head},
+    ])
+
+    with op.batch_alter_table('event_tombstones', schema=None) as batch_op:
+        if bind.dialect.name == 'postgresql':
+            batch_op.drop_constraint('event_tombstones_pkey', type_='primary')
+        batch_op.create_primary_key('event_tombstones_pkey', ['change_seq'])
+        batch_op.create_index('ix_event_tombstones_org_seq', ['org_id', 'change_seq'], unique=False)
+
+    with op.batch_alter_table('change_counters', schema=None) as batch_op:
+        batch_op.alter_column('name', existing_type=sa.String(length=100), type_=sa.String(length=50),
+                              existing_nullable=False)
@@ -0,0 +1,51 @@
+"""Add swap analytics rollups
+
+Revision ID: 6e1c9a3d5b28
+Revises: 4b7d2e9f1a63
+Create Date: 2026-10-21 15:06:52.117830
+
+New tables only. There is no backfill: the first roll-up-analytics run
+starts from log id 0 and rolls up whatever the transition log still holds
+(SWAP_TRANSITION_RETENTION).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1c9a3d5b28'
+down_revision = '4b7d2e9f1a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('swap_daily_stats',
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('accepted', sa.Integer(), nullable=False),
+    sa.Column('rejected', sa.Integer(), nullable=False),
+    sa.Column('expired', sa.Integer(), nullable=False),
+    sa.Column('latency_samples', sa.Integer(), nullable=False),
+    sa.Column('latency_total_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('latency_max_seconds', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('org_id', 'day')
+    )
+    op.create_table('swap_demand_hourly',
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hour', sa.SmallInteger(), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('org_id', 'day', 'hour')
+    )
+
+
+def downgrade():
+    op.drop_table('swap_demand_hourly')
+    op.drop_table('swap_daily_stats')
+    op.execute("DELETE FROM change_counters WHERE name LIKE 'swap_analytics%'")
@@ -0,0 +1,118 @@
+"""Add organizations and scope users, events and swaps to them
+
+Revision ID: 7c2e5d81b4f3
+Revises: f5c3b7a2e819
+Create Date: 2026-10-19 23:11:40.562918
+
+Existing rows join the default organization. On PostgreSQL the new column
+is added nullable, backfilled in batches that each commit, then made NOT
+NULL through a validated CHECK so the final SET NOT NULL skips the table
+scan; the foreign keys are validated the same way and the org-leading
+indexes are built CONCURRENTLY. On SQLite the column stays nullable at the
+database level (the application always stamps it), because tightening it
+would rebuild events and drop its full-text triggers.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e5d81b4f3'
+down_revision = 'f5c3b7a2e819'
+branch_labels = None
+depends_on = None
+
+DEFAULT_ORG_ID = '00000000-0000-7000-8000-000000000000'
+
+BACKFILL_BATCH = 10000
+
+TABLES = ('users', 'events', 'swap_requests', 'event_series', 'event_tombstones',
+          'events_archive', 'swap_requests_archive')
+
+INDEXES = (
+    ('ix_users_org_name', 'users', ['org_id', 'name']),
+    ('ix_events_org_status_start', 'events', ['org_id', 'status', 'start_time']),
+    ('ix_events_org_start', 'events', ['org_id', 'start_time']),
+    ('ix_events_org_change_seq', 'events', ['org_id', 'change_seq']),
+    ('ix_swap_requests_org_status_created', 'swap_requests', ['org_id', 'status', 'created_at']),
+    ('ix_event_series_org_status_start', 'event_series', ['org_id', 'status', 'dtstart']),
+    ('ix_event_tombstones_org_seq', 'event_tombstones', ['org_id', 'change_seq']),
+    ('ix_events_archive_org_start', 'events_archive', ['org_id', 'start_time']),
+    ('ix_swap_requests_archive_org_created', 'swap_requests_archive', ['org_id', 'created_at']),
+)
+
+# Superseded by the org-leading versions above.
+REPLACED_INDEXES = (
+    ('ix_events_status_start', 'events', ['status', 'start_time']),
+    ('ix_event_series_status_start', 'event_series', ['status', 'dtstart']),
+)
+
+
+def _default_org():
+    return sa.bindparam('org', DEFAULT_ORG_ID, type_=GUID())
+
+
+def upgrade():
+    organizations = op.create_table('organizations',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('slug', sa.String(length=63), nullable=False),
+    sa.Column('schema', sa.String(length=63), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.execute(organizations.insert().values(
+        id=DEFAULT_ORG_ID, name='Default', slug='default', created_at=sa.func.now()))
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('org_id', GUID(), nullable=True))
+
+    if op.get_bind().dialect.name != 'postgresql':
+        for table in TABLES:
+            op.execute(sa.text(f'UPDATE {table} SET org_id = :org').bindparams(_default_org()))
+        for name, table, columns in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table)
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+        return
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            backfill = sa.text(
+                f'UPDATE {table} SET org_id = :org WHERE ctid IN '
+                f'(SELECT ctid FROM {table} WHERE org_id IS NULL LIMIT {BACKFILL_BATCH})'
+            ).bindparams(_default_org())
+            while bind.execute(backfill).rowcount:
+                pass
+
+        for table in TABLES:
+            op.execute(f'ALTER TABLE {table} ADD CONSTRAINT ck_{table}_org_id_not_null '
+                       f'CHECK (org_id IS NOT NULL) NOT VALID')
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT ck_{table}_org_id_not_null')
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN org_id SET NOT NULL')
+            op.execute(f'ALTER TABLE {table} DROP CONSTRAINT ck_{table}_org_id_not_null')
+            op.execute(f'ALTER TABLE {table} ADD CONSTRAINT fk_{table}_org_id FOREIGN KEY (org_id) '
+                       f'REFERENCES organizations (id) ON DELETE CASCADE NOT VALID')
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT fk_{table}_org_id')
+
+        for name, table, columns in INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY {name} ON {table} ({", ".join(columns)})')
+        for name, table, columns in REPLACED_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY {name}')
+
+
+def downgrade():
+    for name, table, columns in REPLACED_INDEXES:
+        op.create_index(name, table, columns, unique=False)
+    for name, table, columns in INDEXES:
+        op.drop_index(name, table_name=table)
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table in TABLES:
+        if postgresql:
+            op.drop_constraint(f'fk_{table}_org_id', table, type_='foreignkey')
+        op.drop_column(table, 'org_id')
+    op.drop_table('organizations')
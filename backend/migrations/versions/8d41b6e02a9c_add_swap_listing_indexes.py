@@ -0,0 +1,28 @@
+"""Add composite indexes for swap listings
+
+Revision ID: 8d41b6e02a9c
+Revises: 3c5e9a1f7b24
+Create Date: 2026-10-19 10:03:17.552901
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41b6e02a9c'
+down_revision = '3c5e9a1f7b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('swap_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_swap_requests_requestee_status_created', ['requestee_id', 'status', 'created_at'], unique=False)
+        batch_op.create_index('ix_swap_requests_requester_status_created', ['requester_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('swap_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_swap_requests_requester_status_created')
+        batch_op.drop_index('ix_swap_requests_requestee_status_created')
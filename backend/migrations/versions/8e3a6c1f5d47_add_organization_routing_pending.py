@@ -0,0 +1,26 @@
+"""Add organizations.routing_pending for schema moves
+
+Revision ID: 8e3a6c1f5d47
+Revises: 1f4c8b2d7e90
+Create Date: 2026-10-20 10:03:17.584102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3a6c1f5d47'
+down_revision = '1f4c8b2d7e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('organizations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('routing_pending', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('organizations', schema=None) as batch_op:
+        batch_op.drop_column('routing_pending')
@@ -0,0 +1,63 @@
+"""Add swap transition log and its daily rollup
+
+Revision ID: 9a3e6b0d2f71
+Revises: 1d8f4a6c9e52
+Create Date: 2026-10-20 11:27:05.318842
+
+New tables only. The log starts empty; history before this revision is not
+reconstructed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3e6b0d2f71'
+down_revision = '1d8f4a6c9e52'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_swap_transitions_org_from_user', ['org_id', 'from_user_id', 'id']),
+    ('ix_swap_transitions_org_to_user', ['org_id', 'to_user_id', 'id']),
+    ('ix_swap_transitions_org_slot', ['org_id', 'slot_id', 'id']),
+    ('ix_swap_transitions_org_other_slot', ['org_id', 'other_slot_id', 'id']),
+    ('ix_swap_transitions_created_at', ['created_at']),
+)
+
+
+def upgrade():
+    op.create_table('swap_transitions',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('swap_id', GUID(), nullable=False),
+    sa.Column('actor_id', GUID(), nullable=True),
+    sa.Column('from_user_id', GUID(), nullable=False),
+    sa.Column('to_user_id', GUID(), nullable=False),
+    sa.Column('slot_id', GUID(), nullable=False),
+    sa.Column('other_slot_id', GUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    for name, columns in INDEXES:
+        op.create_index(name, 'swap_transitions', columns, unique=False)
+
+    op.create_table('swap_transition_daily',
+    sa.Column('org_id', GUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('org_id', 'day', 'kind')
+    )
+
+
+def downgrade():
+    op.drop_table('swap_transition_daily')
+    for name, columns in INDEXES:
+        op.drop_index(name, table_name='swap_transitions')
+    op.drop_table('swap_transitions')
@@ -0,0 +1,38 @@
+"""Add EXPIRED swap status and swap_requests.expires_at
+
+Revision ID: 9f16c2b8d4a7
+Revises: 5a7d3f90c1e8
+Create Date: 2026-10-19 16:21:48.036552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f16c2b8d4a7'
+down_revision = '5a7d3f90c1e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # ADD VALUE cannot run inside a transaction block before PG 12.
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE swapstatus ADD VALUE IF NOT EXISTS 'EXPIRED'")
+
+    with op.batch_alter_table('swap_requests', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_swap_requests_pending_expires', ['expires_at'], unique=False,
+                              postgresql_where=sa.text("status = 'PENDING'"),
+                              sqlite_where=sa.text("status = 'PENDING'"))
+
+
+def downgrade():
+    # PostgreSQL cannot drop enum values; EXPIRED rows are folded into REJECTED.
+    op.execute("UPDATE swap_requests SET status = 'REJECTED' WHERE status = 'EXPIRED'")
+    op.execute("UPDATE swap_requests_archive SET status = 'REJECTED' WHERE status = 'EXPIRED'")
+    with op.batch_alter_table('swap_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_swap_requests_pending_expires')
+        batch_op.drop_column('expires_at')
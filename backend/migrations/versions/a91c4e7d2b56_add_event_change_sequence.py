@@ -0,0 +1,53 @@
+"""Add event change sequence and tombstones for delta sync
+
+Revision ID: a91c4e7d2b56
+Revises: 6e2b9d4f1a38
+Create Date: 2026-10-19 20:21:47.530164
+
+Existing events keep change_seq 0; clients start from the cursor returned
+by GET /api/events. Adding a column with a constant default is a catalog-only
+change on PostgreSQL 11+, and a plain ALTER TABLE (no rebuild) on SQLite, so
+the SQLite full-text triggers on events are unaffected.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'a91c4e7d2b56'
+down_revision = '6e2b9d4f1a38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('events', sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute('CREATE INDEX CONCURRENTLY ix_events_change_seq ON events (change_seq)')
+    else:
+        op.create_index('ix_events_change_seq', 'events', ['change_seq'], unique=False)
+
+    op.create_table('change_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO change_counters (name, value) VALUES ('events', 0)")
+
+    op.create_table('event_tombstones',
+    sa.Column('change_seq', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('event_id', GUID(), nullable=False),
+    sa.Column('user_id', GUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('change_seq')
+    )
+
+
+def downgrade():
+    op.drop_table('event_tombstones')
+    op.drop_table('change_counters')
+    op.drop_index('ix_events_change_seq', table_name='events')
+    op.drop_column('events', 'change_seq')
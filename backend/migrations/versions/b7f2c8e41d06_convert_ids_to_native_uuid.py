@@ -0,0 +1,218 @@
+"""Convert String(36) ids to native UUID / 16-byte binary
+
+Revision ID: b7f2c8e41d06
+Revises: 8d41b6e02a9c
+Create Date: 2026-10-19 11:26:52.904117
+
+On PostgreSQL the conversion runs online: shadow ``uuid`` columns are added
+and kept in sync by triggers, backfilled in small autocommitted batches and
+indexed concurrently, and only the final column swap takes short table locks.
+Foreign keys are re-added NOT VALID and validated afterwards so validation
+does not block writes.
+
+On SQLite (local development and tests) the tables are rebuilt in place
+with 16-byte binary ids.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f2c8e41d06'
+down_revision = '8d41b6e02a9c'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+# table -> id-bearing columns, primary key column first
+ID_COLUMNS = {
+    'users': ['id'],
+    'events': ['id', 'user_id'],
+    'swap_requests': ['id', 'requester_id', 'requestee_id', 'requester_slot_id', 'requestee_slot_id'],
+    'swap_counters': ['user_id'],
+}
+
+# (table, column, referenced table, ondelete)
+FOREIGN_KEYS = [
+    ('events', 'user_id', 'users', 'CASCADE'),
+    ('swap_requests', 'requester_id', 'users', 'CASCADE'),
+    ('swap_requests', 'requestee_id', 'users', 'CASCADE'),
+    ('swap_requests', 'requester_slot_id', 'events', 'CASCADE'),
+    ('swap_requests', 'requestee_slot_id', 'events', 'CASCADE'),
+    ('swap_counters', 'user_id', 'users', 'CASCADE'),
+]
+
+# index name -> (table, columns); all reference converted columns
+INDEXES = {
+    'ix_events_user_id': ('events', ['user_id']),
+    'ix_swap_requests_requester_id': ('swap_requests', ['requester_id']),
+    'ix_swap_requests_requestee_id': ('swap_requests', ['requestee_id']),
+    'ix_swap_requests_requestee_status_created': ('swap_requests', ['requestee_id', 'status', 'created_at']),
+    'ix_swap_requests_requester_status_created': ('swap_requests', ['requester_id', 'status', 'created_at']),
+}
+
+
+def _fk_name(table, column):
+    return f'{table}_{column}_fkey'
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+    else:
+        _upgrade_generic()
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _downgrade_postgresql()
+    else:
+        _downgrade_generic()
+
+
+# --- PostgreSQL -------------------------------------------------------------
+
+def _upgrade_postgresql():
+    # 1. Shadow columns plus sync triggers. Adding a nullable column without a
+    #    default is a catalog-only change.
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(f'{column}_uuid', postgresql.UUID(), nullable=True))
+
+        assignments = '\n'.join(f'    NEW.{c}_uuid := NEW.{c}::uuid;' for c in columns)
+        op.execute(f"""
+            CREATE FUNCTION {table}_sync_uuid() RETURNS trigger AS $$
+            BEGIN
+            {assignments}
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_sync_uuid BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_sync_uuid()
+        """)
+
+    with op.get_context().autocommit_block():
+        # 2. Backfill in small transactions so no lock is held for long.
+        for table, columns in ID_COLUMNS.items():
+            assignments = ', '.join(f'{c}_uuid = {c}::uuid' for c in columns)
+            key = columns[0]
+            while True:
+                result = op.get_bind().execute(sa.text(f"""
+                    UPDATE {table} SET {assignments}
+                    WHERE ctid = ANY(ARRAY(
+                        SELECT ctid FROM {table} WHERE {key}_uuid IS NULL LIMIT {BATCH_SIZE}
+                    ))
+                """))
+                if result.rowcount == 0:
+                    break
+
+        # 3. Build the replacement indexes without blocking writes, and prove
+        #    NOT NULL with validated CHECK constraints so SET NOT NULL can skip
+        #    its table scan.
+        for table, columns in ID_COLUMNS.items():
+            key = columns[0]
+            op.execute(f'CREATE UNIQUE INDEX CONCURRENTLY {table}_pkey_uuid ON {table} ({key}_uuid)')
+            for column in columns:
+                op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_uuid_not_null '
+                           f'CHECK ({column}_uuid IS NOT NULL) NOT VALID')
+                op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_uuid_not_null')
+        for name, (table, columns) in INDEXES.items():
+            cols = ', '.join(f'{c}_uuid' if c in ID_COLUMNS[table] else c for c in columns)
+            op.execute(f'CREATE INDEX CONCURRENTLY {name}_uuid ON {table} ({cols})')
+
+    # 4. Swap columns. Every statement here is catalog-only, so the
+    #    ACCESS EXCLUSIVE locks are held briefly.
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(_fk_name(table, column), table, type_='foreignkey')
+    for table, columns in ID_COLUMNS.items():
+        key = columns[0]
+        op.execute(f'DROP TRIGGER {table}_sync_uuid ON {table}')
+        op.execute(f'DROP FUNCTION {table}_sync_uuid()')
+        for column in columns:
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}_uuid', new_column_name=column)
+            op.alter_column(table, column, nullable=False)
+            op.drop_constraint(f'{table}_{column}_uuid_not_null', table, type_='check')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY USING INDEX {table}_pkey_uuid')
+    for name in INDEXES:
+        op.execute(f'ALTER INDEX {name}_uuid RENAME TO {name}')
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {_fk_name(table, column)} '
+                   f'FOREIGN KEY ({column}) REFERENCES {referred} (id) ON DELETE {ondelete} NOT VALID')
+
+    # 5. Validate foreign keys under SHARE UPDATE EXCLUSIVE, which allows writes.
+    with op.get_context().autocommit_block():
+        for table, column, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {_fk_name(table, column)}')
+
+
+def _downgrade_postgresql():
+    # Downgrade is an offline rewrite; it is only expected to run in recovery.
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(_fk_name(table, column), table, type_='foreignkey')
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.String(length=36),
+                            postgresql_using=f'{column}::text')
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(_fk_name(table, column), table, referred, [column], ['id'], ondelete=ondelete)
+
+
+# --- Other backends ---------------------------------------------------------
+
+def _convert_values(to_binary):
+    # One pass per table: every distinct id goes into a temporary mapping
+    # table, then each table is rewritten by a single UPDATE whose columns
+    # are looked up in the mapping by primary key.
+    bind = op.get_bind()
+    values = set()
+    for table, columns in ID_COLUMNS.items():
+        for column in columns:
+            values.update(value for (value,) in bind.execute(sa.text(f'SELECT DISTINCT {column} FROM {table}'))
+                          if value is not None)
+
+    bind.execute(sa.text('CREATE TEMPORARY TABLE id_map (old PRIMARY KEY, new NOT NULL)'))
+    mapping = []
+    for value in values:
+        if to_binary:
+            mapping.append({'old': value, 'new': uuid.UUID(str(value)).bytes})
+        else:
+            mapping.append({'old': value, 'new': str(uuid.UUID(bytes=bytes(value)))})
+    for start in range(0, len(mapping), BATCH_SIZE):
+        bind.execute(sa.text('INSERT INTO id_map (old, new) VALUES (:old, :new)'),
+                     mapping[start:start + BATCH_SIZE])
+
+    for table, columns in ID_COLUMNS.items():
+        assignments = ', '.join(
+            f'{column} = COALESCE((SELECT new FROM id_map WHERE old = {table}.{column}), {column})'
+            for column in columns
+        )
+        bind.execute(sa.text(f'UPDATE {table} SET {assignments}'))
+    bind.execute(sa.text('DROP TABLE id_map'))
+
+
+def _retype(existing_type, type_):
+    for table, columns in ID_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=existing_type, type_=type_,
+                                      existing_nullable=False)
+
+
+def _upgrade_generic():
+    # SQLite does not enforce column types, so values are rewritten first and
+    # the declared types are changed by the batch table rebuild. BLOB rather
+    # than BINARY, which has NUMERIC affinity in SQLite.
+    _convert_values(to_binary=True)
+    _retype(sa.String(length=36), sa.LargeBinary(length=16))
+
+
+def _downgrade_generic():
+    _convert_values(to_binary=False)
+    _retype(sa.LargeBinary(length=16), sa.String(length=36))
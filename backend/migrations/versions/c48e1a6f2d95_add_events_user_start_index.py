@@ -0,0 +1,26 @@
+"""Add (user_id, start_time) index on events
+
+Revision ID: c48e1a6f2d95
+Revises: 9f16c2b8d4a7
+Create Date: 2026-10-19 17:08:11.207743
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c48e1a6f2d95'
+down_revision = '9f16c2b8d4a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.create_index('ix_events_user_start', ['user_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_user_start')
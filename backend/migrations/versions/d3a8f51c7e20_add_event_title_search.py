@@ -0,0 +1,97 @@
+"""Add full-text search index on event titles
+
+Revision ID: d3a8f51c7e20
+Revises: 4b0f7e3a9c61
+Create Date: 2026-10-19 19:02:11.418305
+
+PostgreSQL gets a trigger-maintained tsvector column with a GIN index;
+SQLite gets an external-content FTS5 table. Later migrations that rebuild
+the SQLite events table must recreate the triggers, since the rebuild
+drops them.
+
+The DDL is inlined as it was at this revision; 5c1e7a9d3f62 rekeys the
+SQLite index.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f51c7e20'
+down_revision = '4b0f7e3a9c61'
+branch_labels = None
+depends_on = None
+
+TEXT_SEARCH_CONFIG = 'simple'
+
+POSTGRESQL_DDL = [
+    "ALTER TABLE events ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"UPDATE events SET search_vector = to_tsvector('{TEXT_SEARCH_CONFIG}', title)",
+    "CREATE INDEX IF NOT EXISTS ix_events_search_vector ON events USING GIN (search_vector)",
+    f"""
+    CREATE OR REPLACE FUNCTION events_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('{TEXT_SEARCH_CONFIG}', NEW.title);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS events_search_vector_update ON events",
+    """
+    CREATE TRIGGER events_search_vector_update BEFORE INSERT OR UPDATE OF title ON events
+    FOR EACH ROW EXECUTE FUNCTION events_search_vector_update()
+    """,
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(title, content='events', content_rowid='rowid')",
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF title ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+        INSERT INTO events_fts(rowid, title) VALUES (new.rowid, new.title);
+    END
+    """,
+    "INSERT INTO events_fts(events_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS events_fts_insert",
+    "DROP TRIGGER IF EXISTS events_fts_delete",
+    "DROP TRIGGER IF EXISTS events_fts_update",
+    "DROP TABLE IF EXISTS events_fts",
+]
+
+POSTGRESQL_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS events_search_vector_update ON events",
+    "DROP FUNCTION IF EXISTS events_search_vector_update()",
+    "DROP INDEX IF EXISTS ix_events_search_vector",
+    "ALTER TABLE events DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _statements(postgresql, sqlite):
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql
+    if dialect == 'sqlite':
+        return sqlite
+    return []
+
+
+def upgrade():
+    for statement in _statements(POSTGRESQL_DDL, SQLITE_DDL):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in _statements(POSTGRESQL_DROP_DDL, SQLITE_DROP_DDL):
+        op.execute(statement)
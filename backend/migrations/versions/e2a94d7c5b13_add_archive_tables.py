@@ -0,0 +1,64 @@
+"""Add archive tables for events and swap_requests
+
+Revision ID: e2a94d7c5b13
+Revises: b7f2c8e41d06
+Create Date: 2026-10-19 13:40:05.671382
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a94d7c5b13'
+down_revision = 'b7f2c8e41d06'
+branch_labels = None
+depends_on = None
+
+event_status = sa.Enum('BUSY', 'SWAPPABLE', 'SWAP_PENDING', name='eventstatus', create_type=False)
+swap_status = sa.Enum('PENDING', 'ACCEPTED', 'REJECTED', name='swapstatus', create_type=False)
+
+
+def upgrade():
+    op.create_table('events_archive',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('user_id', GUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.Column('status', event_status, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('events_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_events_archive_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_events_archive_start_time'), ['start_time'], unique=False)
+
+    op.create_table('swap_requests_archive',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('requester_id', GUID(), nullable=False),
+    sa.Column('requestee_id', GUID(), nullable=False),
+    sa.Column('requester_slot_id', GUID(), nullable=False),
+    sa.Column('requestee_slot_id', GUID(), nullable=False),
+    sa.Column('status', swap_status, nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['requester_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['requestee_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('swap_requests_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_swap_requests_archive_requestee_created', ['requestee_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_swap_requests_archive_requester_created', ['requester_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_table('swap_requests_archive')
+    op.drop_table('events_archive')
@@ -0,0 +1,63 @@
+"""Add recurring event series and occurrence exceptions
+
+Revision ID: f5c3b7a2e819
+Revises: a91c4e7d2b56
+Create Date: 2026-10-19 22:04:13.218406
+
+New tables only; events is untouched.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c3b7a2e819'
+down_revision = 'a91c4e7d2b56'
+branch_labels = None
+depends_on = None
+
+event_status = sa.Enum('BUSY', 'SWAPPABLE', 'SWAP_PENDING', name='eventstatus', create_type=False)
+
+
+def upgrade():
+    op.create_table('event_series',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('user_id', GUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('status', event_status, nullable=False),
+    sa.Column('dtstart', sa.DateTime(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('rrule', sa.String(length=255), nullable=False),
+    sa.Column('freq', sa.String(length=10), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('weekdays', sa.SmallInteger(), nullable=False),
+    sa.Column('until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_event_series_user_id', 'event_series', ['user_id'], unique=False)
+    op.create_index('ix_event_series_until', 'event_series', ['until'], unique=False)
+    op.create_index('ix_event_series_status_start', 'event_series', ['status', 'dtstart'], unique=False)
+
+    op.create_table('series_exceptions',
+    sa.Column('series_id', GUID(), nullable=False),
+    sa.Column('occurrence_start', sa.DateTime(), nullable=False),
+    sa.Column('event_id', GUID(), nullable=True),
+    sa.ForeignKeyConstraint(['series_id'], ['event_series.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('series_id', 'occurrence_start')
+    )
+    op.create_index('ix_series_exceptions_occurrence_start', 'series_exceptions', ['occurrence_start'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_series_exceptions_occurrence_start', table_name='series_exceptions')
+    op.drop_table('series_exceptions')
+    op.drop_index('ix_event_series_status_start', table_name='event_series')
+    op.drop_index('ix_event_series_until', table_name='event_series')
+    op.drop_index('ix_event_series_user_id', table_name='event_series')
+    op.drop_table('event_series')
@@ -0,0 +1,67 @@
+"""
+Shared fixtures for the API test suites.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models import User, Event, EventStatus
+
+
+@pytest.fixture
+def app():
+    """Create app instance with testing configuration."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    """Create two test users."""
+    user1 = User(name='User One', email='user1@test.com', password='password123')
+    user2 = User(name='User Two', email='user2@test.com', password='password123')
+    db.session.add_all([user1, user2])
+    db.session.commit()
+    return user1, user2
+
+
+@pytest.fixture
+def events(app, users):
+    """Create two SWAPPABLE slots and one BUSY slot."""
+    user1, user2 = users
+    now = datetime.utcnow()
+    event1 = Event(user_id=user1.id, title='User1 Meeting',
+                   start_time=now + timedelta(hours=1), end_time=now + timedelta(hours=2),
+                   status=EventStatus.SWAPPABLE)
+    event2 = Event(user_id=user2.id, title='User2 Meeting',
+                   start_time=now + timedelta(hours=3), end_time=now + timedelta(hours=4),
+                   status=EventStatus.SWAPPABLE)
+    event3 = Event(user_id=user2.id, title='User2 Busy Event',
+                   start_time=now + timedelta(hours=5), end_time=now + timedelta(hours=6),
+                   status=EventStatus.BUSY)
+    db.session.add_all([event1, event2, event3])
+    db.session.commit()
+    return event1, event2, event3
+
+
+@pytest.fixture
+def headers(app, users):
+    """JWT auth headers for both test users."""
+    user1, user2 = users
+    return {
+        'user1': {'Authorization': f'Bearer {create_access_token(identity=user1.id)}'},
+        'user2': {'Authorization': f'Bearer {create_access_token(identity=user2.id)}'},
+    }
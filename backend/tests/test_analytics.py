@@ -0,0 +1,72 @@
+"""
+Tests for the swap analytics rollups and the endpoint that reads them.
+"""
+
+from datetime import datetime, timedelta
+from app.models import SwapDailyStats, SwapTransition
+from app.services import analytics, transitions
+
+
+def create_swap(client, headers, users, events, mine=0, theirs=1):
+    response = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': users[1].id, 'my_event_id': events[mine].id, 'requestee_event_id': events[theirs].id})
+    return response.get_json()['swap']['id']
+
+
+def later(seconds=60):
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+def test_rollup_counts_latency_and_demand(client, users, events, headers):
+    accepted = create_swap(client, headers, users, events)
+    client.post(f'/api/requests/{accepted}/accept', headers=headers['user2'])
+    # The accepted swap traded the slots; ask for the first one back.
+    rejected = create_swap(client, headers, users, events, mine=1, theirs=0)
+    client.post(f'/api/requests/{rejected}/reject', headers=headers['user2'])
+
+    assert analytics.roll_up(now=later()) == SwapTransition.query.count() == 6
+    body = client.get('/api/analytics/swaps', headers=headers['user1']).get_json()
+    assert body['totals']['created'] == 2
+    assert (body['totals']['accepted'], body['totals']['rejected'], body['totals']['expired']) == (1, 1, 0)
+    assert body['totals']['accept_latency_seconds']['mean'] is not None
+    hours = {(bucket['hour'], bucket['requests']) for bucket in body['top_hours']}
+    assert hours == {(events[0].start_time.hour, 1), (events[1].start_time.hour, 1)}
+
+    response = client.post('/api/auth/register', json={
+        'name': 'Outsider', 'email': 'out@other.com', 'password': 'password123', 'organization': 'Other'})
+    other = {'Authorization': f'Bearer {response.get_json()["access_token"]}'}
+    body = client.get('/api/analytics/swaps', headers=other).get_json()
+    assert body['days'] == [] and body['top_hours'] == []
+
+
+def test_rollup_is_incremental_and_waits_for_settled_rows(client, users, events, headers):
+    create_swap(client, headers, users, events)
+    assert analytics.roll_up(now=datetime.utcnow()) == 0  # younger than ANALYTICS_ROLLUP_LAG
+    assert analytics.roll_up(now=later()) == 1
+    assert analytics.roll_up(now=later()) == 0
+
+    swap_id = create_swap(client, headers, users, events)
+    client.post(f'/api/requests/{swap_id}/reject', headers=headers['user2'])
+    assert analytics.roll_up(now=later(), batch_size=1) == 2
+    stats = SwapDailyStats.query.one()
+    assert (stats.created, stats.rejected, stats.accepted) == (2, 1, 0)
+
+
+def test_compaction_keeps_rows_not_rolled_up(client, users, events, headers):
+    create_swap(client, headers, users, events)
+    analytics.roll_up(now=later())
+    create_swap(client, headers, users, events)
+
+    assert transitions.compact(later()) == 1
+    assert SwapTransition.query.count() == 1
+    assert analytics.roll_up(now=later()) == 1
+    assert transitions.compact(later()) == 1
+
+
+def test_endpoint_validates_range(client, headers):
+    assert client.get('/api/analytics/swaps', headers=headers['user1'],
+                      query_string={'start': '2026-01-02', 'end': '2026-01-01'}).status_code == 400
+    assert client.get('/api/analytics/swaps', headers=headers['user1'],
+                      query_string={'start': '2020-01-01', 'end': '2026-01-01'}).status_code == 400
+    assert client.get('/api/analytics/swaps', headers=headers['user1'],
+                      query_string={'start': 'yesterday'}).status_code == 400
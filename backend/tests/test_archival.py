@@ -0,0 +1,91 @@
+"""
+Tests for hot/cold archival and reads across both tiers.
+"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import (
+    Event, EventStatus, SwapRequest, SwapStatus, SwapBundleSlot, ArchivedEvent, ArchivedSwapRequest, ArchivedSwapBundleSlot,
+)
+from app.services import archival, swap_counters
+
+
+def resolved_swap(users, events, status):
+    user1, user2 = users
+    event1, event2, _ = events
+    swap = SwapRequest(requester_id=user1.id, requestee_id=user2.id,
+                       requester_slot_id=event1.id, requestee_slot_id=event2.id)
+    swap.status = status
+    db.session.add(swap)
+    db.session.commit()
+    return swap
+
+
+class TestArchivalJob:
+    """Tests for the batched mover."""
+
+    def test_moves_resolved_swaps_then_unreferenced_events(self, app, users, events):
+        swap_id = resolved_swap(users, events, SwapStatus.ACCEPTED).id
+        swap_counters.reconcile()
+
+        moved = archival.run(batch_size=1, now=datetime.utcnow() + timedelta(days=365))
+
+        assert moved == {'swap_requests': 1, 'events': 3}
+        assert SwapRequest.query.count() == 0 and Event.query.count() == 0
+        assert db.session.get(ArchivedSwapRequest, swap_id).status == SwapStatus.ACCEPTED
+        assert ArchivedEvent.query.count() == 3
+        # Archived acceptances still count after reconciliation.
+        assert swap_counters.reconcile() == 0
+
+    def test_pending_swaps_pin_their_events(self, app, users, events):
+        resolved_swap(users, events, SwapStatus.PENDING)
+
+        moved = archival.run(now=datetime.utcnow() + timedelta(days=365))
+
+        assert moved == {'swap_requests': 0, 'events': 1}
+        assert SwapRequest.query.count() == 1
+
+    def test_bundles_keep_their_slots_and_release_their_events(self, client, headers, users, events):
+        event1, event2, busy = events
+        mine, theirs = [event1.id], [event2.id, busy.id]
+        busy.status = EventStatus.SWAPPABLE
+        db.session.commit()
+        swap_id = client.post('/api/requests/bundle', headers=headers['user1'], json={
+            'requestee_id': users[1].id, 'my_event_ids': mine, 'requestee_event_ids': theirs}).json['swap']['id']
+        client.post(f'/api/requests/{swap_id}/reject', headers=headers['user2'])
+
+        moved = archival.run(now=datetime.utcnow() + timedelta(days=365))
+
+        assert moved == {'swap_requests': 1, 'events': 3}
+        assert SwapBundleSlot.query.count() == 0 and ArchivedSwapBundleSlot.query.count() == 3
+        archived = db.session.get(ArchivedSwapRequest, swap_id)
+        assert archived.bundle_size == 3 and archived.expires_at is not None
+        swaps = client.get('/api/requests/history', headers=headers['user1']).json['swaps']
+        assert swaps[0]['bundle'] == {'requester_slot_ids': mine, 'requestee_slot_ids': theirs}
+
+    def test_respects_retention_window(self, app, users, events):
+        resolved_swap(users, events, SwapStatus.REJECTED)
+        assert archival.run() == {'swap_requests': 0, 'events': 0}
+
+
+class TestArchivedReads:
+    """Tests for transparent reads across hot and cold tables."""
+
+    def test_history_merges_hot_and_archived_swaps(self, client, headers, users, events):
+        event1_id = events[0].id
+        old_id = resolved_swap(users, events, SwapStatus.ACCEPTED).id
+        archival.archive_swaps(datetime.utcnow() + timedelta(days=1), batch_size=10)
+        recent_id = resolved_swap(users, events, SwapStatus.REJECTED).id
+
+        swaps = client.get('/api/requests/history', headers=headers['user1']).json['swaps']
+        assert [s['id'] for s in swaps] == [recent_id, old_id]
+        assert swaps[1]['archived'] is True
+        assert swaps[1]['requester_slot']['id'] == event1_id
+
+    def test_event_lookup_falls_back_to_archive(self, client, headers, events):
+        busy_id = events[2].id
+        archival.archive_events(datetime.utcnow() + timedelta(days=1), batch_size=10)
+
+        response = client.get(f'/api/events/{busy_id}', headers=headers['user1'])
+        assert response.status_code == 200
+        assert response.json['event']['archived'] is True
@@ -0,0 +1,102 @@
+"""
+Tests for the free/busy availability endpoint.
+"""
+
+import random
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import Event, EventStatus
+from app.services import availability, recurrence
+
+START = datetime(2026, 3, 2)
+
+
+def busy(user, start_hour, end_hour):
+    return Event(user_id=user.id, title='busy', status=EventStatus.BUSY,
+                 start_time=START + timedelta(hours=start_hour),
+                 end_time=START + timedelta(hours=end_hour))
+
+
+@pytest.mark.skipif(availability.np is None, reason='numpy not installed')
+def test_numpy_and_python_paths_agree():
+    rng = random.Random(7)
+    end = START + timedelta(days=7)
+    for _ in range(50):
+        intervals = []
+        for _ in range(rng.randint(0, 40)):
+            s = START + timedelta(minutes=rng.randint(-120, 7 * 24 * 60))
+            intervals.append((s, s + timedelta(minutes=rng.randint(1, 300))))
+        granularity = timedelta(minutes=rng.choice([5, 15, 30, 60]))
+        assert (availability.free_windows(intervals, START, end, granularity, use_numpy=True)
+                == availability.free_windows(intervals, START, end, granularity, use_numpy=False))
+
+
+def test_endpoint_returns_common_free_windows(client, headers, users):
+    user1, user2 = users
+    db.session.add_all([busy(user1, 9, 10), busy(user2, 9.5, 11), busy(user2, 13, 14)])
+    db.session.commit()
+
+    response = client.post('/api/availability', json={
+        'user_ids': [user1.id, user2.id],
+        'start': (START + timedelta(hours=8)).isoformat(),
+        'end': (START + timedelta(hours=15)).isoformat(),
+        'granularity_minutes': 30,
+        'min_duration_minutes': 60,
+    }, headers=headers['user1'])
+
+    assert response.status_code == 200
+    assert response.json['free'] == [
+        {'start': '2026-03-02T08:00:00', 'end': '2026-03-02T09:00:00'},
+        {'start': '2026-03-02T11:00:00', 'end': '2026-03-02T13:00:00'},
+        {'start': '2026-03-02T14:00:00', 'end': '2026-03-02T15:00:00'},
+    ]
+
+
+def test_busy_series_occurrences_are_not_free(client, headers, users):
+    user1, _ = users
+    recurrence.create_series(user1.id, 'standup', START + timedelta(hours=9), START + timedelta(hours=10),
+                             'FREQ=DAILY;COUNT=3', status=EventStatus.BUSY)
+    db.session.commit()
+
+    response = client.post('/api/availability', json={
+        'user_ids': [user1.id],
+        'start': (START + timedelta(days=1, hours=8)).isoformat(),
+        'end': (START + timedelta(days=1, hours=12)).isoformat(),
+        'granularity_minutes': 30,
+    }, headers=headers['user1'])
+
+    assert response.status_code == 200
+    assert response.json['free'] == [
+        {'start': '2026-03-03T08:00:00', 'end': '2026-03-03T09:00:00'},
+        {'start': '2026-03-03T10:00:00', 'end': '2026-03-03T12:00:00'},
+    ]
+
+
+def test_endpoint_validates_window(client, headers, users):
+    response = client.post('/api/availability', json={
+        'user_ids': [users[0].id], 'start': '2026-03-02T10:00:00', 'end': '2026-03-02T09:00:00',
+    }, headers=headers['user1'])
+    assert response.status_code == 400
+
+
+def test_endpoint_converts_offsets_and_names_the_bad_parameter(client, headers, users):
+    user1, _ = users
+    db.session.add(busy(user1, 9, 10))
+    db.session.commit()
+
+    response = client.post('/api/availability', json={
+        'user_ids': [user1.id], 'start': '2026-03-02T10:00:00+02:00', 'end': '2026-03-02T11:00:00Z',
+    }, headers=headers['user1'])
+    assert response.status_code == 200
+    assert response.json['free'] == [
+        {'start': '2026-03-02T08:00:00', 'end': '2026-03-02T09:00:00'},
+        {'start': '2026-03-02T10:00:00', 'end': '2026-03-02T11:00:00'},
+    ]
+
+    response = client.post('/api/availability', json={
+        'user_ids': [user1.id], 'start': '2026-03-02T08:00:00', 'end': '2026-03-02T11:00:00',
+        'min_duration_minutes': -5,
+    }, headers=headers['user1'])
+    assert response.status_code == 400
+    assert 'min_duration_minutes' in response.json['message']
@@ -0,0 +1,108 @@
+"""
+Tests for request batching.
+"""
+
+from datetime import timedelta
+from flask_jwt_extended import view_decorators
+from sqlalchemy import event as sa_event
+from app.extensions import db
+from app.models import Event
+from app.routes import batch
+
+
+def run(client, headers, requests):
+    return client.post('/api/batch', json={'requests': requests}, headers=headers)
+
+
+def test_runs_sub_requests_in_order(client, headers, events):
+    event1 = events[0]
+    response = run(client, headers['user1'], [
+        {'id': 'me', 'method': 'GET', 'path': '/api/auth/me'},
+        {'id': 'rename', 'method': 'PUT', 'path': f'/api/events/{event1.id}', 'body': {'title': 'Renamed'}},
+        {'id': 'event', 'method': 'GET', 'path': f'/api/events/{event1.id}'},
+        {'id': 'swappable', 'path': '/api/events?status=BUSY'},
+        {'id': 'missing', 'path': '/api/events/not-an-id'},
+    ])
+    assert response.status_code == 200
+    results = {r['id']: r for r in response.json['responses']}
+    assert [r['id'] for r in response.json['responses']] == ['me', 'rename', 'event', 'swappable', 'missing']
+    assert results['me']['body']['user']['id'] == event1.user_id
+    assert results['event']['body']['event']['title'] == 'Renamed'
+    assert [e['id'] for e in results['swappable']['body']['events']] == [events[2].id]
+    assert results['missing']['status'] == 404
+
+
+def test_shares_identity_and_session(app, client, headers):
+    db.session.expunge_all()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sa_event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        response = run(client, headers['user1'], [
+            {'method': 'GET', 'path': '/api/auth/me'},
+            {'method': 'GET', 'path': '/api/events'},
+            {'method': 'GET', 'path': '/api/requests/pending'},
+        ])
+    finally:
+        sa_event.remove(db.engine, 'before_cursor_execute', listener)
+    assert [r['status'] for r in response.json['responses']] == [200, 200, 200]
+    assert sum('FROM users' in s and 'WHERE users.id' in s for s in statements) == 1
+
+
+def test_token_is_verified_once_per_batch(client, headers, events, monkeypatch):
+    decodes = []
+    decode_token = view_decorators.decode_token
+    monkeypatch.setattr(view_decorators, 'decode_token', lambda *args: decodes.append(1) or decode_token(*args))
+    response = run(client, headers['user1'], [
+        {'method': 'GET', 'path': '/api/auth/me'},
+        {'method': 'GET', 'path': '/api/events'},
+        {'method': 'PUT', 'path': f'/api/events/{events[0].id}', 'body': {'title': 'Renamed'}},
+    ])
+    assert [r['status'] for r in response.json['responses']] == [200, 200, 200]
+    assert len(decodes) == 1
+
+
+def test_rejects_bad_batches(client, headers):
+    assert client.post('/api/batch', json={'requests': [{'path': '/api/auth/me'}]}).status_code == 401
+    assert run(client, headers['user1'], []).status_code == 400
+    assert run(client, headers['user1'], [{'path': '/api/batch'}]).status_code == 400
+    assert run(client, headers['user1'], [{'path': '/api/auth/me', 'method': 'PATCH'}]).status_code == 400
+    assert run(client, headers['user1'], [{'path': '/api/auth/me'}] * 21).status_code == 400
+
+
+def test_concurrent_reads_are_bounded_by_writes(app, client, headers, monkeypatch):
+    calls = []
+
+    def fake_isolated(app, environ):
+        calls.append(('parallel', environ['PATH_INFO']))
+        return {'status': 200, 'body': None}
+
+    def fake_dispatch(app, environ):
+        calls.append(('serial', environ['PATH_INFO']))
+        return {'status': 200, 'body': None}
+
+    monkeypatch.setattr(batch, '_can_parallelize', lambda app: True)
+    monkeypatch.setattr(batch, '_dispatch_isolated', fake_isolated)
+    monkeypatch.setattr(batch, '_dispatch', fake_dispatch)
+    run(client, headers['user1'], [
+        {'path': '/api/a'}, {'path': '/api/b'}, {'method': 'POST', 'path': '/api/c'},
+        {'path': '/api/d'},
+    ])
+    assert sorted(calls[:2]) == [('parallel', '/api/a'), ('parallel', '/api/b')]
+    assert calls[2:] == [('serial', '/api/c'), ('serial', '/api/d')]
+
+
+def test_failed_sub_request_is_not_saved_by_the_next(client, headers, events):
+    event1 = events[0]
+    start, end = event1.start_time, event1.end_time
+    response = run(client, headers['user1'], [
+        {'method': 'PUT', 'path': f'/api/events/{event1.id}',
+         'body': {'start_time': (end + timedelta(hours=1)).isoformat()}},
+        {'method': 'POST', 'path': '/api/events', 'body': {
+            'title': 'New', 'start_time': (end + timedelta(days=1)).isoformat(),
+            'end_time': (end + timedelta(days=1, hours=1)).isoformat()}},
+    ])
+    assert [r['status'] for r in response.json['responses']] == [400, 201]
+    db.session.expire_all()
+    stored = db.session.get(Event, event1.id)
+    assert (stored.start_time, stored.end_time) == (start, end)
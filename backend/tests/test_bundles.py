@@ -0,0 +1,81 @@
+"""
+Tests for bundle swaps: several slots traded for several, all or nothing.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Event, EventStatus, SwapRequest, SwapStatus, SwapTransition
+
+
+@pytest.fixture
+def slots(users):
+    """Two half-hour SWAPPABLE slots for user1, one hour-long for user2."""
+    user1, user2 = users
+    start = datetime.utcnow() + timedelta(days=1)
+    halves = [Event(user1.id, f'Half {i}', start + timedelta(minutes=30 * i), start + timedelta(minutes=30 * (i + 1)))
+              for i in range(2)]
+    hour = Event(user2.id, 'Hour', start + timedelta(hours=3), start + timedelta(hours=4))
+    db.session.add_all(halves + [hour])
+    db.session.commit()
+    return halves, hour
+
+
+def offer(client, headers, users, mine, theirs):
+    return client.post('/api/requests/bundle', headers=headers['user1'], json={
+        'requestee_id': users[1].id, 'my_event_ids': mine, 'requestee_event_ids': theirs})
+
+
+def test_accept_trades_every_slot_at_once(client, users, headers, slots):
+    user1, user2 = users
+    halves, hour = slots
+    response = offer(client, headers, users, [halves[0].id, halves[1].id], [hour.id])
+    assert response.status_code == 201
+    swap = response.get_json()['swap']
+    assert swap['bundle'] == {'requester_slot_ids': [halves[0].id, halves[1].id], 'requestee_slot_ids': [hour.id]}
+
+    response = client.post(f'/api/requests/{swap["id"]}/accept', headers=headers['user2'])
+    assert response.status_code == 200 and response.get_json()['swap']['status'] == 'ACCEPTED'
+    owners = {event.id: event.user_id for event in Event.query.filter(Event.id.in_([e.id for e in halves + [hour]]))}
+    assert owners == {halves[0].id: user2.id, halves[1].id: user2.id, hour.id: user1.id}
+    kinds = [row.kind for row in SwapTransition.query.order_by(SwapTransition.id)]
+    assert kinds == ['swap.created'] + ['slot.owner_changed'] * 3 + ['swap.accepted']
+
+
+def test_accept_fails_whole_when_a_slot_changed_hands(client, users, events, headers, slots):
+    halves, hour = slots
+    bundle_id = offer(client, headers, users, [halves[0].id, events[0].id], [hour.id]).get_json()['swap']['id']
+    single = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': users[1].id, 'my_event_id': events[0].id, 'requestee_event_id': events[1].id})
+    client.post(f'/api/requests/{single.get_json()["swap"]["id"]}/accept', headers=headers['user2'])
+
+    response = client.post(f'/api/requests/{bundle_id}/accept', headers=headers['user2'])
+    assert response.status_code == 409
+    db.session.expire_all()
+    assert db.session.get(SwapRequest, bundle_id).status == SwapStatus.PENDING
+    assert db.session.get(Event, halves[0].id).user_id == users[0].id
+    assert db.session.get(Event, hour.id).user_id == users[1].id
+
+
+def test_create_validates_slots_in_one_pass(client, users, events, headers, slots):
+    halves, hour = slots
+    busy = events[2]
+    assert busy.status == EventStatus.BUSY
+    cases = [
+        ([halves[0].id, halves[0].id], [hour.id], 'A slot may appear only once in a bundle'),
+        ([halves[0].id], [hour.id, busy.id], f'Slot {busy.id} is not swappable'),
+        ([halves[0].id, hour.id], [events[1].id], f'Slot {hour.id} not found or not owned'),
+        ([], [hour.id], 'Each side of a bundle needs 1 to 8 slots'),
+    ]
+    for mine, theirs, message in cases:
+        response = offer(client, headers, users, mine, theirs)
+        assert (response.status_code, response.get_json()['message']) == (400, message)
+    assert SwapRequest.query.count() == 0
+
+
+def test_rejected_bundle_cannot_be_accepted(client, users, headers, slots):
+    halves, hour = slots
+    swap_id = offer(client, headers, users, [halves[0].id], [hour.id]).get_json()['swap']['id']
+    response = client.post(f'/api/requests/{swap_id}/reject', headers=headers['user2'])
+    assert response.get_json()['swap']['status'] == 'REJECTED'
+    assert client.post(f'/api/requests/{swap_id}/accept', headers=headers['user2']).status_code == 400
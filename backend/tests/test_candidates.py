@@ -0,0 +1,67 @@
+"""
+Tests for ranked swap-candidate recommendations.
+"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Event, EventStatus
+from app.services import recurrence
+from app.services.candidates import BusyIndex
+
+
+def slot(user, start, minutes, status=EventStatus.SWAPPABLE, title='slot'):
+    return Event(user_id=user.id, title=title, start_time=start,
+                 end_time=start + timedelta(minutes=minutes), status=status)
+
+
+def test_busy_index_overlaps():
+    t = datetime(2026, 1, 1)
+    index = BusyIndex([(t, t + timedelta(hours=1)), (t + timedelta(minutes=30), t + timedelta(hours=2))])
+    assert index.overlaps(t + timedelta(hours=1), t + timedelta(hours=3))
+    assert not index.overlaps(t + timedelta(hours=2), t + timedelta(hours=3))
+    assert not index.overlaps(t - timedelta(hours=1), t)
+
+
+def test_candidates_ranked_by_proximity_duration_and_conflicts(client, headers, users):
+    user1, user2 = users
+    base = datetime.utcnow().replace(microsecond=0) + timedelta(days=2)
+    source = slot(user1, base, 60)
+    mine_busy = slot(user1, base + timedelta(hours=5), 60, EventStatus.BUSY)
+    near = slot(user2, base + timedelta(hours=1), 60, title='near')
+    far = slot(user2, base + timedelta(days=3), 60, title='far')
+    short = slot(user2, base + timedelta(hours=1), 15, title='short')
+    clash = slot(user2, base + timedelta(hours=5), 60, title='clash')
+    busy = slot(user2, base + timedelta(hours=1), 60, EventStatus.BUSY, title='busy')
+    db.session.add_all([source, mine_busy, near, far, short, clash, busy])
+    db.session.commit()
+
+    response = client.get(f'/api/events/{source.id}/candidates?k=10', headers=headers['user1'])
+
+    assert response.status_code == 200
+    ranked = response.json['candidates']
+    assert [c['event']['title'] for c in ranked] == ['near', 'short', 'far', 'clash']
+    assert ranked[-1]['conflicts'] is True
+    assert ranked[0]['event']['owner']['id'] == user2.id
+
+
+def test_busy_series_occurrences_count_as_conflicts(client, headers, users):
+    user1, user2 = users
+    base = datetime.utcnow().replace(microsecond=0) + timedelta(days=2)
+    source = slot(user1, base, 60)
+    clash = slot(user2, base + timedelta(days=1), 60, title='clash')
+    db.session.add_all([source, clash])
+    recurrence.create_series(user1.id, 'standup', base + timedelta(days=1), base + timedelta(days=1, hours=1),
+                             'FREQ=DAILY;COUNT=2', status=EventStatus.BUSY)
+    db.session.commit()
+
+    response = client.get(f'/api/events/{source.id}/candidates', headers=headers['user1'])
+    assert [(c['event']['title'], c['conflicts']) for c in response.json['candidates']] == [('clash', True)]
+
+
+def test_candidates_require_ownership(client, headers, users):
+    user1, user2 = users
+    theirs = slot(user2, datetime.utcnow() + timedelta(days=1), 60)
+    db.session.add(theirs)
+    db.session.commit()
+    response = client.get(f'/api/events/{theirs.id}/candidates', headers=headers['user1'])
+    assert response.status_code == 403
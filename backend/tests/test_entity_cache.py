@@ -0,0 +1,166 @@
+"""
+Tests for the read-through entity cache.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from app.services import entity_cache, expiry, tenancy
+from app.utils.cache import LRUCache, SingleFlight
+from app.utils.metrics import metrics
+
+
+def create_swap(client, headers, users, events):
+    user1, user2 = users
+    event1, event2, _ = events
+    response = client.post('/api/requests/swap', json={
+        'requestee_id': user2.id, 'my_event_id': event1.id, 'requestee_event_id': event2.id,
+    }, headers=headers['user1'])
+    return response.json['swap']
+
+
+def test_lru_cache_bounds_size():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.evictions == 1
+
+
+def test_versioned_set_skips_invalidated_keys():
+    cache = LRUCache(maxsize=2, ttl=60)
+    version = cache.version('a')
+    cache.invalidate('a')
+    assert cache.set_if_version('a', 1, version) is False and cache.get('a') is None
+    assert cache.set_if_version('a', 2, cache.version('a')) is True and cache.get('a') == 2
+
+
+def test_single_flight_collapses_concurrent_loads():
+    flight = SingleFlight()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+class TestEventCache:
+    """Tests for cached event detail reads."""
+
+    def test_repeat_reads_hit_the_cache(self, client, headers, events):
+        event1 = events[0]
+        first = client.get(f'/api/events/{event1.id}', headers=headers['user1'])
+        hits = metrics.get('cache.hits')
+        second = client.get(f'/api/events/{event1.id}', headers=headers['user1'])
+        assert second.json == first.json
+        assert second.json['event']['owner']['id'] == event1.user_id
+        assert metrics.get('cache.hits') == hits + 1
+
+    def test_update_and_delete_invalidate(self, client, headers, events):
+        event1 = events[0]
+        client.get(f'/api/events/{event1.id}', headers=headers['user1'])
+
+        client.put(f'/api/events/{event1.id}', json={'title': 'Renamed'}, headers=headers['user1'])
+        assert client.get(f'/api/events/{event1.id}', headers=headers['user1']).json['event']['title'] == 'Renamed'
+
+        client.delete(f'/api/events/{event1.id}', headers=headers['user1'])
+        assert client.get(f'/api/events/{event1.id}', headers=headers['user1']).status_code == 404
+
+    def test_load_racing_an_invalidation_is_not_stored(self, app, events):
+        event1 = events[0]
+        cache = entity_cache.get_cache()
+        original = entity_cache.LOADERS['event']
+
+        def racing_load(event_id):
+            value = original(event_id)
+            cache.invalidate('event', [event_id])
+            return value
+
+        entity_cache.LOADERS['event'] = racing_load
+        try:
+            assert cache.get('event', event1.id)['id'] == event1.id
+        finally:
+            entity_cache.LOADERS['event'] = original
+        assert cache.backend.get(f'event:{event1.id}') is None
+
+    def test_invalidation_in_another_process_drops_the_racing_load(self, app, events):
+        event1 = events[0]
+        cache = entity_cache.get_cache()
+        # A second process sharing the backend, as with ENTITY_CACHE_URL
+        other = entity_cache.EntityCache(cache.backend)
+        original = entity_cache.LOADERS['event']
+
+        def racing_load(event_id):
+            value = original(event_id)
+            other.invalidate('event', [event_id])
+            return value
+
+        entity_cache.LOADERS['event'] = racing_load
+        try:
+            assert cache.get('event', event1.id)['id'] == event1.id
+        finally:
+            entity_cache.LOADERS['event'] = original
+        assert cache.backend.get(f'event:{event1.id}') is None
+
+    def test_loads_are_not_shared_across_organizations(self, app, events):
+        cache = entity_cache.get_cache()
+        flights = []
+        do = cache._flight.do
+        cache._flight.do = lambda key, fn: flights.append(key) or do(key, fn)
+        try:
+            for org_id in ('00000000-0000-7000-8000-00000000000a', '00000000-0000-7000-8000-00000000000b'):
+                cache.backend.clear()
+                with tenancy.scope(org_id):
+                    assert cache.get('event', events[0].id) is None
+        finally:
+            cache._flight.do = do
+        assert len(set(flights)) == 2
+
+
+class TestSwapCache:
+    """Tests for cached swap detail reads."""
+
+    def test_swap_detail_is_participant_only(self, client, headers, users, events):
+        swap = create_swap(client, headers, users, events)
+        response = client.get(f'/api/requests/{swap["id"]}', headers=headers['user2'])
+        assert response.status_code == 200
+        assert response.json['swap']['requester_slot']['id'] == events[0].id
+        assert 'owner' not in response.json['swap']['requester_slot']
+
+        client.post('/api/auth/register', json={'name': 'Third', 'email': 'third@example.com',
+                                                'password': 'password123'})
+        token = client.post('/api/auth/login', json={'email': 'third@example.com',
+                                                     'password': 'password123'}).json['access_token']
+        response = client.get(f'/api/requests/{swap["id"]}', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 403
+
+    def test_accept_invalidates_swap_and_slots(self, client, headers, users, events):
+        user1, user2 = users
+        swap = create_swap(client, headers, users, events)
+        client.get(f'/api/requests/{swap["id"]}', headers=headers['user1'])
+
+        client.post(f'/api/requests/{swap["id"]}/accept', headers=headers['user2'])
+        detail = client.get(f'/api/requests/{swap["id"]}', headers=headers['user1']).json['swap']
+        assert detail['status'] == 'ACCEPTED'
+        assert detail['requester_slot']['user_id'] == user2.id
+        assert detail['requestee_slot']['user_id'] == user1.id
+
+    def test_sweeper_invalidates_expired_swaps(self, client, headers, users, events):
+        swap = create_swap(client, headers, users, events)
+        client.get(f'/api/requests/{swap["id"]}', headers=headers['user1'])
+
+        assert expiry.sweep(now=datetime.utcnow() + timedelta(hours=5)) == 1
+        detail = client.get(f'/api/requests/{swap["id"]}', headers=headers['user1']).json['swap']
+        assert detail['status'] == 'EXPIRED'
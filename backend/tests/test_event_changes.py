@@ -0,0 +1,115 @@
+"""
+Tests for the delta sync endpoint.
+"""
+
+import importlib.util
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text, event as sa_event
+from app.extensions import db
+from app.services import archival, changes
+
+
+def get_changes(client, headers, since, **params):
+    response = client.get('/api/events/changes', query_string=dict(since=since, **params), headers=headers)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_reports_creates_updates_swaps_and_deletes(client, headers, users, events):
+    user1, user2 = users
+    event1, event2, event3 = events
+    cursor = client.get('/api/events', headers=headers['user1']).json['cursor']
+
+    client.put(f'/api/events/{event3.id}', json={'title': 'Renamed'}, headers=headers['user2'])
+    swap = client.post('/api/requests/swap', json={
+        'requestee_id': user2.id, 'my_event_id': event1.id, 'requestee_event_id': event2.id,
+    }, headers=headers['user1']).json['swap']
+    client.post(f'/api/requests/{swap["id"]}/accept', headers=headers['user2'])
+    client.delete(f'/api/events/{event3.id}', headers=headers['user2'])
+
+    data = get_changes(client, headers['user1'], cursor)
+    changed = {event['id']: event for event in data['events']}
+    # event3's update is superseded by its deletion.
+    assert set(changed) == {event1.id, event2.id}
+    assert changed[event1.id]['user_id'] == user2.id
+    assert [tombstone['id'] for tombstone in data['deleted']] == [event3.id]
+    assert data['has_more'] is False
+
+    assert get_changes(client, headers['user1'], data['cursor']) == {
+        'events': [], 'deleted': [], 'cursor': data['cursor'], 'has_more': False}
+
+
+def test_paginates_in_sequence_order(client, headers, events):
+    cursor = client.get('/api/events', headers=headers['user2']).json['cursor']
+    for title in ('a', 'b', 'c'):
+        client.put(f'/api/events/{events[1].id}', json={'title': title}, headers=headers['user2'])
+        client.put(f'/api/events/{events[2].id}', json={'title': title}, headers=headers['user2'])
+
+    first = get_changes(client, headers['user2'], cursor, limit=1)
+    assert first['has_more'] is True and first['events'][0]['id'] == events[1].id
+    second = get_changes(client, headers['user2'], first['cursor'], limit=1)
+    assert second['has_more'] is False and second['events'][0]['id'] == events[2].id
+
+
+def test_quiet_poll_is_one_query(app, client, headers, events):
+    head = changes.current_cursor()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sa_event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert changes.since(head, 50) == ([], [], head, False)
+    finally:
+        sa_event.remove(db.engine, 'before_cursor_execute', listener)
+    assert len(statements) == 1 and 'change_counters' in statements[0]
+
+
+def test_archived_events_become_tombstones_and_old_cursors_expire(client, headers, events):
+    cursor = changes.current_cursor()
+    event_ids = {event.id for event in events}
+    archival.archive_events(datetime.utcnow() + timedelta(days=1), batch_size=10)
+    data = get_changes(client, headers['user1'], cursor)
+    assert {tombstone['id'] for tombstone in data['deleted']} == event_ids
+
+    assert changes.prune_tombstones(datetime.utcnow() + timedelta(seconds=1)) == 3
+    response = client.get('/api/events/changes', query_string={'since': cursor}, headers=headers['user1'])
+    assert response.status_code == 410
+    assert get_changes(client, headers['user1'], data['cursor'])['deleted'] == []
+
+
+def test_rolled_back_writes_take_no_sequence(app, events):
+    head = changes.current_cursor()
+    events[0].title = 'Discarded'
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+    assert changes.current_cursor() == head
+
+
+def test_migration_seeds_per_org_counters_under_canonical_ids():
+    path = Path(__file__).parents[1] / 'migrations/versions/5f8a2c7e1b94_per_org_event_change_counters.py'
+    spec = importlib.util.spec_from_file_location('per_org_event_change_counters', path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    org_id = uuid.uuid4()
+
+    with create_engine('sqlite://').begin() as connection:
+        connection.execute(text('CREATE TABLE organizations (id BLOB PRIMARY KEY)'))
+        connection.execute(text('CREATE TABLE change_counters (name VARCHAR(50) PRIMARY KEY, value BIGINT NOT NULL)'))
+        connection.execute(text('CREATE TABLE event_tombstones (change_seq BIGINT PRIMARY KEY, org_id BLOB, '
+                                'event_id BLOB NOT NULL, user_id BLOB NOT NULL, deleted_at DATETIME NOT NULL)'))
+        connection.execute(text('CREATE INDEX ix_event_tombstones_org_seq ON event_tombstones (org_id, change_seq)'))
+        # Stored as raw bytes, as GUID writes it on SQLite
+        connection.execute(text('INSERT INTO organizations (id) VALUES (:id)'), {'id': org_id.bytes})
+        connection.execute(text("INSERT INTO change_counters VALUES ('events', 50), ('event_tombstones_pruned', 7)"))
+
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+
+        assert dict(connection.execute(text('SELECT name, value FROM change_counters')).all()) == {
+            changes.counter_name(changes.EVENTS, str(org_id)): 50,
+            changes.counter_name(changes.TOMBSTONES_PRUNED, str(org_id)): 7,
+        }
@@ -0,0 +1,79 @@
+"""
+Tests for full-text search over event titles.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.extensions import db
+from app.models import Event, EventStatus
+
+
+def add(user, title, hours, status=EventStatus.SWAPPABLE):
+    start = datetime(2026, 5, 1) + timedelta(hours=hours)
+    event = Event(user_id=user.id, title=title, start_time=start,
+                  end_time=start + timedelta(hours=1), status=status)
+    db.session.add(event)
+    return event
+
+
+def titles(response):
+    assert response.status_code == 200
+    return [e['title'] for e in response.json['events']]
+
+
+def test_search_matches_prefixes_and_ranks(client, headers, users):
+    user1, _ = users
+    add(user1, 'Daily standup', 1)
+    add(user1, 'Standup standup retro', 2)
+    add(user1, 'On-call handover', 3)
+    db.session.commit()
+
+    assert set(titles(client.get('/api/events?q=stand', headers=headers['user1']))) == {
+        'Daily standup', 'Standup standup retro'}
+    assert titles(client.get('/api/events?q=on-call', headers=headers['user1'])) == ['On-call handover']
+    assert titles(client.get('/api/events?q=%22%29%28', headers=headers['user1'])) == []
+
+
+def test_search_combines_with_filters_and_paginates(client, headers, users):
+    user1, _ = users
+    for i in range(3):
+        add(user1, f'Standup {i}', i)
+    add(user1, 'Standup busy', 5, EventStatus.BUSY)
+    db.session.commit()
+
+    response = client.get('/api/events?q=standup&status=SWAPPABLE&limit=2', headers=headers['user1'])
+    assert len(titles(response)) == 2 and response.json['next_offset'] == 2
+    response = client.get('/api/events?q=standup&status=SWAPPABLE&limit=2&offset=2', headers=headers['user1'])
+    assert len(titles(response)) == 1 and response.json['next_offset'] is None
+
+    response = client.get('/api/events?q=standup&start=2026-05-01T04:30:00', headers=headers['user1'])
+    assert titles(response) == ['Standup busy']
+
+
+def test_index_follows_updates_and_deletes(client, headers, users):
+    user1, _ = users
+    event = add(user1, 'Standup', 1)
+    db.session.commit()
+
+    client.put(f'/api/events/{event.id}', json={'title': 'Planning'}, headers=headers['user1'])
+    assert titles(client.get('/api/events?q=standup', headers=headers['user1'])) == []
+    assert titles(client.get('/api/events?q=planning', headers=headers['user1'])) == ['Planning']
+
+    client.delete(f'/api/events/{event.id}', headers=headers['user1'])
+    assert titles(client.get('/api/events?q=planning', headers=headers['user1'])) == []
+
+
+def test_index_survives_rowid_renumbering(client, headers, users):
+    user1, _ = users
+    standup = add(user1, 'Standup', 1)
+    add(user1, 'Retro', 2)
+    db.session.commit()
+    # What VACUUM or a table rebuild may do to the implicit rowids of events
+    db.session.execute(text('UPDATE events SET rowid = rowid + 1000'))
+    db.session.commit()
+
+    assert titles(client.get('/api/events?q=standup', headers=headers['user1'])) == ['Standup']
+    client.delete(f'/api/events/{standup.id}', headers=headers['user1'])
+    assert titles(client.get('/api/events?q=standup', headers=headers['user1'])) == []
+    assert titles(client.get('/api/events?q=retro', headers=headers['user1'])) == ['Retro']
+    assert db.session.execute(text('SELECT count(*) FROM events_fts')).scalar() == Event.query.count()
@@ -0,0 +1,94 @@
+"""
+Tests for expiry of stale pending swaps.
+"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Event, EventStatus, Organization, SwapRequest, SwapStatus, OutboxMessage, User
+from app.services import expiry, swap_counters, tenancy
+
+
+def create_swap(client, headers, users, events):
+    user1, user2 = users
+    event1, event2, _ = events
+    response = client.post('/api/requests/swap', json={
+        'requestee_id': user2.id, 'my_event_id': event1.id, 'requestee_event_id': event2.id,
+    }, headers=headers['user1'])
+    return response.json['swap']
+
+
+class TestSweeper:
+    """Tests for the batched sweeper."""
+
+    def test_new_swaps_get_ttl(self, app, client, headers, users, events):
+        swap = create_swap(client, headers, users, events)
+        expires_at = datetime.fromisoformat(swap['expires_at'])
+        assert expires_at - datetime.utcnow() > app.config['SWAP_REQUEST_TTL'] - timedelta(minutes=1)
+
+    def test_sweep_expires_swaps_whose_slot_started(self, client, headers, users, events):
+        user1, user2 = users
+        for _ in range(3):
+            create_swap(client, headers, users, events)
+
+        assert expiry.sweep(batch_size=2) == 0
+        # Slots start within hours, well before the TTL.
+        assert expiry.sweep(now=datetime.utcnow() + timedelta(hours=5), batch_size=2) == 3
+
+        assert {s.status for s in SwapRequest.query} == {SwapStatus.EXPIRED}
+        assert swap_counters.get_summary(user2.id)['pending_received'] == 0
+        assert swap_counters.get_summary(user1.id)['pending_sent'] == 0
+        assert OutboxMessage.query.filter_by(topic='swap.expired').count() == 3
+        assert swap_counters.reconcile() == 0
+
+    def test_sweep_honours_ttl(self, app, client, headers, users, events):
+        swap = create_swap(client, headers, users, events)
+        db.session.get(SwapRequest, swap['id']).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert expiry.sweep() == 1
+
+    def test_background_sweep_covers_routed_tenants(self, app, monkeypatch):
+        routed = Organization(name='Routed', slug='routed', schema='routed')
+        db.session.add(routed)
+        db.session.flush()
+        members = [User(name=f'Member {i}', email=f'member{i}@routed.com', password='password123') for i in (1, 2)]
+        for member in members:
+            member.org_id = routed.id
+        db.session.add_all(members)
+        db.session.flush()
+        start = datetime.utcnow() + timedelta(days=1)
+        slots = [Event(user_id=member.id, title='Slot', start_time=start, end_time=start + timedelta(hours=1),
+                       status=EventStatus.SWAP_PENDING) for member in members]
+        db.session.add_all(slots)
+        db.session.flush()
+        swap = SwapRequest(members[0].id, members[1].id, slots[0].id, slots[1].id,
+                           expires_at=datetime.utcnow() - timedelta(seconds=1))
+        db.session.add(swap)
+        db.session.commit()
+
+        app.config['SWAP_SWEEPER_INTERVAL'] = 3600
+        task = expiry.start_background(app)
+        task.stop(timeout=1)
+        partitions = []
+        sweep = expiry.sweep
+        monkeypatch.setattr(expiry, 'sweep', lambda: partitions.append(tenancy.current_org_id()) or sweep())
+        task.fn()
+
+        # On PostgreSQL the shared pass cannot see the routed schema at all.
+        assert partitions == [None, routed.id]
+        assert db.session.get(SwapRequest, swap.id, populate_existing=True).status == SwapStatus.EXPIRED
+
+
+class TestRequestPath:
+    """Stale swaps cannot be accepted."""
+
+    def test_accept_stale_swap_expires_it(self, client, headers, users, events):
+        swap = create_swap(client, headers, users, events)
+        db.session.get(SwapRequest, swap['id']).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        response = client.post(f"/api/requests/{swap['id']}/accept", headers=headers['user2'])
+        assert response.status_code == 400
+        assert db.session.get(SwapRequest, swap['id']).status == SwapStatus.EXPIRED
+
+        history = client.get('/api/requests/history', headers=headers['user2']).json['swaps']
+        assert [s['status'] for s in history] == ['EXPIRED']
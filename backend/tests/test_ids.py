@@ -0,0 +1,30 @@
+"""
+Tests for time-ordered ids and the GUID column type.
+"""
+
+import uuid
+from app.extensions import db
+from app.models import Event
+from app.utils.ids import uuid7
+
+
+def test_uuid7_is_versioned_and_monotonic():
+    ids = [uuid7() for _ in range(5000)]
+    assert ids == sorted(ids)
+    assert all(u.version == 7 and u.variant == uuid.RFC_4122 for u in ids)
+
+
+def test_ids_round_trip_as_strings(app, events):
+    event1, _, _ = events
+    db.session.expire_all()
+    loaded = db.session.get(Event, event1.id)
+    assert isinstance(loaded.id, str)
+    assert loaded.id == event1.id
+    assert uuid.UUID(loaded.user_id).version == 7
+
+
+def test_malformed_id_is_not_found(client, headers):
+    response = client.get('/api/events/not-a-uuid', headers=headers['user1'])
+    assert response.status_code == 404
+    response = client.post('/api/requests/nonexistent-id/accept', headers=headers['user1'])
+    assert response.status_code == 404
@@ -0,0 +1,100 @@
+"""
+Tests for the marketplace read model: rows follow event, swap and user
+writes, and the listing reads them without joins.
+"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Event, EventStatus, MarketplaceSlot, User
+from app.services import marketplace, recurrence
+
+
+def listed(client, headers, **params):
+    response = client.get('/api/swappable-slots', headers=headers, query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def snapshot():
+    return sorted((row.event_id, row.user_id, row.owner_name, row.title) for row in MarketplaceSlot.query.all())
+
+
+def test_listing_shows_other_users_swappable_slots(client, users, events, headers):
+    user1, user2 = users
+    slots = listed(client, headers['user1'])['slots']
+    assert [slot['id'] for slot in slots] == [events[1].id]
+    assert slots[0]['owner'] == {'id': user2.id, 'name': 'User Two', 'email': 'user2@test.com'}
+
+    page = listed(client, headers['user2'], limit=1)
+    assert [slot['id'] for slot in page['slots']] == [events[0].id]
+    assert page['next_offset'] is None
+    assert client.get('/api/swappable-slots?limit=x', headers=headers['user1']).status_code == 400
+
+
+def test_rows_follow_event_writes(client, users, events, headers):
+    event1, event2, event3 = events
+    assert {row[0] for row in snapshot()} == {event1.id, event2.id}
+
+    response = client.put(f'/api/events/{event3.id}', headers=headers['user2'],
+                          json={'status': 'SWAPPABLE', 'title': 'Now open'})
+    assert response.status_code == 200
+    assert listed(client, headers['user1'])['slots'][-1]['title'] == 'Now open'
+
+    client.put(f'/api/events/{event2.id}', headers=headers['user2'], json={'status': 'BUSY'})
+    client.delete(f'/api/events/{event3.id}', headers=headers['user2'])
+    assert listed(client, headers['user1'])['slots'] == []
+    assert [row[0] for row in snapshot()] == [event1.id]
+
+
+def test_accepted_swap_moves_owner_and_rename_propagates(client, users, events, headers):
+    user1, user2 = users
+    event1, event2, _ = events
+    response = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': user2.id, 'my_event_id': event1.id, 'requestee_event_id': event2.id})
+    swap_id = response.get_json()['swap']['id']
+    assert client.post(f'/api/requests/{swap_id}/accept', headers=headers['user2']).status_code == 200
+
+    owners = {slot['id']: slot['owner']['name'] for slot in listed(client, headers['user1'])['slots']}
+    assert owners == {event1.id: 'User Two'}
+
+    db.session.get(User, user2.id).name = 'Renamed Two'
+    db.session.commit()
+    assert listed(client, headers['user1'])['slots'][0]['owner']['name'] == 'Renamed Two'
+
+
+def test_prune_and_rebuild(app, users, events):
+    event1, event2, _ = events
+    started = Event(user_id=users[0].id, title='Started', status=EventStatus.SWAPPABLE,
+                    start_time=datetime.utcnow() + timedelta(minutes=1),
+                    end_time=datetime.utcnow() + timedelta(hours=1))
+    db.session.add(started)
+    db.session.commit()
+    expected = snapshot()
+    assert len(expected) == 3
+
+    assert marketplace.prune(now=datetime.utcnow() + timedelta(minutes=2)) == 1
+    assert started.id not in {row[0] for row in snapshot()}
+
+    db.session.execute(MarketplaceSlot.__table__.update().values(owner_name='stale'))
+    db.session.commit()
+    assert marketplace.rebuild() == 3
+    assert snapshot() == expected
+
+
+def test_listing_merges_swappable_occurrences_of_series(client, users, events, headers):
+    _, user2 = users
+    start = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+    response = client.post('/api/events/series', headers=headers['user2'], json={
+        'title': 'Office hours', 'start_time': start.isoformat(),
+        'end_time': (start + timedelta(hours=1)).isoformat(), 'rrule': 'FREQ=DAILY;COUNT=2'})
+    assert response.status_code == 201
+    series_id = response.get_json()['series']['id']
+
+    slots = listed(client, headers['user1'])['slots']
+    assert [slot['id'] for slot in slots] == [events[1].id] + [
+        recurrence.occurrence_id(series_id, start + timedelta(days=day)) for day in (0, 1)]
+    assert slots[1]['owner'] == {'id': user2.id, 'name': 'User Two', 'email': 'user2@test.com'}
+
+    page = listed(client, headers['user1'], limit=1, offset=1)
+    assert [slot['id'] for slot in page['slots']] == [slots[1]['id']] and page['next_offset'] == 2
+    assert all(slot['id'] != slots[1]['id'] for slot in listed(client, headers['user2'])['slots'])
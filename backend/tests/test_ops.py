@@ -0,0 +1,55 @@
+"""
+Tests for the operational metrics endpoint.
+"""
+
+import pytest
+from sqlalchemy import text
+from app import create_app
+from app.config import config, TestingConfig
+from app.extensions import db
+from app.utils import profiling
+
+SECRET = 'metrics-secret'
+
+
+def make_app(**settings):
+    name = f'ops-{len(config)}'
+    config[name] = type('OpsConfig', (TestingConfig,), dict({'METRICS_SECRET': SECRET}, **settings))
+    try:
+        return create_app(name)
+    finally:
+        del config[name]
+
+
+@pytest.fixture
+def app():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_metrics_require_a_signed_token(app, client, headers):
+    # A user's JWT grants nothing here: the metrics span every organization.
+    assert client.get('/api/ops/metrics', headers=headers['user1']).status_code == 403
+    expired = profiling.make_token(SECRET, -1)
+    assert client.get('/api/ops/metrics', headers={'X-Metrics-Token': expired}).status_code == 403
+    forged = profiling.make_token('other-secret', 60)
+    assert client.get('/api/ops/metrics', headers={'X-Metrics-Token': forged}).status_code == 403
+
+    response = client.get('/api/ops/metrics', headers={'X-Metrics-Token': profiling.make_token(SECRET, 60)})
+    assert response.status_code == 200
+    assert response.json['metrics']['outbox']['dead'] == 0
+
+
+def test_metrics_are_not_exposed_without_a_secret():
+    client = make_app(METRICS_SECRET=None).test_client()
+    assert client.get('/api/ops/metrics', headers={'X-Metrics-Token': 'anything'}).status_code == 404
+
+
+def test_dead_letter_count_uses_its_index(app):
+    plan = db.session.execute(text(
+        'EXPLAIN QUERY PLAN SELECT count(*) FROM outbox_messages WHERE failed_at IS NOT NULL')).all()
+    assert any('ix_outbox_messages_dead' in row[-1] for row in plan)
@@ -0,0 +1,95 @@
+"""
+Tests for the transactional outbox and its workers.
+"""
+
+from datetime import datetime, timedelta
+from app import background, create_app
+from app.config import TestingConfig, config
+from app.extensions import db
+from app.models import OutboxMessage
+from app.services import outbox
+
+
+def topics():
+    return [m.topic for m in OutboxMessage.query.order_by(OutboxMessage.id)]
+
+
+class TestEnqueue:
+    """Messages are written with the change that caused them."""
+
+    def test_swap_transitions_enqueue_messages(self, client, headers, users, events):
+        user1, user2 = users
+        event1, event2, _ = events
+        response = client.post('/api/requests/swap', json={
+            'requestee_id': user2.id, 'my_event_id': event1.id, 'requestee_event_id': event2.id,
+        }, headers=headers['user1'])
+        swap_id = response.json['swap']['id']
+        client.post(f'/api/requests/{swap_id}/accept', headers=headers['user2'])
+
+        assert topics() == ['swap.created', 'swap.accepted']
+        assert OutboxMessage.query.first().payload['swap_id'] == swap_id
+
+    def test_failed_write_enqueues_nothing(self, client, headers):
+        response = client.post('/api/events', json={'title': 'x', 'start_time': 'bad', 'end_time': 'bad'},
+                               headers=headers['user1'])
+        assert response.status_code == 400
+        assert topics() == []
+
+
+class TestDrain:
+    """Delivery, retries and dead-lettering."""
+
+    def test_delivers_and_marks_processed(self, app):
+        delivered = []
+        outbox.handler('test.ok')(delivered.append)
+        outbox.enqueue('test.ok', {'n': 1})
+        db.session.commit()
+
+        assert outbox.drain_batch() == 1
+        assert delivered == [{'n': 1}]
+        assert OutboxMessage.query.one().processed_at is not None
+        assert outbox.drain_batch() == 0
+
+    def test_failures_back_off_then_dead_letter(self, app):
+        app.config['OUTBOX_MAX_ATTEMPTS'] = 2
+
+        @outbox.handler('test.fail')
+        def boom(payload):
+            raise RuntimeError('down')
+
+        outbox.enqueue('test.fail', {})
+        db.session.commit()
+
+        outbox.drain_batch()
+        message = OutboxMessage.query.one()
+        assert message.attempts == 1 and message.available_at > datetime.utcnow()
+        assert outbox.drain_batch() == 0  # not due yet
+
+        message.available_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        outbox.drain_batch()
+        assert OutboxMessage.query.one().failed_at is not None
+        assert outbox.stats()['dead'] == 1
+
+    def test_expired_lease_is_reclaimed(self, app):
+        message = outbox.enqueue('test.lease', {})
+        message.claimed_by = 'crashed-worker'
+        message.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert outbox.drain_batch() == 1
+
+
+def test_background_jobs_start_only_when_asked(monkeypatch):
+    monkeypatch.setitem(config, 'background-test', type('BackgroundConfig', (TestingConfig,), {
+        'TESTING': False, 'OUTBOX_WORKER_THREADS': 1}))
+    app = create_app('background-test')
+    jobs = ('outbox_pool', 'swap_sweeper', 'marketplace_prune', 'analytics_rollup', 'revocation_prune')
+    assert not any(job in app.extensions for job in jobs)
+
+    tasks = background.start(app, outbox_pool=False)
+    try:
+        assert sorted(task.name for task in tasks) == ['analytics-rollup', 'marketplace-prune', 'revocation-prune']
+    finally:
+        for task in tasks:
+            task.stop(timeout=1)
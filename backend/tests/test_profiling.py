@@ -0,0 +1,88 @@
+"""
+Tests for on-demand request profiling.
+"""
+
+import os
+import pstats
+import pytest
+from app import create_app
+from app.config import config, TestingConfig
+from app.extensions import db
+from app.utils import profiling
+
+SECRET = 'profile-secret'
+
+
+def make_app(tmp_path, **settings):
+    name = f'profiling-{len(config)}'
+    config[name] = type('ProfilingConfig', (TestingConfig,), dict({
+        'PROFILER_SECRET': SECRET,
+        'PROFILER_DIR': str(tmp_path / 'profiles'),
+        'PROFILER_INTERVAL': 0.0005,
+    }, **settings))
+    try:
+        return create_app(name)
+    finally:
+        del config[name]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def profiles(app):
+    return sorted(os.listdir(app.config['PROFILER_DIR']))
+
+
+def test_token_round_trip():
+    token = profiling.make_token(SECRET, 60)
+    assert profiling.verify_token(SECRET, token)
+    assert not profiling.verify_token('other', token)
+    assert not profiling.verify_token(SECRET, profiling.make_token(SECRET, -1))
+    assert not profiling.verify_token(SECRET, 'garbage')
+
+
+def test_signed_request_writes_folded_stacks(app, client, headers):
+    response = client.get('/api/events', headers=dict(headers['user1'], **{'X-Profile': profiling.make_token(SECRET, 60)}))
+    name = response.headers['X-Profile-File']
+    assert profiles(app) == [name] and name.endswith('.folded')
+    with open(os.path.join(app.config['PROFILER_DIR'], name)) as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0 and stack
+
+
+def test_pstats_format(app, client, headers):
+    token = profiling.make_token(SECRET, 60)
+    response = client.get(f'/api/events?_profile={token}&_profile_format=pstats', headers=headers['user1'])
+    path = os.path.join(app.config['PROFILER_DIR'], response.headers['X-Profile-File'])
+    assert pstats.Stats(path).total_calls > 0
+
+
+def test_unsigned_requests_are_not_profiled(app, client, headers):
+    response = client.get('/api/events', headers=dict(headers['user1'], **{'X-Profile': 'nope'}))
+    assert 'X-Profile-File' not in response.headers
+    assert profiles(app) == []
+
+
+def test_sampled_endpoint_and_disk_bound(tmp_path):
+    app = make_app(tmp_path, PROFILER_SECRET=None, PROFILER_SAMPLE_ENDPOINT='index',
+                   PROFILER_SAMPLE_RATE=1.0, PROFILER_MAX_FILES=2)
+    client = app.test_client()
+    for _ in range(4):
+        assert 'X-Profile-File' in client.get('/').headers
+    assert len(profiles(app)) == 2
+
+
+def test_no_hooks_when_off(tmp_path):
+    app = make_app(tmp_path, PROFILER_SECRET=None)
+    hooks = [fn.__name__ for fn in app.before_request_funcs.get(None, [])]
+    assert '_start_profile' not in hooks
+    assert not (tmp_path / 'profiles').exists()
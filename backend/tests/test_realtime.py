@@ -0,0 +1,146 @@
+"""
+Tests for Socket.IO authentication, outbox notifications and the
+cross-process pub/sub backplane.
+"""
+
+import time
+import uuid
+import pytest
+import socketio as python_socketio
+from flask_jwt_extended import create_access_token, create_refresh_token
+from app.extensions import socketio
+from app.services import outbox
+from app.services.realtime import BackplaneManager
+from app.utils import pubsub
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.005)
+
+
+class Node:
+    """A Socket.IO server process stand-in whose sockets record what they are sent."""
+
+    def __init__(self, url, **options):
+        self.manager = BackplaneManager(pubsub.from_url(url), channel='test', **options)
+        self.server = python_socketio.Server(client_manager=self.manager, async_mode='threading')
+        self.server._send_eio_packet = lambda eio_sid, pkt: self.delivered.append((eio_sid, pkt.data))
+        self.delivered = []
+        self.manager.initialize()
+
+    def connect(self, eio_sid, room):
+        sid = self.manager.connect(eio_sid, '/')
+        self.manager.enter_room(sid, '/', room)
+
+    def received(self, eio_sid):
+        return [data for sid, data in self.delivered if sid == eio_sid]
+
+
+@pytest.fixture
+def memory_url():
+    return f'memory://{uuid.uuid4().hex}'
+
+
+def test_emit_reaches_sockets_on_other_nodes(memory_url):
+    a, b = Node(memory_url), Node(memory_url)
+    wait_for(lambda: a.manager.backplane.subscribers('test') == 2)
+    a.connect('a1', 'user:1')
+    b.connect('b1', 'user:1')
+    b.connect('b2', 'user:2')
+
+    a.server.emit('swap', {'n': 1}, to='user:1')
+
+    assert a.received('a1') == ['2["swap",{"n":1}]']
+    wait_for(lambda: b.received('b1'))
+    assert b.received('b1') == ['2["swap",{"n":1}]']
+    assert b.received('b2') == []
+    # A node does not replay its own published emits.
+    time.sleep(0.05)
+    assert len(a.received('a1')) == 1
+
+
+def test_emits_are_batched_per_room(memory_url):
+    a = Node(memory_url, batch_interval=0.05, batch_max=100)
+    b = Node(memory_url)
+    wait_for(lambda: a.manager.backplane.subscribers('test') == 2)
+    published = []
+    publish = a.manager.backplane.publish
+    a.manager.backplane.publish = lambda channel, payload: published.append(payload) or publish(channel, payload)
+    b.connect('b1', 'user:1')
+    b.connect('b2', 'user:2')
+
+    for i in range(10):
+        a.server.emit('event', i, to='user:1' if i % 2 else 'user:2')
+
+    wait_for(lambda: len(b.delivered) == 10)
+    assert len(published) == 1
+    assert b.received('b1') == [f'2["event",{i}]' for i in (1, 3, 5, 7, 9)]
+    assert b.received('b2') == [f'2["event",{i}]' for i in (0, 2, 4, 6, 8)]
+
+
+def test_batch_max_forces_immediate_publish(memory_url):
+    a = Node(memory_url, batch_interval=60, batch_max=3)
+    b = Node(memory_url)
+    wait_for(lambda: a.manager.backplane.subscribers('test') == 2)
+    b.connect('b1', 'user:1')
+
+    for i in range(4):
+        a.server.emit('event', i, to='user:1')
+
+    wait_for(lambda: len(b.delivered) == 3)
+    a.manager.flush()
+    wait_for(lambda: len(b.delivered) == 4)
+    assert b.received('b1') == [f'2["event",{i}]' for i in range(4)]
+
+
+def test_resp_backplane_against_stand_in_server():
+    server = pubsub.StandInServer().start()
+    try:
+        a, b = Node(server.url), Node(server.url, batch_interval=0.01)
+        wait_for(lambda: len(server.channels.get(b'test', ())) == 2)
+        a.connect('a1', 'user:1')
+        b.connect('b1', 'user:1')
+
+        a.server.emit('swap', {'id': 'x'}, to='user:1')
+        b.server.emit('swap', {'id': 'y'}, to='user:1')
+
+        wait_for(lambda: len(a.received('a1')) == 2 and len(b.received('b1')) == 2)
+        assert sorted(a.received('a1')) == sorted(b.received('b1'))
+        assert pubsub.RespBackplane(server.url).publish('test', b'not json') == 2
+    finally:
+        server.stop()
+
+
+def test_socket_connect_requires_access_token(app, users):
+    user1, _ = users
+    assert not socketio.test_client(app).is_connected()
+    assert not socketio.test_client(app, auth={'token': 'garbage'}).is_connected()
+    refresh = create_refresh_token(identity=user1.id)
+    assert not socketio.test_client(app, auth={'token': refresh}).is_connected()
+
+    client = socketio.test_client(app, auth={'token': create_access_token(identity=user1.id)})
+    assert client.is_connected()
+    query_client = socketio.test_client(app, query_string=f'token={create_access_token(identity=user1.id)}')
+    assert query_client.is_connected()
+
+
+def test_swap_changes_are_pushed_to_both_participants(app, client, users, events, headers):
+    _, user2 = users
+    event1, event2, _ = events
+    sockets = {user.id: socketio.test_client(app, auth={'token': create_access_token(identity=user.id)})
+               for user in users}
+
+    response = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': user2.id, 'my_event_id': event1.id, 'requestee_event_id': event2.id,
+    })
+    assert response.status_code == 201
+    outbox.drain_batch()
+
+    for user in users:
+        [message] = [m for m in sockets[user.id].get_received() if m['name'] == 'swap']
+        assert message['args'][0]['topic'] == 'swap.created'
+        assert message['args'][0]['swap_id'] == response.get_json()['swap']['id']
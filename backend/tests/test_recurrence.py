@@ -0,0 +1,151 @@
+"""
+Tests for recurring event series: rule handling, lazy expansion in listings
+and materialization of edited or swapped occurrences.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.extensions import db
+from app.models import Event, EventSeries, SeriesException
+from app.services import recurrence
+
+# A Monday, far enough ahead that occurrences are upcoming.
+MONDAY = (datetime.utcnow() + timedelta(days=14)).replace(hour=9, minute=0, second=0, microsecond=0)
+MONDAY -= timedelta(days=MONDAY.weekday())
+
+
+def create_series(client, headers, rrule='FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR', start=MONDAY, **fields):
+    response = client.post('/api/events/series', headers=headers, json=dict({
+        'title': 'Office hours', 'start_time': start.isoformat(),
+        'end_time': (start + timedelta(hours=1)).isoformat(), 'rrule': rrule,
+    }, **fields))
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['series']
+
+
+def list_events(client, headers, start, end, **params):
+    response = client.get('/api/events', headers=headers,
+                          query_string=dict(start=start.isoformat(), end=end.isoformat(), **params))
+    assert response.status_code == 200
+    return response.get_json()['events']
+
+
+def test_rule_subset():
+    rule = recurrence.parse_rrule('RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3', MONDAY)
+    assert (rule.freq, rule.interval, rule.weekdays, rule.count) == ('DAILY', 2, recurrence.ALL_DAYS, 3)
+    assert recurrence.last_start(MONDAY, rule) == MONDAY + timedelta(days=4)
+    assert recurrence.parse_rrule('FREQ=WEEKLY', MONDAY).weekdays == 1
+
+    for bad in ('FREQ=MONTHLY', 'FREQ=WEEKLY;BYDAY=1MO', 'FREQ=DAILY;BYHOUR=9',
+                'FREQ=DAILY;COUNT=2;UNTIL=20300101', 'FREQ=DAILY;INTERVAL=0',
+                'FREQ=DAILY;INTERVAL=7;BYDAY=TU'):
+        with pytest.raises(recurrence.InvalidRule):
+            recurrence.parse_rrule(bad, MONDAY)
+
+
+def test_expansion_is_bounded_to_the_window():
+    one_hour = timedelta(hours=1)
+    starts = recurrence.expand(MONDAY, one_hour, 'WEEKLY', 1, 0b0011111, None,
+                               MONDAY + timedelta(days=365), MONDAY + timedelta(days=379))
+    assert len(starts) == 10
+    assert {start.weekday() for start in starts} == set(range(5))
+    # An occurrence already running at the window start overlaps it.
+    assert recurrence.expand(MONDAY, one_hour, 'DAILY', 1, recurrence.ALL_DAYS, None,
+                             MONDAY + timedelta(minutes=30), MONDAY + timedelta(minutes=31)) == [MONDAY]
+    until = MONDAY + timedelta(days=2)
+    assert len(recurrence.expand(MONDAY, one_hour, 'DAILY', 1, recurrence.ALL_DAYS, until,
+                                 MONDAY, MONDAY + timedelta(days=30))) == 3
+
+
+def test_listing_expands_occurrences_in_window(client, users, headers):
+    series = create_series(client, headers['user1'])
+    create_series(client, headers['user2'], rrule='FREQ=DAILY', status='BUSY', title='Standup')
+
+    events = list_events(client, headers['user1'], MONDAY, MONDAY + timedelta(days=7), status='SWAPPABLE')
+    assert len(events) == 5
+    assert [e['start_time'] for e in events] == sorted((e['start_time'] for e in events), reverse=True)
+    assert all(e['series_id'] == series['id'] and e['title'] == 'Office hours' for e in events)
+
+    everything = list_events(client, headers['user1'], MONDAY, MONDAY + timedelta(days=7))
+    assert len(everything) == 12
+    assert not db.session.query(Event).count()
+
+
+def test_get_edit_and_cancel_occurrence(client, users, headers):
+    create_series(client, headers['user1'])
+    tuesday, wednesday = MONDAY + timedelta(days=1), MONDAY + timedelta(days=2)
+    tuesday_id = recurrence.occurrence_id(
+        list_events(client, headers['user1'], tuesday, tuesday + timedelta(hours=1))[0]['series_id'], tuesday)
+
+    response = client.get(f'/api/events/{tuesday_id}', headers=headers['user1'])
+    assert response.status_code == 200
+    assert response.get_json()['event']['owner']['email'] == 'user1@test.com'
+    assert client.put(f'/api/events/{tuesday_id}', headers=headers['user2'],
+                      json={'title': 'Mine'}).status_code == 403
+
+    response = client.put(f'/api/events/{tuesday_id}', headers=headers['user1'], json={'title': 'Moved'})
+    assert response.status_code == 200
+    materialized = response.get_json()['event']
+    assert materialized['id'] != tuesday_id and materialized['title'] == 'Moved'
+    # The old occurrence id now resolves to the stored event.
+    assert client.get(f'/api/events/{tuesday_id}', headers=headers['user1']).get_json()['event']['id'] == materialized['id']
+
+    wednesday_id = tuesday_id.replace(tuesday.strftime('%Y%m%d'), wednesday.strftime('%Y%m%d'))
+    assert client.delete(f'/api/events/{wednesday_id}', headers=headers['user1']).status_code == 200
+    assert client.get(f'/api/events/{wednesday_id}', headers=headers['user1']).status_code == 404
+
+    week = list_events(client, headers['user1'], MONDAY, MONDAY + timedelta(days=7))
+    assert len(week) == 4
+    assert [e['title'] for e in week if 'series_id' not in e] == ['Moved']
+
+    # Not an occurrence: a Saturday, and a malformed stamp.
+    saturday_id = tuesday_id.replace(tuesday.strftime('%Y%m%d'), (MONDAY + timedelta(days=5)).strftime('%Y%m%d'))
+    assert client.get(f'/api/events/{saturday_id}', headers=headers['user1']).status_code == 404
+    assert client.get(f'/api/events/{tuesday_id}x', headers=headers['user1']).status_code == 404
+
+
+def test_swapping_occurrences_materializes_both(client, users, headers):
+    user1, user2 = users
+    mine = create_series(client, headers['user1'])
+    theirs = create_series(client, headers['user2'], rrule='FREQ=DAILY', start=MONDAY + timedelta(hours=3))
+    my_id = recurrence.occurrence_id(mine['id'], MONDAY)
+    their_id = recurrence.occurrence_id(theirs['id'], MONDAY + timedelta(days=6, hours=3))
+
+    response = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': user2.id, 'my_event_id': my_id, 'requestee_event_id': their_id,
+    })
+    assert response.status_code == 201, response.get_json()
+    swap = response.get_json()['swap']
+    assert {swap['requester_slot_id'], swap['requestee_slot_id']} == {
+        e.id for e in Event.query.all()}
+    assert SeriesException.query.count() == 2
+
+    ids = {e['id'] for e in list_events(client, headers['user1'], MONDAY, MONDAY + timedelta(days=7))}
+    assert my_id not in ids and their_id not in ids
+    assert {swap['requester_slot_id'], swap['requestee_slot_id']} <= ids
+
+
+def test_delete_series_keeps_materialized_occurrences(client, users, headers):
+    series = create_series(client, headers['user1'])
+    monday_id = recurrence.occurrence_id(series['id'], MONDAY)
+    client.put(f'/api/events/{monday_id}', headers=headers['user1'], json={'title': 'Kept'})
+
+    assert client.delete(f'/api/events/series/{series["id"]}', headers=headers['user2']).status_code == 403
+    assert client.delete(f'/api/events/series/{series["id"]}', headers=headers['user1']).status_code == 200
+
+    assert EventSeries.query.count() == 0 and SeriesException.query.count() == 0
+    assert [e['title'] for e in list_events(client, headers['user1'], MONDAY, MONDAY + timedelta(days=7))] == ['Kept']
+
+
+def test_series_validation(client, users, headers):
+    response = client.post('/api/events/series', headers=headers['user1'], json={
+        'title': 'x', 'start_time': MONDAY.isoformat(), 'end_time': (MONDAY + timedelta(hours=1)).isoformat(),
+        'rrule': 'FREQ=YEARLY',
+    })
+    assert response.status_code == 400
+    response = client.post('/api/events/series', headers=headers['user1'], json={
+        'title': 'x', 'start_time': MONDAY.isoformat(), 'end_time': (MONDAY + timedelta(days=2)).isoformat(),
+        'rrule': 'FREQ=WEEKLY',
+    })
+    assert response.status_code == 400
+    assert client.get('/api/events/series', headers=headers['user1']).get_json()['series'] == []
@@ -0,0 +1,193 @@
+"""
+Tests for JWT revocation and the in-memory blocklist.
+"""
+
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from app.extensions import db
+from app.models import RevokedToken
+from app.services import revocation
+from app.utils.bloom import BloomFilter
+from app.utils.metrics import metrics
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f'key-{i}' for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+class TestLogoutAndRefresh:
+    """Tests for the revoking auth endpoints."""
+
+    def test_logout_revokes_access_and_refresh_tokens(self, app, client, users):
+        user1, _ = users
+        access = create_access_token(identity=user1.id)
+        refresh = create_refresh_token(identity=user1.id)
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 200
+
+        response = client.post('/api/auth/logout', json={'refresh_token': refresh}, headers=bearer(access))
+        assert response.status_code == 200
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 401
+        assert client.post('/api/auth/refresh', headers=bearer(refresh)).status_code == 401
+        assert RevokedToken.query.count() == 2
+
+    def test_logout_rejects_another_users_refresh_token(self, client, users):
+        user1, user2 = users
+        response = client.post('/api/auth/logout',
+                               json={'refresh_token': create_refresh_token(identity=user2.id)},
+                               headers=bearer(create_access_token(identity=user1.id)))
+        assert response.status_code == 400
+
+    def test_refresh_rotates_the_refresh_token(self, client, users):
+        user1, _ = users
+        refresh = create_refresh_token(identity=user1.id)
+        response = client.post('/api/auth/refresh', headers=bearer(refresh))
+        assert response.status_code == 200
+        assert client.get('/api/auth/me', headers=bearer(response.json['access_token'])).status_code == 200
+
+        assert client.post('/api/auth/refresh', headers=bearer(refresh)).status_code == 401
+        assert client.post('/api/auth/refresh', headers=bearer(response.json['refresh_token'])).status_code == 200
+
+
+    def test_refresh_fails_when_a_concurrent_refresh_used_the_token(self, client, users):
+        user1, _ = users
+        refresh = create_refresh_token(identity=user1.id)
+        payload = decode_token(refresh)
+        revocation.get_blocklist().sync()
+        # The other request committed its revocation; this process has not synced since.
+        db.session.add(RevokedToken(jti=payload['jti'], token_type='refresh', user_id=user1.id,
+                                    expires_at=revocation.token_expiry(payload)))
+        db.session.commit()
+        assert client.post('/api/auth/refresh', headers=bearer(refresh)).status_code == 401
+
+
+class TestBlocklist:
+    """Tests for the per-process blocklist."""
+
+    def test_unrevoked_tokens_never_touch_the_database(self, client, headers):
+        client.get('/api/auth/me', headers=headers['user1'])
+        before = metrics.get('revocation.db_checks')
+        for _ in range(20):
+            assert client.get('/api/auth/me', headers=headers['user1']).status_code == 200
+        assert metrics.get('revocation.db_checks') == before
+
+    def test_revocations_from_other_processes_apply_after_sync(self, app, client, users):
+        user1, _ = users
+        access = create_access_token(identity=user1.id)
+        payload = decode_token(access)
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 200
+
+        # Written by another process: only the log row exists.
+        db.session.add(RevokedToken(jti=payload['jti'], token_type='access', user_id=user1.id,
+                                    expires_at=revocation.token_expiry(payload)))
+        db.session.commit()
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 200
+
+        assert revocation.get_blocklist().sync() == 1
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 401
+
+    def test_first_check_starts_the_sync_thread(self, app, client, users):
+        user1, _ = users
+        access = create_access_token(identity=user1.id)
+        payload = decode_token(access)
+        blocklist = revocation.get_blocklist()
+        blocklist.sync_interval = 3600
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 200
+        task = app.extensions['revocation_sync']
+        task.stop(timeout=1)
+        assert task.name == 'revocation-sync' and task.interval == 3600
+
+        db.session.add(RevokedToken(jti=payload['jti'], token_type='access', user_id=user1.id,
+                                    expires_at=revocation.token_expiry(payload)))
+        db.session.commit()
+        # Checks never sync after the first one; that is the thread's job.
+        blocklist.synced_at -= timedelta(hours=2)
+        syncs = metrics.get('revocation.syncs')
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 200
+        assert metrics.get('revocation.syncs') == syncs
+        task.fn()
+        assert client.get('/api/auth/me', headers=bearer(access)).status_code == 401
+
+    def test_sync_picks_up_rows_that_committed_below_the_cursor(self, app, users):
+        user1, _ = users
+        blocklist = revocation.get_blocklist()
+        blocklist.sync()
+
+        def log_row(log_id):
+            payload = decode_token(create_access_token(identity=user1.id))
+            row = RevokedToken(jti=payload['jti'], token_type='access', user_id=user1.id,
+                               expires_at=revocation.token_expiry(payload))
+            row.id = log_id
+            db.session.add(row)
+            db.session.commit()
+            return payload['jti']
+
+        log_row(100)
+        assert blocklist.sync() == 1 and blocklist.cursor == 100
+        # Took its id before the row above, but committed after the sync.
+        late = log_row(50)
+        assert blocklist.sync() == 1
+        assert late in blocklist.exact and blocklist.cursor == 100
+
+    def test_evicted_entries_fall_back_to_the_database(self, app, client, users):
+        user1, _ = users
+        blocklist = revocation.get_blocklist()
+        blocklist.exact_max = 1
+        tokens = [create_access_token(identity=user1.id, expires_delta=timedelta(minutes=m))
+                  for m in (10, 20)]
+        for token in tokens:
+            revocation.revoke(decode_token(token))
+        assert len(blocklist.exact) == 1
+
+        before = metrics.get('revocation.db_checks')
+        assert all(client.get('/api/auth/me', headers=bearer(t)).status_code == 401 for t in tokens)
+        assert metrics.get('revocation.db_checks') == before + 1
+
+    def test_expired_entries_are_dropped_and_pruned(self, app, users):
+        user1, _ = users
+        revocation.revoke(decode_token(create_access_token(identity=user1.id)))
+        later = datetime.utcnow() + timedelta(hours=2)
+
+        blocklist = revocation.get_blocklist()
+        blocklist.sync(now=later)
+        assert blocklist.exact == {}
+        assert revocation.prune(now=later) == 1
+        assert RevokedToken.query.count() == 0
+
+    def test_resyncing_the_lag_window_does_not_grow_the_filter(self, app, users):
+        user1, _ = users
+        blocklist = revocation.get_blocklist()
+        for _ in range(3):
+            revocation.revoke(decode_token(create_access_token(identity=user1.id)))
+        blocklist.sync()
+        count = len(blocklist.bloom)
+        # Every sync re-reads the rows revoked within REVOCATION_SYNC_LAG.
+        for _ in range(12):
+            blocklist.sync()
+        assert len(blocklist.bloom) == count == 3
+
+        jti = next(iter(blocklist.exact))
+        blocklist.bloom.add(jti)
+        assert len(blocklist.bloom) == count
+
+    def test_overfull_bloom_filter_is_rebuilt_from_the_log(self, app, users):
+        user1, _ = users
+        blocklist = revocation.get_blocklist()
+        blocklist.bloom = BloomFilter(10)
+        for i in range(11):
+            blocklist.bloom.add(f'stale-{i}')
+        token = decode_token(create_access_token(identity=user1.id))
+        revocation.revoke(token)
+
+        blocklist.sync()
+        assert len(blocklist.bloom) == 1
+        assert blocklist.is_revoked(token['jti'])
@@ -0,0 +1,72 @@
+"""
+Tests for the compiled request schemas and the endpoints that use them.
+"""
+
+import pytest
+from marshmallow import ValidationError as FieldError
+from app import schemas
+from app.models import EventStatus
+from app.schemas.auth import RegisterSchema
+from app.schemas.events import EventSchema, EventUpdateSchema, SeriesSchema
+
+PAYLOADS = [
+    (EventSchema, {'title': ' Standup ', 'start_time': '2030-01-01T09:00:00', 'end_time': '2030-01-01T09:30:00'}),
+    (EventSchema, {'title': '  ', 'start_time': 'tomorrow', 'status': 'NOPE'}),
+    (EventSchema, {'title': 'x', 'start_time': '2030-01-01T10:00:00', 'end_time': '2030-01-01T09:00:00'}),
+    (EventUpdateSchema, {'title': '', 'status': 'SWAPPABLE', 'end_time': None}),
+    (SeriesSchema, {'title': 'Gym', 'start_time': '2030-01-01T07:00:00', 'end_time': '2030-01-01T08:00:00',
+                    'rrule': 'FREQ=DAILY', 'status': 'SWAP_PENDING'}),
+    (RegisterSchema, {'name': 'Al', 'email': ' AL@Example.com ', 'password': 'secret', 'organization': ' '}),
+    (RegisterSchema, {'name': 'A', 'email': 'nope', 'password': 5, 'organization': 'Acme', 'invite': 'x'}),
+]
+
+
+@pytest.mark.parametrize('schema_class, payload', PAYLOADS)
+def test_compiled_schema_matches_marshmallow(schema_class, payload):
+    try:
+        expected = schema_class().load(payload)
+    except FieldError as e:
+        expected = e.messages
+    try:
+        loaded = schemas.compile_schema(schema_class).load(payload)
+    except schemas.ValidationError as e:
+        loaded = e.errors
+    assert loaded == expected
+
+
+def test_load_coerces_and_defaults():
+    data = schemas.event_payload.load({'title': ' Standup ', 'start_time': '2030-01-01T09:00:00',
+                                       'end_time': '2030-01-01T09:30:00', 'ignored': 1})
+    assert data['title'] == 'Standup' and data['status'] is EventStatus.BUSY
+    assert data['end_time'].minute == 30 and 'ignored' not in data
+    assert schemas.event_update_payload.load({'title': 'New'}) == {'title': 'New'}
+    assert schemas.logout_payload.load(None) == {}
+
+    with pytest.raises(schemas.ValidationError) as e:
+        schemas.swap_request_payload.load([])
+    assert e.value.to_dict() == {'message': 'No data provided', 'errors': {'_schema': ['No data provided']}}
+
+
+def test_endpoints_report_structured_errors(client, headers):
+    response = client.post('/api/events', headers=headers['user1'], json={'title': 'x', 'start_time': 'soon'})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['message'] == 'Invalid datetime format. Use ISO format: YYYY-MM-DDTHH:MM:SS'
+    assert body['errors']['end_time'] == ['Start and end times are required']
+
+    response = client.post('/api/auth/register', json={'name': 'Zed', 'email': 'zed@example.com',
+                                                       'password': 'secret', 'organization': 'Zed', 'invite': 'x'})
+    assert response.get_json()['message'] == 'Provide either organization or invite, not both'
+    response = client.post('/api/requests/swap', headers=headers['user1'], data='not json')
+    assert response.status_code == 400 and response.get_json()['message'] == 'No data provided'
+
+
+def test_update_applies_only_given_fields(client, headers, events):
+    event = events[0]
+    response = client.put(f'/api/events/{event.id}', headers=headers['user1'], json={'status': 'BUSY'})
+    assert response.status_code == 200
+    assert response.get_json()['event']['status'] == 'BUSY'
+    assert response.get_json()['event']['title'] == event.title
+
+    response = client.put(f'/api/events/{event.id}', headers=headers['user1'], json={'status': 'MAYBE'})
+    assert response.status_code == 400 and response.get_json()['message'] == 'Invalid status: MAYBE'
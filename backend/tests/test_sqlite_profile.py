@@ -0,0 +1,104 @@
+"""
+Tests for the SQLite production profile: connection PRAGMAs and the
+serialized writer.
+"""
+
+import threading
+import pytest
+from sqlalchemy import select, text, update
+from app import create_app
+from app.config import SQLiteConfig, config
+from app.extensions import db
+from app.models import ChangeCounter
+
+
+@pytest.fixture
+def sqlite_app(tmp_path, monkeypatch):
+    """The 'sqlite' profile on a fresh database file."""
+    monkeypatch.setitem(config, 'sqlite-test', type('SQLiteTestConfig', (SQLiteConfig,), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "slotswapper.db"}',
+        'BCRYPT_LOG_ROUNDS': 4,
+    }))
+    app = create_app('sqlite-test')
+    with app.app_context():
+        db.create_all()
+        db.session.add(ChangeCounter(name='hits', value=0))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def in_thread(app, fn, errors):
+    def run():
+        with app.app_context():
+            try:
+                fn()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+    return threading.Thread(target=run)
+
+
+def test_connections_get_the_profile_pragmas(sqlite_app):
+    pragmas = {name: db.session.execute(text(f'PRAGMA {name}')).scalar()
+               for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'foreign_keys')}
+    assert pragmas == {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+                       'cache_size': -64 * 1024, 'foreign_keys': 1}
+
+
+def test_read_modify_write_transactions_run_one_at_a_time(sqlite_app):
+    def bump():
+        for _ in range(20):
+            value = db.session.execute(select(ChangeCounter.value).where(ChangeCounter.name == 'hits')).scalar()
+            db.session.execute(update(ChangeCounter).where(ChangeCounter.name == 'hits').values(value=value + 1))
+            db.session.commit()
+
+    errors = []
+    threads = [in_thread(sqlite_app, bump, errors) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.session.get(ChangeCounter, 'hits').value == 80
+
+
+def test_readers_do_not_wait_for_the_writer(sqlite_app):
+    writing, release = threading.Event(), threading.Event()
+
+    def hold_write():
+        db.session.execute(update(ChangeCounter).where(ChangeCounter.name == 'hits').values(value=1))
+        writing.set()
+        release.wait(5)
+        db.session.commit()
+
+    errors = []
+    writer = in_thread(sqlite_app, hold_write, errors)
+    writer.start()
+    assert writing.wait(5)
+    try:
+        with sqlite_app.test_request_context('/', method='GET'):
+            # Reads the snapshot from before the uncommitted write.
+            assert db.session.execute(select(ChangeCounter.value)).scalar() == 0
+            db.session.rollback()
+    finally:
+        release.set()
+        writer.join()
+    assert errors == []
+    assert db.session.execute(select(ChangeCounter.value)).scalar() == 1
+
+
+def test_api_writes_and_reads(sqlite_app):
+    client = sqlite_app.test_client()
+    response = client.post('/api/auth/register', json={
+        'name': 'Solo', 'email': 'solo@test.com', 'password': 'password123'})
+    assert response.status_code == 201
+    headers = {'Authorization': f'Bearer {response.get_json()["access_token"]}'}
+    response = client.post('/api/events', headers=headers, json={
+        'title': 'Standup', 'start_time': '2030-01-01T09:00:00', 'end_time': '2030-01-01T09:15:00'})
+    assert response.status_code == 201
+    assert [event['title'] for event in client.get('/api/events', headers=headers).get_json()['events']] == ['Standup']
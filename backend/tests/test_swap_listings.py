@@ -0,0 +1,73 @@
+"""
+Tests for the sent and history swap listings.
+"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import SwapRequest, SwapStatus
+
+
+def make_swaps(users, events, statuses):
+    user1, user2 = users
+    event1, event2, _ = events
+    base = datetime(2026, 1, 1)
+    swaps = []
+    for i, status in enumerate(statuses):
+        swap = SwapRequest(requester_id=user1.id, requestee_id=user2.id,
+                           requester_slot_id=event1.id, requestee_slot_id=event2.id)
+        swap.status = status
+        swap.created_at = base + timedelta(minutes=i)
+        swaps.append(swap)
+    db.session.add_all(swaps)
+    db.session.commit()
+    return swaps
+
+
+class TestSentSwaps:
+    """Tests for GET /api/requests/sent."""
+
+    def test_keyset_pagination_walks_all_pages(self, client, headers, users, events):
+        swaps = make_swaps(users, events, [SwapStatus.PENDING] * 5)
+        expected = [s.id for s in reversed(swaps)]
+
+        seen, cursor = [], None
+        while True:
+            url = '/api/requests/sent?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            response = client.get(url, headers=headers['user1'])
+            assert response.status_code == 200
+            seen += [s['id'] for s in response.json['sent_swaps']]
+            cursor = response.json['next_cursor']
+            if not cursor:
+                break
+
+        assert seen == expected
+
+    def test_status_filter(self, client, headers, users, events):
+        make_swaps(users, events, [SwapStatus.PENDING, SwapStatus.ACCEPTED])
+        response = client.get('/api/requests/sent?status=accepted', headers=headers['user1'])
+        assert [s['status'] for s in response.json['sent_swaps']] == ['ACCEPTED']
+
+    def test_only_own_sent_swaps(self, client, headers, users, events):
+        make_swaps(users, events, [SwapStatus.PENDING])
+        response = client.get('/api/requests/sent', headers=headers['user2'])
+        assert response.json['sent_swaps'] == []
+
+    def test_invalid_cursor(self, client, headers):
+        response = client.get('/api/requests/sent?cursor=garbage', headers=headers['user1'])
+        assert response.status_code == 400
+
+
+class TestSwapHistory:
+    """Tests for GET /api/requests/history."""
+
+    def test_history_excludes_pending(self, client, headers, users, events):
+        make_swaps(users, events, [SwapStatus.PENDING, SwapStatus.ACCEPTED, SwapStatus.REJECTED])
+        for key in ('user1', 'user2'):
+            response = client.get('/api/requests/history', headers=headers[key])
+            assert [s['status'] for s in response.json['swaps']] == ['REJECTED', 'ACCEPTED']
+
+    def test_date_filter(self, client, headers, users, events):
+        make_swaps(users, events, [SwapStatus.ACCEPTED, SwapStatus.ACCEPTED, SwapStatus.ACCEPTED])
+        response = client.get('/api/requests/history?created_after=2026-01-01T00:01:00'
+                              '&created_before=2026-01-01T00:02:00', headers=headers['user1'])
+        assert len(response.json['swaps']) == 1
@@ -0,0 +1,108 @@
+"""
+Tests for the materialized swap counters and the summary endpoint.
+"""
+
+from sqlalchemy import update
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+from app.models import Organization, SwapCounter, SwapRequest, SwapStatus, User
+from app.services import swap_counters, tenancy
+
+
+def create_swap(client, headers, users, events):
+    user1, user2 = users
+    event1, event2, _ = events
+    response = client.post('/api/requests/swap', json={
+        'requestee_id': user2.id,
+        'my_event_id': event1.id,
+        'requestee_event_id': event2.id,
+    }, headers=headers['user1'])
+    assert response.status_code == 201
+    return response.json['swap']['id']
+
+
+class TestSwapSummary:
+    """Tests for GET /api/requests/summary."""
+
+    def test_summary_defaults_to_zero(self, client, headers):
+        response = client.get('/api/requests/summary', headers=headers['user1'])
+        assert response.status_code == 200
+        assert response.json['summary'] == {'pending_received': 0, 'pending_sent': 0, 'accepted': 0}
+
+    def test_counters_follow_create_and_accept(self, client, headers, users, events):
+        swap_id = create_swap(client, headers, users, events)
+
+        assert client.get('/api/requests/summary', headers=headers['user1']).json['summary']['pending_sent'] == 1
+        assert client.get('/api/requests/summary', headers=headers['user2']).json['summary']['pending_received'] == 1
+
+        client.post(f'/api/requests/{swap_id}/accept', headers=headers['user2'])
+
+        for key in ('user1', 'user2'):
+            summary = client.get('/api/requests/summary', headers=headers[key]).json['summary']
+            assert summary == {'pending_received': 0, 'pending_sent': 0, 'accepted': 1}
+
+    def test_counters_follow_reject(self, client, headers, users, events):
+        swap_id = create_swap(client, headers, users, events)
+        client.post(f'/api/requests/{swap_id}/reject', headers=headers['user2'])
+
+        summary = client.get('/api/requests/summary', headers=headers['user2']).json['summary']
+        assert summary == {'pending_received': 0, 'pending_sent': 0, 'accepted': 0}
+
+    def test_swap_resolved_elsewhere_is_not_counted_twice(self, client, headers, users, events):
+        swap_id = create_swap(client, headers, users, events)
+        swap = db.session.get(SwapRequest, swap_id)
+        # Another process rejects it after this session loaded it as PENDING.
+        db.session.execute(update(SwapRequest).where(SwapRequest.id == swap_id).values(status=SwapStatus.REJECTED))
+        swap_counters.record_resolved(swap, SwapStatus.REJECTED)
+        db.session.commit()
+        set_committed_value(swap, 'status', SwapStatus.PENDING)
+
+        response = client.post(f'/api/requests/{swap_id}/accept', headers=headers['user2'])
+        assert response.status_code == 400
+        summary = client.get('/api/requests/summary', headers=headers['user2']).json['summary']
+        assert summary == {'pending_received': 0, 'pending_sent': 0, 'accepted': 0}
+
+    def test_deleting_a_slot_drops_its_pending_swaps(self, client, headers, users, events):
+        swap_id = create_swap(client, headers, users, events)
+        response = client.delete(f'/api/events/{events[0].id}', headers=headers['user1'])
+        assert response.status_code == 200
+
+        assert db.session.get(SwapRequest, swap_id) is None
+        for key in ('user1', 'user2'):
+            summary = client.get('/api/requests/summary', headers=headers[key]).json['summary']
+            assert summary == {'pending_received': 0, 'pending_sent': 0, 'accepted': 0}
+        assert swap_counters.reconcile() == 0
+
+
+class TestReconcile:
+    """Tests for the counter reconciliation job."""
+
+    def test_reconcile_fixes_drift(self, client, headers, users, events):
+        user1, user2 = users
+        create_swap(client, headers, users, events)
+
+        db.session.get(SwapCounter, user2.id).pending_received = 7
+        db.session.delete(db.session.get(SwapCounter, user1.id))
+        db.session.commit()
+
+        assert swap_counters.reconcile() == 2
+        assert swap_counters.get_summary(user1.id)['pending_sent'] == 1
+        assert swap_counters.get_summary(user2.id)['pending_received'] == 1
+        assert swap_counters.reconcile() == 0
+
+    def test_reconcile_leaves_routed_tenants_to_their_partition(self, client, headers, users, events):
+        create_swap(client, headers, users, events)
+        routed = Organization(name='Routed', slug='routed', schema='routed')
+        db.session.add(routed)
+        db.session.flush()
+        member = User(name='Member', email='member@routed.com', password='password123')
+        member.org_id = routed.id
+        db.session.add(member)
+        db.session.flush()
+        # Its swaps live in the routed schema, out of sight of the shared partition.
+        db.session.add(SwapCounter(user_id=member.id, pending_sent=3))
+        db.session.commit()
+
+        with tenancy.unscoped():
+            assert swap_counters.reconcile() == 0
+        assert swap_counters.get_summary(member.id)['pending_sent'] == 3
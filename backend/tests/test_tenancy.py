@@ -0,0 +1,130 @@
+"""
+Tests for organization scoping: isolation between tenants, stamping of new
+rows and joining an organization at registration.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from app.extensions import db
+from app.models import Event, EventStatus, Organization, SwapRequest, User, DEFAULT_ORG_ID
+from app.services import tenancy
+
+
+@pytest.fixture
+def other_org(app, events):
+    """A second organization with one member and one SWAPPABLE slot."""
+    org = Organization(name='Other Co', slug='other-co')
+    db.session.add(org)
+    db.session.flush()
+    outsider = User(name='Outsider', email='outsider@test.com', password='password123')
+    outsider.org_id = org.id
+    db.session.add(outsider)
+    db.session.flush()
+    now = datetime.utcnow()
+    slot = Event(user_id=outsider.id, title='Outsider Meeting', status=EventStatus.SWAPPABLE,
+                 start_time=now + timedelta(hours=7), end_time=now + timedelta(hours=8))
+    db.session.add(slot)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=outsider.id)}'}
+    return org, outsider, slot, headers
+
+
+def test_rows_are_stamped_with_their_owners_org(app, users, events, other_org):
+    org, outsider, slot, _ = other_org
+    assert {user.org_id for user in users} == {DEFAULT_ORG_ID}
+    assert {event.org_id for event in events} == {DEFAULT_ORG_ID}
+    assert slot.org_id == org.id
+
+    claims = decode_token(create_access_token(identity=outsider.id))
+    assert claims['org'] == org.id
+
+    with tenancy.scope(org.id):
+        assert Event.query.count() == 1
+        assert Event.query.filter_by(id=events[0].id).first() is None
+        assert db.session.get(Event, events[0].id) is None
+        assert User.query.filter_by(email='user1@test.com').first() is None
+    assert Event.query.count() == 4
+
+
+def test_listings_and_changes_are_scoped(client, events, headers, other_org):
+    _, _, slot, outsider_headers = other_org
+
+    titles = {e['title'] for e in client.get('/api/events', headers=outsider_headers).get_json()['events']}
+    assert titles == {'Outsider Meeting'}
+    titles = {e['title'] for e in client.get('/api/events', headers=headers['user1']).get_json()['events']}
+    assert 'Outsider Meeting' not in titles and len(titles) == 3
+
+    changed = client.get('/api/events/changes', headers=outsider_headers).get_json()['events']
+    assert [e['id'] for e in changed] == [slot.id]
+
+    members = client.get('/api/orgs/members', headers=outsider_headers).get_json()
+    assert [m['name'] for m in members['members']] == ['Outsider']
+
+
+def test_other_orgs_entities_are_not_found(client, users, events, headers, other_org):
+    _, outsider, slot, outsider_headers = other_org
+    user1, user2 = users
+
+    # Warm the shared cache from the owning organization first.
+    assert client.get(f'/api/events/{events[0].id}', headers=headers['user1']).status_code == 200
+    assert client.get(f'/api/events/{events[0].id}', headers=outsider_headers).status_code == 404
+    assert client.delete(f'/api/events/{events[0].id}', headers=outsider_headers).status_code == 404
+
+    response = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': outsider.id, 'my_event_id': events[0].id, 'requestee_event_id': slot.id})
+    assert response.status_code == 404
+
+    response = client.post('/api/requests/swap', headers=headers['user1'], json={
+        'requestee_id': user2.id, 'my_event_id': events[0].id, 'requestee_event_id': events[1].id})
+    assert response.status_code == 201
+    swap_id = response.get_json()['swap']['id']
+    assert client.get(f'/api/requests/{swap_id}', headers=headers['user2']).status_code == 200
+    assert client.get(f'/api/requests/{swap_id}', headers=outsider_headers).status_code == 404
+    assert client.post(f'/api/requests/{swap_id}/accept', headers=outsider_headers).status_code == 404
+    assert db.session.get(SwapRequest, swap_id).org_id == DEFAULT_ORG_ID
+
+
+def test_register_with_new_organization_and_invite(client):
+    response = client.post('/api/auth/register', json={
+        'name': 'Founder', 'email': 'founder@test.com', 'password': 'password123', 'organization': 'Acme Labs'})
+    assert response.status_code == 201
+    founder = response.get_json()
+    founder_headers = {'Authorization': f'Bearer {founder["access_token"]}'}
+    org = client.get('/api/orgs/current', headers=founder_headers).get_json()['organization']
+    assert (org['name'], org['slug']) == ('Acme Labs', 'acme-labs')
+
+    response = client.post('/api/auth/register', json={
+        'name': 'Copycat', 'email': 'copycat@test.com', 'password': 'password123', 'organization': 'ACME labs'})
+    assert response.status_code == 400
+
+    invite = client.post('/api/orgs/invites', headers=founder_headers).get_json()['invite']
+    response = client.post('/api/auth/register', json={
+        'name': 'Joiner', 'email': 'joiner@test.com', 'password': 'password123', 'invite': invite})
+    assert response.status_code == 201
+    assert response.get_json()['user']['id'] in {
+        m['id'] for m in client.get('/api/orgs/members', headers=founder_headers).get_json()['members']}
+
+    response = client.post('/api/auth/register', json={
+        'name': 'Forger', 'email': 'forger@test.com', 'password': 'password123', 'invite': invite + 'x'})
+    assert response.status_code == 400
+
+    response = client.post('/api/auth/register', json={
+        'name': 'Loner', 'email': 'loner@test.com', 'password': 'password123'})
+    assert response.status_code == 201
+    assert User.query.filter_by(email='loner@test.com').one().org_id == DEFAULT_ORG_ID
+
+
+def test_change_sequences_are_per_org(client, events, headers, other_org):
+    _, _, slot, outsider_headers = other_org
+    cursor = client.get('/api/events', headers=headers['user1']).get_json()['cursor']
+
+    client.put(f'/api/events/{slot.id}', json={'title': 'Renamed'}, headers=outsider_headers)
+    client.delete(f'/api/events/{slot.id}', headers=outsider_headers)
+    assert client.get('/api/events', headers=headers['user1']).get_json()['cursor'] == cursor
+
+    client.delete(f'/api/events/{events[2].id}', headers=headers['user2'])
+    data = client.get('/api/events/changes', query_string={'since': cursor}, headers=headers['user1']).get_json()
+    assert [tombstone['id'] for tombstone in data['deleted']] == [events[2].id]
+    outsider = client.get('/api/events/changes', headers=outsider_headers).get_json()
+    assert [tombstone['id'] for tombstone in outsider['deleted']] == [slot.id]
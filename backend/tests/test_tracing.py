@@ -0,0 +1,93 @@
+"""
+Tests for request tracing and slow-trace export.
+"""
+
+import json
+import pytest
+from app import create_app
+from app.config import config, TestingConfig
+from app.extensions import db
+from app.utils import tracing
+
+
+def make_app(tmp_path, **settings):
+    name = f'tracing-{len(config)}'
+    config[name] = type('TracingConfig', (TestingConfig,), dict({
+        'TRACE_EXPORT_PATH': str(tmp_path / 'traces' / 'slow.jsonl'),
+        'TRACE_SAMPLE_RATE': 1.0,
+        'TRACE_SLOW_MS': 0,
+    }, **settings))
+    try:
+        return create_app(name)
+    finally:
+        del config[name]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def exported(app):
+    path = app.config['TRACE_EXPORT_PATH']
+    with open(path) as f:
+        return [json.loads(line)['resourceSpans'][0]['scopeSpans'][0]['spans'] for line in f]
+
+
+def test_exports_span_tree_in_otlp_json(app, client, users):
+    response = client.post('/api/auth/login', json={'email': 'user1@test.com', 'password': 'password123'},
+                           headers={'X-Request-ID': 'req-42'})
+    assert response.headers['X-Request-ID'] == 'req-42'
+
+    [spans] = exported(app)
+    by_name = {span['name']: span for span in spans}
+    root = by_name['POST /api/auth/login']
+    assert root['kind'] == tracing.SPAN_KIND_SERVER and 'parentSpanId' not in root
+    assert {'key': 'request.id', 'value': {'stringValue': 'req-42'}} in root['attributes']
+    assert by_name['handler auth.login']['parentSpanId'] == root['spanId']
+    assert by_name['bcrypt.check']['parentSpanId'] == by_name['handler auth.login']['spanId']
+    assert 'serialize User' in by_name
+    assert any(span['name'] == 'db.query' and span['kind'] == tracing.SPAN_KIND_CLIENT for span in spans)
+    assert len({span['traceId'] for span in spans}) == 1
+
+
+def test_traceparent_controls_trace_id_and_sampling(app, client, headers):
+    trace_id = 'ab' * 16
+    client.get('/api/events', headers=dict(headers['user1'], traceparent=f'00-{trace_id}-{"cd" * 8}-00'))
+    client.get('/api/events', headers=dict(headers['user1'], traceparent=f'00-{trace_id}-{"cd" * 8}-01'))
+
+    [spans] = exported(app)
+    assert {span['traceId'] for span in spans} == {trace_id}
+    root = next(span for span in spans if span['name'] == 'GET /api/events')
+    assert root['parentSpanId'] == 'cd' * 8
+    assert any(span['name'] == 'jwt.verify' for span in spans)
+
+
+def test_batch_sub_requests_nest_in_one_trace(app, client, headers):
+    client.post('/api/batch', json={'requests': [{'path': '/api/auth/me'}, {'path': '/api/events'}]},
+                headers=headers['user1'])
+    [spans] = exported(app)
+    names = [span['name'] for span in spans]
+    assert 'POST /api/batch' in names and 'GET /api/auth/me' in names and 'GET /api/events' in names
+
+
+def test_fast_and_unsampled_requests_are_not_exported(tmp_path):
+    for settings in ({'TRACE_SLOW_MS': 60000}, {'TRACE_SAMPLE_RATE': 0.0}):
+        app = make_app(tmp_path, **settings)
+        response = app.test_client().get('/')
+        assert response.headers['X-Request-ID']
+        assert not (tmp_path / 'traces' / 'slow.jsonl').exists()
+    assert tracing.span('anything') is tracing._NOOP
+
+
+def test_file_sink_rotates(tmp_path):
+    sink = tracing.FileSink(str(tmp_path / 'out.jsonl'), max_bytes=100)
+    for i in range(5):
+        sink.write({'i': i, 'padding': 'x' * 40})
+    assert (tmp_path / 'out.jsonl.1').exists()
+    assert (tmp_path / 'out.jsonl').stat().st_size <= 100
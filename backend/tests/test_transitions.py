@@ -0,0 +1,101 @@
+"""
+Tests for the swap transition log: rows written with each swap write,
+queries by user and slot, and compaction into daily counts.
+"""
+
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import SwapTransition, SwapTransitionDaily
+from app.services import expiry, transitions
+from app.utils.metrics import metrics
+
+
+def create_swap(client, headers, users, events, sender='user1'):
+    user1, user2 = users
+    mine, theirs = (events[0], events[1]) if sender == 'user1' else (events[1], events[0])
+    requestee = user2 if sender == 'user1' else user1
+    response = client.post('/api/requests/swap', headers=headers[sender], json={
+        'requestee_id': requestee.id, 'my_event_id': mine.id, 'requestee_event_id': theirs.id})
+    assert response.status_code == 201
+    return response.get_json()['swap']['id']
+
+
+def kinds(rows):
+    return [row['kind'] if isinstance(row, dict) else row.kind for row in rows]
+
+
+def test_accept_logs_swap_and_ownership_in_one_insert(client, users, events, headers):
+    user1, user2 = users
+    event1, event2, _ = events
+    swap_id = create_swap(client, headers, users, events)
+
+    written = metrics.get('transitions.written')
+    assert client.post(f'/api/requests/{swap_id}/accept', headers=headers['user2']).status_code == 200
+    assert metrics.get('transitions.written') - written == 3
+
+    rows = SwapTransition.query.order_by(SwapTransition.id).all()
+    assert kinds(rows) == ['swap.created', 'slot.owner_changed', 'slot.owner_changed', 'swap.accepted']
+    moves = {(row.slot_id, row.from_user_id, row.to_user_id) for row in rows[1:3]}
+    assert moves == {(event1.id, user1.id, user2.id), (event2.id, user2.id, user1.id)}
+    assert rows[-1].actor_id == user2.id
+
+    history = client.get('/api/requests/transitions', headers=headers['user1']).get_json()
+    assert kinds(history['transitions']) == ['swap.accepted', 'slot.owner_changed', 'slot.owner_changed',
+                                             'swap.created']
+    slot = client.get('/api/requests/transitions', headers=headers['user1'],
+                      query_string={'slot_id': event1.id, 'limit': 2}).get_json()
+    assert kinds(slot['transitions']) == ['swap.accepted', 'slot.owner_changed']
+    rest = client.get('/api/requests/transitions', headers=headers['user1'],
+                      query_string={'slot_id': event1.id, 'before': slot['next_before']}).get_json()
+    assert kinds(rest['transitions']) == ['swap.created'] and rest['next_before'] is None
+
+
+def test_slot_history_is_limited_to_owners_and_parties(client, users, events, headers):
+    event1, _, event3 = events
+    create_swap(client, headers, users, events)
+    client.post('/api/auth/register', json={'name': 'Third', 'email': 'third@example.com', 'password': 'password123'})
+    token = client.post('/api/auth/login', json={'email': 'third@example.com',
+                                                 'password': 'password123'}).get_json()['access_token']
+    third = {'Authorization': f'Bearer {token}'}
+
+    def history(slot_id, who):
+        return client.get('/api/requests/transitions', headers=who, query_string={'slot_id': slot_id})
+
+    assert history(event1.id, headers['user2']).status_code == 200
+    assert history(event3.id, headers['user2']).status_code == 200
+    assert history(event1.id, third).status_code == 403
+    assert history(event3.id, headers['user1']).status_code == 403
+    assert history('01890000-0000-7000-8000-000000000000', third).status_code == 404
+
+
+def test_reject_and_expire_are_logged(client, users, events, headers):
+    rejected = create_swap(client, headers, users, events)
+    client.post(f'/api/requests/{rejected}/reject', headers=headers['user2'])
+    create_swap(client, headers, users, events, sender='user2')
+    assert expiry.sweep(now=datetime.utcnow() + timedelta(hours=5)) == 1
+
+    rows = SwapTransition.query.order_by(SwapTransition.id).all()
+    assert kinds(rows) == ['swap.created', 'swap.rejected', 'swap.created', 'swap.expired']
+    assert rows[-1].actor_id is None
+
+
+def test_failed_transaction_logs_nothing(app, users, events):
+    transitions._append('swap.created', events[0].org_id, events[0].id, users[0].id, users[1].id, events[0].id)
+    db.session.rollback()
+    db.session.commit()
+    assert SwapTransition.query.count() == 0
+
+
+def test_compaction_folds_old_rows_into_daily_counts(client, users, events, headers):
+    for _ in range(2):
+        swap_id = create_swap(client, headers, users, events)
+        client.post(f'/api/requests/{swap_id}/reject', headers=headers['user2'])
+    assert SwapTransition.query.count() == 4
+
+    cutoff = datetime.utcnow() + timedelta(seconds=1)
+    assert transitions.compact(cutoff, batch_size=3) == 3
+    assert transitions.compact(cutoff, batch_size=3) == 1
+    assert transitions.compact(cutoff) == 0
+    assert SwapTransition.query.count() == 0
+    counts = {row.kind: row.count for row in SwapTransitionDaily.query.all()}
+    assert counts == {'swap.created': 2, 'swap.rejected': 2}
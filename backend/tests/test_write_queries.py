@@ -0,0 +1,62 @@
+"""
+Statement counts of the write endpoints: responses are serialized from the
+objects just written, with no reloads after commit.
+"""
+
+from contextlib import contextmanager
+from sqlalchemy import event as sa_event
+from app.extensions import db
+
+
+@contextmanager
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement.split(None, 1)[0].upper())
+
+    sa_event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield executed
+    finally:
+        sa_event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def request(client, method, url, headers, json=None):
+    """Issue a request with a fresh session, as in production."""
+    db.session.remove()
+    with statements() as executed:
+        response = getattr(client, method)(url, headers=headers, json=json)
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json(), executed
+
+
+def test_write_endpoints_do_not_reload_after_commit(client, users, events, headers):
+    user1, user2 = users
+    slot_id, their_slot_id = events[0].id, events[1].id
+    start, end = events[0].start_time, events[0].end_time
+    client.get('/api/auth/me', headers=headers['user1'])  # loads the revocation filter
+
+    body, executed = request(client, 'post', '/api/events', headers['user1'], {
+        'title': 'Focus', 'start_time': start.isoformat(), 'end_time': end.isoformat(), 'status': 'SWAPPABLE'})
+    # user, event, read model (delete + insert), outbox, then at commit the change counter and the event's change_seq
+    assert executed == ['SELECT', 'INSERT', 'DELETE', 'INSERT', 'INSERT', 'UPDATE', 'UPDATE']
+    assert body['event']['title'] == 'Focus'
+
+    _, executed = request(client, 'put', f'/api/events/{body["event"]["id"]}', headers['user1'], {'title': 'Deep work'})
+    # user, event, event, outbox, read model (delete + insert), change counter, change_seq
+    assert executed == ['SELECT', 'SELECT', 'UPDATE', 'INSERT', 'DELETE', 'INSERT', 'UPDATE', 'UPDATE']
+
+    body, executed = request(client, 'post', '/api/requests/swap', headers['user1'], {
+        'requestee_id': user2.id, 'my_event_id': slot_id, 'requestee_event_id': their_slot_id})
+    # users, events, swap, two counter upserts (first swap: update, savepoint insert), log, outbox
+    assert len(executed) == 15 and executed.count('SELECT') == 4
+    assert body['swap']['requester_slot']['id'] == slot_id
+
+    swap_id = body['swap']['id']
+    body, executed = request(client, 'post', f'/api/requests/{swap_id}/accept', headers['user2'])
+    # user, swap, events, events, swap, read model (delete, owners, insert), counters, outbox,
+    # change counter, change_seq, log, then the requester for the response
+    assert len(executed) == 16 and executed.count('SELECT') == 6
+    assert body['swap']['status'] == 'ACCEPTED'
+    assert body['swap']['requestee_slot']['user_id'] == user1.id